@@ -0,0 +1,80 @@
+"""
+    Name:           benchmark_compressed_dump.py
+    Description:    Compares reading speed (atoms/s) of uncompressed dump file and of the same
+                    dump file compressed by gzip, bz2, xz and zstd (streamed decompression).
+    Usage:          python3 benchmark_compressed_dump.py [<dump.file>] [<repeats>]
+"""
+
+import os
+import sys
+import bz2
+import gzip
+import lzma
+import time
+import shutil
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules.dump_reader import read_frames
+
+
+def compress(filename, directory, compression):
+    """
+    writes compressed copy of 'filename' to 'directory', returns its path or None if codec is not available
+    """
+    path = os.path.join(directory, os.path.basename(filename) + "." + compression)
+    with open(filename, "rb") as input_file:
+        data = input_file.read()
+
+    if compression == "gz":
+        with gzip.open(path, "wb") as output_file:
+            output_file.write(data)
+    elif compression == "bz2":
+        with bz2.open(path, "wb") as output_file:
+            output_file.write(data)
+    elif compression == "xz":
+        with lzma.open(path, "wb") as output_file:
+            output_file.write(data)
+    elif shutil.which("zstd") is not None:
+        subprocess.run(["zstd", "-q", "-f", filename, "-o", path], check=True)
+    else:
+        return None
+    return path
+
+
+def measure(filename, repeats):
+    """
+    returns (number of atoms, best time of 'repeats' runs)
+    """
+    best = None
+    number_of_atoms = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        number_of_atoms = sum(frame.number_of_atoms for frame in read_frames(filename))
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return number_of_atoms, best
+
+
+if __name__ == "__main__":
+    path_to_example = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "..", "example", "mo_one_timestep", "dump.out")
+    filename = sys.argv[1] if len(sys.argv) > 1 else path_to_example
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print("file: {}".format(filename))
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [("uncompressed", filename)]
+        for compression in ("gz", "bz2", "xz", "zst"):
+            path = compress(filename, directory, compression)
+            if path is None:
+                print("{:14s} codec not available".format(compression))
+                continue
+            paths.append((compression, path))
+
+        for name, path in paths:
+            atoms, duration = measure(path, repeats)
+            print("{:14s} {:10d} bytes {:10d} atoms {:10.6f} s {:14.0f} atoms/s".format(
+                name, os.path.getsize(path), atoms, duration, atoms / duration))
@@ -0,0 +1,49 @@
+"""
+    Name:           benchmark_compute_array.py
+    Description:    Compares calculation of descriptors through nested dictionaries (descriptors.compute)
+                    and through contiguous arrays (descriptors.compute_array).
+    Usage:          python3 benchmark_compute_array.py [<dump.file>] [<number_of_timesteps>] [<repeats>]
+                    (C++ extension 'descriptors' must be installed)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules import parallel
+from modules.dump_reader import read_frames
+
+
+def measure(function, frames, repeats):
+    """
+    returns the best time of 'repeats' runs
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(frames)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+if __name__ == "__main__":
+    path_to_example = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "..", "example", "mo_one_timestep", "dump.out")
+    filename = sys.argv[1] if len(sys.argv) > 1 else path_to_example
+    number_of_timesteps = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    frames = []
+    for frame in read_frames(filename):
+        frames.append(frame)
+        if len(frames) == number_of_timesteps:
+            break
+    atoms = sum(frame.number_of_atoms for frame in frames)
+
+    print("file: {} ({} timesteps, {} atoms)".format(filename, len(frames), atoms))
+    for name, function in [("dictionaries", parallel.compute_dict), ("arrays", parallel.compute_array)]:
+        duration = measure(function, frames, repeats)
+        print("{:14s} {:10.4f} s {:14.0f} atoms/s".format(name, duration, atoms / duration))
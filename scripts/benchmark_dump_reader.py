@@ -0,0 +1,95 @@
+"""
+    Name:           benchmark_dump_reader.py
+    Description:    Compares parsing speed (atoms/s) of the vectorized dump reader
+                    and of the former line-by-line parser of Kabuto.
+    Usage:          python3 benchmark_dump_reader.py [<dump.file>] [<repeats>]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules.dump_reader import read_frames
+
+
+def legacy_parser(filename):
+    """
+    line-by-line parser that was used in Kabuto.prepare and Kabuto.predict
+    """
+    timesteps = {}
+    pbc_dict = {}
+    with open(filename, "r") as input_file:
+        scan_timestep = False
+        scan_atoms = False
+        scan_number_of_atoms = False
+        scan_pbc = False
+        current_timestep = None
+        number_of_pbc = 0
+        pbc = [None, None, None]
+
+        for raw_line in input_file:
+            line = raw_line.strip()
+            if line == "ITEM: TIMESTEP":
+                scan_timestep = True
+                scan_atoms = False
+            elif scan_timestep:
+                line = int(line)
+                timesteps[line] = {}
+                current_timestep = line
+                scan_timestep = False
+            elif line == "ITEM: NUMBER OF ATOMS":
+                scan_number_of_atoms = True
+            elif scan_number_of_atoms:
+                scan_number_of_atoms = False
+            elif line == "ITEM: BOX BOUNDS pp pp pp":
+                scan_pbc = True
+            elif scan_pbc:
+                min_value, max_value = tuple(line.split())
+                if number_of_pbc <= 2:
+                    pbc[number_of_pbc] = float(max_value) - float(min_value)
+                    number_of_pbc += 1
+                if number_of_pbc == 3:
+                    scan_pbc = False
+            elif line == "ITEM: ATOMS id type x y z":
+                timesteps[current_timestep] = {}
+                pbc_dict[current_timestep] = list(pbc)
+                scan_atoms = True
+            elif scan_atoms:
+                atom_id, atom_type, atom_x, atom_y, atom_z = line.strip().split()
+                timesteps[current_timestep][int(atom_id)] = [float(atom_x), float(atom_y), float(atom_z)]
+    return sum(len(atoms) for atoms in timesteps.values())
+
+
+def vectorized_reader(filename):
+    """
+    shared dump reader from 'modules.dump_reader'
+    """
+    return sum(frame.number_of_atoms for frame in read_frames(filename))
+
+
+def measure(function, filename, repeats):
+    """
+    returns (number of atoms, best time of 'repeats' runs)
+    """
+    best = None
+    number_of_atoms = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        number_of_atoms = function(filename)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return number_of_atoms, best
+
+
+if __name__ == "__main__":
+    path_to_example = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "..", "example", "mo_one_timestep", "dump.out")
+    filename = sys.argv[1] if len(sys.argv) > 1 else path_to_example
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print("file: {}".format(filename))
+    for name, function in [("legacy parser", legacy_parser), ("vectorized reader", vectorized_reader)]:
+        atoms, duration = measure(function, filename, repeats)
+        print("{:20s} {:10d} atoms {:10.6f} s {:14.0f} atoms/s".format(name, atoms, duration, atoms / duration))
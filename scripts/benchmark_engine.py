@@ -0,0 +1,65 @@
+"""
+    Name:           benchmark_engine.py
+    Description:    Compares latency of calculation of descriptors of one frame at a time: new calculation for
+                    each frame (descriptors.compute_array, Verlet lists are created for every frame) and
+                    persistent engine (descriptors.Engine, Verlet lists and buffers are kept between frames).
+    Usage:          python3 benchmark_engine.py [<dump.file>] [<number_of_timesteps>] [<threads>]
+                    (NumPy implementation in 'modules' is used if C++ extension 'descriptors' is not installed)
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+try:
+    import descriptors
+except ImportError:
+    from modules import descriptors
+from modules.dump_reader import read_frames
+
+
+def latencies(update, frames):
+    """
+    returns latencies [us] of 'update(positions, box)' for all frames
+    """
+    result = []
+    for positions, box in frames:
+        start = time.perf_counter()
+        update(positions, box)
+        result.append(1e6 * (time.perf_counter() - start))
+    return np.array(result)
+
+
+if __name__ == "__main__":
+    path_to_example = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "..", "example", "mo_bcc_fcc_amorf", "dumpOnlyAmorf.out")
+    filename = sys.argv[1] if len(sys.argv) > 1 else path_to_example
+    number_of_timesteps = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    frames = []
+    for frame in read_frames(filename):
+        frames.append((np.ascontiguousarray(frame.positions, dtype=np.float64), np.array(frame.pbc(), dtype=np.float64)))
+        if len(frames) == number_of_timesteps:
+            break
+    number_of_atoms = len(frames[0][0])
+
+    descriptors.set_num_threads(threads)
+    out = np.empty((number_of_atoms, descriptors.parameters()["number_of_descriptors"]))
+    engine = descriptors.Engine(threads=threads)
+    results = [("compute_array", latencies(lambda positions, box: descriptors.compute_array(positions, box, out), frames)),
+               ("Engine.update", latencies(lambda positions, box: engine.update(positions, box, out), frames))]
+
+    statistics = engine.statistics()
+    print("file: {} ({} timesteps, {} atoms, {} threads, {})".format(
+        filename, len(frames), number_of_atoms, threads, statistics["instruction_set"]))
+    print("{:14s} {:>12s} {:>12s} {:>12s} {:>12s}".format("", "mean [us]", "median [us]", "p99 [us]", "max [us]"))
+    for name, values in results:
+        print("{:14s} {:12.0f} {:12.0f} {:12.0f} {:12.0f}".format(
+            name, values.mean(), np.median(values), np.percentile(values, 99), values.max()))
+    print("Engine: {} creations of Verlet lists in {} updates, mean update {:.0f} us (measured by Engine)".format(
+        statistics["verlet_list_builds"], statistics["updates"], statistics["mean_update_us"]))
@@ -0,0 +1,68 @@
+"""
+    Name:           benchmark_model_registry.py
+    Description:    Compares wall time of prediction of all timesteps of a dump file when model of neural network
+                    is loaded (deserialized from .h5 file) for each timestep and when it is taken from
+                    ModelRegistry (loaded once per run).
+    Usage:          python3 benchmark_model_registry.py [<dump.file>] [<number_of_timesteps>] [<path/to/model.h5>]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+try:
+    import descriptors
+except ImportError:
+    from modules import descriptors
+from modules.dump_reader import read_frames
+from modules.neural_network import NeuralNetwork
+from modules.model_registry import ModelRegistry
+
+
+def predict_all(get_network, inputs):
+    """
+    returns wall time [s] of prediction of all inputs by network returned by 'get_network()'
+    """
+    start = time.perf_counter()
+    for input_array in inputs:
+        get_network().predict(input_array)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    path_to_example = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "example", "mo_bcc_fcc_amorf")
+    filename = sys.argv[1] if len(sys.argv) > 1 else os.path.join(path_to_example, "dumpOnlyAmorf.out")
+    number_of_timesteps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    path_to_model = sys.argv[3] if len(sys.argv) > 3 else os.path.join(path_to_example, "saved_nn",
+                                                                      "nn-bcc-fcc-amorf.h5")
+    saved_nn_dir, name = os.path.split(os.path.abspath(path_to_model))
+    name = name[:-len(".h5")]
+
+    # descriptors are calculated before the measurement, the same inputs are used by both ways
+    inputs = []
+    for frame in read_frames(filename):
+        positions = np.ascontiguousarray(frame.positions, dtype=np.float64)
+        out = np.empty((len(positions), descriptors.parameters()["number_of_descriptors"]))
+        descriptors.compute_array(positions, np.array(frame.pbc(), dtype=np.float64), out)
+        inputs.append(out.astype(np.float32))
+        if len(inputs) == number_of_timesteps:
+            break
+
+    def load_each_time():
+        nn = NeuralNetwork(name)
+        nn.load_model(saved_nn_dir)
+        return nn
+
+    registry = ModelRegistry(saved_nn_dir, keras=True)
+    results = [("load per timestep", predict_all(load_each_time, inputs)),
+               ("ModelRegistry", predict_all(lambda: registry.get(name), inputs))]
+
+    print("file: {} ({} timesteps, {} atoms), model: {}".format(filename, len(inputs), len(inputs[0]), path_to_model))
+    print("{:18s} {:>12s} {:>18s}".format("", "total [s]", "per timestep [ms]"))
+    for label, seconds in results:
+        print("{:18s} {:12.2f} {:18.1f}".format(label, seconds, 1e3 * seconds / len(inputs)))
+    print("ModelRegistry: {} loads in {:.2f} s, {} hits".format(registry.loads, registry.load_time, registry.hits))
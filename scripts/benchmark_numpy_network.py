@@ -0,0 +1,90 @@
+"""
+    Name:           benchmark_numpy_network.py
+    Description:    Compares NumPy forward pass (NumpyNetwork, weights exported from .h5 file) with Keras model
+                    (NeuralNetwork): startup (new Python process that imports the module, loads the model and
+                    predicts one atom) and throughput of prediction for several numbers of atoms.
+    Usage:          python3 benchmark_numpy_network.py [<path/to/model.h5>] [<max_atoms>]
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+import numpy as np
+
+path_to_src = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, path_to_src)
+
+from modules.numpy_network import NumpyNetwork
+
+# program of new process, it prints time [s] of import, load of model and prediction of one atom
+STARTUP_PROGRAM = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {path_to_src!r})
+from {module} import {network}
+imported = time.perf_counter()
+nn = {network}({name!r})
+nn.load_model({saved_nn_dir!r})
+loaded = time.perf_counter()
+nn.predict(__import__("numpy").zeros((1, 14), dtype="float32"))
+print(imported - start, loaded - imported, time.perf_counter() - loaded)
+"""
+
+
+def startup(module, network, name, saved_nn_dir):
+    """
+    returns times [s] of import, load of model and first prediction in a new Python process
+    """
+    program = STARTUP_PROGRAM.format(path_to_src=path_to_src, module=module, network=network,
+                                     name=name, saved_nn_dir=saved_nn_dir)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", program], capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - start
+    return [float(value) for value in output.split()[-3:]] + [total]
+
+
+def throughput(nn, input_array, repeats=3):
+    """
+    returns the best throughput [atoms/s] of prediction of input_array
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        nn.predict(input_array, len(input_array))
+        best = min(best, time.perf_counter() - start)
+    return len(input_array) / best
+
+
+if __name__ == "__main__":
+    path_to_model = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "example", "mo_bcc_fcc_amorf", "saved_nn",
+        "nn-bcc-fcc-amorf.h5")
+    max_atoms = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    saved_nn_dir, name = os.path.split(os.path.abspath(path_to_model))
+    name = name[:-len(".h5")]
+
+    print("model: {}".format(path_to_model))
+    print("{:14s} {:>10s} {:>10s} {:>16s} {:>10s}".format("startup [s]", "import", "load", "first predict",
+                                                            "process"))
+    startup_numpy = startup("modules.numpy_network", "NumpyNetwork", name, saved_nn_dir)
+    startup_keras = startup("modules.neural_network", "NeuralNetwork", name, saved_nn_dir)
+    for label, times in (("NumpyNetwork", startup_numpy), ("NeuralNetwork", startup_keras)):
+        print("{:14s} {:10.3f} {:10.3f} {:16.3f} {:10.3f}".format(label, *times))
+
+    from modules.neural_network import NeuralNetwork
+    numpy_network, keras_network = NumpyNetwork(name), NeuralNetwork(name)
+    numpy_network.load_model(saved_nn_dir)
+    keras_network.load_model(saved_nn_dir)
+
+    generator = np.random.default_rng(0)
+    print("{:>10s} {:>22s} {:>22s} {:>14s}".format("atoms", "NumpyNetwork [atoms/s]", "NeuralNetwork [atoms/s]",
+                                                   "max difference"))
+    atoms = 250
+    while atoms <= max_atoms:
+        input_array = generator.normal(size=(atoms, 14)).astype(np.float32)
+        difference = np.max(np.abs(numpy_network.predict(input_array) - keras_network.predict(input_array, atoms)))
+        print("{:10d} {:22.0f} {:23.0f} {:14.1e}".format(atoms, throughput(numpy_network, input_array),
+                                                         throughput(keras_network, input_array), difference))
+        atoms *= 20
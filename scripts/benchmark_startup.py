@@ -0,0 +1,99 @@
+"""
+    Name:           benchmark_startup.py
+    Description:    Measures startup of kabuto.py for each action: wall time of the whole run and import time
+                    of heavy dependencies reported by 'python -X importtime'. Kabuto is run in a temporary copy
+                    of 'src' folder (with the example network in 'saved_nn'), so results, cache and descriptor
+                    store of the original folder are not changed. Actions that read a dump file read only
+                    its first timestep.
+    Usage:          python3 benchmark_startup.py [<path/to/src>] [<repeats>]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+path_to_example = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "example", "mo_bcc_fcc_amorf")
+path_to_dump = os.path.join(path_to_example, "dumpOnlyAmorf.out")
+
+# actions of kabuto.py (arguments) whose startup is measured
+ACTIONS = [
+    ["list_nn"],
+    ["cache", "info"],
+    ["prepare", "amorf", path_to_dump, "--timesteps=0", "--no-cache"],
+    ["predict", "nn-bcc-fcc-amorf", path_to_dump, "--timesteps=0", "--no-cache"],
+    ["create_nn", "new-nn"],
+]
+
+# heavy dependencies whose import time is reported
+PACKAGES = ["numpy", "scipy", "descriptors", "matplotlib", "h5py", "tensorflow"]
+
+
+def import_times(stderr):
+    """
+    returns import times [s] from output of 'python -X importtime': the sum of cumulative times
+    of top-level imports ("imports") and the time of each package of PACKAGES (cumulative times of its modules
+    imported by other packages, also when it was imported by another module)
+    """
+    result = {"imports": 0.0}
+    roots = []  # root package of the last module at each depth
+    # modules are printed after modules they import, reversed lines start with the importing module
+    for line in reversed(stderr.splitlines()):
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            # header
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        root = name.strip().split(".")[0]
+        roots[depth:] = [root]
+        if depth == 0:
+            result["imports"] += int(cumulative) * 1e-6
+        if root in PACKAGES and (depth == 0 or roots[depth - 1] != root):
+            result[root] = result.get(root, 0.0) + int(cumulative) * 1e-6
+    return result
+
+
+def run(directory, arguments):
+    """
+    returns (wall time [s], {module: import time [s]}) of one run of kabuto.py
+    """
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", os.path.join(directory, "kabuto.py")] + arguments,
+                             cwd=directory, capture_output=True, text=True)
+    wall_time = time.perf_counter() - start
+    return wall_time, import_times(process.stderr)
+
+
+if __name__ == "__main__":
+    path_to_src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "src")
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as directory:
+        for item in os.listdir(path_to_src):
+            if item in ("kabuto.py", "modules", "config"):
+                source = os.path.join(path_to_src, item)
+                (shutil.copytree if os.path.isdir(source) else shutil.copy)(source, os.path.join(directory, item))
+        os.mkdir(os.path.join(directory, "saved_nn"))
+        shutil.copy(os.path.join(path_to_example, "saved_nn", "nn-bcc-fcc-amorf.h5"),
+                    os.path.join(directory, "saved_nn"))
+
+        print("kabuto: {} (best of {} runs)".format(os.path.abspath(path_to_src), repeats))
+        print("{:12s} {:>9s} {:>9s}  ".format("action", "wall [s]", "imports") +
+              " ".join("{:>11s}".format(package) for package in PACKAGES))
+        for arguments in ACTIONS:
+            runs = []
+            for _ in range(repeats):
+                runs.append(run(directory, arguments))
+                if arguments[0] == "create_nn":
+                    # the network is created again in the next run
+                    os.remove(os.path.join(directory, "saved_nn", arguments[1] + ".h5"))
+            wall_time, modules = min(runs, key=lambda result: result[0])
+            print("{:12s} {:9.2f} {:9.2f}  ".format(arguments[0], wall_time, modules["imports"]) +
+                  " ".join("{:>11s}".format("{:.3f}".format(modules[package]) if package in modules else "-")
+                           for package in PACKAGES))
+        print("import times [s] of all imports and of packages ('-' means the package was not imported)")
@@ -0,0 +1,86 @@
+"""
+    Name:           benchmark_training.py
+    Description:    Compares peak memory (RSS) and time of one epoch of training from descriptor store with random
+                    descriptors: all rows loaded into arrays (model.fit with validation_split, the former way) and
+                    rows streamed from disk by TrainingData (tf.data pipeline, validation by segments).
+                    Each way runs in its own process, so peak memory of one does not affect the other.
+    Usage:          python3 benchmark_training.py [<number_of_rows>] [<segments_per_phase>]
+"""
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import subprocess
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules.descriptor_store import DescriptorStore
+
+PHASES = {"bcc": 0, "fcc": 1, "amorf": 2}
+
+# number of atoms in one frame of generated store
+ATOMS_PER_FRAME = 10000
+
+
+def create_store(directory, number_of_rows, segments_per_phase):
+    """
+    creates descriptor store with random descriptors, 'segments_per_phase' segments of each phase
+    """
+    generator = np.random.default_rng(0)
+    store = DescriptorStore(directory)
+    rows_per_segment = number_of_rows // (len(PHASES) * segments_per_phase)
+    for phase, index in PHASES.items():
+        for _ in range(segments_per_phase):
+            with store.segment_writer("float32") as writer:
+                for timestep, start in enumerate(range(0, rows_per_segment, ATOMS_PER_FRAME)):
+                    count = min(ATOMS_PER_FRAME, rows_per_segment - start)
+                    descriptors = generator.normal(loc=index, size=(count, 14)).astype(np.float32)
+                    writer.append(timestep, np.arange(count), descriptors, phase)
+
+
+def train(directory, way):
+    """
+    trains a new network for one epoch from store in 'directory', returns time [s]
+    """
+    from modules.neural_network import NeuralNetwork
+    from modules.training_data import TrainingData
+
+    nn = NeuralNetwork("benchmark")
+    nn.create_model(14, len(PHASES))
+    store = DescriptorStore(directory)
+    start = time.perf_counter()
+    if way == "arrays":
+        input_array = np.concatenate([store.open_segment(segment)[1] for segment in store.segments])
+        output_array = np.concatenate([np.repeat(np.eye(len(PHASES))[[PHASES[frame["phase"]]]], frame["count"], axis=0)
+                                       for frame in store.frames])
+        nn.model.fit(x=input_array, y=output_array, validation_split=0.2, shuffle=True, verbose=0)
+    else:
+        data = TrainingData(store, PHASES)
+        nn.train(data.training_dataset(), data.validation_dataset())
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        seconds = train(sys.argv[2], sys.argv[3])
+        print(seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+        sys.exit()
+
+    number_of_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 3000000
+    segments_per_phase = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_store(directory, number_of_rows, segments_per_phase)
+        size = sum(os.path.getsize(os.path.join(directory, item)) for item in os.listdir(directory))
+        print("store: {} rows, {} segments, {:.1f} MB".format(
+            DescriptorStore(directory).number_of_rows, len(DescriptorStore(directory).segments), size / 1024 / 1024))
+        print("{:8s} {:>14s} {:>18s}".format("", "epoch [s]", "peak RSS [MB]"))
+        for way in ("arrays", "stream"):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", directory, way],
+                                    capture_output=True, text=True, check=True).stdout
+            seconds, peak_rss = (float(value) for value in output.split()[-2:])
+            print("{:8s} {:14.1f} {:18.1f}".format(way, seconds, peak_rss))
@@ -0,0 +1,63 @@
+"""
+    Name:           benchmark_workers.py
+    Description:    Measures scaling of parallel calculation of descriptors (option --workers)
+                    with number of worker processes, compared to serial streaming mode.
+    Usage:          python3 benchmark_workers.py <dump.file> [<max_workers>] [<number_of_timesteps>]
+                    (C++ extension 'descriptors' must be installed)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import descriptors
+from modules import parallel
+from modules.dump_reader import read_frames, load_frame_index
+
+
+def serial(filename, frames):
+    """
+    serial streaming mode with window of one timestep, returns number of atoms
+    """
+    number_of_atoms = 0
+    chosen = [timestep for timestep, _, _ in frames]
+    for frame in read_frames(filename, chosen):
+        result = descriptors.compute({frame.timestep: frame.pbc()}, {frame.timestep: frame.atoms_dict()})
+        number_of_atoms += len(result[frame.timestep])
+    return number_of_atoms
+
+
+def in_parallel(filename, frames, workers):
+    """
+    parallel mode with given number of workers, returns number of atoms
+    """
+    return sum(len(ids) for _, ids, _ in parallel.compute_in_parallel(filename, frames, 1, workers))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    filename = sys.argv[1]
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    frames = load_frame_index(filename)
+    if len(sys.argv) > 3:
+        frames = frames[:int(sys.argv[3])]
+
+    print("file: {} ({} timesteps, {} cores)".format(filename, len(frames), os.cpu_count()))
+    start = time.perf_counter()
+    atoms = serial(filename, frames)
+    serial_duration = time.perf_counter() - start
+    print("{:>10s} {:10d} atoms {:10.3f} s {:14.0f} atoms/s".format(
+        "serial", atoms, serial_duration, atoms / serial_duration))
+
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        atoms = in_parallel(filename, frames, workers)
+        duration = time.perf_counter() - start
+        print("{:>10s} {:10d} atoms {:10.3f} s {:14.0f} atoms/s   speed-up {:5.2f}".format(
+            "{} workers".format(workers), atoms, duration, atoms / duration, serial_duration / duration))
+        workers *= 2
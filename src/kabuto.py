@@ -18,20 +18,72 @@ else:
 
 import logging.config
 
-# set-up logger
-logging.config.fileConfig(os.path.join(path_to_kabuto, "config", "logger.ini"))
+# set-up logger (log is printed to console and appended to 'kabuto.log')
+logging.config.fileConfig(os.path.join(path_to_kabuto, "config", "logger.ini"),
+                          defaults={"log_file": os.path.join(path_to_kabuto, "kabuto.log").replace("\\", "/")})
 logger = logging.getLogger('kabuto')
 
 
 import json
+import time
 import datetime
-import shutil
+import resource
+
+# heavy dependencies are imported by import_modules() only for actions that need them:
+#   * "descriptors" - NumPy, C++ extension 'descriptors' (or its NumPy/SciPy version), dump reader,
+#                     descriptor store, cache and workers
+#   * "networks"    - registry of loaded models and NumPy forward pass of networks
+# TensorFlow is imported only by create_nn, train and predict --keras, matplotlib only by plots of training
+ACTION_IMPORTS = {
+    "prepare": ("descriptors",),
+    "list_nn": (),
+    "create_nn": (),
+    "train": ("descriptors",),
+    "predict": ("descriptors", "networks"),
+    "cache": ("descriptors",),
+    "test": ("descriptors", "networks"),
+}
+
+np = None
+descriptors = None
+parallel = None
+read_frames = windows = parse_selection = indexed_frames = None
+DescriptorStore = None
+Cache = DEFAULT_MAX_SIZE_MB = None
+ModelRegistry = DEFAULT_MAX_MODELS = DEFAULT_BATCH_SIZE = None
+
+# options whose value (if given) must be a positive integer, checked by parse_command_line
+POSITIVE_INTEGER_OPTIONS = ("window", "workers", "max-models", "batch-size", "shuffle-buffer")
+
+
+def import_modules(action):
+    """
+    imports heavy dependencies needed by 'action' (see ACTION_IMPORTS) to global names of this script
+        * returns a tuple of imported groups
+    """
+    global np, descriptors, parallel, read_frames, windows, parse_selection, indexed_frames
+    global DescriptorStore, Cache, DEFAULT_MAX_SIZE_MB, ModelRegistry, DEFAULT_MAX_MODELS, DEFAULT_BATCH_SIZE
+    groups = ACTION_IMPORTS.get(action, ())
+
+    if "descriptors" in groups:
+        import numpy as np
+        try:
+            import descriptors
+        except ImportError:
+            # C++ extension is not installed, descriptors are calculated by NumPy/SciPy (equal up to rounding)
+            from modules import descriptors
+            logger.warning("C++ extension 'descriptors' is not installed, "
+                           "descriptors are calculated by NumPy/SciPy (modules/descriptors.py)")
+        from modules.dump_reader import read_frames, windows, parse_selection, indexed_frames
+        from modules.descriptor_store import DescriptorStore
+        from modules.cache import Cache, DEFAULT_MAX_SIZE_MB
+        from modules import parallel
 
-import numpy as np
-import matplotlib.pyplot as plt
+    if "networks" in groups:
+        from modules.model_registry import ModelRegistry, DEFAULT_MAX_MODELS
+        from modules.numpy_network import DEFAULT_BATCH_SIZE
 
-import descriptors
-from modules.neural_network import NeuralNetwork
+    return groups
 
 
 class NumpyEncoder(json.JSONEncoder):
@@ -43,17 +95,36 @@ class NumpyEncoder(json.JSONEncoder):
 
 class Kabuto:
 
-    def __init__(self, action, option1, option2):
+    def __init__(self, action, option1, option2, options=None):
         """
         constructor of Kabuto class
+            * 'options' is a dictionary of command line options {name: value}
         """
         self.print_intro()
+        self.start_time = time.perf_counter()
 
         # initialize attributes
         self.nn = None  # neural-network object
         self.action = action
         self.option1 = option1
         self.option2 = option2
+        self.options = options if options is not None else dict()
+
+        # streaming mode: process dump file window by window (--stream, --window=N)
+        self.stream = "stream" in self.options or "window" in self.options or "workers" in self.options
+        self.window = int(self.options.get("window") or 1)
+
+        # number of worker processes in streaming mode (--workers=N, '--workers' alone uses all cores)
+        self.workers = None
+        if "workers" in self.options:
+            self.workers = int(self.options["workers"] or os.cpu_count())
+
+        # frames with triclinic box are calculated as orthogonal boxes of the same lengths (--triclinic),
+        # otherwise they are an error
+        self.allow_triclinic = "triclinic" in self.options
+
+        # data type of descriptors saved in descriptor store (--dtype=float32|float64)
+        self.dtype = self.options.get("dtype") or "float32"
 
         # directory names that will be used
         self.to_train_dir = os.path.join(path_to_kabuto, 'dir_to_train')
@@ -63,14 +134,22 @@ class Kabuto:
         self.config_dir = os.path.join(path_to_kabuto, 'config')
         self.saved_nn_dir = os.path.join(path_to_kabuto, 'saved_nn')
         self.result_dir = os.path.join(path_to_kabuto, "results")
+        self.cache_dir = os.path.join(path_to_kabuto, "cache")
 
         # file with phases that will be identified
         self.phase_file = os.path.join(self.config_dir, "phases_to_learn.txt")
 
-        # main dictionary that stores individual timesteps {timestep: atoms}
-        self.timesteps = {}
-        # dictionary of pbc values
-        self.pbc_dict = dict()
+        # heavy dependencies are imported only for actions that need them (see ACTION_IMPORTS)
+        imported = import_modules(self.action)
+        self.selection = None
+        self.profile_report = None
+        self.cache = None
+        self.models = None
+        self.batch_size = None
+        if "descriptors" in imported and not self.configure_descriptors():
+            return
+        if "networks" in imported:
+            self.configure_networks()
 
         # these parameters are specific for each nn, change it in your case
         # dictionary of phases and positions in vector_q
@@ -127,6 +206,12 @@ class Kabuto:
             else:
                 logger.error("Either no file given or name of nn not given")
 
+        elif self.action == "cache":
+            if self.option1 in ("info", "clear") and self.option2 is None:
+                self.manage_cache(self.option1)
+            else:
+                logger.error("Action \'{}\' takes one argument: info or clear".format(self.action))
+
         elif self.action == "test":
             if self.option1 is None and self.option2 is None:
                 self.test(0, 0)
@@ -140,15 +225,93 @@ class Kabuto:
                          "    list_nn\n"
                          "    create_nn <name_of_nn>\n"
                          "    train <name_of_nn>\n"
-                         "    predict <path_to_file_with_structure>".format(self.action))
+                         "    predict <name_of_nn> <dump_file>\n"
+                         "    cache <info|clear>\n"
+                         "Possible options (prepare, predict):\n"
+                         "    --stream --window=<number_of_timesteps> --workers=<number_of_processes>\n"
+                         "    --dtype=<float32|float64> --no-cache --cache-size=<MB> --skin=<A> --threads=<N>\n"
+                         "    --half-lists --profile[=<report.json>] --max-models=<N> --batch-size=<N> --keras\n"
+                         "    --timesteps=<start:stop:stride> or --timesteps=<t1,t2,...> --triclinic\n"
+                         "Possible options (train):\n"
+                         "    --validation=<fraction> --shuffle-buffer=<rows>".format(self.action))
+
+    def configure_descriptors(self):
+        """
+        applies options of calculation of descriptors, the selection of timesteps and the cache
+            * returns False if an option is wrong
+        """
+        # data type of descriptors saved in descriptor store (--dtype=float32|float64)
+        if self.dtype not in DescriptorStore.dtypes:
+            logger.error("Wrong data type of descriptors \'{}\', use one of: {}".format(
+                self.dtype, ", ".join(DescriptorStore.dtypes)))
+            return False
+
+        # selection of timesteps read from dump file (--timesteps=start:stop:stride or --timesteps=t1,t2,...)
+        if self.options.get("timesteps"):
+            try:
+                self.selection = parse_selection(self.options["timesteps"])
+            except ValueError as error:
+                logger.error(error)
+                return False
+
+        # skin of Verlet lists (--skin=<A>), lists are created again when an atom moves more than half of skin
+        if self.options.get("skin"):
+            try:
+                descriptors.set_skin(float(self.options["skin"]))
+            except ValueError as error:
+                logger.error("Wrong skin of Verlet lists: {}".format(error))
+                return False
+
+        # number of threads calculating descriptors (--threads=N, all cores by default)
+        if self.options.get("threads"):
+            try:
+                descriptors.set_num_threads(int(self.options["threads"]))
+            except ValueError as error:
+                logger.error("Wrong number of threads: {}".format(error))
+                return False
+
+        # symmetry functions evaluated once for each pair of atoms (--half-lists), the same descriptors,
+        # faster only without vectorized RadialKernel
+        if "half-lists" in self.options:
+            descriptors.set_half_lists(True)
+
+        # time of stages of calculation of descriptors and numbers of atoms and neighbours
+        # (--profile[=<report.json>]) are logged (also to 'kabuto.log') and saved to JSON report
+        if "profile" in self.options:
+            descriptors.set_profiling(True)
+            self.profile_report = self.options["profile"] or os.path.join(
+                self.result_dir, datetime.datetime.today().strftime("profile_%Y_%m_%d_%H_%M_%S") + ".json")
+
+        # on-disk cache of descriptors and predictions (--no-cache, --cache-size=<MB>)
+        if "no-cache" not in self.options:
+            try:
+                max_size_mb = float(self.options.get("cache-size") or DEFAULT_MAX_SIZE_MB)
+                if not 0.0 < max_size_mb < float("inf"):
+                    raise ValueError("size must be a positive number of MB, not {}".format(max_size_mb))
+            except ValueError as error:
+                logger.error("Wrong size of cache: {}".format(error))
+                return False
+            self.cache = Cache(self.cache_dir, max_size_mb)
+        return True
+
+    def configure_networks(self):
+        """
+        creates the registry of loaded neural networks, each model is loaded once per run
+            * --max-models=<N> networks are kept loaded
+            * prediction is calculated by NumPy from exported weights, or by TensorFlow with --keras
+            * --batch-size=<N> atoms (of consecutive timesteps) are predicted in one inference pass
+        """
+        self.models = ModelRegistry(self.saved_nn_dir, int(self.options.get("max-models") or DEFAULT_MAX_MODELS),
+                                    keras="keras" in self.options)
+        self.batch_size = int(self.options.get("batch-size") or DEFAULT_BATCH_SIZE)
 
     def prepare(self, phase, filename):
         """
         Documentation for 'prepare' function:
-            * prepares files for training from dump-file
+            * prepares descriptors for training from dump-file
             * parses all atomic positions and calculates descriptors for each atom
-            * for each timestep creates corresponding file in 'dir_to_train' folder
-            * those file are then used to feed the NN (teaching NN to identify given phases)
+            * descriptors of all timesteps are appended to binary descriptor store in 'dir_to_train' folder
+            * the store is then used to feed the NN (teaching NN to identify given phases)
             * usage:
                 * prepare(phase, file)
         """
@@ -156,91 +319,23 @@ class Kabuto:
                     "preparing phase: {}\n"
                     "preparing from file: {}".format(phase, filename))
 
+        if self.stream:
+            self.prepare_stream(phase, filename)
+            return
+
         # processing of file ...
-        with open(filename, "r") as input_file:
-
-            # the scanning booleans (starts and stops scanning particular parts of input file)
-            scan_timestep = False
-            scan_atoms = False
-            scan_number_of_atoms = False
-            scan_pbc = False
-
-            # current timestep for accessing main dictionary
-            current_timestep = None
-            number_of_pbc = 0
-            pbc = [None, None, None]
-
-            for raw_line in input_file:
-                line = raw_line.strip()
-
-                if line == "ITEM: TIMESTEP":
-                    # scan for timestep in next line
-                    scan_timestep = True
-                    # stop scanning for atoms
-                    scan_atoms = False
-
-                elif scan_timestep:
-                    logger.debug("Timestep: {}".format(repr(line)))
-                    line = int(line)
-                    self.timesteps[line] = {}
-                    current_timestep = line
-                    scan_timestep = False
-
-                elif line == "ITEM: NUMBER OF ATOMS":
-                    # scan for number of atoms in next line
-                    scan_number_of_atoms = True
-
-                elif scan_number_of_atoms:
-                    logger.debug("Number of atoms: {}".format(repr(line)))
-                    # number_of_atoms = int(line)
-                    scan_number_of_atoms = False
-
-                elif line == "ITEM: BOX BOUNDS pp pp pp":
-                    # scan for pbc in next three lines
-                    scan_pbc = True
-
-                elif scan_pbc:
-                    logger.debug("PBC: {}".format(repr(line)))
-                    min_value, max_value = tuple(line.split())
-                    if number_of_pbc <= 2:  # load another pbc
-                        pbc[number_of_pbc] = float(max_value) - float(min_value)
-                        number_of_pbc += 1
-                    if number_of_pbc == 3:  # end loading pbc
-                        scan_pbc = False
-
-                elif line == "ITEM: ATOMS id type x y z":
-                    self.timesteps[current_timestep] = {}
-                    # store the pbc in separate dictionary (timestep:list(pbc))
-                    self.pbc_dict[current_timestep] = list(pbc)
-                    logger.debug("PBC (timestep #{}): {}".format(current_timestep, pbc))
-                    # scan for atoms in next lines
-                    scan_atoms = True
-
-                elif scan_atoms:
-                    logger.debug("Atom: {}".format(repr(line)))
-                    atom_id, atom_type, atom_x, atom_y, atom_z = line.strip().split()
-                    self.timesteps[current_timestep][int(atom_id)] = [float(atom_x), float(atom_y), float(atom_z)]
-
-                else:
-                    # skipping useless lines
-                    pass
-        # all atoms are loaded in dictionary
-
-        # calculating of the descriptors for each timestep using C++ extension
+        try:
+            frames = self.load_dump(filename)
+        except ValueError as error:
+            logger.error("Reading of dump file \'{}\' failed: {}".format(filename, error))
+            return
+        # all atoms are loaded in frames
+
+        # calculating of the descriptors for each timestep using C++ extension (or taking them from cache)
         logger.info("Calculating of descriptors begins")
-        self.timesteps = descriptors.compute(self.pbc_dict, self.timesteps)
+        results = parallel.compute_frames(frames, self.cache)
         logger.info("Calculating of descriptors ended")
 
-        # # save dictionary to json file
-        # with open(self.config_dir + os.path.sep + "dict_timesteps.json", "w") as json_file:
-        #     json.dump(self.timesteps, json_file)
-        #     logger.info("Dictionary 'timesteps' was saved to: dict_timesteps.json")
-
-        # # save dictionary to json file
-        # with open(self.config_dir + os.path.sep + "dict_pbc.json", "w") as json_file:
-        #     json.dump(self.pbc_dict, json_file)
-        #     logger.info("Dictionary 'pbc_dict' was saved to: dict_pbc.json")
-
         # save timesteps to separate files in 'dir_to_train' output_dir
         # create output_dir for saving timesteps (if it does not exist)
         if os.path.isdir(self.to_train_dir):
@@ -253,27 +348,15 @@ class Kabuto:
             else:
                 logger.info("Successfully created the directory {}".format(self.to_train_dir))
 
-        # each timestep is saved to different file
-        # filename = date_time_timestep, e.g. 2020_03_28_09_42_45_500.txt
+        # all timesteps are appended to the store as one segment
+        logger.info("Saving timesteps to descriptor store begins")
+        with DescriptorStore(self.to_train_dir).segment_writer(self.dtype) as writer:
+            self.save_timesteps(results, writer, phase)
 
-        logger.info("Saving timesteps to separate files begins")
-
-        for timestep in self.timesteps.keys():
-            # create specific filename
-            filename = datetime.datetime.today().strftime("%Y_%m_%d_%H_%M_%S_") + str(timestep) + ".txt"
-            path_to_file = os.path.join(self.to_train_dir, filename)
-            logger.info("... saving timestep #{} to file {}".format(timestep, path_to_file))
-            # open file
-            with open(path_to_file, 'w') as file:
-                # print informative header
-                file.write(self.descriptors_info_header(timestep, phase))
-
-                # print descriptors for each atom to file
-                for atom_id in self.timesteps[timestep].keys():
-                    file.write(str(atom_id) + ' ' + ' '.join(map(str, self.timesteps[timestep][atom_id])) + '\n')
-
-        # all files are prepared in 'dir_to_train' folder
+        # all timesteps are saved in 'dir_to_train' folder
         logger.info("All timesteps were saved in \'{}\' folder".format(self.to_train_dir))
+        self.log_statistics()
+        self.close_cache()
 
     def list_nn(self):
         """
@@ -347,6 +430,7 @@ class Kabuto:
             logger.info("Neural network \'{}\' already exists.".format(name))
         else:
             # else, create a new neural network and save its model to <name>.h5 file in 'saved_nn' directory
+            from modules.neural_network import NeuralNetwork  # TensorFlow is imported only by create_nn and train
             nn = NeuralNetwork(name)
             nn.create_model(self.number_of_descriptors, self.number_of_phases)
             nn.save_model(self.saved_nn_dir)
@@ -384,18 +468,33 @@ class Kabuto:
                 models.append(item.replace(model_extension, ""))
 
         if name in models:
-            # prepare two lists, one with descriptors, second one with vector q_i
-            first_array, second_array, timestep = self.prepare_arrays(self.to_train_dir)
-            if first_array is None or second_array is None:
+            # TensorFlow is imported only by create_nn and train
+            from modules.neural_network import NeuralNetwork
+            from modules.training_data import TrainingData, DEFAULT_SHUFFLE_BUFFER, DEFAULT_VALIDATION_FRACTION
+
+            # descriptors and vectors q_i are streamed from the store in 'dir_to_train' (not loaded into memory),
+            # validation data are whole segments (--validation=<fraction>), --shuffle-buffer=<rows>
+            store = DescriptorStore(self.to_train_dir)
+            if not store.exists():
+                logger.error("No descriptors in \'{}\'".format(self.to_train_dir))
+                logger.error("The interrupting of the training NN!")
+                return
+            try:
+                data = TrainingData(store, self.phases_available,
+                                    validation_fraction=float(self.options.get("validation")
+                                                              or DEFAULT_VALIDATION_FRACTION),
+                                    shuffle_buffer=int(self.options.get("shuffle-buffer") or DEFAULT_SHUFFLE_BUFFER))
+            except ValueError as error:
+                logger.error(error)
                 logger.error("The interrupting of the training NN!")
                 return
 
             # prepare NN
             self.nn = NeuralNetwork(name)
-            self.nn.load_model(self.saved_nn_dir)
+            self.nn.load_model(self.saved_nn_dir, training=True)
 
             # let the NN train (catch history)
-            history = self.nn.train(first_array, second_array)
+            history = self.nn.train(data.training_dataset(), data.validation_dataset())
 
             # save loss and accuracy vs. epochs during training
             self.plot_loss(history)
@@ -404,8 +503,8 @@ class Kabuto:
             # at the end, save the model
             self.nn.save_model(self.saved_nn_dir)
 
-            # move all files from 'prepare_to_training' dir to 'dir_trained' dir
-            self.move_files_from_to(self.to_train_dir, self.trained_dir)
+            # move all descriptors from 'dir_to_train' dir to 'dir_trained' dir
+            DescriptorStore(self.to_train_dir).move_to(self.trained_dir)
 
         else:
             # if 'name' is in 'saved_nn' directory, do nothing
@@ -420,92 +519,24 @@ class Kabuto:
         logger.debug("ACTION: predict\n"
                     "predicting from file: {}".format(filename))
 
+        if self.stream:
+            self.predict_stream(name, filename)
+            return
+
         # processing of file ...
-        with open(filename, "r") as input_file:
-
-            # scanning booleans (starts and stops scanning parts of input file)
-            scan_timestep = False
-            scan_atoms = False
-            scan_number_of_atoms = False
-            scan_pbc = False
-
-            # current timestep for accessing main dictionary
-            current_timestep = None
-            number_of_pbc = 0
-            pbc = [None, None, None]
-
-            for raw_line in input_file:
-                line = raw_line.strip()
-
-                if line == "ITEM: TIMESTEP":
-                    # scan for timestep in next line
-                    scan_timestep = True
-                    # stop scanning for atoms
-                    scan_atoms = False
-
-                elif scan_timestep:
-                    logger.debug("Timestep: {}".format(repr(line)))
-                    line = int(line)
-                    self.timesteps[line] = {}
-                    current_timestep = line
-                    scan_timestep = False
-
-                elif line == "ITEM: NUMBER OF ATOMS":
-                    # scan for number of atoms in next line
-                    scan_number_of_atoms = True
-
-                elif scan_number_of_atoms:
-                    logger.debug("Number of atoms: {}".format(repr(line)))
-                    # number_of_atoms = int(line)
-                    scan_number_of_atoms = False
-
-                elif line == "ITEM: BOX BOUNDS pp pp pp":
-                    # scan for pbc in next three lines
-                    scan_pbc = True
-
-                elif scan_pbc:
-                    logger.debug("PBC: {}".format(repr(line)))
-                    min_value, max_value = tuple(line.split())
-                    if number_of_pbc <= 2:  # load another pbc
-                        pbc[number_of_pbc] = float(max_value) - float(min_value)
-                        number_of_pbc += 1
-                    if number_of_pbc == 3:  # end loading pbc
-                        scan_pbc = False
-
-                elif line == "ITEM: ATOMS id type x y z":
-                    self.timesteps[current_timestep] = {}
-                    # store the pbc in separate dictionary (timestep:list(pbc))
-                    self.pbc_dict[current_timestep] = list(pbc)
-                    logger.debug("PBC (timestep #{}): {}".format(current_timestep, pbc))
-                    # scan for atoms in next lines
-                    scan_atoms = True
-
-                elif scan_atoms:
-                    logger.debug("Atom: {}".format(repr(line)))
-                    atom_id, atom_type, atom_x, atom_y, atom_z = line.strip().split()
-                    self.timesteps[current_timestep][int(atom_id)] = [float(atom_x), float(atom_y), float(atom_z)]
-
-                else:
-                    # skipping useless lines
-                    pass
-        # all atoms are loaded in dictionary
-        logger.info("All atoms are loaded in dictionary")
-        
-        # calculating of the descriptors for each timestep using C++ extension
+        try:
+            frames = self.load_dump(filename)
+        except ValueError as error:
+            logger.error("Reading of dump file \'{}\' failed: {}".format(filename, error))
+            return
+        # all atoms are loaded in frames
+        logger.info("All atoms are loaded in frames")
+
+        # calculating of the descriptors for each timestep using C++ extension (or taking them from cache)
         logger.debug("Calculating of descriptors begins")
-        self.timesteps = descriptors.compute(self.pbc_dict, self.timesteps)
+        results = parallel.compute_frames(frames, self.cache)
         logger.debug("Calculating of descriptors ended")
 
-        # # save dictionary to json file
-        # with open(self.config_dir + os.path.sep + "dict_timesteps.json", "w") as json_file:
-        #     json.dump(self.timesteps, json_file)
-        #     logger.info("Dictionary 'timesteps' was saved to: dict_timesteps.json")
-
-        # # save dictionary to json file
-        # with open(self.config_dir + os.path.sep + "dict_pbc.json", "w") as json_file:
-        #     json.dump(self.pbc_dict, json_file)
-        #     logger.info("Dictionary 'pbc_dict' was saved to: dict_pbc.json")
-
         # save timesteps to separate files in 'dir_to_predict' folder
         # create to_predict_dir for saving timesteps (if it does not exist)
         if os.path.isdir(self.to_predict_dir):
@@ -518,24 +549,10 @@ class Kabuto:
             else:
                 logger.debug("Successfully created directory {}".format(self.to_predict_dir))
 
-        # each timestep is saved to different file
-        # filename = date_time_timestep, e.g. 2020_03_28_09_42_45_500.txt
-        logger.debug("Saving timesteps to separate file begins")
-
-        for timestep in self.timesteps.keys():
-            # create specific filename
-            filename = datetime.datetime.today().strftime("%Y_%m_%d_%H_%M_%S_") + str(timestep) + ".txt"
-            path_to_file = os.path.join(self.to_predict_dir, filename)
-            logger.debug("... saving timestep #{} to file {}".format(timestep, path_to_file))
-
-            # open file
-            with open(path_to_file, 'w') as file:
-                # print informative header
-                file.write(self.descriptors_info_header(timestep, phase=None))
-
-                # print descriptors for each atom to file
-                for atom_id in self.timesteps[timestep].keys():
-                    file.write(str(atom_id) + ' ' + ' '.join(map(str, self.timesteps[timestep][atom_id])) + '\n')
+        # all timesteps are saved to descriptor store
+        logger.debug("Saving timesteps to descriptor store begins")
+        with DescriptorStore(self.to_predict_dir).segment_writer(self.dtype) as writer:
+            self.save_timesteps(results, writer, phase=None)
 
         # all files are prepared in 'dir_to_predict' folder
         logger.debug("All timesteps were saved to \'{}\' folder".format(self.to_predict_dir))
@@ -562,46 +579,31 @@ class Kabuto:
 
         # we have existing NN
         if name in models:
-            for root, directories, files in os.walk(self.to_predict_dir):
-
-                # for each file in 'dir_to_predict' folder do:
-                for filename in files:
+            store = DescriptorStore(self.to_predict_dir)
 
-                    # prepare two lists, one with descriptors, second one with None
-                    input_array, second_array, timestep = self.prepare_arrays(self.to_predict_dir, filename)
-                    if input_array is None or second_array is not None or timestep is None:
-                        logger.error("The interrupting of the predicting!")
-                        return
+            # arrays of descriptors [num_atoms, num_descriptors] (memory-mapped) of each timestep in store
+            timesteps = ((frame["timestep"], store.read_frame(frame)[1]) for frame in store.frames)
 
-                    # prepare NN, load model
-                    self.nn = NeuralNetwork(name)
-                    self.nn.load_model(self.saved_nn_dir)
+            # let the NN predict something for batches of timesteps (or take the prediction from cache)
+            # vector_Q (global structure) is calculated from vector_q (local structures)
+            for timestep, vector_big_q in self.predict_batches(name, timesteps):
 
-                    # let the NN predict something
-                    # output is vector q (local structure) for each atom in file at that timestep
-                    # i.e. a numpy.ndarray [num_atoms, num_phases]
-                    prediction = self.nn.predict(input_array)
+                # I have vector Q that has information about global structure at given timestep
+                logger.debug("Q = {}".format(vector_big_q))
 
-                    # I have a prediction!
-                    logger.debug("prediction for file \'{}\'\n{}".format(filename, prediction))
+                # add another timestep to results [phase:percentage]
+                global_structure_dict[timestep] = self.create_dict_phase_percentage(vector_big_q)
 
-                    # calculate the vector_Q (global structure) from vector_q (local structures)
-                    vector_big_q = self.calculate_vector_big_q(prediction)
-
-                    # I have vector Q that has information about global structure at given timestep
-                    logger.debug("Q = {}".format(vector_big_q))
-
-                    # add another timestep to results [phase:percentage]
-                    global_structure_dict[timestep] = self.create_dict_phase_percentage(vector_big_q)
-
-            # move all files from 'dir_to_predict' folder to 'dir_predicted' folder
-            self.move_files_from_to(self.to_predict_dir, self.predicted_dir)
+            # move all descriptors from 'dir_to_predict' folder to 'dir_predicted' folder
+            store.move_to(self.predicted_dir)
 
             # print result (global structure info)
             logger.debug("RESULT:\n{}".format(global_structure_dict))
 
             # save results to 'results' dir
             self.save_results(global_structure_dict)
+            self.log_statistics()
+            self.close_cache()
 
             logger.debug("End of predicting.")
 
@@ -609,6 +611,69 @@ class Kabuto:
             # if 'name' is in 'saved_nn' directory, do nothing
             logger.error("Neural network \'{}\' does not exist!".format(name))
 
+    def prepare_stream(self, phase, filename):
+        """
+        Documentation for 'prepare_stream' function:
+            * streaming version of 'prepare' function (option --stream)
+            * dump file is processed in windows of '--window' timesteps (default 1)
+            * descriptors of a window are calculated and saved, then the window is dropped
+            * memory usage does not depend on the number of timesteps in dump file
+        """
+        logger.info("Streaming mode: {} timestep(s) per window".format(self.window))
+
+        # segment of a dump file that could not be read is deleted (nothing is saved)
+        number_of_timesteps = 0
+        try:
+            with DescriptorStore(self.to_train_dir).segment_writer(self.dtype) as writer:
+                for timestep, ids, input_array in self.stream_descriptors(filename):
+                    writer.append(timestep, ids, input_array, phase)
+                    number_of_timesteps += 1
+        except ValueError as error:
+            logger.error("Reading of dump file \'{}\' failed: {}".format(filename, error))
+            return
+
+        logger.info("{} timesteps were saved in \'{}\' folder".format(number_of_timesteps, self.to_train_dir))
+        self.log_peak_rss()
+        self.log_statistics()
+        self.close_cache()
+
+    def predict_stream(self, name, filename):
+        """
+        Documentation for 'predict_stream' function:
+            * streaming version of 'predict' function (option --stream)
+            * dump file is processed in windows of '--window' timesteps (default 1)
+            * descriptors of a window are calculated and classified, then the window is dropped
+            * no descriptors are written to 'dir_to_predict', only results are saved
+        """
+        logger.info("Streaming mode: {} timestep(s) per window".format(self.window))
+
+        # check whether the name of NN is in saved_nn directory
+        model_extension = ".h5"
+        if not os.path.isfile(os.path.join(self.saved_nn_dir, name + model_extension)):
+            logger.error("Neural network \'{}\' does not exist!".format(name))
+            return
+
+        # initialize a dictionary that holds result
+        global_structure_dict = dict()
+
+        timesteps = ((timestep, input_array) for timestep, ids, input_array in self.stream_descriptors(filename))
+        try:
+            for timestep, vector_big_q in self.predict_batches(name, timesteps):
+                logger.debug("Q = {}".format(vector_big_q))
+                global_structure_dict[timestep] = self.create_dict_phase_percentage(vector_big_q)
+        except ValueError as error:
+            logger.error("Reading of dump file \'{}\' failed: {}".format(filename, error))
+            return
+
+        # save results to 'results' dir
+        logger.debug("RESULT:\n{}".format(global_structure_dict))
+        self.save_results(global_structure_dict)
+        self.log_statistics()
+        self.close_cache()
+
+        self.log_peak_rss()
+        logger.debug("End of predicting.")
+
     def test(self, name, filename):
         """
         Documentation for 'test' function:
@@ -636,137 +701,208 @@ class Kabuto:
         # logger.info("y_20 = {}".format(test_descriptors.y_lm(2, 0, 1, 0, 0)))
         # # logger.info("srt(2) * y_4^2 = {}".format(scipy.special.sph_harm(2, 4, 0, math.pi / 2) * math.sqrt(2)))
 
-    def prepare_arrays(self, directory=None, filename=None):
-        """
-        * prepares two arrays, input data, either from all files in 'directory' or from a file 'directory + filename'
-        * first array contains arrays of descriptors
-        * second array contains arrays of 1 and 0s
-            * position of 1 is determined by phase
-            * calls function create_output_vector(phase)
-        """
-
-        if filename is None and directory is not None:
-            input_array, output_array = [], []
-            logger.debug("Preparing arrays from directory: \'{}\'".format(directory))
-
-            for root, directories, files in os.walk(directory):
-                if not files:
-                    logger.error("No files in \'{}\'".format(directory))
-                    return None, None, None
-                num_of_files = len(files)
-                counter = 1
-                for filename in sorted(files):
-                    # process each file
-                    logger.debug("{}/{} ... processing file: {}".format(counter, num_of_files, filename))
-                    counter += 1
-                    output_vector = None
-
-                    with open(os.path.join(directory, filename)) as file:
-                        for line in file:
-                            if line[0] == '#':
-                                # processing info header
-                                if "phase" in line:
-                                    # find phase that is about to be learned
-                                    phase = line.split()[2]
-                                    output_vector = self.create_output_vector(phase)
-                                    if output_vector is None:
-                                        logger.error("The interrupting of the preparing of arrays!")
-                                        return None, None, None
-                            else:
-                                # processing a line with descriptors: [id, **descriptors]
-                                items = line.split()
-                                descriptors_list = list(map(float, items[1:]))
-                                logger.debug("{} : {}".format(id, descriptors_list))
-
-                                # add output_vector to output array
-                                output_array.append(output_vector)
-
-                                # add descriptors to input array
-                                input_array.append(descriptors_list)
-
-            logger.debug("Input and output arrays have the same length: {} ({} vs. {})"
-                        .format(len(input_array) == len(output_array), len(input_array), len(output_array)))
-
-            logger.debug("... Descriptors:\n{}".format(np.array(input_array, dtype=float)))
-            logger.debug("... Output vector:\n{}".format(np.array(output_array, dtype=float)))
-
-            
-            input_result = np.array(input_array, dtype=float)
-            output_result = np.array(output_array, dtype=float)
-            
-            # save arrays in json
-            # with open(self.config_dir + os.path.sep + "input_array.json", "w") as json_file:
-            #     print("input_result.shape =", input_result.shape)
-            #     json.dump(input_result, json_file, cls=NumpyEncoder)
-            #     logger.info("Input numpy array was saved to: input_array.json")
-
-            # with open(self.config_dir + os.path.sep + "output_array.json", "w") as json_file:
-            #     print("output_result.shape =", output_result.shape)
-            #     json.dump(output_result, json_file, cls=NumpyEncoder)
-            #     logger.info("Input numpy array was saved to: output_array.json")
-
-            # return numpy array, tensorflow likes it
-            return input_result, output_result, None
-
-        elif filename is not None and directory is not None:
-            logger.debug("Preparing only input array from the file: \'{}\'".format(os.path.join(directory, filename)))
-
-            input_array, output_array, timestep = [], None, None
-
-            # processing a file
-            try:
-                with open(os.path.join(directory, filename)) as file:
-                    for line in file:
-                        if line[0] == '#':
-                            # processing info header
-                            if "timestep" in line:
-                                # find phase that is about to be learned
-                                timestep = line.split()[2]
-                        else:
-                            # processing a line with descriptors: [id, **descriptors]
-                            items = line.split()
-                            descriptors_list = list(map(float, items[1:]))
-                            logger.debug("{} : {}".format(id, descriptors_list))
-
-                            # add descriptors to input array
-                            input_array.append(descriptors_list)
-
-                logger.debug("... Descriptors:\n{}".format(np.array(input_array, dtype=float)))
-
-                # return numpy array, tensorflow likes it
-                return np.array(input_array, dtype=float), None, timestep
-
-            except FileNotFoundError:
-                logger.error("File {} not found!".format(filename))
-                return None, None, None
+    def load_dump(self, filename):
+        """
+        returns a list of all (selected) frames of dump file
+        """
+        frames = []
+        number_of_atoms = 0
+        for frame in read_frames(filename, self.selection, self.allow_triclinic):
+            logger.debug("PBC (timestep #{}): {}".format(frame.timestep, frame.pbc()))
+            frames.append(frame)
+            number_of_atoms += frame.number_of_atoms
+
+        logger.info("Loaded {} timesteps ({} atoms) from file: {}".format(
+            len(frames), number_of_atoms, filename))
+        return frames
+
+    def stream_descriptors(self, filename):
+        """
+        yields (timestep, ids, descriptors [num_atoms, num_descriptors]) for each timestep of dump file
+            * descriptors are calculated window by window, either here or in '--workers' processes
+            * workers need an uncompressed text dump file (frames are found in the frame index),
+              other files are processed serially
+        """
+        if self.workers is not None:
+            if parallel.supports_workers(filename):
+                frames = indexed_frames(filename, self.selection)
+                yield from parallel.compute_in_parallel(filename, frames, self.window, self.workers, self.cache,
+                                                        self.allow_triclinic)
+                return
+            logger.warning("Option --workers needs an uncompressed text dump file, "
+                           "file {} is processed serially".format(filename))
 
-        else:
-            logger.error("Wrong use of \'prepare_arrays()\' function!")
-            return None, None, None
+        for frames in windows(read_frames(filename, self.selection, self.allow_triclinic), self.window):
+            yield from parallel.compute_frames(frames, self.cache)
 
-    def create_output_vector(self, phase):
+    @staticmethod
+    def save_timesteps(results, writer, phase):
         """
-        creates an output vector for neural network
-            * it is a array of 0s and 1
-            * 1 is at the position of given phase
+        appends each timestep of 'results' [(timestep, ids, descriptors)] to the segment 'writer'
         """
+        for timestep, ids, values in results:
+            logger.debug("... saving timestep #{} to segment {}".format(timestep, writer.name))
+            writer.append(timestep, ids, values, phase)
 
-        if phase not in self.phases_available.keys():
-            logger.error("Given phase is not one of the available phases!")
-            return None
-
-        # create output vector
-        vector_q = [0] * self.number_of_phases
+    def predict_batches(self, name, timesteps):
+        """
+        yields (timestep, vector Q) for each (timestep, input_array) of 'timesteps' predicted by neural network 'name'
+            * input_array is a matrix [num_of_atoms, num_of_descriptors]
+            * input arrays of consecutive timesteps are collected until they have at least '--batch-size' atoms,
+              then the whole batch is predicted at once
+        """
+        batch = []
+        number_of_atoms = 0
+        for timestep, input_array in timesteps:
+            batch.append((timestep, input_array))
+            number_of_atoms += len(input_array)
+            if number_of_atoms >= self.batch_size:
+                yield from self.predict_batch(name, batch)
+                batch = []
+                number_of_atoms = 0
+        if batch:
+            yield from self.predict_batch(name, batch)
+
+    def predict_batch(self, name, batch):
+        """
+        returns a list [(timestep, vector Q)] for a batch of timesteps [(timestep, input_array)]
+            * prediction is taken from cache if the same model already predicted the same input
+            * atoms of all other timesteps are concatenated and predicted in one inference pass
+            * neural network is taken from registry of loaded models (it is loaded once, when it is needed)
+        """
+        path_to_model = os.path.join(self.saved_nn_dir, name + ".h5")
+        vectors = [None] * len(batch)
+        if self.cache is not None:
+            for index, (timestep, input_array) in enumerate(batch):
+                vectors[index] = self.cache.load_prediction(path_to_model, input_array)
+
+        missing = [index for index, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # prepare NN, the model is loaded only if it is not in registry or its file has changed
+            nn = self.models.get(name)
+
+            # output is vector q (local structure) for each atom, i.e. a numpy.ndarray [num_atoms, num_phases]
+            input_arrays = [batch[index][1] for index in missing]
+            prediction = nn.predict(np.concatenate(input_arrays), self.batch_size)
+            logger.debug("prediction of {} timesteps:\n{}".format(len(missing), prediction))
+            counts = np.array([len(input_array) for input_array in input_arrays])
+            for index, input_array, vector_big_q in zip(missing, input_arrays,
+                                                        self.calculate_vectors_big_q(prediction, counts)):
+                vectors[index] = vector_big_q
+                if self.cache is not None:
+                    self.cache.save_prediction(path_to_model, input_array, vector_big_q)
+
+        return [(timestep, vector_big_q) for (timestep, _), vector_big_q in zip(batch, vectors)]
+
+    def log_statistics(self):
+        """
+        logs how many times Verlet lists were created and how long the calculation of descriptors took
+            * with '--profile', time of each stage is logged and saved to JSON report
+        """
+        statistics = parallel.statistics
+        if statistics["timesteps"] > 0:
+            logger.info("Descriptors of {} timesteps calculated in {:.2f} s, "
+                        "Verlet lists created {} times in {:.2f} s (skin {} A, {} threads, {})".format(
+                            statistics["timesteps"], statistics["descriptors_time"],
+                            statistics["verlet_list_builds"], statistics["verlet_list_time"],
+                            descriptors.parameters()["skin"], descriptors.get_num_threads(),
+                            descriptors.statistics()["instruction_set"]))
+            logger.info("Time of descriptor families (summed over threads): symmetry functions {:.2f} s, "
+                        "Steinhardt parameters {:.2f} s".format(
+                            statistics["symmetry_functions_time"], statistics["steinhardt_time"]))
+        if self.models is not None and self.models.loads > 0:
+            logger.info("Neural networks loaded {} times in {:.2f} s, loaded model used {} times".format(
+                self.models.loads, self.models.load_time, self.models.hits))
+        if self.profile_report is not None:
+            self.log_profile(statistics)
+            self.save_profile(statistics)
 
-        # change correct place in vector_q
+    @staticmethod
+    def log_profile(statistics):
+        """
+        logs time of stages of calculation of descriptors (summed over all calculations) and numbers of neighbours
+        """
+        if statistics["atoms"] == 0:
+            return
+        logger.info("Profile of descriptors: parsing {:.3f} s, Verlet lists {:.3f} s, symmetry functions {:.3f} s, "
+                    "Steinhardt parameters {:.3f} s, marshalling {:.3f} s, extension {:.3f} s, "
+                    "with preparation of arrays {:.3f} s".format(
+                        statistics["parsing_time"], statistics["verlet_list_time"],
+                        statistics["symmetry_functions_time"], statistics["steinhardt_time"],
+                        statistics["marshalling_time"], statistics["total_time"], statistics["compute_time"]))
+        logger.info("Profile of descriptors: {} atoms, {} pairs, {} neighbours ({:.1f} per atom), "
+                    "{} neighbours of Steinhardt parameters ({:.1f} per atom)".format(
+                        statistics["atoms"], statistics["pairs"], statistics["neighbours"],
+                        statistics["neighbours"] / statistics["atoms"], statistics["steinhardt_neighbours"],
+                        statistics["steinhardt_neighbours"] / statistics["atoms"]))
+
+    def save_profile(self, statistics):
+        """
+        saves time of stages of calculation of descriptors (summed over all calculations, in seconds),
+        numbers of atoms and neighbours and settings of this run to JSON report
+        """
+        report = {
+            "action": self.action,
+            "arguments": [self.option1, self.option2],
+            "options": self.options,
+            "created": datetime.datetime.today().isoformat(timespec="seconds"),
+            "wall_time": time.perf_counter() - self.start_time,
+            "peak_rss_mb": self.peak_rss_mb(),
+            "peak_rss_workers_mb": self.peak_rss_mb(resource.RUSAGE_CHILDREN) if self.workers is not None else None,
+            "settings": {"skin": descriptors.parameters()["skin"],
+                         "threads": descriptors.get_num_threads(),
+                         "half_lists": descriptors.statistics()["half_lists"],
+                         "instruction_set": descriptors.statistics()["instruction_set"],
+                         "workers": self.workers,
+                         "window": self.window if self.stream else None},
+            "stages": {key: statistics[key] for key in ("parsing_time", "verlet_list_time", "symmetry_functions_time",
+                                                        "steinhardt_time", "descriptors_time", "marshalling_time",
+                                                        "total_time", "compute_time")},
+            "counts": {key: statistics[key] for key in ("timesteps", "verlet_list_builds", "atoms", "pairs",
+                                                        "neighbours", "steinhardt_neighbours")},
+            "cache": {"hits": self.cache.hits, "misses": self.cache.misses, "evicted": self.cache.evicted}
+            if self.cache is not None else None,
+            "models": {"loads": self.models.loads, "hits": self.models.hits, "evictions": self.models.evictions,
+                       "load_time": self.models.load_time} if self.models is not None else None,
+        }
         try:
-            vector_q[self.phases_available[phase]] = 1
-        except IndexError:
-            logger.error("Problem with available_phases attribute in Kabuto class!")
-            return None
+            with open(self.profile_report, "w") as file:
+                json.dump(report, file, indent=4)
+        except OSError as error:
+            logger.error("Profile was not saved: {}".format(error))
+        else:
+            logger.info("Profile was saved to \'{}\'".format(self.profile_report))
+
+    def close_cache(self):
+        """
+        evicts the least recently used entries if the cache is too big and logs usage of cache
+        """
+        if self.cache is None:
+            return
+        self.cache.evict()
+        logger.info("Cache: {} hits, {} misses, {} entries evicted".format(
+            self.cache.hits, self.cache.misses, self.cache.evicted))
 
-        logger.debug("vector_q: {}".format(vector_q))
-        return vector_q
+    def manage_cache(self, command):
+        """
+        Documentation for 'cache' function:
+            * 'info' lists number and size of entries in cache
+            * 'clear' removes all entries of cache
+            * usage:
+                * cache info
+                * cache clear
+        """
+        logger.info("ACTION: cache {}".format(command))
+        cache = self.cache if self.cache is not None else Cache(self.cache_dir)
+
+        if command == "clear":
+            logger.info("{} entries removed from cache \'{}\'".format(cache.clear(), self.cache_dir))
+            return
+
+        lines = ["Cache \'{}\' (limit {:.0f} MB):".format(self.cache_dir, cache.max_size / 1024 / 1024)]
+        for kind, (count, size) in cache.info().items():
+            lines.append("    {:12s} {:8d} entries {:10.1f} MB".format(kind, count, size / 1024 / 1024))
+        logger.info("\n".join(lines))
 
     def load_available_phases(self):
         """
@@ -793,19 +929,22 @@ class Kabuto:
         logger.debug("Available phases: {}".format(phases_dict))
         return phases_dict
 
-    def calculate_vector_big_q(self, prediction):
+    @staticmethod
+    def calculate_vectors_big_q(prediction, counts):
         """
-        returns the vector Q, that contains information about global structure
-            * len(Q) = self.number_of_phases
+        returns a list of vectors Q, that contain information about global structure of each timestep
+            * prediction is a matrix [num_of_atoms, num_of_phases] of atoms of consecutive timesteps,
+              counts are numbers of atoms of the timesteps
             * each component is an average percentage of particular phase in all system
+            * sums over atoms of all timesteps are calculated at once (segmented sum, in double precision)
         """
-        vector = [0] * self.number_of_phases
-        n = len(prediction.tolist())
-        logger.debug("Number of atoms in prediction: {}".format(n))
-        for q_i in prediction.tolist():  # rows
-            for j, q_ij in enumerate(q_i):  # columns
-                vector[j] += q_ij
-        return [q_i / n for q_i in vector]
+        vectors = np.full((len(counts), prediction.shape[1]), np.nan)
+        nonempty = counts > 0
+        if np.any(nonempty):
+            offsets = np.cumsum(counts) - counts
+            sums = np.add.reduceat(prediction.astype(np.float64), offsets[nonempty], axis=0)
+            vectors[nonempty] = sums / counts[nonempty, np.newaxis]
+        return vectors.tolist()
 
     def create_dict_phase_percentage(self, vector_big_q):
         """
@@ -821,8 +960,9 @@ class Kabuto:
         """
         summarize history for loss
         """
+        import matplotlib.pyplot as plt  # matplotlib is imported only for plots of training
         plt.plot(history.history['loss'])
-        plt.plot(history.history['val_loss'])
+        plt.plot(history.history.get('val_loss', []))
         plt.title('model loss')
         plt.ylabel('loss')
         plt.xlabel('epoch')
@@ -834,8 +974,9 @@ class Kabuto:
         """
         summarize history for accuracy
         """
+        import matplotlib.pyplot as plt
         plt.plot(history.history['accuracy'])
-        plt.plot(history.history['val_accuracy'])
+        plt.plot(history.history.get('val_accuracy', []))
         plt.title('model accuracy')
         plt.ylabel('accuracy')
         plt.xlabel('epoch')
@@ -843,19 +984,6 @@ class Kabuto:
         plt.savefig(os.path.join(self.result_dir, "accuracy-vs-epochs.png"))
         plt.clf()
 
-    @staticmethod
-    def descriptors_info_header(timestep, phase):
-        """
-        returns informative header that is to be written at the beginning of file with descriptors
-        """
-        if phase is not None:
-            return "# timestep {}\n" \
-                   "# phase {}\n" \
-                   "# id f1 f2 f3 f4 f5 f6 f7 f8 f9 f10 f11 f12 f13 f14\n".format(timestep, phase)
-        else:
-            return "# timestep {}\n" \
-                   "# id f1 f2 f3 f4 f5 f6 f7 f8 f9 f10 f11 f12 f13 f14\n".format(timestep)
-
     @staticmethod
     def print_timesteps(timesteps):
         """
@@ -883,6 +1011,28 @@ class Kabuto:
                     "                       2020\n"
                     "******************************************************\n")
 
+    def log_peak_rss(self):
+        """
+        logs peak memory usage of this process and of '--workers' processes
+        """
+        if self.workers is None:
+            logger.info("Peak memory usage (RSS): {:.1f} MB".format(self.peak_rss_mb()))
+        else:
+            logger.info("Peak memory usage (RSS): {:.1f} MB (main process), {:.1f} MB (largest worker)".format(
+                self.peak_rss_mb(), self.peak_rss_mb(resource.RUSAGE_CHILDREN)))
+
+    @staticmethod
+    def peak_rss_mb(who=resource.RUSAGE_SELF):
+        """
+        returns peak resident set size of the process in MB
+            * with 'who' = resource.RUSAGE_CHILDREN, the largest peak of finished child processes (workers)
+        """
+        peak_rss = resource.getrusage(who).ru_maxrss
+        if sys.platform == "darwin":
+            # macOS reports bytes, Linux reports kilobytes
+            return peak_rss / 1024 / 1024
+        return peak_rss / 1024
+
     @staticmethod
     def models_to_string(models):
         to_print = ""
@@ -890,29 +1040,6 @@ class Kabuto:
             to_print += "-> {}\n".format(model)
         return to_print.strip()
 
-    @staticmethod
-    def move_files_from_to(from_dir, to_dir):
-        """
-        moves all files from 'from_dir' to 'to_dir'
-        """
-        logger.debug("Moving files ...")
-        # create to_dir if it does not exist)
-        if os.path.isdir(to_dir):
-            logger.debug("Directory {} already exists.".format(to_dir))
-        else:
-            try:
-                os.mkdir(to_dir)
-            except OSError:
-                logger.error("Creation of the directory {} failed".format(to_dir))
-
-            else:
-                logger.debug("Successfully created the directory {}".format(to_dir))
-        files = os.listdir(from_dir)
-        for filename in files:
-            shutil.move(os.path.join(from_dir, filename), to_dir)
-
-        logger.debug("Files successfully moved from \'{}\' to \'{}\'".format(from_dir, to_dir))
-
     @staticmethod
     def dict_to_string(dictionary):
         """
@@ -970,24 +1097,77 @@ def print_kabuto_intro():
              "    kabuto.py create_nn <name_of_nn>\n" \
              "    kabuto.py train <name_of_nn>\n" \
              "    kabuto.py predict <name_of_nn> <dump.file>\n" \
+             "    kabuto.py cache <info|clear>\n" \
              "    kabuto.py test\n" \
+             "Options (prepare, predict):\n" \
+             "    --stream                  process dump file timestep by timestep\n" \
+             "    --window=<N>              number of timesteps processed at once in streaming mode\n" \
+             "    --workers=<N>             process dump file in N processes (streaming mode)\n" \
+             "    --dtype=<float32|float64> data type of descriptors in descriptor store (default float32)\n" \
+             "    --timesteps=<selection>   only chosen timesteps, 'start:stop:stride' or 't1,t2,...'\n" \
+             "    --triclinic               calculate triclinic boxes as orthogonal boxes of the same lengths\n" \
+             "    --no-cache                do not use cache of descriptors and predictions\n" \
+             "    --cache-size=<MB>         size limit of cache (default 1024 MB)\n" \
+             "    --skin=<A>                skin of Verlet lists (default 1.0 A)\n" \
+             "    --threads=<N>             number of threads calculating descriptors (default all cores)\n" \
+             "    --half-lists              evaluate symmetry functions once for each pair of atoms\n" \
+             "    --profile[=<report.json>] log time of stages of descriptors and save them to JSON report\n" \
+             "    --max-models=<N>          number of neural networks kept loaded (default 4)\n" \
+             "    --batch-size=<N>          number of atoms predicted in one inference pass (default 65536)\n" \
+             "    --keras                   predict by TensorFlow model instead of NumPy forward pass\n" \
+             "Options (train):\n" \
+             "    --validation=<fraction>   fraction of segments (runs of prepare) used for validation (default 0.2)\n" \
+             "    --shuffle-buffer=<rows>   number of rows in shuffle buffer of training data (default 65536)\n" \
              "******************************************************\n"
     return result
 
 
+def parse_command_line(arguments):
+    """
+    splits command line arguments into positional arguments and options
+        * option is either a flag '--name' or a pair '--name=value'
+        * values of POSITIVE_INTEGER_OPTIONS must be positive integers (ValueError is raised otherwise)
+        * returns (list of positional arguments, dictionary {name: value})
+    """
+    positional, options = [], dict()
+    for argument in arguments:
+        if argument.startswith("--"):
+            name, _, value = argument[2:].partition("=")
+            options[name] = value if value else None
+        else:
+            positional.append(argument)
+
+    for name in POSITIVE_INTEGER_OPTIONS:
+        if options.get(name) is None:
+            continue
+        try:
+            number = int(options[name])
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise ValueError("Wrong value of option --{}: \'{}\' is not a positive integer"
+                             .format(name, options[name]))
+    return positional, options
+
+
 ################################################################
 # create Kabuto Machine iff there is correct number of arguments
 ################################################################
 logger.info("Command line arguments:\n{}".format(' '.join(sys.argv)))
-if len(sys.argv) == 2:
+try:
+    arguments, command_line_options = parse_command_line(sys.argv[1:])
+except ValueError as error:
+    logger.error(error)
+    sys.exit(1)
+if len(arguments) == 1:
     # script called with one argument (action)
-    Kabuto(action=sys.argv[1], option1=None, option2=None)
-elif len(sys.argv) == 3:
+    Kabuto(action=arguments[0], option1=None, option2=None, options=command_line_options)
+elif len(arguments) == 2:
     # script called with two arguments (action, option)
-    Kabuto(action=sys.argv[1], option1=sys.argv[2], option2=None)
-elif len(sys.argv) == 4:
+    Kabuto(action=arguments[0], option1=arguments[1], option2=None, options=command_line_options)
+elif len(arguments) == 3:
     # script called with three arguments (action, phase/name, file)
-    Kabuto(action=sys.argv[1], option1=sys.argv[2], option2=sys.argv[3])
+    Kabuto(action=arguments[0], option1=arguments[1], option2=arguments[2], options=command_line_options)
 else:
     # script called without action
     logger.info(print_kabuto_intro())
@@ -0,0 +1,245 @@
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+
+try:
+    import descriptors
+except ImportError:
+    # C++ extension is not installed, descriptors are calculated by NumPy/SciPy (equal up to rounding)
+    from modules import descriptors
+
+# set-up the logger
+logger = logging.getLogger('kabuto.cache')
+
+# default limit of size of the cache in MB
+DEFAULT_MAX_SIZE_MB = 1024
+
+
+class Cache:
+    """
+    class Cache
+        * content-addressed on-disk cache of descriptors and predictions
+        * descriptors of a group of frames (frames computed in one call of descriptors.compute)
+          are keyed by sha256 of content of the frames (ids, positions, box) and of parameters
+          of descriptors (descriptors.parameters(), i. e. cutoffs, G2, G3 and Steinhardt parameters)
+        * predictions (vector Q of a timestep) are keyed by sha256 of model file and of input array
+        * entries are .npz files in 'descriptors' and 'predictions' subdirectories,
+          modification time of entry is updated on each hit and the least recently used entries
+          are evicted as soon as a saved entry makes the cache bigger than the limit
+        * an entry bigger than the limit is not saved
+    """
+    kinds = ("descriptors", "predictions")
+    entry_suffix = ".npz"
+
+    def __init__(self, directory, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        self.directory = directory
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.parameters = json.dumps(descriptors.parameters(), sort_keys=True)
+        self.file_hashes = dict()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        # running size of cache in bytes (None until the cache is scanned) and the process that counts it
+        self.size = None
+        self.pid = os.getpid()
+
+    def path_to_entry(self, kind, key):
+        return os.path.join(self.directory, kind, key[:2], key + self.entry_suffix)
+
+    def descriptors_key(self, frames):
+        """
+        returns the key of descriptors of a group of frames
+        """
+        digest = hashlib.sha256(self.parameters.encode())
+        for frame in frames:
+            digest.update(np.ascontiguousarray(frame.ids, dtype=np.int64).tobytes())
+            digest.update(np.ascontiguousarray(frame.positions, dtype=np.float64).tobytes())
+            digest.update(np.array(frame.pbc(), dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def prediction_key(self, path_to_model, input_array):
+        """
+        returns the key of prediction of model (file 'path_to_model') for given input array
+        """
+        input_array = np.ascontiguousarray(input_array)
+        digest = hashlib.sha256(self.file_hash(path_to_model).encode())
+        digest.update("{}{}".format(input_array.dtype.str, input_array.shape).encode())
+        digest.update(input_array.tobytes())
+        return digest.hexdigest()
+
+    def file_hash(self, path):
+        """
+        returns sha256 of file, it is computed once for each size and modification time of file
+        """
+        status = os.stat(path)
+        signature = (path, status.st_size, status.st_mtime_ns)
+        if signature not in self.file_hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as file:
+                for block in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(block)
+            self.file_hashes[signature] = digest.hexdigest()
+        return self.file_hashes[signature]
+
+    def load(self, kind, key):
+        """
+        returns arrays of entry {name: array} or None if the entry is not in cache
+        """
+        path = self.path_to_entry(kind, key)
+        try:
+            with np.load(path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            # entry was used now (LRU)
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return arrays
+
+    def save(self, kind, key, **arrays):
+        """
+        saves arrays to entry (atomically, via temporary file, so that workers can share the cache)
+            * entry bigger than the limit is not saved, the least recently used entries are evicted
+              when the cache gets bigger than the limit
+        """
+        path = self.path_to_entry(kind, key)
+        path_to_tmp = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path_to_tmp, "wb") as file:
+                np.savez(file, **arrays)
+            size = os.path.getsize(path_to_tmp)
+            if size > self.max_size:
+                os.remove(path_to_tmp)
+                logger.debug("Entry of {} bytes is bigger than cache \'{}\', it is not saved"
+                             .format(size, self.directory))
+                return
+            replaced = os.path.getsize(path) if os.path.isfile(path) else 0
+            os.replace(path_to_tmp, path)
+        except OSError as error:
+            logger.warning("Entry could not be saved to cache: {}".format(error))
+            return
+        self.add_size(size - replaced)
+
+    def add_size(self, size):
+        """
+        adds 'size' of saved entry to the running size of cache and evicts entries if the cache is too big
+            * the cache is scanned at the first save; processes sharing the cache with the process that created
+              this object (workers) do not see each other's entries, so they scan the cache on each save
+        """
+        if self.size is None or os.getpid() != self.pid:
+            self.size = sum(entry[2] for entry in self.entries())
+        else:
+            self.size += size
+        if self.size > self.max_size:
+            self.evict()
+
+    def load_descriptors(self, frames):
+        """
+        returns descriptors of frames [(timestep, ids, descriptors)] from cache, or None
+        """
+        entry = self.load("descriptors", self.descriptors_key(frames))
+        if entry is None or len(entry["counts"]) != len(frames):
+            return None
+        results = []
+        offset = 0
+        for frame, count in zip(frames, entry["counts"].tolist()):
+            results.append((frame.timestep, entry["ids"][offset:offset + count],
+                            entry["descriptors"][offset:offset + count]))
+            offset += count
+        return results
+
+    def save_descriptors(self, frames, results):
+        """
+        saves descriptors of frames [(timestep, ids, descriptors)] to cache
+        """
+        number_of_descriptors = max((values.shape[1] for _, _, values in results if values.ndim == 2), default=0)
+        self.save("descriptors", self.descriptors_key(frames),
+                  counts=np.array([len(ids) for _, ids, _ in results], dtype=np.int64),
+                  ids=np.concatenate([ids for _, ids, _ in results]) if results else np.empty(0, np.int64),
+                  descriptors=np.concatenate([values.reshape(len(ids), number_of_descriptors)
+                                              for _, ids, values in results]) if results
+                  else np.empty((0, number_of_descriptors)))
+
+    def load_prediction(self, path_to_model, input_array):
+        """
+        returns vector Q predicted by model for input array from cache, or None
+        """
+        entry = self.load("predictions", self.prediction_key(path_to_model, input_array))
+        return None if entry is None else entry["vector_big_q"].tolist()
+
+    def save_prediction(self, path_to_model, input_array, vector_big_q):
+        """
+        saves vector Q predicted by model for input array to cache
+        """
+        self.save("predictions", self.prediction_key(path_to_model, input_array),
+                  vector_big_q=np.asarray(vector_big_q, dtype=np.float64))
+
+    def entries(self):
+        """
+        returns a list of entries [(path, kind, size, modification time)]
+        """
+        result = []
+        for kind in self.kinds:
+            for root, _, files in os.walk(os.path.join(self.directory, kind)):
+                for name in files:
+                    if not name.endswith(self.entry_suffix):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        status = os.stat(path)
+                    except OSError:
+                        continue
+                    result.append((path, kind, status.st_size, status.st_mtime))
+        return result
+
+    def info(self):
+        """
+        returns a dictionary {kind: (number of entries, size in bytes)}
+        """
+        result = {kind: (0, 0) for kind in self.kinds}
+        for _, kind, size, _ in self.entries():
+            count, total = result[kind]
+            result[kind] = (count + 1, total + size)
+        return result
+
+    def evict(self):
+        """
+        removes the least recently used entries until the size of cache is under the limit
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[3])
+        size = sum(entry[2] for entry in entries)
+        removed = 0
+        for path, _, entry_size, _ in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            removed += 1
+        self.size = size
+        self.evicted += removed
+        if removed:
+            logger.debug("{} entries evicted from cache \'{}\'".format(removed, self.directory))
+
+    def clear(self):
+        """
+        removes all entries of cache
+        """
+        entries = self.entries()
+        for path, _, _, _ in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.size = 0
+        return len(entries)
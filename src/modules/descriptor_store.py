@@ -0,0 +1,231 @@
+import os
+import json
+import shutil
+import logging
+import datetime
+
+import numpy as np
+
+# set-up the logger
+logger = logging.getLogger('kabuto.descriptor_store')
+
+
+class DescriptorStore:
+    """
+    class DescriptorStore
+        * binary columnar store of descriptors kept in one directory (e.g. 'dir_to_train')
+        * each run of 'prepare' appends one segment that consists of two raw binary files:
+            * '<segment>.descriptors.bin' - matrix [num_of_rows, num_of_descriptors] (float32 or float64)
+            * '<segment>.ids.bin' - atom ids [num_of_rows] (int64)
+        * metadata are stored in 'descriptors.json':
+            * segments {segment: {dtype, rows}}
+            * frames [{segment, timestep, phase, offset, count}], one frame for each timestep
+        * segments are opened with np.memmap, i. e. without any copying or parsing
+    """
+    index_filename = "descriptors.json"
+    # data types of descriptors of segments
+    dtypes = ("float32", "float64")
+    descriptors_suffix = ".descriptors.bin"
+    ids_suffix = ".ids.bin"
+
+    def __init__(self, directory, number_of_descriptors=14):
+        self.directory = directory
+        self.number_of_descriptors = number_of_descriptors
+        self.path_to_index = os.path.join(directory, self.index_filename)
+        self.index = self.load_index()
+
+    def load_index(self):
+        """
+        loads metadata of the store, returns an empty index if store does not exist yet
+        """
+        if not os.path.isfile(self.path_to_index):
+            return {"number_of_descriptors": self.number_of_descriptors, "segments": {}, "frames": []}
+        with open(self.path_to_index, "r") as file:
+            index = json.load(file)
+        self.number_of_descriptors = index["number_of_descriptors"]
+        return index
+
+    def save_index(self):
+        """
+        saves metadata of the store (atomically, via temporary file)
+        """
+        path_to_tmp = self.path_to_index + ".tmp"
+        with open(path_to_tmp, "w") as file:
+            json.dump(self.index, file, indent=1)
+        os.replace(path_to_tmp, self.path_to_index)
+
+    def exists(self):
+        return len(self.index["frames"]) > 0
+
+    @property
+    def frames(self):
+        return self.index["frames"]
+
+    @property
+    def segments(self):
+        return self.index["segments"]
+
+    @property
+    def number_of_rows(self):
+        return sum(segment["rows"] for segment in self.segments.values())
+
+    def path_to_segment(self, segment, suffix):
+        return os.path.join(self.directory, segment + suffix)
+
+    def new_segment_name(self):
+        """
+        returns a unique name of segment, e.g. 2020_03_28_09_42_45
+        """
+        name = datetime.datetime.today().strftime("%Y_%m_%d_%H_%M_%S")
+        unique_name, counter = name, 1
+        while unique_name in self.segments:
+            unique_name = "{}_{}".format(name, counter)
+            counter += 1
+        return unique_name
+
+    def segment_writer(self, dtype="float32"):
+        """
+        returns a SegmentWriter that appends a new segment to the store
+        """
+        if not os.path.isdir(self.directory):
+            os.mkdir(self.directory)
+        return SegmentWriter(self, self.new_segment_name(), dtype)
+
+    def open_segment(self, segment):
+        """
+        returns memory-mapped arrays (ids [rows], descriptors [rows, num_of_descriptors]) of given segment
+        """
+        info = self.segments[segment]
+        if info["rows"] == 0:
+            return (np.empty(0, dtype=np.int64),
+                    np.empty((0, self.number_of_descriptors), dtype=info["dtype"]))
+        ids = np.memmap(self.path_to_segment(segment, self.ids_suffix),
+                        dtype=np.int64, mode="r", shape=(info["rows"],))
+        descriptors = np.memmap(self.path_to_segment(segment, self.descriptors_suffix),
+                                dtype=info["dtype"], mode="r",
+                                shape=(info["rows"], self.number_of_descriptors))
+        return ids, descriptors
+
+    def read_frame(self, frame):
+        """
+        returns memory-mapped arrays (ids, descriptors) of one frame
+        """
+        ids, descriptors = self.open_segment(frame["segment"])
+        start, stop = frame["offset"], frame["offset"] + frame["count"]
+        return ids[start:stop], descriptors[start:stop]
+
+    def read_rows(self, segment, start, stop):
+        """
+        returns a copy of descriptors [stop - start, num_of_descriptors] of rows start ... stop - 1 of given segment
+            * rows are read from the file (not memory-mapped), so pages of the segment do not stay in memory
+        """
+        info = self.segments[segment]
+        dtype = np.dtype(info["dtype"])
+        with open(self.path_to_segment(segment, self.descriptors_suffix), "rb") as file:
+            file.seek(start * self.number_of_descriptors * dtype.itemsize)
+            descriptors = np.fromfile(file, dtype=dtype, count=(stop - start) * self.number_of_descriptors)
+        return descriptors.reshape(stop - start, self.number_of_descriptors)
+
+    def move_to(self, directory):
+        """
+        moves all segments of this store to the store in 'directory' and empties this store
+        """
+        other = DescriptorStore(directory, self.number_of_descriptors)
+        if not os.path.isdir(directory):
+            os.mkdir(directory)
+        if other.number_of_descriptors != self.number_of_descriptors:
+            raise ValueError("Stores in '{}' and '{}' have different number of descriptors"
+                             .format(self.directory, directory))
+
+        for segment, info in self.segments.items():
+            target = segment
+            counter = 1
+            while target in other.segments:
+                target = "{}_{}".format(segment, counter)
+                counter += 1
+            for suffix in (self.descriptors_suffix, self.ids_suffix):
+                if os.path.isfile(self.path_to_segment(segment, suffix)):
+                    shutil.move(self.path_to_segment(segment, suffix), other.path_to_segment(target, suffix))
+            other.segments[target] = info
+            for frame in self.frames:
+                if frame["segment"] == segment:
+                    other.frames.append(dict(frame, segment=target))
+        other.save_index()
+
+        self.index["segments"], self.index["frames"] = {}, []
+        if os.path.isfile(self.path_to_index):
+            os.remove(self.path_to_index)
+        logger.debug("Store moved from \'{}\' to \'{}\'".format(self.directory, directory))
+
+
+class SegmentWriter:
+    """
+    class SegmentWriter
+        * appends frames (timesteps) to one segment of DescriptorStore
+        * index of the store is updated when the writer is closed
+        * used as a context manager, a segment of a with-block that raised is deleted (see abort),
+          so a run that failed leaves no partial segment in the store
+    """
+
+    def __init__(self, store, name, dtype):
+        if np.dtype(dtype).name not in store.dtypes:
+            raise ValueError("Descriptors cannot be stored as {}, use one of: {}".format(
+                np.dtype(dtype).name, ", ".join(store.dtypes)))
+        self.store = store
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.frames = []
+        self.ids_file = open(store.path_to_segment(name, store.ids_suffix), "wb")
+        self.descriptors_file = open(store.path_to_segment(name, store.descriptors_suffix), "wb")
+
+    def append(self, timestep, ids, descriptors, phase=None):
+        """
+        appends descriptors [num_of_atoms, num_of_descriptors] of atoms 'ids' at given timestep
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        descriptors = np.asarray(descriptors, dtype=self.dtype)
+        if descriptors.size != len(ids) * self.store.number_of_descriptors:
+            raise ValueError("Descriptors of timestep #{} have wrong shape {}".format(timestep, descriptors.shape))
+        descriptors = descriptors.reshape(len(ids), self.store.number_of_descriptors)
+
+        ids.tofile(self.ids_file)
+        descriptors.tofile(self.descriptors_file)
+        self.frames.append({"segment": self.name, "timestep": int(timestep), "phase": phase,
+                            "offset": self.rows, "count": len(ids)})
+        self.rows += len(ids)
+
+    def close(self):
+        """
+        closes binary files and registers the segment in the index of the store
+        """
+        self.ids_file.close()
+        self.descriptors_file.close()
+        self.store.segments[self.name] = {"dtype": self.dtype.name, "rows": self.rows}
+        self.store.frames.extend(self.frames)
+        self.store.save_index()
+        logger.debug("Segment \'{}\' with {} frames ({} rows) saved to \'{}\'".format(
+            self.name, len(self.frames), self.rows, self.store.directory))
+
+    def abort(self):
+        """
+        closes and deletes binary files of the segment, the index of the store is not changed
+        """
+        self.ids_file.close()
+        self.descriptors_file.close()
+        for suffix in (self.store.ids_suffix, self.store.descriptors_suffix):
+            try:
+                os.remove(self.store.path_to_segment(self.name, suffix))
+            except OSError:
+                pass
+        logger.debug("Segment \'{}\' with {} frames was not finished, it is deleted".format(
+            self.name, len(self.frames)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
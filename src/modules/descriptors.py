@@ -1,277 +1,459 @@
+"""
+    Vectorized NumPy/SciPy implementation of descriptors with the same interface as C++ extension 'descriptors'
+    (compute, compute_array, Engine, parameters, set_skin, set_num_threads, get_num_threads, set_half_lists,
+    set_profiling, profile, statistics).
+    It is used when the extension is not installed:
+
+        try:
+            import descriptors
+        except ImportError:
+            from modules import descriptors
+
+    Descriptors of each atom (14 values):
+        * 8 symmetry functions G_2 and 3 symmetry functions G_3 (Behler-Parinello)
+        * 3 Steinhardt parameters with l = 6, 7, 8
+    Pairs of atoms closer than the cutoff are found by periodic cKDTree, each pair once; values of all
+    pairs are evaluated at once and added to both atoms of the pair. Descriptors agree with the C++
+    extension up to rounding errors (the order of summation differs).
+"""
+
+import os
 import math
+import time
 import logging
-from scipy.special import sph_harm
+import threading
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+try:
+    from scipy.special import sph_harm_y
+except ImportError:
+    # SciPy < 1.15
+    from scipy.special import sph_harm
+
+    def sph_harm_y(l_param, m, theta, phi):
+        return sph_harm(m, l_param, phi, theta)
 
 # set-up the logger
 logger = logging.getLogger('kabuto.descriptors')
 
+# cutoff functions (r_min, r_max) [Angstrom]
+SYMMETRY_CUTOFF = (6.2, 6.4)
+STEINHARDT_CUTOFF = (3.8, 4.0)
 
-class Descriptors:
-    """
-    class Descriptors
-        * it can be changed to calculate whatever descriptors you choose, but
-        * the function 'get_descriptors()' must return an array of floats
-        * number of descriptors affects the neural network (# of its input nodes), so be careful
-        * the function 'info_header' returns a header for the output file that contains descriptors
-        * ... it must be changed adequately
-        * class attribute 'number_of_descriptors' holds the number of descriptors
-        * r_min and r_max are different for Steinhardt parameters and symmetry functions!
-        * 'all_atoms' holds all atoms in the simulation box
-    """
-    # important class attribute; update it, when descriptors are changed
-    number_of_descriptors = 14
-
-    def __init__(self, atom_id, x, y, z, all_atoms, pbc):
-        self.atom_id = atom_id                                       # id of actual atom
-        self.x, self.y, self.z = x, y, z                             # coordination of actual atom
-        self.all_atoms = all_atoms                                   # all atoms in box
-        self.pbc_x, self.pbc_y, self.pbc_z = pbc[0], pbc[1], pbc[2]  # PBC
-
-        # dictionary of parameters for symmetry functions
-        self.symmetry_functions_parameters = {
-            1: [2.8, 20.0],  # r_s [Angstrom], eta [angstrom ^ -2]
-            2: [3.2, 20.0],
-            3: [4.4, 20.0],
-            4: [4.8, 20.0],
-            5: [5.0, 20.0],
-            6: [5.3, 20.0],
-            7: [5.7, 20.0],
-            8: [6.0, 20.0],
-            9: [3.5],  # kappa [angstrom ^ -1]
-            10: [4.5],
-            11: [7.0]
-        }
-
-    def get_descriptors(self):
-        """
-        returns descriptors
-            > it can be changed
-            > it must returns an array of floats
-            > number of descriptors affects the NN
-        """
-        return self.values_of_14_functions()
+# parameters of symmetry functions: (eta [Angstrom^-2], r_s [Angstrom]) for G_2, kappa [Angstrom^-1] for G_3
+G2_PARAMETERS = ((20.0, 2.8), (20.0, 3.2), (20.0, 4.4), (20.0, 4.8),
+                 (20.0, 5.0), (20.0, 5.3), (20.0, 5.7), (20.0, 6.0))
+G3_PARAMETERS = (3.5, 4.5, 7.0)
+STEINHARDT_PARAMETERS = (6, 7, 8)
 
-    def values_of_14_functions(self):
-        """
-        returns the list of 14 functions that describe a local structure for individual atom
-            11 symmetry functions (G_2 and G_3 with different parameters)
-            3 Steinhardt parameters (l = 6, 7, 8)
-        """
-        return [
-            self.g_2(self.symmetry_functions_parameters[1][0],
-                     self.symmetry_functions_parameters[1][1]),
-            self.g_2(self.symmetry_functions_parameters[2][0],
-                     self.symmetry_functions_parameters[2][1]),
-            self.g_2(self.symmetry_functions_parameters[3][0],
-                     self.symmetry_functions_parameters[3][1]),
-            self.g_2(self.symmetry_functions_parameters[4][0],
-                     self.symmetry_functions_parameters[4][1]),
-            self.g_2(self.symmetry_functions_parameters[5][0],
-                     self.symmetry_functions_parameters[5][1]),
-            self.g_2(self.symmetry_functions_parameters[6][0],
-                     self.symmetry_functions_parameters[6][1]),
-            self.g_2(self.symmetry_functions_parameters[7][0],
-                     self.symmetry_functions_parameters[7][1]),
-            self.g_2(self.symmetry_functions_parameters[8][0],
-                     self.symmetry_functions_parameters[8][1]),
-
-            self.g_3(self.symmetry_functions_parameters[9][0]),
-            self.g_3(self.symmetry_functions_parameters[10][0]),
-            self.g_3(self.symmetry_functions_parameters[11][0]),
-
-            self.q_6(),
-            self.q_7(),
-            self.q_8()
-        ]
-
-    @staticmethod
-    def f_c(r, r_min, r_max):
-        """
-        cutoff function, returns a value between 0 and 1
-            'r' is distance between current atom and the other one, i. e. r_ij
-        """
-        if r <= r_min:
-            return 1.0
-        elif r_min < r <= r_max:
-            return 0.5 + 0.5 * math.cos(math.pi * (r - r_min) / (r_max - r_min))
-        elif r_max < r:
-            return 0.0
-
-    def g_2(self, r_s, eta):
+NUMBER_OF_DESCRIPTORS = len(G2_PARAMETERS) + len(G3_PARAMETERS) + len(STEINHARDT_PARAMETERS)
+
+# settings of all following calculations (the same defaults as in C++ extension: all cores), the number of threads
+# is only reported, NumPy calculation uses one thread
+settings = {"skin": 1.0, "threads": max(1, os.cpu_count() or 1), "half_lists": False, "profiling": False}
+
+# statistics of the last calculation (descriptors.statistics())
+last_statistics = {"timesteps": 0, "verlet_list_builds": 0, "verlet_list_time": 0.0, "descriptors_time": 0.0,
+                   "symmetry_functions_time": 0.0, "steinhardt_time": 0.0, "max_displacement": 0.0}
+
+# profile of the last calculation (descriptors.profile()), valid only if it was calculated with profiling
+last_profile = {"profiled": False, "parsing_time": 0.0, "marshalling_time": 0.0, "total_time": 0.0,
+                "atoms": 0, "neighbours": 0, "steinhardt_neighbours": 0}
+
+
+def cutoff_function(distances, r_min, r_max):
+    """
+    returns values of cutoff function (between 0 and 1) for array of distances
+    """
+    inside = 0.5 + 0.5 * np.cos(np.pi * (distances - r_min) / (r_max - r_min))
+    return np.where(distances <= r_min, 1.0, np.where(distances <= r_max, inside, 0.0))
+
+
+def neighbour_pairs(positions, box, cutoff):
+    """
+    returns pairs of atoms [pairs, 2] (i < j) closer than 'cutoff' (Verlet lists, each pair once)
+        * cKDTree needs positions inside the box, so they are wrapped
+    """
+    wrapped = np.mod(positions, box)
+    wrapped = np.where(wrapped >= box, wrapped - box, wrapped)
+    tree = cKDTree(wrapped, boxsize=box)
+    return tree.query_pairs(cutoff, output_type="ndarray").reshape(-1, 2)
+
+
+def close_pairs(positions, box, pairs, cutoff):
+    """
+    returns pairs of atoms [pairs, 2], vectors r_ij [pairs, 3] and distances [pairs] of given pairs closer than 'cutoff'
+        * vectors follow minimum image convention as in C++ extension (calculated from original positions)
+    """
+    vectors = positions[pairs[:, 1]] - positions[pairs[:, 0]]
+    vectors -= box * np.round(vectors / box)
+    distances = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+
+    close = distances <= cutoff
+    return pairs[close], vectors[close], distances[close]
+
+
+def find_pairs(positions, box, cutoff):
+    """
+    returns pairs of atoms [pairs, 2] (i < j), vectors r_ij [pairs, 3] and distances [pairs] of atoms closer than 'cutoff'
+    """
+    # skin covers rounding of distances in cKDTree
+    return close_pairs(positions, box, neighbour_pairs(positions, box, cutoff + settings["skin"]), cutoff)
+
+
+def sum_over_pairs(pairs, first, second, number_of_atoms):
+    """
+    returns sums [atoms, columns] of values of pairs, 'first' [pairs, columns] is added to atom pairs[:, 0]
+    and 'second' to atom pairs[:, 1]
+    """
+    atoms = np.concatenate((pairs[:, 0], pairs[:, 1]))
+    values = np.concatenate((first, second))
+    sums = np.empty((number_of_atoms, values.shape[1]))
+    for column in range(values.shape[1]):
+        sums[:, column] = np.bincount(atoms, weights=values[:, column], minlength=number_of_atoms)
+    return sums
+
+
+def symmetry_functions(pairs, distances, number_of_atoms):
+    """
+    returns symmetry functions G_2 and G_3 of all atoms [atoms, 11]
+    """
+    fc = cutoff_function(distances, *SYMMETRY_CUTOFF)[:, np.newaxis]
+    eta, r_s = np.array(G2_PARAMETERS).T
+    kappa = np.array(G3_PARAMETERS)
+    terms = np.hstack((fc * np.exp(-eta * (distances[:, np.newaxis] - r_s) ** 2),
+                       fc * np.cos(kappa * distances[:, np.newaxis])))
+
+    # both atoms of pair have the same distance
+    return sum_over_pairs(pairs, terms, terms, number_of_atoms)
+
+
+def steinhardt_parameters(pairs, vectors, distances, number_of_atoms):
+    """
+    returns Steinhardt parameters q_l of all atoms [atoms, 3]
+        * q_l = sqrt(4 pi / (2l + 1) * sum_m |q_lm|^2), q_lm = sum_j fc(r_ij) Y_lm(r_ij) / sum_j fc(r_ij)
+        * atom without neighbours has q_l = nan (as in C++ extension)
+    """
+    fc = cutoff_function(distances, *STEINHARDT_CUTOFF)
+    bonds = fc > 0.0
+    pairs, vectors, distances, fc = pairs[bonds], vectors[bonds], distances[bonds], fc[bonds]
+    theta = np.arccos(np.clip(vectors[:, 2] / distances, -1.0, 1.0))[:, np.newaxis]
+    phi = np.arctan2(vectors[:, 1], vectors[:, 0])[:, np.newaxis]
+    denominator = sum_over_pairs(pairs, fc[:, np.newaxis], fc[:, np.newaxis], number_of_atoms)
+
+    result = np.empty((number_of_atoms, len(STEINHARDT_PARAMETERS)))
+    for index, l_param in enumerate(STEINHARDT_PARAMETERS):
+        # Y_lm of all bonds at once (m >= 0), the other atom of pair sees vector -r_ij: Y_lm(-r) = (-1)^l Y_lm(r)
+        ylm = fc[:, np.newaxis] * sph_harm_y(l_param, np.arange(l_param + 1), theta, phi)
+        sign = (-1) ** l_param
+        real = sum_over_pairs(pairs, ylm.real, sign * ylm.real, number_of_atoms)
+        imag = sum_over_pairs(pairs, ylm.imag, sign * ylm.imag, number_of_atoms)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            q_lm2 = (real ** 2 + imag ** 2) / denominator ** 2
+
+        # |q_l,-m| = |q_lm|
+        total = q_lm2[:, 0] + 2.0 * q_lm2[:, 1:].sum(axis=1)
+        result[:, index] = np.sqrt(total * 4.0 * math.pi / (2 * l_param + 1))
+    return result
+
+
+def descriptors_of_pairs(pairs, vectors, distances, out, statistics):
+    """
+    calculates descriptors 'out' [atoms, 14] from pairs of atoms closer than the largest cutoff (find_pairs),
+    times of symmetry functions and Steinhardt parameters are added to 'statistics'
+    """
+    start = time.perf_counter()
+    number_of_atoms = len(out)
+    number_of_g = len(G2_PARAMETERS) + len(G3_PARAMETERS)
+    symmetry = distances <= SYMMETRY_CUTOFF[1]
+    out[:, :number_of_g] = symmetry_functions(pairs[symmetry], distances[symmetry], number_of_atoms)
+    middle = time.perf_counter()
+
+    steinhardt = distances <= STEINHARDT_CUTOFF[1]
+    out[:, number_of_g:] = steinhardt_parameters(pairs[steinhardt], vectors[steinhardt], distances[steinhardt],
+                                                 number_of_atoms)
+    stop = time.perf_counter()
+
+    statistics["symmetry_functions_time"] += middle - start
+    statistics["steinhardt_time"] += stop - middle
+    statistics["descriptors_time"] += stop - start
+
+
+def compute_frame(positions, box, out):
+    """
+    calculates descriptors of one frame: positions [atoms, 3], box (pbc_x, pbc_y, pbc_z), out [atoms, 14]
+    """
+    start = time.perf_counter()
+    cutoff = max(SYMMETRY_CUTOFF[1], STEINHARDT_CUTOFF[1])
+    # skin covers rounding of distances in cKDTree
+    neighbours = neighbour_pairs(positions, box, cutoff + settings["skin"])
+    pairs, vectors, distances = close_pairs(positions, box, neighbours, cutoff)
+    last_statistics["verlet_list_builds"] += 1
+    last_statistics["verlet_list_time"] += time.perf_counter() - start
+
+    # each pair is in Verlet lists (and short lists) of both atoms as in C++ extension
+    last_profile["atoms"] += len(positions)
+    last_profile["neighbours"] += 2 * len(neighbours)
+    steinhardt_neighbours = np.count_nonzero(distances <= STEINHARDT_CUTOFF[1] + settings["skin"])
+    last_profile["steinhardt_neighbours"] += 2 * int(steinhardt_neighbours)
+
+    descriptors_of_pairs(pairs, vectors, distances, out, last_statistics)
+
+
+def reset_statistics(number_of_timesteps):
+    """
+    starts statistics of a new calculation
+    """
+    last_statistics.update({key: 0 if isinstance(value, int) else 0.0 for key, value in last_statistics.items()})
+    last_statistics["timesteps"] = number_of_timesteps
+    last_profile.update({key: 0 if isinstance(value, int) else 0.0 for key, value in last_profile.items()})
+    last_profile["profiled"] = settings["profiling"]
+
+
+def double_array(array, name, writable=False):
+    """
+    returns 'array' as contiguous float64 numpy array without copying it (as buffers in C++ extension)
+    """
+    result = np.asarray(array)
+    if result.dtype != np.float64 or not result.flags.c_contiguous:
+        raise TypeError("{} must be a contiguous array of float64".format(name))
+    if writable and not result.flags.writeable:
+        raise TypeError("{} must be a writable array".format(name))
+    return result
+
+
+def compute(pbc_dict, timesteps):
+    """
+    returns descriptors of all timesteps {timestep_id: {atom_id: (tuple of descriptors)}}
+        * 'pbc_dict' is {timestep_id: (pbc_x, pbc_y, pbc_z)}, 'timesteps' is {timestep_id: {atom_id: (x, y, z)}}
+        * pairs of atoms are searched again in every timestep (C++ extension reuses Verlet lists within the skin),
+          use Engine to reuse pairs between frames
+    """
+    start = time.perf_counter()
+    for timestep_id in timesteps:
+        if timestep_id not in pbc_dict or len(pbc_dict[timestep_id]) != 3:
+            raise ValueError("timestep {} has no pbc (pbcX, pbcY, pbcZ)".format(timestep_id))
+    reset_statistics(len(timesteps))
+    result = {}
+    for timestep_id, atoms in timesteps.items():
+        parsing = time.perf_counter()
+        positions = np.array(list(atoms.values()), dtype=np.float64).reshape(-1, 3)
+        out = np.empty((len(positions), NUMBER_OF_DESCRIPTORS))
+        last_profile["parsing_time"] += time.perf_counter() - parsing
+        compute_frame(positions, np.array(pbc_dict[timestep_id], dtype=np.float64), out)
+
+        marshalling = time.perf_counter()
+        result[timestep_id] = {atom_id: tuple(values) for atom_id, values in zip(atoms.keys(), out.tolist())}
+        last_profile["marshalling_time"] += time.perf_counter() - marshalling
+    last_profile["total_time"] = time.perf_counter() - start
+    return result
+
+
+def compute_array(positions, box, out):
+    """
+    calculates descriptors of positions [frames, atoms, 3] or [atoms, 3] with box [frames, 3] or [3]
+    into 'out' [frames, atoms, number_of_descriptors], returns 'out'
+        * pairs of atoms are searched again in every frame, as in compute
+    """
+    start = time.perf_counter()
+    positions_array = double_array(positions, "positions")
+    box_array = double_array(box, "box")
+    out_array = double_array(out, "out", writable=True)
+
+    if positions_array.ndim not in (2, 3) or positions_array.shape[-1] != 3:
+        raise ValueError("positions must have shape [frames, atoms, 3] or [atoms, 3]")
+    positions_array = positions_array.reshape(-1, positions_array.shape[-2], 3)
+    number_of_frames, number_of_atoms = positions_array.shape[:2]
+    if box_array.size != 3 and box_array.size != 3 * number_of_frames:
+        raise ValueError("box must have shape [frames, 3] or [3]")
+    if out_array.size != number_of_frames * number_of_atoms * NUMBER_OF_DESCRIPTORS:
+        raise ValueError("out must have shape [frames, atoms, number_of_descriptors]")
+
+    reset_statistics(number_of_frames)
+    last_profile["parsing_time"] = time.perf_counter() - start
+    if number_of_atoms > 0:
+        # descriptors are written directly to 'out', nothing is copied
+        boxes = np.broadcast_to(box_array.reshape(-1, 3), (number_of_frames, 3))
+        out_frames = out_array.reshape(number_of_frames, number_of_atoms, NUMBER_OF_DESCRIPTORS)
+        for frame in range(number_of_frames):
+            compute_frame(positions_array[frame], boxes[frame], out_frames[frame])
+    last_profile["total_time"] = time.perf_counter() - start
+    return out
+
+
+class Engine:
+    """
+    calculates descriptors of one frame at a time (the same interface as descriptors.Engine of C++ extension)
+        * pairs of atoms closer than the largest cutoff plus skin are kept between frames and searched again
+          only when atoms moved too much (twice the largest displacement plus the change of the box exceeds
+          the skin) or the number of atoms changed, atom i is the same atom in all frames
+        * descriptors are written to 'out' or to an array owned by Engine (overwritten by the next update)
+        * settings of module are used for arguments that are not given
+    """
+
+    def __init__(self, *, skin=None, threads=None, half_lists=None):
+        self.skin = settings["skin"] if skin is None else float(skin)
+        self.threads = settings["threads"] if threads is None else int(threads)
+        self.half_lists = settings["half_lists"] if half_lists is None else bool(half_lists)
+        if not self.skin >= 0.0:
+            raise ValueError("skin must be a non-negative number")
+        if self.threads < 1:
+            raise ValueError("number of threads must be a positive integer")
+
+        self.lock = threading.Lock()
+        self.out = np.empty((0, NUMBER_OF_DESCRIPTORS))
+        self.reference = None  # (positions, box, pairs) of the last search of pairs
+        self.engine_statistics = {"updates": 0, "atoms": 0, "last_update_time": 0.0, "total_update_time": 0.0,
+                                  "max_update_time": 0.0, "verlet_list_builds": 0, "verlet_list_time": 0.0,
+                                  "descriptors_time": 0.0, "symmetry_functions_time": 0.0, "steinhardt_time": 0.0,
+                                  "max_displacement": 0.0}
+
+    def pairs_need_update(self, positions, box):
         """
-        symmetry function G_2
-        it takes two parameters, eta and R_s
+        returns True if pairs of the last search may miss some atoms closer than the cutoff
         """
-        r_min, r_max = self.set_r_min_max_g_functions()
-        res = 0.
-        for atom_id, items in self.all_atoms.items():
-            if atom_id != self.atom_id:  # skip myself
-                # vector r_ij
-                x_ij = items[0] - self.x
-                y_ij = items[1] - self.y
-                z_ij = items[2] - self.z
-
-                # correction of vector r_ij for PBC (and minimum image convention)
-                x_ij -= self.pbc_x * round(x_ij / self.pbc_x)
-                y_ij -= self.pbc_y * round(y_ij / self.pbc_y)
-                z_ij -= self.pbc_z * round(z_ij / self.pbc_z)
-
-                # calculate the correct length of vector r_ij
-                r_ij = math.sqrt(math.pow(x_ij, 2) + math.pow(y_ij, 2) + math.pow(z_ij, 2))
-
-                res += self.f_c(r_ij, r_min, r_max) * math.exp(-eta * math.pow(r_ij - r_s, 2))
-        return res
-
-    def g_3(self, kappa):
+        if self.reference is None or len(self.reference[0]) != len(positions):
+            return True
+        reference_positions, reference_box, _ = self.reference
+        displacements = positions - reference_positions
+        displacements -= box * np.round(displacements / box)
+        max_displacement = math.sqrt(np.einsum("ij,ij->i", displacements, displacements).max())
+        self.engine_statistics["max_displacement"] = max(self.engine_statistics["max_displacement"], max_displacement)
+        return 2 * max_displacement + float(np.linalg.norm(box - reference_box)) > self.skin
+
+    def update(self, positions, box, out=None):
         """
-        symmetry function G_3
-        it takes one parameter, kappa
+        calculates descriptors of positions [atoms, 3] with box [3] into 'out' [atoms, number_of_descriptors],
+        returns 'out' (or array of Engine if 'out' is not given)
         """
-        r_min, r_max = self.set_r_min_max_g_functions()
-        res = 0.
-        for atom_id, items in self.all_atoms.items():
-            if atom_id != self.atom_id:  # skip myself
-                # vector r_ij
-                x_ij = items[0] - self.x
-                y_ij = items[1] - self.y
-                z_ij = items[2] - self.z
-
-                # correction of vector r_ij for PBC (and minimum image convention)
-                x_ij -= self.pbc_x * round(x_ij / self.pbc_x)
-                y_ij -= self.pbc_y * round(y_ij / self.pbc_y)
-                z_ij -= self.pbc_z * round(z_ij / self.pbc_z)
-
-                # calculate the correct length of vector r_ij
-                r_ij = math.sqrt(math.pow(x_ij, 2) + math.pow(y_ij, 2) + math.pow(z_ij, 2))
-
-                res += self.f_c(r_ij, r_min, r_max) * math.cos(kappa * r_ij)
-        return res
-
-    def q_6(self):
+        if not self.lock.acquire(blocking=False):
+            raise RuntimeError("Engine is updating another frame")
+        try:
+            start = time.perf_counter()
+            positions_array = double_array(positions, "positions")
+            box_array = double_array(box, "box")
+            if positions_array.ndim != 2 or positions_array.shape[1] != 3:
+                raise ValueError("positions must have shape [atoms, 3]")
+            if box_array.size != 3:
+                raise ValueError("box must have shape [3]")
+            box_array = box_array.reshape(3)
+
+            number_of_atoms = len(positions_array)
+            if out is None:
+                if len(self.out) != number_of_atoms:
+                    self.out = np.empty((number_of_atoms, NUMBER_OF_DESCRIPTORS))
+                out_array = self.out
+            else:
+                out_array = double_array(out, "out", writable=True)
+                if out_array.size != number_of_atoms * NUMBER_OF_DESCRIPTORS:
+                    raise ValueError("out must have shape [atoms, number_of_descriptors]")
+                out_array = out_array.reshape(number_of_atoms, NUMBER_OF_DESCRIPTORS)
+
+            if number_of_atoms > 0:
+                cutoff = max(SYMMETRY_CUTOFF[1], STEINHARDT_CUTOFF[1])
+                if self.pairs_need_update(positions_array, box_array):
+                    search = time.perf_counter()
+                    self.reference = (positions_array.copy(), box_array.copy(),
+                                      neighbour_pairs(positions_array, box_array, cutoff + self.skin))
+                    self.engine_statistics["verlet_list_builds"] += 1
+                    self.engine_statistics["verlet_list_time"] += time.perf_counter() - search
+                pairs, vectors, distances = close_pairs(positions_array, box_array, self.reference[2], cutoff)
+                descriptors_of_pairs(pairs, vectors, distances, out_array, self.engine_statistics)
+
+            update_time = time.perf_counter() - start
+            self.engine_statistics["updates"] += 1
+            self.engine_statistics["atoms"] = number_of_atoms
+            self.engine_statistics["last_update_time"] = update_time
+            self.engine_statistics["total_update_time"] += update_time
+            self.engine_statistics["max_update_time"] = max(self.engine_statistics["max_update_time"], update_time)
+        finally:
+            self.lock.release()
+        return self.out if out is None else out
+
+    def statistics(self):
         """
-        Steinhardt parameter with l = 6
+        returns statistics of all updates (times of updates in microseconds, other times in seconds)
         """
-        l_param = 6
-        res = 0
-        for m in range(-l_param, l_param + 1, 1):
-            res += math.pow(abs(self.q_lm(l_param, m)), 2)
-        return math.sqrt(res * 4 * math.pi / (2 * l_param + 1))
+        result = dict(self.engine_statistics, skin=self.skin, threads=self.threads, half_lists=self.half_lists,
+                      instruction_set="numpy")
+        updates = result.pop("updates")
+        last, total, slowest = (result.pop(key) for key in ("last_update_time", "total_update_time", "max_update_time"))
+        result.update(updates=updates, last_update_us=1e6 * last, mean_update_us=1e6 * total / max(updates, 1),
+                      max_update_us=1e6 * slowest)
+        return result
 
-    def q_7(self):
-        """
-        Steinhardt parameter with l = 7
-        """
-        l_param = 7
-        res = 0
-        for m in range(-l_param, l_param + 1, 1):
-            res += math.pow(abs(self.q_lm(l_param, m)), 2)
-        return math.sqrt(res * 4 * math.pi / (2 * l_param + 1))
 
-    def q_8(self):
-        """
-        Steinhardt parameter with l = 8
-        """
-        l_param = 8
-        res = 0
-        for m in range(-l_param, l_param + 1, 1):
-            res += math.pow(abs(self.q_lm(l_param, m)), 2)
-        return math.sqrt(res * 4 * math.pi / (2 * l_param + 1))
+def parameters():
+    """
+    returns parameters of descriptors (cutoffs, parameters of G2, G3 and Steinhardt functions)
+    """
+    return {"verlet_cutoff": max(SYMMETRY_CUTOFF[1], STEINHARDT_CUTOFF[1]) + settings["skin"],
+            "skin": settings["skin"],
+            "symmetry_cutoff": SYMMETRY_CUTOFF,
+            "steinhardt_cutoff": STEINHARDT_CUTOFF,
+            "g2_parameters": list(G2_PARAMETERS),
+            "g3_parameters": G3_PARAMETERS,
+            "steinhardt_parameters": list(STEINHARDT_PARAMETERS),
+            "number_of_descriptors": NUMBER_OF_DESCRIPTORS}
 
-    def q_lm(self, l_param, m):
-        """
-        returns value of function Q_lm
-        """
-        r_min, r_max = self.set_r_min_max_q_functions()
-
-        # numerator
-        num = 0
-        for atom_id, items in self.all_atoms.items():
-            if atom_id != self.atom_id:  # skip myself
-                # vector r_ij
-                x_ij = items[0] - self.x
-                y_ij = items[1] - self.y
-                z_ij = items[2] - self.z
-
-                # correction of vector r_ij for PBC (and minimum image convention)
-                x_ij -= self.pbc_x * round(x_ij / self.pbc_x)
-                y_ij -= self.pbc_y * round(y_ij / self.pbc_y)
-                z_ij -= self.pbc_z * round(z_ij / self.pbc_z)
-
-                # calculate the correct length of vector r_ij
-                r_ij = math.sqrt(math.pow(x_ij, 2) + math.pow(y_ij, 2) + math.pow(z_ij, 2))
-
-                # addition to a numerator
-                num += self.f_c(r_ij, r_min, r_max) * self.y_lm(l_param, m, x_ij, y_ij, z_ij)
-
-        # denominator
-        den = 0
-        for atom_id, items in self.all_atoms.items():
-            if atom_id != self.atom_id:  # skip myself
-                # vector r_ij
-                x_ij = items[0] - self.x
-                y_ij = items[1] - self.y
-                z_ij = items[2] - self.z
-
-                # correction of vector r_ij for PBC (and minimum image convention)
-                x_ij -= self.pbc_x * round(x_ij / self.pbc_x)
-                y_ij -= self.pbc_y * round(y_ij / self.pbc_y)
-                z_ij -= self.pbc_z * round(z_ij / self.pbc_z)
-
-                # calculate the correct length of vector r_ij
-                r_ij = math.sqrt(math.pow(x_ij, 2) + math.pow(y_ij, 2) + math.pow(z_ij, 2))
-
-                # addition to a denominator
-                den += self.f_c(r_ij, r_min, r_max)
-
-        return num / den
-
-    @staticmethod
-    def y_lm(l_param, m, dx, dy, dz):
-        """
-        returns value of spherical harmonics for given l and m
-        [dx, dy, dz] is a vector between two atoms
-        [self.x, self.y, self.z] are coordinates of current atom
-        """
 
-        # spherical coordinates of vector r_ij
-        r = math.sqrt(math.pow(dx, 2) + math.pow(dy, 2) + math.pow(dz, 2))
-        phi = math.atan2(dy, dx)
-        theta = math.acos(dz / r)
-
-        # return real form spherical harmonics in form Y_lm
-        #   sph_harm() returns Y_l^m --> wikipedia
-        if m < 0:
-            return (-1)**m * math.sqrt(2) * (sph_harm(abs(m), l_param, phi, theta)).imag
-        elif m == 0:
-            return sph_harm(0, l_param, phi, theta)
-        elif m > 0:
-            return (-1)**m * math.sqrt(2) * (sph_harm(m, l_param, phi, theta)).real
-
-    @staticmethod
-    def info_header(timestep, phase):
-        """
-        returns informative header that is to be written at the beginning of file with descriptors
-        """
-        if phase is not None:
-            return "# timestep {}\n" \
-                   "# phase {}\n" \
-                   "# id f1 f2 f3 f4 f5 f6 f7 f8 f9 f10 f11 f12 f13 f14\n".format(timestep, phase)
-        else:
-            return "# timestep {}\n" \
-                   "# id f1 f2 f3 f4 f5 f6 f7 f8 f9 f10 f11 f12 f13 f14\n".format(timestep)
-
-    @staticmethod
-    def set_r_min_max_q_functions():
-        """
-        return r_min and r_max for cutoff function for Steinhardt bond parameters q
-            units = Angstroms
-        """
-        return 3.8, 4.0
+def set_skin(skin):
+    """
+    sets skin added to the cutoff of neighbour search (default 1.0)
+    """
+    if not skin >= 0.0:
+        raise ValueError("skin must be a non-negative number")
+    settings["skin"] = float(skin)
 
-    @staticmethod
-    def set_r_min_max_g_functions():
-        """
-        return r_min and r_max for cutoff function for symmetry functions G_2 and G_3
-            units = Angstroms
-        """
-        return 6.2, 6.4
+
+def set_num_threads(threads):
+    """
+    sets number of threads (default all cores)
+        * kept for the interface of C++ extension, NumPy calculation uses one thread
+    """
+    if threads < 1:
+        raise ValueError("number of threads must be a positive integer")
+    settings["threads"] = int(threads)
+
+
+def get_num_threads():
+    """
+    returns number of threads
+    """
+    return settings["threads"]
+
+
+def set_half_lists(enabled):
+    """
+    kept for the interface of C++ extension, each pair of atoms is always evaluated once
+    """
+    settings["half_lists"] = bool(enabled)
+
+
+def set_profiling(enabled):
+    """
+    keeps time of each stage and numbers of atoms and neighbours of the following calculations (default False)
+    """
+    settings["profiling"] = bool(enabled)
+
+
+def profile():
+    """
+    returns profile of the last calculation (compute or compute_array), or None if it was not profiled
+    """
+    if not last_profile["profiled"]:
+        return None
+    result = {key: last_statistics[key] for key in ("verlet_list_time", "descriptors_time",
+                                                    "symmetry_functions_time", "steinhardt_time", "timesteps")}
+    result.update({key: value for key, value in last_profile.items() if key != "profiled"})
+    result["pairs"] = result["neighbours"] // 2
+    return result
+
+
+def statistics():
+    """
+    returns statistics of the last calculation (compute or compute_array)
+    """
+    return dict(settings, instruction_set="numpy", **last_statistics)
@@ -0,0 +1,86 @@
+/**
+ * Name:
+ *      benchmark_cell_list.cpp
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Scaling benchmark of search of neighbours (Verlet lists) in bcc
+ *      lattice of molybdenum with 10^3 ... 10^7 atoms. Cell list is
+ *      compared with the former O(N^2) search (only up to 'maxBruteForce'
+ *      atoms, default 10^5).
+ *
+ *      Usage: ./benchmark_cell_list [maxAtoms] [maxBruteForce]
+ */
+
+#include <chrono>
+#include <cmath>
+#include <cstdlib>
+#include <iostream>
+#include <random>
+#include <vector>
+
+#include "../src/descriptors_cell_list.h"
+
+CellList bccLattice(int cellsPerEdge, double latticeConstant, double cutoff)
+{
+    std::mt19937 generator(42);
+    std::normal_distribution<double> noise(0.0, 0.05);
+    std::vector<double> x, y, z;
+    for (int i = 0; i < cellsPerEdge; i++)
+        for (int j = 0; j < cellsPerEdge; j++)
+            for (int k = 0; k < cellsPerEdge; k++)
+                for (double shift : {0.0, 0.5})
+                {
+                    x.push_back((i + shift) * latticeConstant + noise(generator));
+                    y.push_back((j + shift) * latticeConstant + noise(generator));
+                    z.push_back((k + shift) * latticeConstant + noise(generator));
+                }
+    double length{cellsPerEdge * latticeConstant};
+    return CellList(x, y, z, {length, length, length}, cutoff);
+}
+
+int main(int argc, char *argv[])
+{
+    double maxAtoms{argc > 1 ? std::atof(argv[1]) : 1e7};
+    double maxBruteForce{argc > 2 ? std::atof(argv[2]) : 1e5};
+    const double latticeConstant{3.147};
+    const double cutoff{7.4};
+
+    std::cout << "atoms\tcells\tneighbours/atom\tcell list [s]\tbrute force [s]\tatoms/s (cell list)" << std::endl;
+    for (double target = 1e3; target <= maxAtoms * 1.0001; target *= 10)
+    {
+        int cellsPerEdge{static_cast<int>(std::round(std::cbrt(target / 2)))};
+
+        auto start = std::chrono::steady_clock::now();
+        CellList cellList = bccLattice(cellsPerEdge, latticeConstant, cutoff);
+        long numOfNeighbours{0};
+        for (int atom = 0; atom < cellList.getNumOfAtoms(); atom++)
+        {
+            numOfNeighbours += cellList.getNeighbours(atom).size();
+        }
+        std::chrono::duration<double> cellTime = std::chrono::steady_clock::now() - start;
+
+        std::cout << cellList.getNumOfAtoms() << '\t'
+                  << cellList.getNumOfCells()[0] << '^' << '3' << '\t'
+                  << static_cast<double>(numOfNeighbours) / cellList.getNumOfAtoms() << '\t'
+                  << cellTime.count() << '\t';
+
+        if (cellList.getNumOfAtoms() <= maxBruteForce)
+        {
+            start = std::chrono::steady_clock::now();
+            long numOfBruteForceNeighbours{0};
+            for (int atom = 0; atom < cellList.getNumOfAtoms(); atom++)
+            {
+                numOfBruteForceNeighbours += cellList.getNeighboursBruteForce(atom).size();
+            }
+            std::chrono::duration<double> bruteForceTime = std::chrono::steady_clock::now() - start;
+            std::cout << bruteForceTime.count() << (numOfBruteForceNeighbours == numOfNeighbours ? "" : " (MISMATCH)");
+        }
+        else
+        {
+            std::cout << "-";
+        }
+        std::cout << '\t' << cellList.getNumOfAtoms() / cellTime.count() << std::endl;
+    }
+    return 0;
+}
@@ -0,0 +1,95 @@
+/**
+ * Name:
+ *      benchmark_half_lists.cpp
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Time of symmetry functions with full Verlet lists (every atom evaluates
+ *      all its neighbours) and with half lists (terms of each pair of atoms
+ *      are evaluated once and added to both atoms) for each instruction set
+ *      supported by RadialKernel. Bcc lattice of molybdenum (default
+ *      2 * 13^3 = 4394 atoms, one timestep) is used; descriptors must be
+ *      bit-identical.
+ *
+ *      Usage: ./benchmark_half_lists [cellsPerEdge] [repeats] [threads]
+ */
+
+#include <algorithm>
+#include <cstdlib>
+#include <iostream>
+#include <random>
+#include <vector>
+
+#include "../src/descriptors_box.h"
+
+// the best time of symmetry functions (summed over threads) of 'repeats' calculations of descriptors
+double symmetryFunctionsTime(Box &box, int repeats)
+{
+    double best{0.0};
+    for (int repeat = 0; repeat < repeats; repeat++)
+    {
+        double before{box.getSymmetryFunctionsTime()};
+        box.calculateDescriptors();
+        double duration{box.getSymmetryFunctionsTime() - before};
+        best = repeat == 0 ? duration : std::min(best, duration);
+    }
+    return best;
+}
+
+int main(int argc, char *argv[])
+{
+    int cellsPerEdge{argc > 1 ? std::atoi(argv[1]) : 13};
+    int repeats{argc > 2 ? std::atoi(argv[2]) : 5};
+    int numOfThreads{argc > 3 ? std::atoi(argv[3]) : 1};
+    const double latticeConstant{3.147};
+
+    // bcc lattice with small random displacements
+    std::mt19937 generator(42);
+    std::normal_distribution<double> noise(0.0, 0.05);
+    double length{cellsPerEdge * latticeConstant};
+    Box box({{0, {length, length, length}}});
+    box.setNumOfThreads(numOfThreads);
+    box.addTimestep(0);
+    int atomId{1};
+    for (int i = 0; i < cellsPerEdge; i++)
+        for (int j = 0; j < cellsPerEdge; j++)
+            for (int k = 0; k < cellsPerEdge; k++)
+                for (double shift : {0.0, 0.5})
+                {
+                    box.addAtomToTimestep(0, atomId++,
+                                          (i + shift) * latticeConstant + noise(generator),
+                                          (j + shift) * latticeConstant + noise(generator),
+                                          (k + shift) * latticeConstant + noise(generator));
+                }
+    box.createVerletLists();
+
+    std::cout << "atoms: " << box.getNumOfAtoms() << ", repeats: " << repeats << ", threads: " << numOfThreads << std::endl;
+    std::cout << "instruction set\tfull lists [s]\thalf lists [s]\tspeed-up\tidentical" << std::endl;
+
+    RadialKernel::InstructionSet best{RadialKernel::getInstructionSet()};
+    for (RadialKernel::InstructionSet instructionSet : {RadialKernel::scalar, RadialKernel::avx2, RadialKernel::avx512})
+    {
+        if (!RadialKernel::isSupported(instructionSet))
+        {
+            std::cout << RadialKernel::getInstructionSetName(instructionSet) << "\tnot supported" << std::endl;
+            continue;
+        }
+        RadialKernel::setInstructionSet(instructionSet);
+
+        box.setHalfLists(false);
+        double fullTime{symmetryFunctionsTime(box, repeats)};
+        std::vector<double> fullDescriptors{box.getTimestepDescriptors(0)};
+
+        box.setHalfLists(true);
+        double halfTime{symmetryFunctionsTime(box, repeats)};
+        const std::vector<double> &halfDescriptors{box.getTimestepDescriptors(0)};
+
+        std::cout << RadialKernel::getInstructionSetName(instructionSet) << '\t'
+                  << fullTime << '\t'
+                  << halfTime << '\t'
+                  << fullTime / halfTime << '\t'
+                  << (fullDescriptors == halfDescriptors ? "yes" : "NO") << std::endl;
+    }
+    RadialKernel::setInstructionSet(best);
+    return 0;
+}
@@ -0,0 +1,206 @@
+/**
+ * Name:
+ *      benchmark_layout.cpp
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Compares the former layout of atoms (std::map<int, Atom>, each Atom
+ *      with its own vector of descriptors, std::map<int, VerletList> of IDs,
+ *      neighbours looked up in the map by ID) with the structure of arrays
+ *      used by Timestep and Box (contiguous coordinates and descriptors,
+ *      Verlet lists as one array of indices).
+ *
+ *      * memory: resident memory of atoms and Verlet lists of bcc lattice
+ *        with 2 * cellsPerEdge^3 atoms (default 2 * 40^3 = 128000 atoms),
+ *        each layout is measured in a separate process
+ *      * throughput: descriptors of bcc lattice with 2 * 13^3 = 4394 atoms
+ *        (one thread), descriptors must be bit-identical
+ *
+ *      Usage: ./benchmark_layout [cellsPerEdge (memory)] [cellsPerEdge (throughput)]
+ */
+
+#include <chrono>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <map>
+#include <random>
+#include <vector>
+
+#include <sys/wait.h>
+#include <unistd.h>
+
+#include "../src/descriptors_box.h"
+
+const double latticeConstant{3.147};
+
+std::vector<std::array<double, 3>> bccLattice(int cellsPerEdge)
+{
+    std::mt19937 generator(42);
+    std::normal_distribution<double> noise(0.0, 0.05);
+    std::vector<std::array<double, 3>> positions;
+    for (int i = 0; i < cellsPerEdge; i++)
+        for (int j = 0; j < cellsPerEdge; j++)
+            for (int k = 0; k < cellsPerEdge; k++)
+                for (double shift : {0.0, 0.5})
+                {
+                    positions.push_back({(i + shift) * latticeConstant + noise(generator),
+                                         (j + shift) * latticeConstant + noise(generator),
+                                         (k + shift) * latticeConstant + noise(generator)});
+                }
+    return positions;
+}
+
+// resident memory of this process in bytes
+long residentMemory()
+{
+    long pages{0}, residentPages{0};
+    std::ifstream statm("/proc/self/statm");
+    statm >> pages >> residentPages;
+    return residentPages * sysconf(_SC_PAGESIZE);
+}
+
+// atoms and Verlet lists in the former layout
+struct MapLayout
+{
+    std::map<int, Atom> atoms;
+    std::vector<int> atomsId;
+    std::map<int, VerletList> verletLists;
+
+    MapLayout(const std::vector<std::array<double, 3>> &positions, double length, double cutoff)
+    {
+        std::vector<double> x, y, z;
+        for (size_t index = 0; index < positions.size(); index++)
+        {
+            int atomId = index + 1;
+            atomsId.push_back(atomId);
+            atoms.insert(std::make_pair(atomId, Atom(atomId, positions[index][0], positions[index][1], positions[index][2])));
+            x.push_back(positions[index][0]);
+            y.push_back(positions[index][1]);
+            z.push_back(positions[index][2]);
+        }
+        CellList cellList(x, y, z, {length, length, length}, cutoff);
+        for (size_t index = 0; index < positions.size(); index++)
+        {
+            std::vector<int> idsInVerletList;
+            for (int neighbour : cellList.getNeighbours(index))
+            {
+                idsInVerletList.push_back(atomsId[neighbour]);
+            }
+            verletLists.insert(std::make_pair(atomsId[index], VerletList(atomsId[index], idsInVerletList)));
+        }
+    }
+
+    void calculateDescriptors(Box &parameters, double length)
+    {
+        for (int atomId : atomsId)
+        {
+            atoms.at(atomId).calculateDescriptors(length, length, length,
+                                                  verletLists.at(atomId).getAtomIds(), atoms,
+                                                  parameters.getRMinSym(), parameters.getRMaxSym(),
+                                                  parameters.getRMinStein(), parameters.getRMaxStein(),
+                                                  parameters.getG2FunctionParameters(),
+                                                  parameters.getG3FunctionParameters(),
+                                                  parameters.getSteinhardtFunctionParameters());
+        }
+    }
+};
+
+// atoms and Verlet lists in the structure of arrays (Box)
+Box *arrayLayout(const std::vector<std::array<double, 3>> &positions, double length)
+{
+    Box *box = new Box({{0, {length, length, length}}});
+    box->addTimestep(0, positions.size());
+    for (size_t index = 0; index < positions.size(); index++)
+    {
+        box->addAtomToTimestep(0, index + 1, positions[index][0], positions[index][1], positions[index][2]);
+    }
+    box->createVerletLists();
+    return box;
+}
+
+// measures memory of one layout in a child process, returns bytes per atom
+double memoryPerAtom(int cellsPerEdge, bool mapLayout)
+{
+    int pipe_[2];
+    if (pipe(pipe_) != 0)
+    {
+        return -1.0;
+    }
+    pid_t pid = fork();
+    if (pid == 0)
+    {
+        std::vector<std::array<double, 3>> positions = bccLattice(cellsPerEdge);
+        double length{cellsPerEdge * latticeConstant};
+        long before{residentMemory()};
+        long after;
+        if (mapLayout)
+        {
+            MapLayout layout(positions, length, Box(std::map<int, std::vector<double>>{}).getRVerletListLimit());
+            for (auto &item : layout.atoms)
+            {
+                // descriptors are allocated in constructor of Atom, touch them as the calculation would
+                item.second.getDescriptors()[0] = 0.0;
+            }
+            after = residentMemory();
+        }
+        else
+        {
+            Box *box = arrayLayout(positions, length);
+            box->getTimesteps().at(0).resetDescriptors(box->getNumOfDescriptors());
+            after = residentMemory();
+        }
+        double result{static_cast<double>(after - before) / positions.size()};
+        ssize_t written = write(pipe_[1], &result, sizeof(result));
+        _exit(written == sizeof(result) ? 0 : 1);
+    }
+    double result{-1.0};
+    close(pipe_[1]);
+    if (read(pipe_[0], &result, sizeof(result)) != sizeof(result))
+    {
+        result = -1.0;
+    }
+    close(pipe_[0]);
+    waitpid(pid, nullptr, 0);
+    return result;
+}
+
+int main(int argc, char *argv[])
+{
+    int memoryCellsPerEdge{argc > 1 ? std::atoi(argv[1]) : 40};
+    int throughputCellsPerEdge{argc > 2 ? std::atoi(argv[2]) : 13};
+
+    std::cout << "memory (" << 2 * memoryCellsPerEdge * memoryCellsPerEdge * memoryCellsPerEdge
+              << " atoms with Verlet lists)" << std::endl;
+    double mapMemory{memoryPerAtom(memoryCellsPerEdge, true)};
+    double arrayMemory{memoryPerAtom(memoryCellsPerEdge, false)};
+    std::cout << "layout\tbytes/atom" << std::endl;
+    std::cout << "map\t" << mapMemory << std::endl;
+    std::cout << "arrays\t" << arrayMemory << std::endl;
+
+    std::vector<std::array<double, 3>> positions = bccLattice(throughputCellsPerEdge);
+    double length{throughputCellsPerEdge * latticeConstant};
+    std::cout << std::endl << "throughput (" << positions.size() << " atoms, 1 thread)" << std::endl;
+    std::cout << "layout\ttime [s]\tatoms/s\tidentical" << std::endl;
+
+    MapLayout mapLayout(positions, length, Box(std::map<int, std::vector<double>>{}).getRVerletListLimit());
+    Box parameters(std::map<int, std::vector<double>>{});
+    auto start = std::chrono::steady_clock::now();
+    mapLayout.calculateDescriptors(parameters, length);
+    std::chrono::duration<double> mapTime = std::chrono::steady_clock::now() - start;
+    std::cout << "map\t" << mapTime.count() << '\t' << positions.size() / mapTime.count() << "\t-" << std::endl;
+
+    Box *box = arrayLayout(positions, length);
+    start = std::chrono::steady_clock::now();
+    box->calculateDescriptors();
+    std::chrono::duration<double> arrayTime = std::chrono::steady_clock::now() - start;
+    bool identical{true};
+    for (int atomId : box->getTimestepAtomsId(0))
+    {
+        identical = identical && box->getAtomDescriptors(0, atomId) == mapLayout.atoms.at(atomId).getDescriptors();
+    }
+    std::cout << "arrays\t" << arrayTime.count() << '\t' << positions.size() / arrayTime.count() << '\t'
+              << (identical ? "yes" : "NO") << std::endl;
+    delete box;
+    return 0;
+}
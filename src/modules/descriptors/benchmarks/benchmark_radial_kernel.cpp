@@ -0,0 +1,125 @@
+/**
+ * Name:
+ *      benchmark_radial_kernel.cpp
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Throughput of symmetry functions (cutoff function, 8 G2 and 3 G3
+ *      functions) and of all descriptors for each instruction set supported
+ *      by RadialKernel (scalar, avx2, avx512). Bcc lattice of molybdenum
+ *      (default 2 * 13^3 = 4394 atoms, one timestep, one thread) is used;
+ *      the largest relative difference of descriptors from the scalar
+ *      version is printed.
+ *
+ *      Usage: ./benchmark_radial_kernel [cellsPerEdge] [repeats]
+ */
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <cstdlib>
+#include <iostream>
+#include <random>
+#include <vector>
+
+#include "../src/descriptors_box.h"
+
+int main(int argc, char *argv[])
+{
+    int cellsPerEdge{argc > 1 ? std::atoi(argv[1]) : 13};
+    int repeats{argc > 2 ? std::atoi(argv[2]) : 5};
+    const double latticeConstant{3.147};
+
+    // bcc lattice with small random displacements
+    std::mt19937 generator(42);
+    std::normal_distribution<double> noise(0.0, 0.05);
+    double length{cellsPerEdge * latticeConstant};
+    Box box({{0, {length, length, length}}});
+    box.addTimestep(0);
+    int atomId{1};
+    for (int i = 0; i < cellsPerEdge; i++)
+        for (int j = 0; j < cellsPerEdge; j++)
+            for (int k = 0; k < cellsPerEdge; k++)
+                for (double shift : {0.0, 0.5})
+                {
+                    box.addAtomToTimestep(0, atomId++,
+                                          (i + shift) * latticeConstant + noise(generator),
+                                          (j + shift) * latticeConstant + noise(generator),
+                                          (k + shift) * latticeConstant + noise(generator));
+                }
+    box.createVerletLists();
+
+    // neighbours of all atoms (indices into arrays of coordinates)
+    Timestep &timestep{box.getTimesteps().at(0)};
+    int numOfAtoms{timestep.getNumOfAtoms()};
+    CellList cellList(timestep.getX(), timestep.getY(), timestep.getZ(), {length, length, length}, box.getRMaxSym());
+    std::vector<std::vector<int>> neighbours;
+    for (int index = 0; index < numOfAtoms; index++)
+    {
+        neighbours.push_back(cellList.getNeighbours(index));
+    }
+
+    std::cout << "atoms: " << numOfAtoms << ", repeats: " << repeats << std::endl;
+    std::cout << "instruction set\tsymmetry functions [atoms/s]\tall descriptors [atoms/s]\tmax relative difference" << std::endl;
+
+    RadialKernel::InstructionSet best{RadialKernel::getInstructionSet()};
+    std::vector<double> scalarDescriptors;
+    for (RadialKernel::InstructionSet instructionSet : {RadialKernel::scalar, RadialKernel::avx2, RadialKernel::avx512})
+    {
+        if (!RadialKernel::isSupported(instructionSet))
+        {
+            std::cout << RadialKernel::getInstructionSetName(instructionSet) << "\tnot supported" << std::endl;
+            continue;
+        }
+        RadialKernel::setInstructionSet(instructionSet);
+
+        // symmetry functions only (the best of repeats)
+        std::vector<double> descriptors(numOfAtoms * box.getNumOfDescriptors());
+        double symmetryTime{0.0};
+        for (int repeat = 0; repeat < repeats; repeat++)
+        {
+            std::fill(descriptors.begin(), descriptors.end(), 0.0);
+            auto start = std::chrono::steady_clock::now();
+            for (int index = 0; index < numOfAtoms; index++)
+            {
+                Atom::evaluateSymmetryFunctions(index, neighbours[index].data(), neighbours[index].size(),
+                                                timestep.getX().data(), timestep.getY().data(), timestep.getZ().data(),
+                                                length, length, length,
+                                                box.getRMinSym(), box.getRMaxSym(),
+                                                box.getG2FunctionParameters(), box.getG3FunctionParameters(),
+                                                descriptors.data() + index * box.getNumOfDescriptors());
+            }
+            std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+            symmetryTime = repeat == 0 ? duration.count() : std::min(symmetryTime, duration.count());
+        }
+
+        // all descriptors (symmetry functions and Steinhardt parameters)
+        double descriptorsTime{0.0};
+        for (int repeat = 0; repeat < repeats; repeat++)
+        {
+            auto start = std::chrono::steady_clock::now();
+            box.calculateDescriptors();
+            std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+            descriptorsTime = repeat == 0 ? duration.count() : std::min(descriptorsTime, duration.count());
+        }
+
+        const std::vector<double> &allDescriptors{box.getTimestepDescriptors(0)};
+        if (instructionSet == RadialKernel::scalar)
+        {
+            scalarDescriptors = allDescriptors;
+        }
+        double maxDifference{0.0};
+        for (size_t descriptor = 0; descriptor < allDescriptors.size(); descriptor++)
+        {
+            maxDifference = std::max(maxDifference, fabs(allDescriptors[descriptor] - scalarDescriptors[descriptor]) /
+                                                        std::max(fabs(scalarDescriptors[descriptor]), 1e-300));
+        }
+
+        std::cout << RadialKernel::getInstructionSetName(instructionSet) << '\t'
+                  << numOfAtoms / symmetryTime << '\t'
+                  << numOfAtoms / descriptorsTime << '\t'
+                  << maxDifference << std::endl;
+    }
+    RadialKernel::setInstructionSet(best);
+    return 0;
+}
@@ -0,0 +1,109 @@
+/**
+ * Name:
+ *      benchmark_steinhardt_list.cpp
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Time of each family of descriptors when Steinhardt parameters are
+ *      evaluated for all atoms in Verlet lists (cutoff of symmetry functions
+ *      plus skin, 7.4 A) and for atoms in short lists (cutoff of Steinhardt
+ *      parameters plus skin, 5.0 A). Bcc lattice of molybdenum (default
+ *      2 * 13^3 = 4394 atoms, one timestep, one thread) is used; descriptors
+ *      must be bit-identical.
+ *
+ *      Usage: ./benchmark_steinhardt_list [cellsPerEdge] [repeats]
+ */
+
+#include <algorithm>
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <random>
+#include <vector>
+
+#include "../src/descriptors_box.h"
+
+// the best time of 'repeats' evaluations of Steinhardt parameters of all atoms with given neighbours
+double steinhardtTime(Box &box, const std::vector<std::vector<int>> &neighbours, double length, int repeats,
+                      std::vector<double> &descriptors)
+{
+    Timestep &timestep{box.getTimesteps().at(0)};
+    int numOfAtoms{timestep.getNumOfAtoms()};
+    int numOfDescriptors{box.getNumOfDescriptors()};
+    double best{0.0};
+    for (int repeat = 0; repeat < repeats; repeat++)
+    {
+        descriptors.assign(numOfAtoms * numOfDescriptors, 0.0);
+        auto start = std::chrono::steady_clock::now();
+        for (int index = 0; index < numOfAtoms; index++)
+        {
+            Atom::evaluateSteinhardtParameters(index, neighbours[index].data(), neighbours[index].size(),
+                                               timestep.getX().data(), timestep.getY().data(), timestep.getZ().data(),
+                                               length, length, length,
+                                               box.getRMinStein(), box.getRMaxStein(),
+                                               box.getSteinhardtFunctionParameters(),
+                                               descriptors.data() + index * numOfDescriptors);
+        }
+        std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+        best = repeat == 0 ? duration.count() : std::min(best, duration.count());
+    }
+    return best;
+}
+
+int main(int argc, char *argv[])
+{
+    int cellsPerEdge{argc > 1 ? std::atoi(argv[1]) : 13};
+    int repeats{argc > 2 ? std::atoi(argv[2]) : 5};
+    const double latticeConstant{3.147};
+
+    // bcc lattice with small random displacements
+    std::mt19937 generator(42);
+    std::normal_distribution<double> noise(0.0, 0.05);
+    double length{cellsPerEdge * latticeConstant};
+    Box box({{0, {length, length, length}}});
+    box.addTimestep(0);
+    int atomId{1};
+    for (int i = 0; i < cellsPerEdge; i++)
+        for (int j = 0; j < cellsPerEdge; j++)
+            for (int k = 0; k < cellsPerEdge; k++)
+                for (double shift : {0.0, 0.5})
+                {
+                    box.addAtomToTimestep(0, atomId++,
+                                          (i + shift) * latticeConstant + noise(generator),
+                                          (j + shift) * latticeConstant + noise(generator),
+                                          (k + shift) * latticeConstant + noise(generator));
+                }
+
+    // neighbours of all atoms in Verlet lists and in short lists
+    Timestep &timestep{box.getTimesteps().at(0)};
+    int numOfAtoms{timestep.getNumOfAtoms()};
+    std::vector<std::vector<int>> verletLists, steinhardtLists;
+    for (double cutoff : {box.getRVerletListLimit(), box.getRSteinhardtListLimit()})
+    {
+        CellList cellList(timestep.getX(), timestep.getY(), timestep.getZ(), {length, length, length}, cutoff);
+        std::vector<std::vector<int>> &lists{cutoff == box.getRVerletListLimit() ? verletLists : steinhardtLists};
+        for (int index = 0; index < numOfAtoms; index++)
+        {
+            lists.push_back(cellList.getNeighbours(index));
+        }
+    }
+
+    std::vector<double> fullDescriptors, shortDescriptors;
+    double fullTime{steinhardtTime(box, verletLists, length, repeats, fullDescriptors)};
+    double shortTime{steinhardtTime(box, steinhardtLists, length, repeats, shortDescriptors)};
+
+    // time of each family of descriptors in Box
+    box.createVerletLists();
+    box.calculateDescriptors();
+
+    std::cout << "atoms: " << numOfAtoms << ", repeats: " << repeats << std::endl;
+    std::cout << "neighbours/atom: " << verletLists[0].size() << " (Verlet list), "
+              << steinhardtLists[0].size() << " (short list)" << std::endl;
+    std::cout << "Steinhardt parameters with Verlet lists: " << fullTime << " s" << std::endl;
+    std::cout << "Steinhardt parameters with short lists:  " << shortTime << " s (saved "
+              << fullTime - shortTime << " s, " << 100.0 * (fullTime - shortTime) / fullTime << " %)" << std::endl;
+    std::cout << "identical: " << (fullDescriptors == shortDescriptors ? "yes" : "NO") << std::endl;
+    std::cout << "Box: symmetry functions " << box.getSymmetryFunctionsTime() << " s, Steinhardt parameters "
+              << box.getSteinhardtTime() << " s" << std::endl;
+    return 0;
+}
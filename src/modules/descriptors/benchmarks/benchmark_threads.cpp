@@ -0,0 +1,94 @@
+/**
+ * Name:
+ *      benchmark_threads.cpp
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Strong-scaling benchmark of calculation of descriptors: the same
+ *      bcc lattice of molybdenum (default 2 * 13^3 = 4394 atoms, one
+ *      timestep) is calculated by 1, 2, 4, ... 'maxThreads' threads
+ *      (default 64). Descriptors are compared with the serial calculation,
+ *      they must be bit-identical.
+ *
+ *      Usage: ./benchmark_threads [cellsPerEdge] [maxThreads]
+ */
+
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <random>
+#include <thread>
+#include <vector>
+
+#include "../src/descriptors_box.h"
+
+Box bccLattice(int cellsPerEdge, double latticeConstant, int numOfThreads)
+{
+    std::mt19937 generator(42);
+    std::normal_distribution<double> noise(0.0, 0.05);
+    double length{cellsPerEdge * latticeConstant};
+    Box box({{0, {length, length, length}}});
+    box.setNumOfThreads(numOfThreads);
+    box.addTimestep(0);
+    int atomId{1};
+    for (int i = 0; i < cellsPerEdge; i++)
+        for (int j = 0; j < cellsPerEdge; j++)
+            for (int k = 0; k < cellsPerEdge; k++)
+                for (double shift : {0.0, 0.5})
+                {
+                    box.addAtomToTimestep(0, atomId++,
+                                          (i + shift) * latticeConstant + noise(generator),
+                                          (j + shift) * latticeConstant + noise(generator),
+                                          (k + shift) * latticeConstant + noise(generator));
+                }
+    return box;
+}
+
+int main(int argc, char *argv[])
+{
+    int cellsPerEdge{argc > 1 ? std::atoi(argv[1]) : 13};
+    int maxThreads{argc > 2 ? std::atoi(argv[2]) : 64};
+    const double latticeConstant{3.147};
+
+    std::cout << "cores: " << std::thread::hardware_concurrency() << std::endl;
+    std::cout << "threads\tatoms\ttime [s]\tatoms/s\tspeed-up\tefficiency\tidentical" << std::endl;
+
+    std::vector<std::vector<double>> serialDescriptors;
+    double serialTime{0.0};
+    for (int numOfThreads = 1; numOfThreads <= maxThreads; numOfThreads *= 2)
+    {
+        Box box = bccLattice(cellsPerEdge, latticeConstant, numOfThreads);
+        box.createVerletLists();
+        box.calculateDescriptors();
+        double time{box.getDescriptorsTime()};
+
+        // compare descriptors with the serial calculation
+        bool identical{true};
+        const std::vector<int> &atomsId{box.getTimestepAtomsId(0)};
+        for (size_t index = 0; index < atomsId.size(); index++)
+        {
+            const std::vector<double> &descriptors{box.getAtomDescriptors(0, atomsId[index])};
+            if (numOfThreads == 1)
+            {
+                serialDescriptors.push_back(descriptors);
+            }
+            else if (descriptors != serialDescriptors[index])
+            {
+                identical = false;
+            }
+        }
+        if (numOfThreads == 1)
+        {
+            serialTime = time;
+        }
+
+        std::cout << numOfThreads << '\t'
+                  << atomsId.size() << '\t'
+                  << time << '\t'
+                  << atomsId.size() / time << '\t'
+                  << serialTime / time << '\t'
+                  << serialTime / time / numOfThreads << '\t'
+                  << (identical ? "yes" : "NO") << std::endl;
+    }
+    return 0;
+}
@@ -12,9 +12,13 @@ module1 = Extension(
              'src/descriptors_module.cpp',
              'src/descriptors_utility.cpp',
              'src/descriptors_verlet_list.cpp',
+             'src/descriptors_cell_list.cpp',
              'src/descriptors_atom.cpp',
+             'src/descriptors_radial_kernel.cpp',
+             'src/descriptors_engine.cpp',
              'src/descriptors_box.cpp'],
-    extra_compile_args=['-std=c++17'],
+    extra_compile_args=['-std=c++17', '-pthread'],
+    extra_link_args=['-pthread'],
 )
 
 setup(name="descriptors",
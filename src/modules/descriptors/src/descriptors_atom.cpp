@@ -12,33 +12,17 @@ void Atom::calculateDescriptors(const double pbcX,
                                 const std::vector <std::vector<double>> &g2FunctionParameters,
                                 const std::vector<double> &g3FunctionParameters,
                                 const std::vector<int> &steinhardtFunctionParameters) {
-    auto start = std::chrono::steady_clock::now();
-    evaluateSymmetryFunctions(pbcX,
-                              pbcY,
-                              pbcZ,
-                              atomsInVerletListIds,
-                              atomsInVerletList,
-                              rMinSym, rMaxSym,
-                              g2FunctionParameters,
-                              g3FunctionParameters);
-    auto end = std::chrono::steady_clock::now();
-    std::chrono::duration<double> duration = end - start;
-//    std::cout << "\t\t" << duration.count() << "s - Symmetry ..." << std::endl;
-
-    start = std::chrono::steady_clock::now();
-    evaluateSteinhardtParameters(pbcX,
-                                 pbcY,
-                                 pbcZ,
-                                 atomsInVerletListIds,
-                                 atomsInVerletList,
-                                 rMinStein,
-                                 rMaxStein,
-                                 steinhardtFunctionParameters);
-
-    end = std::chrono::steady_clock::now();
-    duration = end - start;
-//    std::cout << "\t\t" << duration.count() << "s - Steinhardt ..." << std::endl
-//              << std::endl;
+    std::vector<double> x, y, z;
+    std::vector<int> neighbours;
+    gatherVerletList(atomsInVerletListIds, atomsInVerletList, x, y, z, neighbours);
+    calculateDescriptors(0, neighbours.data(), neighbours.size(), x.data(), y.data(), z.data(),
+                         pbcX, pbcY, pbcZ,
+                         rMinSym, rMaxSym,
+                         rMinStein, rMaxStein,
+                         g2FunctionParameters,
+                         g3FunctionParameters,
+                         steinhardtFunctionParameters,
+                         m_descriptors.data());
 }
 
 void Atom::evaluateSymmetryFunctions(const double pbcX,
@@ -50,22 +34,115 @@ void Atom::evaluateSymmetryFunctions(const double pbcX,
                                      const double rMaxSym,
                                      const std::vector <std::vector<double>> &g2FunctionParameters,
                                      const std::vector<double> &g3FunctionParameters) {
-    double myX{atomsInVerletList.at(m_id).getX()};
-    double myY{atomsInVerletList.at(m_id).getY()};
-    double myZ{atomsInVerletList.at(m_id).getZ()};
+    std::vector<double> x, y, z;
+    std::vector<int> neighbours;
+    gatherVerletList(atomsInVerletListIds, atomsInVerletList, x, y, z, neighbours);
+    evaluateSymmetryFunctions(0, neighbours.data(), neighbours.size(), x.data(), y.data(), z.data(),
+                              pbcX, pbcY, pbcZ,
+                              rMinSym, rMaxSym,
+                              g2FunctionParameters,
+                              g3FunctionParameters,
+                              m_descriptors.data());
+}
 
+void Atom::evaluateSteinhardtParameters(const double pbcX,
+                                        const double pbcY,
+                                        const double pbcZ,
+                                        const std::vector<int> &atomsInVerletListIds,
+                                        std::map<int, Atom> &atomsInVerletList,
+                                        const double rMinStein,
+                                        const double rMaxStein,
+                                        const std::vector<int> &steinhardtFunctionParameters) {
+    std::vector<double> x, y, z;
+    std::vector<int> neighbours;
+    gatherVerletList(atomsInVerletListIds, atomsInVerletList, x, y, z, neighbours);
+    evaluateSteinhardtParameters(0, neighbours.data(), neighbours.size(), x.data(), y.data(), z.data(),
+                                 pbcX, pbcY, pbcZ,
+                                 rMinStein, rMaxStein,
+                                 steinhardtFunctionParameters,
+                                 m_descriptors.data());
+}
+
+void Atom::gatherVerletList(const std::vector<int> &atomsInVerletListIds,
+                            std::map<int, Atom> &atomsInVerletList,
+                            std::vector<double> &x,
+                            std::vector<double> &y,
+                            std::vector<double> &z,
+                            std::vector<int> &neighbours) {
+    // this atom has index 0, atoms in Verlet list (except myself) have indices 1, 2, ...
+    x.push_back(atomsInVerletList.at(m_id).getX());
+    y.push_back(atomsInVerletList.at(m_id).getY());
+    z.push_back(atomsInVerletList.at(m_id).getZ());
     for (int id : atomsInVerletListIds) {
         if (m_id != id) { // skip myself
+            neighbours.push_back(x.size());
+            x.push_back(atomsInVerletList.at(id).getX());
+            y.push_back(atomsInVerletList.at(id).getY());
+            z.push_back(atomsInVerletList.at(id).getZ());
+        }
+    }
+}
 
-            // coordinates of other atom
-            double otherX{atomsInVerletList.at(id).getX()};
-            double otherY{atomsInVerletList.at(id).getY()};
-            double otherZ{atomsInVerletList.at(id).getZ()};
+void Atom::calculateDescriptors(const int index,
+                                const int *neighbours,
+                                const int numOfNeighbours,
+                                const double *x,
+                                const double *y,
+                                const double *z,
+                                const double pbcX,
+                                const double pbcY,
+                                const double pbcZ,
+                                const double rMinSym,
+                                const double rMaxSym,
+                                const double rMinStein,
+                                const double rMaxStein,
+                                const std::vector <std::vector<double>> &g2FunctionParameters,
+                                const std::vector<double> &g3FunctionParameters,
+                                const std::vector<int> &steinhardtFunctionParameters,
+                                double *descriptors) {
+    evaluateSymmetryFunctions(index, neighbours, numOfNeighbours, x, y, z,
+                              pbcX, pbcY, pbcZ,
+                              rMinSym, rMaxSym,
+                              g2FunctionParameters,
+                              g3FunctionParameters,
+                              descriptors);
+    evaluateSteinhardtParameters(index, neighbours, numOfNeighbours, x, y, z,
+                                 pbcX, pbcY, pbcZ,
+                                 rMinStein, rMaxStein,
+                                 steinhardtFunctionParameters,
+                                 descriptors);
+}
+
+void Atom::evaluateSymmetryFunctions(const int index,
+                                     const int *neighbours,
+                                     const int numOfNeighbours,
+                                     const double *x,
+                                     const double *y,
+                                     const double *z,
+                                     const double pbcX,
+                                     const double pbcY,
+                                     const double pbcZ,
+                                     const double rMinSym,
+                                     const double rMaxSym,
+                                     const std::vector <std::vector<double>> &g2FunctionParameters,
+                                     const std::vector<double> &g3FunctionParameters,
+                                     double *descriptors) {
+    double myX{x[index]};
+    double myY{y[index]};
+    double myZ{z[index]};
+
+    // distances of neighbours inside the cutoff are evaluated in blocks by RadialKernel
+    alignas(64) double distances[RadialKernel::blockSize];
+    int numOfDistances{0};
+
+    for (int neighbour = 0; neighbour < numOfNeighbours; neighbour++) {
+        int other{neighbours[neighbour]};
+        if (other != index) { // skip myself
 
             // components of the vector r_ij
-            double x_ij{otherX - myX};
-            double y_ij{otherY - myY};
-            double z_ij{otherZ - myZ};
+            double x_ij{x[other] - myX};
+            double y_ij{y[other] - myY};
+            double z_ij{z[other] - myZ};
 
             // correction of vector r_ij for PBC (and minimum image convention)
             x_ij -= pbcX * round(x_ij / pbcX);
@@ -75,57 +152,150 @@ void Atom::evaluateSymmetryFunctions(const double pbcX,
             // calculate the correct length of vector r_ij
             double r_ij{getSphericalR(x_ij, y_ij, z_ij)};
 
-            // calculate value of fcFunction
-            double fcValue{fcFunction(r_ij, rMinSym, rMaxSym)};
+            // atoms beyond the cutoff do not contribute (fc = 0)
+            if (r_ij <= rMaxSym) {
+                distances[numOfDistances] = r_ij;
+                numOfDistances++;
+                if (numOfDistances == RadialKernel::blockSize) {
+                    RadialKernel::evaluate(distances, numOfDistances, rMinSym, rMaxSym,
+                                           g2FunctionParameters, g3FunctionParameters, descriptors);
+                    numOfDistances = 0;
+                }
+            }
+        }
+    }
+    if (numOfDistances > 0) {
+        RadialKernel::evaluate(distances, numOfDistances, rMinSym, rMaxSym,
+                               g2FunctionParameters, g3FunctionParameters, descriptors);
+    }
+}
 
-            // add correct contributions to correct descriptors
-            int index{0};
-            for (const std::vector<double> &params : g2FunctionParameters) {
-                m_descriptors.at(index) += fcValue * exp(-params.at(0) * pow(r_ij - params.at(1), 2));
-                index++;
+void Atom::evaluatePairTerms(const int index,
+                             const int *neighbours,
+                             const int numOfNeighbours,
+                             const double *x,
+                             const double *y,
+                             const double *z,
+                             const double pbcX,
+                             const double pbcY,
+                             const double pbcZ,
+                             const double rMinSym,
+                             const double rMaxSym,
+                             const std::vector <std::vector<double>> &g2FunctionParameters,
+                             const std::vector<double> &g3FunctionParameters,
+                             double *pairDistances,
+                             double *pairTerms) {
+    int numOfFunctions{static_cast<int>(g2FunctionParameters.size() + g3FunctionParameters.size())};
+    double myX{x[index]};
+    double myY{y[index]};
+    double myZ{z[index]};
+
+    // terms of a block of distances are copied to pairs they belong to
+    alignas(64) double distances[RadialKernel::blockSize];
+    alignas(64) double terms[RadialKernel::maxNumOfFunctions * RadialKernel::blockSize];
+    int blockPairs[RadialKernel::blockSize];
+    int numOfDistances{0};
+
+    for (int neighbour = 0; neighbour <= numOfNeighbours; neighbour++) {
+        if (neighbour < numOfNeighbours) {
+            int other{neighbours[neighbour]};
+
+            // the same operations as in evaluateSymmetryFunctions (the distance is the same in both directions,
+            // since the minimum image of -r_ij is exactly -(minimum image of r_ij))
+            double x_ij{x[other] - myX};
+            double y_ij{y[other] - myY};
+            double z_ij{z[other] - myZ};
+            x_ij -= pbcX * round(x_ij / pbcX);
+            y_ij -= pbcY * round(y_ij / pbcY);
+            z_ij -= pbcZ * round(z_ij / pbcZ);
+            double r_ij{getSphericalR(x_ij, y_ij, z_ij)};
+
+            pairDistances[neighbour] = r_ij;
+            if (r_ij > rMaxSym) {
+                continue;
+            }
+            distances[numOfDistances] = r_ij;
+            blockPairs[numOfDistances] = neighbour;
+            numOfDistances++;
+            if (numOfDistances < RadialKernel::blockSize) {
+                continue;
             }
-            for (const double &param : g3FunctionParameters) {
-                m_descriptors.at(index) += fcValue * cos(param * r_ij);
-                index++;
+        }
+        if (numOfDistances == 0) {
+            continue;
+        }
+
+        // the block is full or all neighbours were gathered
+        RadialKernel::evaluateTerms(distances, numOfDistances, rMinSym, rMaxSym,
+                                    g2FunctionParameters, g3FunctionParameters, terms);
+        for (int i = 0; i < numOfDistances; i++) {
+            for (int function = 0; function < numOfFunctions; function++) {
+                pairTerms[blockPairs[i] * numOfFunctions + function] = terms[function * RadialKernel::blockSize + i];
             }
         }
+        numOfDistances = 0;
     }
 }
 
-void Atom::evaluateSteinhardtParameters(const double pbcX,
+void Atom::addPairTerms(const int *pairs,
+                        const int numOfPairs,
+                        const double *pairDistances,
+                        const double *pairTerms,
+                        const double rMaxSym,
+                        const int numOfFunctions,
+                        double *descriptors) {
+    // terms are gathered into blocks of the same size as in evaluateSymmetryFunctions
+    alignas(64) double terms[RadialKernel::maxNumOfFunctions * RadialKernel::blockSize];
+    int numOfDistances{0};
+
+    for (int i = 0; i < numOfPairs; i++) {
+        int pair{pairs[i]};
+        if (pairDistances[pair] <= rMaxSym) {
+            for (int function = 0; function < numOfFunctions; function++) {
+                terms[function * RadialKernel::blockSize + numOfDistances] = pairTerms[pair * numOfFunctions + function];
+            }
+            numOfDistances++;
+            if (numOfDistances == RadialKernel::blockSize) {
+                RadialKernel::addTerms(terms, numOfDistances, numOfFunctions, descriptors);
+                numOfDistances = 0;
+            }
+        }
+    }
+    if (numOfDistances > 0) {
+        RadialKernel::addTerms(terms, numOfDistances, numOfFunctions, descriptors);
+    }
+}
+
+void Atom::evaluateSteinhardtParameters(const int index,
+                                        const int *neighbours,
+                                        const int numOfNeighbours,
+                                        const double *x,
+                                        const double *y,
+                                        const double *z,
+                                        const double pbcX,
                                         const double pbcY,
                                         const double pbcZ,
-                                        const std::vector<int> &atomsInVerletListIds,
-                                        std::map<int, Atom> &atomsInVerletList,
                                         const double rMinStein,
                                         const double rMaxStein,
-                                        const std::vector<int> &steinhardtFunctionParameters) {
-    double myX{atomsInVerletList.at(m_id).getX()};
-    double myY{atomsInVerletList.at(m_id).getY()};
-    double myZ{atomsInVerletList.at(m_id).getZ()};
-
-    std::array<double, 2 * 6 + 1> numerator6{0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0};
-    std::array<double, 2 * 6 + 1> denominator6{0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0};
-    std::array<double, 2 * 7 + 1> numerator7{0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0};
-    std::array<double, 2 * 7 + 1> denominator7{0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
-                                               0.0};
-    std::array<double, 2 * 8 + 1> numerator8{0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
-                                             0.0, 0.0};
-    std::array<double, 2 * 8 + 1> denominator8{0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
-                                               0.0, 0.0, 0.0};
-
-    for (int id : atomsInVerletListIds) {
-        if (m_id != id) { // skip myself
+                                        const std::vector<int> &steinhardtFunctionParameters,
+                                        double *descriptors) {
+    double myX{x[index]};
+    double myY{y[index]};
+    double myZ{z[index]};
+
+    // sums of fc * Y_lm over neighbours (index l * l + l + m), the sum of fc is the same for all m
+    std::array<double, (maxL + 1) * (maxL + 1)> numerator{};
+    std::array<double, (maxL + 1) * (maxL + 1)> ylm;
+    double denominator{0.0};
 
-            // coordinates of other atom
-            double otherX{atomsInVerletList.at(id).getX()};
-            double otherY{atomsInVerletList.at(id).getY()};
-            double otherZ{atomsInVerletList.at(id).getZ()};
+    for (int neighbour = 0; neighbour < numOfNeighbours; neighbour++) {
+        int other{neighbours[neighbour]};
+        if (other != index) { // skip myself
 
             // components of the vector r_ij
-            double x_ij{otherX - myX};
-            double y_ij{otherY - myY};
-            double z_ij{otherZ - myZ};
+            double x_ij{x[other] - myX};
+            double y_ij{y[other] - myY};
+            double z_ij{z[other] - myZ};
 
             // correction of vector r_ij for PBC (and minimum image convention)
             x_ij -= pbcX * round(x_ij / pbcX);
@@ -133,62 +303,35 @@ void Atom::evaluateSteinhardtParameters(const double pbcX,
             z_ij -= pbcZ * round(z_ij / pbcZ);
 
             // calculate the correct length of vector r_ij
-            double r_ij{sqrt(pow(x_ij, 2) + pow(y_ij, 2) + pow(z_ij, 2))};
-            // double r_ij{getSphericalR(x_ij, y_ij, z_ij)};
+            double r_ij{sqrt(x_ij * x_ij + y_ij * y_ij + z_ij * z_ij)};
 
             // calculate value of fcFunction
             double fcValue{fcFunction(r_ij, rMinStein, rMaxStein)};
+            if (fcValue == 0.0) {
+                continue;
+            }
 
-            int index6{0};
-            int index7{0};
-            int index8{0};
-
-            for (int m = -8; m <= 8; m++) {
-                if (m >= -6 && m <= 6) {
-                    numerator6[index6] += fcValue * ylmFunction(m, 6, x_ij, y_ij, z_ij);
-                    denominator6[index6] += fcValue;
-                    index6++;
-                }
-                if (m >= -7 && m <= 7) {
-                    numerator7[index7] += fcValue * ylmFunction(m, 7, x_ij, y_ij, z_ij);
-                    denominator7[index7] += fcValue;
-                    index7++;
+            // all Y_lm of this bond at once
+            ylmFunctions(x_ij, y_ij, z_ij, ylm.data());
+            for (int l : {6, 7, 8}) {
+                for (int lm = l * l; lm <= l * l + 2 * l; lm++) {
+                    numerator[lm] += fcValue * ylm[lm];
                 }
-                numerator8[index8] += fcValue * ylmFunction(m, 8, x_ij, y_ij, z_ij);
-                denominator8[index8] += fcValue;
-                index8++;
             }
+            denominator += fcValue;
         }
     }
 
-    // calculate steinhardt parameter for l = 6
-    double result;
-    int numOfElements;
-
-    result = 0;
-    numOfElements = numerator6.size();
-    for (int index{0}; index < numOfElements; index++) {
-        result += pow(fabs(numerator6.at(index) / denominator6.at(index)), 2);
-    }
-    m_descriptors.at(11) = sqrt(result * 4 * M_PI / (2 * 6 + 1));
-
-    // calculate steinhardt parameter for l = 7
-    result = 0;
-    numOfElements = numerator7.size();
-    for (int index{0}; index < numOfElements; index++) {
-        result += pow(fabs(numerator7.at(index) / denominator7.at(index)), 2);
-    }
-    m_descriptors.at(12) = sqrt(result * 4 * M_PI / (2 * 7 + 1));
-
-    // calculate steinhardt parameter for l = 8
-    result = 0;
-    numOfElements = numerator8.size();
-    for (int index{0}; index < numOfElements; index++) {
-        result += pow(fabs(numerator8.at(index) / denominator8.at(index)), 2);
+    // calculate steinhardt parameters for l = 6, 7, 8
+    int descriptor{11};
+    for (int l : {6, 7, 8}) {
+        double result{0.0};
+        for (int lm = l * l; lm <= l * l + 2 * l; lm++) {
+            result += pow(numerator[lm] / denominator, 2);
+        }
+        descriptors[descriptor] = sqrt(result * 4 * M_PI / (2 * l + 1));
+        descriptor++;
     }
-    m_descriptors.at(13) = sqrt(result * 4 * M_PI / (2 * 8 + 1));
-
-    // print(m_descriptors);
 }
 
 //double Atom::symmetryFunctionG2(const double eta,
@@ -368,6 +511,79 @@ double Atom::ylmFunction(const int m,
     return std::sph_legendre(l, m, theta);
 }
 
+namespace {
+// coefficients of recurrences of normalized associated Legendre functions for l, m <= Atom::maxL
+struct LegendreCoefficients {
+    std::array<double, Atom::maxL + 1> diagonal;   // P_m^m = diagonal[m] * sin(theta) * P_(m-1)^(m-1)
+    std::array<double, Atom::maxL + 1> subdiagonal; // P_(m+1)^m = subdiagonal[m] * cos(theta) * P_m^m
+    std::array<double, (Atom::maxL + 1) * (Atom::maxL + 1)> a; // P_l^m = a * (cos(theta) * P_(l-1)^m - b * P_(l-2)^m)
+    std::array<double, (Atom::maxL + 1) * (Atom::maxL + 1)> b;
+
+    LegendreCoefficients() : diagonal{}, subdiagonal{}, a{}, b{} {
+        diagonal[0] = sqrt(1.0 / (4 * M_PI));
+        for (int m = 0; m <= Atom::maxL; m++) {
+            if (m > 0) {
+                diagonal[m] = sqrt((2.0 * m + 1) / (2.0 * m));
+            }
+            subdiagonal[m] = sqrt(2.0 * m + 3);
+            for (int l = m + 2; l <= Atom::maxL; l++) {
+                a[l * l + m] = sqrt((4.0 * l * l - 1) / (l * l - m * m));
+                b[l * l + m] = sqrt(((l - 1.0) * (l - 1) - m * m) / (4.0 * (l - 1) * (l - 1) - 1));
+            }
+        }
+    }
+};
+
+const LegendreCoefficients legendreCoefficients;
+}
+
+void Atom::ylmFunctions(const double dx,
+                        const double dy,
+                        const double dz,
+                        double *ylm) {
+    const LegendreCoefficients &coefficients{legendreCoefficients};
+    double r{sqrt(dx * dx + dy * dy + dz * dz)};
+    double cosTheta{dz / r};
+
+    // (dx + i dy)^m / r^m = sin(theta)^m * (cos(m * phi) + i sin(m * phi)),
+    // so Legendre functions are computed without the factor sin(theta)^m
+    double cosM{1.0};
+    double sinM{0.0};
+    double unitX{dx / r};
+    double unitY{dy / r};
+
+    double diagonal{coefficients.diagonal[0]};
+    for (int m = 0; m <= maxL; m++) {
+        if (m > 0) {
+            double nextCosM{cosM * unitX - sinM * unitY};
+            sinM = cosM * unitY + sinM * unitX;
+            cosM = nextCosM;
+            diagonal *= coefficients.diagonal[m];
+        }
+
+        // real form: sqrt(2) * P_l^m * cos(m * phi) for m > 0, sqrt(2) * P_l^m * sin(m * phi) for m < 0
+        double cosFactor{m > 0 ? M_SQRT2 * cosM : 1.0};
+        double sinFactor{M_SQRT2 * sinM};
+
+        double previous{0.0};
+        double current{diagonal};
+        for (int l = m; l <= maxL; l++) {
+            if (l == m + 1) {
+                previous = current;
+                current = coefficients.subdiagonal[m] * cosTheta * current;
+            } else if (l > m + 1) {
+                double next{coefficients.a[l * l + m] * (cosTheta * current - coefficients.b[l * l + m] * previous)};
+                previous = current;
+                current = next;
+            }
+            ylm[l * l + l + m] = cosFactor * current;
+            if (m > 0) {
+                ylm[l * l + l - m] = sinFactor * current;
+            }
+        }
+    }
+}
+
 double Atom::getSphericalR(const double x,
                            const double y,
                            const double z) {
@@ -20,19 +20,30 @@
  *      * 3 Steinhardt parameters with l = 6, 7, 8
  *
  *      Note: periodic boundary conditions (PBC) are implemented as well.
+ *
+ *      Descriptors are calculated by static methods that take coordinates
+ *      of atoms as contiguous arrays and neighbours as indices into them
+ *      (Box stores atoms of each Timestep this way). Methods of Atom object
+ *      that take a map of atoms gather the coordinates into arrays first.
  */
 
 #ifndef DESCRIPTORS_ATOM_H
 #define DESCRIPTORS_ATOM_H
 
+#include <array>
 #include <vector>
 #include <map>
 #include <cmath>
 #include <chrono>
 #include <iostream>
 
+#include "descriptors_radial_kernel.h"
+
 class Atom
 {
+public:
+    static constexpr int maxL{8}; // the largest l of spherical harmonics in Steinhardt parameters
+
 private:
     int m_id;                          // ID of atom
     double m_x;                        // coordinate x
@@ -40,6 +51,14 @@ private:
     double m_z;                        // coordinate z
     std::vector<double> m_descriptors; // descriptors of atom
 
+    // gathers coordinates of this atom (index 0) and of atoms in Verlet list into arrays
+    void gatherVerletList(const std::vector<int> &atomsInVerletListIds,
+                          std::map<int, Atom> &atomsInVerletList,
+                          std::vector<double> &x,
+                          std::vector<double> &y,
+                          std::vector<double> &z,
+                          std::vector<int> &neighbours);
+
 public:
     // constructor
     Atom(int id, double x, double y, double z)
@@ -88,6 +107,81 @@ public:
                                       const double rMinStein,
                                       const double rMaxStein,
                                       const std::vector<int> &steinhardtFunctionParameters);
+
+    // descriptors of atom 'index' calculated from arrays of coordinates, neighbours are indices into
+    // the arrays, symmetry functions are added to 'descriptors', Steinhardt parameters are set
+    static void calculateDescriptors(const int index,
+                                     const int *neighbours,
+                                     const int numOfNeighbours,
+                                     const double *x,
+                                     const double *y,
+                                     const double *z,
+                                     const double pbcX,
+                                     const double pbcY,
+                                     const double pbcZ,
+                                     const double rMinSym,
+                                     const double rMaxSym,
+                                     const double rMinStein,
+                                     const double rMaxStein,
+                                     const std::vector<std::vector<double>> &g2FunctionParameters,
+                                     const std::vector<double> &g3FunctionParameters,
+                                     const std::vector<int> &steinhardtFunctionParameters,
+                                     double *descriptors);
+    static void evaluateSymmetryFunctions(const int index,
+                                          const int *neighbours,
+                                          const int numOfNeighbours,
+                                          const double *x,
+                                          const double *y,
+                                          const double *z,
+                                          const double pbcX,
+                                          const double pbcY,
+                                          const double pbcZ,
+                                          const double rMinSym,
+                                          const double rMaxSym,
+                                          const std::vector<std::vector<double>> &g2FunctionParameters,
+                                          const std::vector<double> &g3FunctionParameters,
+                                          double *descriptors);
+    static void evaluateSteinhardtParameters(const int index,
+                                             const int *neighbours,
+                                             const int numOfNeighbours,
+                                             const double *x,
+                                             const double *y,
+                                             const double *z,
+                                             const double pbcX,
+                                             const double pbcY,
+                                             const double pbcZ,
+                                             const double rMinStein,
+                                             const double rMaxStein,
+                                             const std::vector<int> &steinhardtFunctionParameters,
+                                             double *descriptors);
+
+    // symmetry functions from pairs of atoms (half lists): evaluatePairTerms stores distance of atom 'index'
+    // to each neighbour in 'pairDistances' and terms of symmetry functions of neighbours inside the cutoff
+    // in 'pairTerms' [numOfNeighbours * numOfFunctions], addPairTerms adds stored terms of pairs of atom
+    // in the same order as evaluateSymmetryFunctions (both atoms of a pair use the same terms)
+    static void evaluatePairTerms(const int index,
+                                  const int *neighbours,
+                                  const int numOfNeighbours,
+                                  const double *x,
+                                  const double *y,
+                                  const double *z,
+                                  const double pbcX,
+                                  const double pbcY,
+                                  const double pbcZ,
+                                  const double rMinSym,
+                                  const double rMaxSym,
+                                  const std::vector<std::vector<double>> &g2FunctionParameters,
+                                  const std::vector<double> &g3FunctionParameters,
+                                  double *pairDistances,
+                                  double *pairTerms);
+    static void addPairTerms(const int *pairs,
+                             const int numOfPairs,
+                             const double *pairDistances,
+                             const double *pairTerms,
+                             const double rMaxSym,
+                             const int numOfFunctions,
+                             double *descriptors);
+
 //    double symmetryFunctionG2(const double eta,
 //                              const double rs,
 //                              const double pbcX,
@@ -107,9 +201,9 @@ public:
 //                              const double pbcZ,
 //                              const std::vector<int> &atomsInVerletListIds,
 //                              std::map<int, Atom> &atomsInVerletList);
-    double fcFunction(const double r,
-                      const double rMin,
-                      const double rMax);
+    static double fcFunction(const double r,
+                             const double rMin,
+                             const double rMax);
     double qlmFunction(const int m,
                        const int l,
                        const double pbcX,
@@ -119,20 +213,33 @@ public:
                        std::map<int, Atom> &atomsInVerletList,
                        const double rMinStein,
                        const double rMaxStein);
-    double ylmFunction(const int m,
-                       const int l,
-                       const double dx,
-                       const double dy,
-                       const double dz);
-    double getSphericalR(const double x,
-                         const double y,
-                         const double z);
-    double getSphericalPhi(const double x,
-                           const double y,
-                           const double z);
-    double getSphericalTheta(const double x,
-                             const double y,
-                             const double z);
+    static double ylmFunction(const int m,
+                              const int l,
+                              const double dx,
+                              const double dy,
+                              const double dz);
+    /**
+     * Real spherical harmonics Y_lm of direction (dx, dy, dz) for all l <= maxL (same values as ylmFunction)
+     * in one pass: normalized associated Legendre functions are obtained by recurrences in cos(theta) and
+     * cos(m * phi), sin(m * phi) by complex powers of (dx + i dy) / r, so no inverse trigonometric
+     * function is evaluated
+     *
+     * @param dx, dy, dz    vector from atom to its neighbour (non-zero)
+     * @param ylm           output, Y_lm is stored at index l * l + l + m [(maxL + 1)^2]
+     */
+    static void ylmFunctions(const double dx,
+                             const double dy,
+                             const double dz,
+                             double *ylm);
+    static double getSphericalR(const double x,
+                                const double y,
+                                const double z);
+    static double getSphericalPhi(const double x,
+                                  const double y,
+                                  const double z);
+    static double getSphericalTheta(const double x,
+                                    const double y,
+                                    const double z);
 
     void print(std::vector<double> const &input);
 };
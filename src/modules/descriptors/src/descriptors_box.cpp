@@ -1,10 +1,33 @@
 #include "descriptors_box.h"
 
-void Box::addTimestep(int timestepId)
+void Box::addTimestep(int timestepId, int numOfAtoms)
 {
     m_numOfTimesteps++;
     m_timestepsId.push_back(timestepId);
-    m_timesteps.insert(std::make_pair(timestepId, Timestep{timestepId}));
+    m_timesteps.insert(std::make_pair(timestepId, Timestep{timestepId})).first->second.reserve(numOfAtoms);
+}
+
+void Box::addTimestep(Timestep &&timestep, const std::vector<double> &pbc)
+{
+    int timestepId{timestep.getId()};
+    m_numOfTimesteps++;
+    m_timestepsId.push_back(timestepId);
+    m_pbc[timestepId] = pbc;
+    m_timesteps.insert(std::make_pair(timestepId, std::move(timestep)));
+}
+
+Timestep Box::removeTimestep(int timestepId)
+{
+    Timestep timestep{std::move(m_timesteps.at(timestepId))};
+    m_timesteps.erase(timestepId);
+    m_pbc.erase(timestepId);
+    m_timestepsId.erase(std::find(m_timestepsId.begin(), m_timestepsId.end(), timestepId));
+    m_numOfTimesteps--;
+    if (timestepId == m_referenceTimestepId)
+    {
+        m_referenceTimestepId = -1;
+    }
+    return timestep;
 }
 
 void Box::addAtomToTimestep(int timestepId, int atomId, double x, double y, double z)
@@ -19,7 +42,38 @@ int Box::getNumOfAtoms()
 
 int Box::getNumOfAtomsInVerletList(int atomId)
 {
-    return m_verletLists.at(atomId).getNumOfAtoms();
+    int index{m_timesteps.at(m_referenceTimestepId).getAtomIndex(atomId)};
+    if (index < 0)
+    {
+        throw std::out_of_range("no Verlet list of atom with ID " + std::to_string(atomId));
+    }
+    return m_verletListStart[index + 1] - m_verletListStart[index];
+}
+
+int Box::getNumOfAtomsInSteinhardtList(int atomId)
+{
+    int index{m_timesteps.at(m_referenceTimestepId).getAtomIndex(atomId)};
+    if (index < 0)
+    {
+        throw std::out_of_range("no Verlet list of atom with ID " + std::to_string(atomId));
+    }
+    return m_steinhardtListStart[index + 1] - m_steinhardtListStart[index];
+}
+
+VerletList Box::getVerletList(int atomId)
+{
+    Timestep &reference{m_timesteps.at(m_referenceTimestepId)};
+    int index{reference.getAtomIndex(atomId)};
+    if (index < 0)
+    {
+        throw std::out_of_range("no Verlet list of atom with ID " + std::to_string(atomId));
+    }
+    std::vector<int> idsInVerletList;
+    for (int neighbour = m_verletListStart[index]; neighbour < m_verletListStart[index + 1]; neighbour++)
+    {
+        idsInVerletList.push_back(reference.getAtomsId()[m_verletListAtoms[neighbour]]);
+    }
+    return VerletList(atomId, idsInVerletList);
 }
 
 const std::vector<int> &Box::getTimestepAtomsId(int timestepId)
@@ -27,9 +81,19 @@ const std::vector<int> &Box::getTimestepAtomsId(int timestepId)
     return m_timesteps.at(timestepId).getAtomsId();
 }
 
-const std::vector<double> &Box::getAtomDescriptors(int timestepId, int atomId)
+std::vector<double> Box::getAtomDescriptors(int timestepId, int atomId)
+{
+    return m_timesteps.at(timestepId).getAtomDescriptors(atomId);
+}
+
+const std::vector<double> &Box::getTimestepDescriptors(int timestepId)
+{
+    return m_timesteps.at(timestepId).getDescriptors();
+}
+
+int Box::getNumOfDescriptors()
 {
-    return m_timesteps.at(timestepId).getAtom(atomId).getDescriptors();
+    return m_g2FunctionParameters.size() + m_g3FunctionParameters.size() + m_steinhardtFunctionParameters.size();
 }
 
 const std::vector<double> &Box::getPbcOfTimestep(int timestepId)
@@ -39,91 +103,400 @@ const std::vector<double> &Box::getPbcOfTimestep(int timestepId)
 
 void Box::createVerletLists()
 {
-    // TODO: for now, Verlet lists are calculated ONLY on the beginning of simulation
-    int timestepId{m_timestepsId[0]};
-    std::vector<double> pbc{getPbcOfTimestep(timestepId)};
-    std::vector<int> atomsId{m_timesteps.at(timestepId).getAtomsId()};
-    std::map<int, Atom> atoms{m_timesteps.at(timestepId).getAtoms()};
+    createVerletLists(m_timestepsId[0]);
+}
+
+void Box::createVerletLists(int timestepId)
+{
+    auto start = std::chrono::steady_clock::now();
+
+    const std::vector<double> &pbc{getPbcOfTimestep(timestepId)};
+    Timestep &timestep{m_timesteps.at(timestepId)};
+
+    // neighbours are searched in cells (or by comparing all pairs of atoms in small box)
+    CellList cellList(timestep.getX(), timestep.getY(), timestep.getZ(), pbc, m_rVerletListLimit);
+
+    // Verlet lists of all atoms in this timestep are stored one after another,
+    // short lists of Steinhardt parameters contain atoms of Verlet lists that are close enough
+    int numOfAtoms{timestep.getNumOfAtoms()};
+    const std::vector<double> &x{timestep.getX()}, &y{timestep.getY()}, &z{timestep.getZ()};
+    double rSteinhardtListLimit2{m_rSteinhardtListLimit * m_rSteinhardtListLimit};
+    m_verletListStart.assign(1, 0);
+    m_verletListStart.reserve(numOfAtoms + 1);
+    m_verletListAtoms.clear();
+    m_steinhardtListStart.assign(1, 0);
+    m_steinhardtListStart.reserve(numOfAtoms + 1);
+    m_steinhardtListAtoms.clear();
+    for (int index = 0; index < numOfAtoms; index++)
+    {
+        std::vector<int> neighbours{cellList.getNeighbours(index)};
+        m_verletListAtoms.insert(m_verletListAtoms.end(), neighbours.begin(), neighbours.end());
+        m_verletListStart.push_back(m_verletListAtoms.size());
+
+        for (int neighbour : neighbours)
+        {
+            double dx{x[neighbour] - x[index]};
+            double dy{y[neighbour] - y[index]};
+            double dz{z[neighbour] - z[index]};
+            dx -= pbc[0] * round(dx / pbc[0]);
+            dy -= pbc[1] * round(dy / pbc[1]);
+            dz -= pbc[2] * round(dz / pbc[2]);
+            if (dx * dx + dy * dy + dz * dz <= rSteinhardtListLimit2)
+            {
+                m_steinhardtListAtoms.push_back(neighbour);
+            }
+        }
+        m_steinhardtListStart.push_back(m_steinhardtListAtoms.size());
+    }
+
+    // pairs of half lists are numbered again when they are used
+    m_pairStart.clear();
+
+    // displacements are measured from this timestep
+    m_referenceTimestepId = timestepId;
+
+    m_numOfVerletListBuilds++;
+    std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    m_verletListTime += duration.count();
+}
+
+void Box::createHalfLists()
+{
+    auto start = std::chrono::steady_clock::now();
 
-    // go through all atoms in the first timestep
-    for (int atomId : atomsId)
+    // atoms j > i are at the end of sorted Verlet list of atom i
+    int numOfAtoms{static_cast<int>(m_verletListStart.size()) - 1};
+    const int *verletListAtoms{m_verletListAtoms.data()};
+    m_halfListFirst.resize(numOfAtoms);
+    m_pairStart.assign(1, 0);
+    m_pairStart.reserve(numOfAtoms + 1);
+    for (int index = 0; index < numOfAtoms; index++)
     {
-        std::vector<int> idsInVerletList;
-        double myX{atoms.at(atomId).getX()};
-        double myY{atoms.at(atomId).getY()};
-        double myZ{atoms.at(atomId).getZ()};
+        m_halfListFirst[index] = std::upper_bound(verletListAtoms + m_verletListStart[index],
+                                                  verletListAtoms + m_verletListStart[index + 1],
+                                                  index) - verletListAtoms;
+        m_pairStart.push_back(m_pairStart.back() + m_verletListStart[index + 1] - m_halfListFirst[index]);
+    }
 
-        // go through all atoms (except this atom) in the first timestep again
-        // add atom to verlet list when condition is true ->
-        for (int innerAtomId : atomsId)
+    // pair of atoms i < j is owned by atom i and found in its half list from Verlet list of atom j
+    // (Verlet lists are symmetric: j is in Verlet list of i if and only if i is in Verlet list of j)
+    m_pairIndex.resize(m_verletListAtoms.size());
+    for (int index = 0; index < numOfAtoms; index++)
+    {
+        for (int neighbour = m_verletListStart[index]; neighbour < m_verletListStart[index + 1]; neighbour++)
         {
-            if (innerAtomId != atomId)
-            { // skip atomid
-
-                // coordinates of other atom
-                double otherX{atoms.at(innerAtomId).getX()};
-                double otherY{atoms.at(innerAtomId).getY()};
-                double otherZ{atoms.at(innerAtomId).getZ()};
-
-                // components of the vector r_ij
-                double x_ij{otherX - myX};
-                double y_ij{otherY - myY};
-                double z_ij{otherZ - myZ};
-
-                // correction of vector r_ij for PBC (and minimum image convention)
-                x_ij -= pbc[0] * std::round(x_ij / pbc[0]);
-                y_ij -= pbc[1] * std::round(y_ij / pbc[1]);
-                z_ij -= pbc[2] * std::round(z_ij / pbc[2]);
-
-                // calculate the correct length of vector r_ij
-                double r_ij{sqrt(pow(x_ij, 2) + pow(y_ij, 2) + pow(z_ij, 2))};
-
-                if (r_ij <= m_rVerletListLimit) // innerAtom is inside of "Verlet sphere" of atom
-                {
-                    idsInVerletList.push_back(innerAtomId);
-                }
+            int other{m_verletListAtoms[neighbour]};
+            if (other > index)
+            {
+                m_pairIndex[neighbour] = m_pairStart[index] + neighbour - m_halfListFirst[index];
+            }
+            else
+            {
+                const int *first{verletListAtoms + m_halfListFirst[other]};
+                const int *position{std::lower_bound(first, verletListAtoms + m_verletListStart[other + 1], index)};
+                m_pairIndex[neighbour] = m_pairStart[other] + (position - first);
             }
         }
+    }
 
-        // add verlet list for this atom!
-        m_verletLists.insert(std::make_pair(atomId, VerletList(atomId, idsInVerletList)));
+    int numOfFunctions{static_cast<int>(m_g2FunctionParameters.size() + m_g3FunctionParameters.size())};
+    m_pairDistances.resize(m_pairStart.back());
+    m_pairTerms.resize(static_cast<size_t>(m_pairStart.back()) * numOfFunctions);
+
+    std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    m_verletListTime += duration.count();
+}
+
+bool Box::usesHalfLists()
+{
+    int numOfFunctions{static_cast<int>(m_g2FunctionParameters.size() + m_g3FunctionParameters.size())};
+    return m_halfLists && numOfFunctions <= RadialKernel::maxNumOfFunctions;
+}
+
+bool Box::findReferenceAtoms(int timestepId)
+{
+    Timestep &timestep{m_timesteps.at(timestepId)};
+    Timestep &reference{m_timesteps.at(m_referenceTimestepId)};
+    int numOfAtoms{reference.getNumOfAtoms()};
+    if (timestep.getNumOfAtoms() != numOfAtoms)
+    {
+        return false;
+    }
+
+    m_frameIndex.resize(numOfAtoms);
+    m_frameHasReferenceOrder = timestep.getAtomsId() == reference.getAtomsId();
+    if (m_frameHasReferenceOrder)
+    {
+        // atoms are in the same order (the most common case)
+        for (int index = 0; index < numOfAtoms; index++)
+        {
+            m_frameIndex[index] = index;
+        }
+        return true;
     }
+
+    for (int index = 0; index < numOfAtoms; index++)
+    {
+        m_frameIndex[index] = timestep.getAtomIndex(reference.getAtomsId()[index]);
+        if (m_frameIndex[index] < 0)
+        {
+            return false;
+        }
+    }
+    return true;
 }
 
-void Box::calculateDescriptors()
+bool Box::verletListsNeedUpdate(int timestepId)
+{
+    // Verlet lists of other atoms are not known
+    if (m_referenceTimestepId < 0 || !findReferenceAtoms(timestepId))
+    {
+        return true;
+    }
+
+    const std::vector<double> &pbc{getPbcOfTimestep(timestepId)};
+    const std::vector<double> &referencePbc{getPbcOfTimestep(m_referenceTimestepId)};
+    Timestep &timestep{m_timesteps.at(timestepId)};
+    Timestep &reference{m_timesteps.at(m_referenceTimestepId)};
+
+    // change of the box moves periodic images of atoms
+    double boxChange{sqrt(pow(pbc[0] - referencePbc[0], 2) +
+                          pow(pbc[1] - referencePbc[1], 2) +
+                          pow(pbc[2] - referencePbc[2], 2))};
+
+    const std::vector<double> &x{timestep.getX()}, &y{timestep.getY()}, &z{timestep.getZ()};
+    const std::vector<double> &referenceX{reference.getX()}, &referenceY{reference.getY()}, &referenceZ{reference.getZ()};
+    double maxDisplacement2{0.0};
+    for (int index = 0; index < reference.getNumOfAtoms(); index++)
+    {
+        // displacement of atom (minimum image convention, atoms may be wrapped into the box)
+        int frameIndex{m_frameIndex[index]};
+        double dx{x[frameIndex] - referenceX[index]};
+        double dy{y[frameIndex] - referenceY[index]};
+        double dz{z[frameIndex] - referenceZ[index]};
+        dx -= pbc[0] * round(dx / pbc[0]);
+        dy -= pbc[1] * round(dy / pbc[1]);
+        dz -= pbc[2] * round(dz / pbc[2]);
+        maxDisplacement2 = std::max(maxDisplacement2, dx * dx + dy * dy + dz * dz);
+    }
+
+    double maxDisplacement{sqrt(maxDisplacement2)};
+    m_maxDisplacement = std::max(m_maxDisplacement, maxDisplacement);
+
+    // distance of two atoms changed at most by twice the largest displacement plus the change of the box
+    return 2 * maxDisplacement + boxChange > m_skin;
+}
+
+void Box::calculateAtomsDescriptors(Timestep &timestep, const std::vector<double> &pbc,
+                                    const int *verletListAtoms, const int *steinhardtListAtoms,
+                                    size_t begin, size_t end,
+                                    double &symmetryFunctionsTime, double &steinhardtTime)
 {
     auto start = std::chrono::steady_clock::now();
-    std::chrono::duration<double> timeFromStart;
+    if (usesHalfLists())
+    {
+        // terms of all pairs were evaluated by calculatePairTerms
+        int numOfFunctions{static_cast<int>(m_g2FunctionParameters.size() + m_g3FunctionParameters.size())};
+        for (size_t referenceIndex = begin; referenceIndex < end; referenceIndex++)
+        {
+            int index{m_frameIndex[referenceIndex]};
+            int first{m_verletListStart[referenceIndex]};
+            Atom::addPairTerms(m_pairIndex.data() + first,
+                               m_verletListStart[referenceIndex + 1] - first,
+                               m_pairDistances.data(), m_pairTerms.data(),
+                               m_rMaxSym, numOfFunctions,
+                               timestep.getDescriptors(index));
+        }
+    }
+    else
+    {
+        for (size_t referenceIndex = begin; referenceIndex < end; referenceIndex++)
+        {
+            int index{m_frameIndex[referenceIndex]};
+            int first{m_verletListStart[referenceIndex]};
+            Atom::evaluateSymmetryFunctions(index,
+                                            verletListAtoms + first,
+                                            m_verletListStart[referenceIndex + 1] - first,
+                                            timestep.getX().data(), timestep.getY().data(), timestep.getZ().data(),
+                                            pbc[0], pbc[1], pbc[2],
+                                            m_rMinSym, m_rMaxSym,
+                                            m_g2FunctionParameters,
+                                            m_g3FunctionParameters,
+                                            timestep.getDescriptors(index));
+        }
+    }
+    auto middle = std::chrono::steady_clock::now();
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-//    std::cout << '\t' << timeFromStart.count() << "s - Beginning of calculation of descriptors ..." << std::endl;
+    // only atoms in short lists can be closer than the cutoff of Steinhardt parameters
+    for (size_t referenceIndex = begin; referenceIndex < end; referenceIndex++)
+    {
+        int index{m_frameIndex[referenceIndex]};
+        int first{m_steinhardtListStart[referenceIndex]};
+        Atom::evaluateSteinhardtParameters(index,
+                                           steinhardtListAtoms + first,
+                                           m_steinhardtListStart[referenceIndex + 1] - first,
+                                           timestep.getX().data(), timestep.getY().data(), timestep.getZ().data(),
+                                           pbc[0], pbc[1], pbc[2],
+                                           m_rMinStein, m_rMaxStein,
+                                           m_steinhardtFunctionParameters,
+                                           timestep.getDescriptors(index));
+    }
+    auto stop = std::chrono::steady_clock::now();
+
+    std::chrono::duration<double> symmetryFunctionsDuration = middle - start;
+    std::chrono::duration<double> steinhardtDuration = stop - middle;
+    symmetryFunctionsTime += symmetryFunctionsDuration.count();
+    steinhardtTime += steinhardtDuration.count();
+}
+
+void Box::calculatePairTerms(Timestep &timestep, const std::vector<double> &pbc, const int *verletListAtoms,
+                             size_t begin, size_t end, double &symmetryFunctionsTime)
+{
+    auto start = std::chrono::steady_clock::now();
+    int numOfFunctions{static_cast<int>(m_g2FunctionParameters.size() + m_g3FunctionParameters.size())};
+    for (size_t referenceIndex = begin; referenceIndex < end; referenceIndex++)
+    {
+        int first{m_halfListFirst[referenceIndex]};
+        int pair{m_pairStart[referenceIndex]};
+        Atom::evaluatePairTerms(m_frameIndex[referenceIndex],
+                                verletListAtoms + first,
+                                m_verletListStart[referenceIndex + 1] - first,
+                                timestep.getX().data(), timestep.getY().data(), timestep.getZ().data(),
+                                pbc[0], pbc[1], pbc[2],
+                                m_rMinSym, m_rMaxSym,
+                                m_g2FunctionParameters,
+                                m_g3FunctionParameters,
+                                m_pairDistances.data() + pair,
+                                m_pairTerms.data() + static_cast<size_t>(pair) * numOfFunctions);
+    }
+    std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    symmetryFunctionsTime += duration.count();
+}
+
+void Box::forEachChunk(size_t numOfAtoms, const std::function<void(size_t, size_t, size_t)> &work)
+{
+    // threads take atoms in chunks of this size
+    const size_t chunkSize{16};
+    size_t numOfThreads{std::min(static_cast<size_t>(m_numOfThreads), (numOfAtoms + chunkSize - 1) / chunkSize)};
 
+    if (numOfThreads <= 1)
+    {
+        // go through all atoms
+        work(0, numOfAtoms, 0);
+        return;
+    }
+
+    // each thread takes next chunk of atoms until all atoms are done
+    std::atomic<size_t> nextAtom{0};
+    std::vector<std::exception_ptr> errors(numOfThreads);
+    auto takeChunks = [&](size_t thread) {
+        try
+        {
+            for (size_t begin = nextAtom.fetch_add(chunkSize); begin < numOfAtoms;
+                 begin = nextAtom.fetch_add(chunkSize))
+            {
+                work(begin, std::min(begin + chunkSize, numOfAtoms), thread);
+            }
+        }
+        catch (...)
+        {
+            errors[thread] = std::current_exception();
+        }
+    };
+
+    std::vector<std::thread> threads;
+    threads.reserve(numOfThreads - 1);
+    for (size_t thread = 1; thread < numOfThreads; thread++)
+    {
+        threads.emplace_back(takeChunks, thread);
+    }
+    takeChunks(0);
+    for (std::thread &thread : threads)
+    {
+        thread.join();
+    }
+
+    // errors are passed to the caller as in serial calculation
+    for (std::exception_ptr &error : errors)
+    {
+        if (error)
+        {
+            std::rethrow_exception(error);
+        }
+    }
+}
+
+void Box::calculateDescriptors()
+{
     // go through all timesteps
     for (const int &timestepId : m_timestepsId)
     {
-        timeFromStart = std::chrono::steady_clock::now() - start;
-//        std::cout << '\t' << timeFromStart.count() << "s - Calculating timestep #" << timestepId << std::endl;
+        calculateTimestepDescriptors(timestepId);
+    }
+}
+
+void Box::calculateTimestepDescriptors(int timestepId)
+{
+    // Verlet lists are created again only if atoms moved too much
+    if (verletListsNeedUpdate(timestepId))
+    {
+        createVerletLists(timestepId);
+        findReferenceAtoms(timestepId);
+    }
+    if (usesHalfLists() && m_pairStart.size() != m_verletListStart.size())
+    {
+        createHalfLists();
+    }
+
+    auto start = std::chrono::steady_clock::now();
+
+    Timestep &timestep{m_timesteps.at(timestepId)};
+    const std::vector<double> &pbc{getPbcOfTimestep(timestepId)};
+    timestep.resetDescriptors(getNumOfDescriptors());
 
-        std::vector<int> atomsId{m_timesteps.at(timestepId).getAtomsId()};
-        std::vector<double> pbc{getPbcOfTimestep(timestepId)};
+    // Verlet lists are mapped to indices of atoms in this timestep (once for all atoms)
+    const int *verletListAtoms{m_verletListAtoms.data()};
+    const int *steinhardtListAtoms{m_steinhardtListAtoms.data()};
+    if (!m_frameHasReferenceOrder)
+    {
+        m_frameVerletListAtoms.resize(m_verletListAtoms.size());
+        for (size_t neighbour = 0; neighbour < m_verletListAtoms.size(); neighbour++)
+        {
+            m_frameVerletListAtoms[neighbour] = m_frameIndex[m_verletListAtoms[neighbour]];
+        }
+        verletListAtoms = m_frameVerletListAtoms.data();
 
-        // go through all atoms in given timestep
-        for (const int &atomId : atomsId)
+        m_frameSteinhardtListAtoms.resize(m_steinhardtListAtoms.size());
+        for (size_t neighbour = 0; neighbour < m_steinhardtListAtoms.size(); neighbour++)
         {
-            timeFromStart = std::chrono::steady_clock::now() - start;
-//            std::cout << '\t' << timeFromStart.count() << "s - Calculating atom #" << atomId << std::endl;
-
-            // calculate descriptors for atom
-            m_timesteps .at(timestepId)
-                        .getAtom(atomId)
-                        .calculateDescriptors(  pbc[0], pbc[1], pbc[2],
-                                                m_verletLists.at(atomId).getAtomIds(),
-                                                m_timesteps.at(timestepId).getAtoms(),
-                                                m_rMinSym, m_rMaxSym,
-                                                m_rMinStein, m_rMaxStein,
-                                                m_g2FunctionParameters,
-                                                m_g3FunctionParameters,
-                                                m_steinhardtFunctionParameters);
+            m_frameSteinhardtListAtoms[neighbour] = m_frameIndex[m_steinhardtListAtoms[neighbour]];
         }
+        steinhardtListAtoms = m_frameSteinhardtListAtoms.data();
     }
+
+    // atoms are independent (each pair of half lists is written by one atom and all pairs are
+    // evaluated before they are read), so descriptors are the same as in serial calculation
+    size_t numOfAtoms{static_cast<size_t>(timestep.getNumOfAtoms())};
+    std::vector<double> symmetryFunctionsTimes(m_numOfThreads, 0.0), steinhardtTimes(m_numOfThreads, 0.0);
+    if (usesHalfLists())
+    {
+        forEachChunk(numOfAtoms, [&](size_t begin, size_t end, size_t thread) {
+            calculatePairTerms(timestep, pbc, verletListAtoms, begin, end, symmetryFunctionsTimes[thread]);
+        });
+    }
+    forEachChunk(numOfAtoms, [&](size_t begin, size_t end, size_t thread) {
+        calculateAtomsDescriptors(timestep, pbc, verletListAtoms, steinhardtListAtoms, begin, end,
+                                  symmetryFunctionsTimes[thread], steinhardtTimes[thread]);
+    });
+    for (int thread = 0; thread < m_numOfThreads; thread++)
+    {
+        m_symmetryFunctionsTime += symmetryFunctionsTimes[thread];
+        m_steinhardtTime += steinhardtTimes[thread];
+    }
+    m_numOfCalculatedAtoms += numOfAtoms;
+    m_numOfNeighbours += m_verletListAtoms.size();
+    m_numOfSteinhardtNeighbours += m_steinhardtListAtoms.size();
+
+    std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    m_descriptorsTime += duration.count();
 }
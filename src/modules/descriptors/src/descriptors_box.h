@@ -10,19 +10,55 @@
  *      contained in the Box object. Object Box is also responsible for
  *      creating Verlet lists for each atom and for calculating descriptors
  *      for each atom.
+ *
+ *      Verlet lists contain atoms closer than the largest cutoff plus skin.
+ *      They are created from the first timestep and created again only when
+ *      atoms moved too much: when the largest displacement of atom since the
+ *      last build (plus the change of the box) exceeds half of the skin, some
+ *      atom could have come into cutoff sphere of another atom.
+ *
+ *      Atoms of each timestep are stored in contiguous arrays (see Timestep),
+ *      Verlet lists of all atoms are stored in one array of indices of atoms
+ *      in the timestep they were created from. When another timestep has
+ *      atoms in different order, Verlet lists are mapped to its indices once
+ *      for the whole timestep.
+ *
+ *      Steinhardt parameters have much shorter cutoff than symmetry
+ *      functions, so each atom has also a short list of neighbours closer
+ *      than the cutoff of Steinhardt parameters plus skin (created together
+ *      with Verlet lists, in the same order). Steinhardt parameters are
+ *      evaluated only for atoms in the short list.
+ *
+ *      With half lists (setHalfLists), each pair of atoms within the cutoff
+ *      of symmetry functions is evaluated only once: the atom with the lower
+ *      index evaluates terms of all G2 and G3 functions for its pair and both
+ *      atoms add the same stored terms to their descriptors (in the same
+ *      order as with full lists, so descriptors are exactly the same). Terms
+ *      are stored for all pairs in Verlet lists (about 12 doubles per pair).
+ *
+ *      Descriptors of atoms in one timestep are calculated in parallel by
+ *      'numOfThreads' threads (each atom depends only on positions of its
+ *      neighbours, so the result does not depend on the number of threads).
  */
 
 #ifndef DESCRIPTORS_BOX_H
 #define DESCRIPTORS_BOX_H
 
 #include <utility>
+#include <algorithm>
 #include <map>
 #include <vector>
 #include <chrono>
+#include <cmath>
+#include <atomic>
+#include <thread>
+#include <exception>
+#include <functional>
 
 #include "descriptors_timestep.h"
 #include "descriptors_atom.h"
 #include "descriptors_verlet_list.h"
+#include "descriptors_cell_list.h"
 
 class Box
 {
@@ -30,8 +66,9 @@ protected:
     std::map<int, std::vector<double>> m_pbc; // PBCs foreach timestep
 
     int m_numOfTimesteps;                     // number of timesteps of system
+    double m_skin;                            // skin of Verlet lists (added to the largest cutoff)
     double m_rVerletListLimit;                // cutoff for atoms in the Verlet List
-    std::map<int, VerletList> m_verletLists;  // map of Verlet List for each atom
+    double m_rSteinhardtListLimit;            // cutoff for atoms in the short list of Steinhardt parameters
     std::map<int, Timestep> m_timesteps;      // map of all timesteps of systems
     std::vector<int> m_timestepsId;           // IDs of all timesteps
 
@@ -44,13 +81,106 @@ protected:
     std::vector<double> m_g3FunctionParameters;                 // parameters for G3 symmetry functions
     std::vector<int> m_steinhardtFunctionParameters;            // parameters for Steinhardt parameters
 
+    // Verlet lists of all atoms of reference timestep (the timestep they were created from) are stored
+    // in one array, atoms in Verlet list of atom i are m_verletListAtoms[m_verletListStart[i] ... m_verletListStart[i + 1] - 1]
+    // (all atoms are given by their indices in reference timestep)
+    int m_referenceTimestepId;                // ID of timestep Verlet lists were created from (-1 if not created)
+    std::vector<int> m_verletListStart;       // start of Verlet list of each atom in m_verletListAtoms
+    std::vector<int> m_verletListAtoms;       // atoms in Verlet lists of all atoms
+    std::vector<int> m_frameIndex;            // index of each atom of reference timestep in the calculated timestep
+    bool m_frameHasReferenceOrder;            // atoms of the calculated timestep are in the same order as in reference timestep
+    std::vector<int> m_frameVerletListAtoms;  // m_verletListAtoms with indices in the calculated timestep
+    std::vector<int> m_steinhardtListStart;   // start of short list of each atom in m_steinhardtListAtoms
+    std::vector<int> m_steinhardtListAtoms;   // atoms in short lists of Steinhardt parameters of all atoms
+    std::vector<int> m_frameSteinhardtListAtoms; // m_steinhardtListAtoms with indices in the calculated timestep
+    int m_numOfVerletListBuilds;              // number of creations of Verlet lists
+    double m_verletListTime;                  // time spent by creating Verlet lists [s]
+    double m_descriptorsTime;                 // time spent by calculating descriptors [s]
+    double m_symmetryFunctionsTime;           // time spent by symmetry functions (summed over threads) [s]
+    double m_steinhardtTime;                  // time spent by Steinhardt parameters (summed over threads) [s]
+    double m_maxDisplacement;                 // the largest displacement of atom since the last creation of Verlet lists
+    long long m_numOfCalculatedAtoms;         // number of atoms descriptors were calculated for (summed over timesteps)
+    long long m_numOfNeighbours;              // number of atoms in Verlet lists of calculated atoms (summed over timesteps)
+    long long m_numOfSteinhardtNeighbours;    // number of atoms in short lists of calculated atoms (summed over timesteps)
+    int m_numOfThreads;                       // number of threads calculating descriptors
+
+    // half lists: pairs of atoms i < j (indices in reference timestep) are numbered atom by atom, atom i owns
+    // pairs m_pairStart[i] ... m_pairStart[i + 1] - 1 with atoms m_verletListAtoms[m_halfListFirst[i] ...]
+    // (Verlet lists are sorted, so atoms j > i are at the end of Verlet list of i)
+    bool m_halfLists;                         // symmetry functions are evaluated once for each pair of atoms
+    std::vector<int> m_halfListFirst;         // first atom j > i in Verlet list of each atom i in m_verletListAtoms
+    std::vector<int> m_pairStart;             // first pair owned by each atom
+    std::vector<int> m_pairIndex;             // pair of each atom in m_verletListAtoms (the same order)
+    std::vector<double> m_pairDistances;      // distance of atoms of each pair in the calculated timestep
+    std::vector<double> m_pairTerms;          // terms of symmetry functions of each pair [numOfPairs * numOfFunctions]
+
+    /**
+     * Finds atoms of reference timestep in specific timestep (fills m_frameIndex and m_frameHasReferenceOrder),
+     * returns false if some atom is missing or number of atoms differs
+     *
+     * @param timestepId
+     */
+    bool findReferenceAtoms(int timestepId);
+
+    /**
+     * Calculates descriptors of atoms with indices begin ... end - 1 in reference timestep in specific timestep
+     * (symmetry functions of all of them first, then Steinhardt parameters), adds time spent by each family
+     * of descriptors to symmetryFunctionsTime and steinhardtTime
+     *
+     * @param timestep
+     * @param pbc
+     * @param verletListAtoms Atoms in Verlet lists with indices in the timestep
+     * @param steinhardtListAtoms Atoms in short lists of Steinhardt parameters with indices in the timestep
+     * @param begin, end
+     * @param symmetryFunctionsTime, steinhardtTime
+     */
+    void calculateAtomsDescriptors(Timestep &timestep, const std::vector<double> &pbc,
+                                   const int *verletListAtoms, const int *steinhardtListAtoms,
+                                   size_t begin, size_t end,
+                                   double &symmetryFunctionsTime, double &steinhardtTime);
+
+    /**
+     * Numbers pairs of atoms in Verlet lists (fills m_halfListFirst, m_pairStart and m_pairIndex)
+     */
+    void createHalfLists();
+
+    /**
+     * Returns true if symmetry functions are evaluated from half lists (they are enabled and
+     * all terms of one block fit into RadialKernel)
+     */
+    bool usesHalfLists();
+
+    /**
+     * Evaluates terms of symmetry functions of pairs owned by atoms with indices begin ... end - 1
+     * in reference timestep in specific timestep (each pair is written by one atom only),
+     * adds time spent to symmetryFunctionsTime
+     *
+     * @param timestep
+     * @param pbc
+     * @param verletListAtoms Atoms in Verlet lists with indices in the timestep
+     * @param begin, end
+     * @param symmetryFunctionsTime
+     */
+    void calculatePairTerms(Timestep &timestep, const std::vector<double> &pbc, const int *verletListAtoms,
+                            size_t begin, size_t end, double &symmetryFunctionsTime);
+
+    /**
+     * Calls work(begin, end, thread) for chunks of atoms 0 ... numOfAtoms - 1 in up to m_numOfThreads
+     * threads (serially for one thread), exception thrown in any thread is passed to the caller
+     *
+     * @param numOfAtoms
+     * @param work
+     */
+    void forEachChunk(size_t numOfAtoms, const std::function<void(size_t, size_t, size_t)> &work);
+
 public:
     // constructor
-    Box(std::map<int, std::vector<double>> pbcMap)
-        : m_pbc{pbcMap}
+    Box(std::map<int, std::vector<double>> pbcMap, double skin = 1.0)
+        : m_pbc{pbcMap}, m_skin{skin}
     {
         m_numOfTimesteps = 0;     // no timesteps at the beginning
-        m_rVerletListLimit = 7.4; // because rMaxSym = 6.4 (magical number for now)
+        m_referenceTimestepId = -1; // no Verlet lists at the beginning
+        m_frameHasReferenceOrder = false;
 
         // set the cutoff parameters
         m_rMinSym = 6.2;
@@ -58,6 +188,27 @@ public:
         m_rMinStein = 3.8;
         m_rMaxStein = 4.0;
 
+        // Verlet lists contain all atoms closer than the largest cutoff + skin (7.4 for default skin)
+        m_rVerletListLimit = std::max(m_rMaxSym, m_rMaxStein) + m_skin;
+        m_rSteinhardtListLimit = m_rMaxStein + m_skin;
+
+        // nothing was calculated yet
+        m_numOfVerletListBuilds = 0;
+        m_verletListTime = 0.0;
+        m_descriptorsTime = 0.0;
+        m_symmetryFunctionsTime = 0.0;
+        m_steinhardtTime = 0.0;
+        m_maxDisplacement = 0.0;
+        m_numOfCalculatedAtoms = 0;
+        m_numOfNeighbours = 0;
+        m_numOfSteinhardtNeighbours = 0;
+
+        // descriptors are calculated serially unless setNumOfThreads is called
+        m_numOfThreads = 1;
+
+        // every atom evaluates symmetry functions of all its neighbours unless setHalfLists is called
+        m_halfLists = false;
+
         // set the parameters for g2 function
         m_g2FunctionParameters.reserve(8);
         m_g2FunctionParameters.push_back(std::vector<double>{20.0, 2.8});
@@ -85,18 +236,59 @@ public:
     // getters
     inline std::map<int, std::vector<double>> getPbc() { return m_pbc; };
     inline int getNumOfTimesteps() { return m_numOfTimesteps; };
+    inline double getSkin() { return m_skin; };
     inline double getRVerletListLimit() { return m_rVerletListLimit; };
-    inline std::map<int, VerletList> &getVerletLists() { return m_verletLists; };
+    inline double getRSteinhardtListLimit() { return m_rSteinhardtListLimit; };
     inline std::map<int, Timestep> &getTimesteps() { return m_timesteps; };
     inline std::vector<int> &getTimestepsId() { return m_timestepsId; };
+    inline double getRMinSym() { return m_rMinSym; };
+    inline double getRMaxSym() { return m_rMaxSym; };
+    inline double getRMinStein() { return m_rMinStein; };
+    inline double getRMaxStein() { return m_rMaxStein; };
+    inline const std::vector<std::vector<double>> &getG2FunctionParameters() { return m_g2FunctionParameters; };
+    inline const std::vector<double> &getG3FunctionParameters() { return m_g3FunctionParameters; };
+    inline const std::vector<int> &getSteinhardtFunctionParameters() { return m_steinhardtFunctionParameters; };
+    inline int getNumOfVerletListBuilds() { return m_numOfVerletListBuilds; };
+    inline double getVerletListTime() { return m_verletListTime; };
+    inline double getDescriptorsTime() { return m_descriptorsTime; };
+    inline double getSymmetryFunctionsTime() { return m_symmetryFunctionsTime; };
+    inline double getSteinhardtTime() { return m_steinhardtTime; };
+    inline double getMaxDisplacement() { return m_maxDisplacement; };
+    inline long long getNumOfCalculatedAtoms() { return m_numOfCalculatedAtoms; };
+    inline long long getNumOfNeighbours() { return m_numOfNeighbours; };
+    inline long long getNumOfSteinhardtNeighbours() { return m_numOfSteinhardtNeighbours; };
+    inline int getNumOfThreads() { return m_numOfThreads; };
+    inline int getReferenceTimestepId() { return m_referenceTimestepId; };
+    inline bool getHalfLists() { return m_halfLists; };
+
+    // setters
+    inline void setNumOfThreads(int numOfThreads) { m_numOfThreads = std::max(1, numOfThreads); };
+    inline void setHalfLists(bool halfLists) { m_halfLists = halfLists; };
 
     // methods
     /**
      * Adds new timestep to box
      *
      * @param timestepId
+     * @param numOfAtoms Expected number of atoms (memory is reserved for them)
+     */
+    void addTimestep(int timestepId, int numOfAtoms = 0);
+
+    /**
+     * Adds timestep with its atoms and PBC to box (e.g. a timestep removed before, so that its memory is reused)
+     *
+     * @param timestep
+     * @param pbc
+     */
+    void addTimestep(Timestep &&timestep, const std::vector<double> &pbc);
+
+    /**
+     * Removes specific timestep from box and returns it (Verlet lists are created again
+     * at the next calculation if they were created from this timestep)
+     *
+     * @param timestepId
      */
-    void addTimestep(int timestepId);
+    Timestep removeTimestep(int timestepId);
 
     /**
      * Adds new atom to specific timestep
@@ -109,14 +301,42 @@ public:
 
     /**
      * Creates Verlet lists for all atoms based on configuration at first timestep
+     * (neighbours are found using CellList)
      */
     void createVerletLists();
 
+    /**
+     * Creates Verlet lists for all atoms based on configuration at specific timestep
+     * (previous Verlet lists are replaced)
+     *
+     * @param timestepId
+     */
+    void createVerletLists(int timestepId);
+
+    /**
+     * Returns true if Verlet lists must be created again before calculating specific timestep,
+     * i. e. if twice the largest displacement of atom since the last creation of Verlet lists
+     * plus the change of the box exceeds the skin, or if atoms are not the same
+     *
+     * @param timestepId
+     */
+    bool verletListsNeedUpdate(int timestepId);
+
     /**
      * Calculates descriptors for all atoms in all timesteps
+     * (Verlet lists are created again whenever verletListsNeedUpdate is true,
+     * atoms of each timestep are divided among threads)
      */
     void calculateDescriptors();
 
+    /**
+     * Calculates descriptors for all atoms in specific timestep (Verlet lists are created again
+     * if verletListsNeedUpdate is true, otherwise lists of previous timesteps are used)
+     *
+     * @param timestepId
+     */
+    void calculateTimestepDescriptors(int timestepId);
+
     /**
      * Returns number of atoms in first timestep
      */
@@ -129,13 +349,40 @@ public:
      */
     int getNumOfAtomsInVerletList(int atomId);
 
+    /**
+     * Returns number of atoms in short list of Steinhardt parameters of specific atom
+     *
+     * @param atomId
+     */
+    int getNumOfAtomsInSteinhardtList(int atomId);
+
+    /**
+     * Returns Verlet list (IDs of atoms) of specific atom
+     *
+     * @param atomId
+     */
+    VerletList getVerletList(int atomId);
+
     /**
      * Returns descriptors of specific atom in specific timestep
      *
      * @param timestepId
      * @param atomId
      */
-    const std::vector<double> &getAtomDescriptors(int timestepId, int atomId);
+    std::vector<double> getAtomDescriptors(int timestepId, int atomId);
+
+    /**
+     * Returns descriptors of all atoms in specific timestep [numOfAtoms * numOfDescriptors],
+     * atoms are in the order in which they were added
+     *
+     * @param timestepId
+     */
+    const std::vector<double> &getTimestepDescriptors(int timestepId);
+
+    /**
+     * Returns number of descriptors of each atom
+     */
+    int getNumOfDescriptors();
 
     /**
      * Returns a vector of PBC in specific timestep
@@ -0,0 +1,133 @@
+#include "descriptors_cell_list.h"
+
+CellList::CellList(std::vector<double> x,
+                   std::vector<double> y,
+                   std::vector<double> z,
+                   std::vector<double> pbc,
+                   double cutoff)
+    : m_x{std::move(x)}, m_y{std::move(y)}, m_z{std::move(z)}, m_pbc{std::move(pbc)}, m_cutoff{cutoff}
+{
+    // edge of cell is at least as long as cutoff (with small margin for rounding errors), number of cells
+    // in each direction is at most the cube root of number of atoms (but at least 3), so there are about
+    // as many cells as atoms and memory does not grow with volume of dilute systems
+    int numOfAtoms{getNumOfAtoms()};
+    double maxNumOfCells{std::max(3.0, std::ceil(std::cbrt(static_cast<double>(numOfAtoms))))};
+    for (int direction = 0; direction < 3; direction++)
+    {
+        double numOfCells{std::floor(m_pbc[direction] / (m_cutoff * (1.0 + 1e-10)))};
+        m_numOfCells[direction] = static_cast<int>(std::max(0.0, std::min(numOfCells, maxNumOfCells)));
+    }
+    if (!isUsed())
+    {
+        return;
+    }
+
+    // sort atoms into cells (counting sort)
+    m_atomCell.resize(numOfAtoms);
+    m_cellStart.assign(static_cast<size_t>(m_numOfCells[0]) * m_numOfCells[1] * m_numOfCells[2] + 1, 0);
+    for (int atom = 0; atom < numOfAtoms; atom++)
+    {
+        m_atomCell[atom] = cellIndex(cellCoordinate(m_x[atom], 0),
+                                     cellCoordinate(m_y[atom], 1),
+                                     cellCoordinate(m_z[atom], 2));
+        m_cellStart[m_atomCell[atom] + 1]++;
+    }
+    for (size_t cell = 1; cell < m_cellStart.size(); cell++)
+    {
+        m_cellStart[cell] += m_cellStart[cell - 1];
+    }
+    m_cellAtoms.resize(numOfAtoms);
+    std::vector<int> position(m_cellStart.begin(), m_cellStart.end() - 1);
+    for (int atom = 0; atom < numOfAtoms; atom++)
+    {
+        m_cellAtoms[position[m_atomCell[atom]]++] = atom;
+    }
+}
+
+size_t CellList::cellIndex(int cx, int cy, int cz) const
+{
+    return (static_cast<size_t>(cx) * m_numOfCells[1] + cy) * m_numOfCells[2] + cz;
+}
+
+int CellList::cellCoordinate(double coordinate, int direction) const
+{
+    // coordinate is wrapped into the periodic box [0, pbc)
+    double length{m_pbc[direction]};
+    double wrapped{coordinate - length * std::floor(coordinate / length)};
+    int cell{static_cast<int>(wrapped / length * m_numOfCells[direction])};
+    return std::min(std::max(cell, 0), m_numOfCells[direction] - 1);
+}
+
+bool CellList::isUsed() const
+{
+    return m_numOfCells[0] >= 3 && m_numOfCells[1] >= 3 && m_numOfCells[2] >= 3;
+}
+
+bool CellList::areNeighbours(int first, int second) const
+{
+    // components of the vector r_ij
+    double x_ij{m_x[second] - m_x[first]};
+    double y_ij{m_y[second] - m_y[first]};
+    double z_ij{m_z[second] - m_z[first]};
+
+    // correction of vector r_ij for PBC (and minimum image convention)
+    x_ij -= m_pbc[0] * std::round(x_ij / m_pbc[0]);
+    y_ij -= m_pbc[1] * std::round(y_ij / m_pbc[1]);
+    z_ij -= m_pbc[2] * std::round(z_ij / m_pbc[2]);
+
+    return std::sqrt(x_ij * x_ij + y_ij * y_ij + z_ij * z_ij) <= m_cutoff;
+}
+
+std::vector<int> CellList::getNeighbours(int index) const
+{
+    if (!isUsed())
+    {
+        return getNeighboursBruteForce(index);
+    }
+
+    size_t cell{m_atomCell[index]};
+    int cx{static_cast<int>(cell / (static_cast<size_t>(m_numOfCells[1]) * m_numOfCells[2]))};
+    int cy{static_cast<int>((cell / m_numOfCells[2]) % m_numOfCells[1])};
+    int cz{static_cast<int>(cell % m_numOfCells[2])};
+
+    // go through the cell of atom and 26 surrounding cells (with PBC)
+    std::vector<int> neighbours;
+    for (int dx = -1; dx <= 1; dx++)
+    {
+        int nx{(cx + dx + m_numOfCells[0]) % m_numOfCells[0]};
+        for (int dy = -1; dy <= 1; dy++)
+        {
+            int ny{(cy + dy + m_numOfCells[1]) % m_numOfCells[1]};
+            for (int dz = -1; dz <= 1; dz++)
+            {
+                int nz{(cz + dz + m_numOfCells[2]) % m_numOfCells[2]};
+                size_t other{cellIndex(nx, ny, nz)};
+                for (int i = m_cellStart[other]; i < m_cellStart[other + 1]; i++)
+                {
+                    int atom{m_cellAtoms[i]};
+                    if (atom != index && areNeighbours(index, atom))
+                    {
+                        neighbours.push_back(atom);
+                    }
+                }
+            }
+        }
+    }
+
+    // the same order as in the brute force search
+    std::sort(neighbours.begin(), neighbours.end());
+    return neighbours;
+}
+
+std::vector<int> CellList::getNeighboursBruteForce(int index) const
+{
+    std::vector<int> neighbours;
+    for (int atom = 0; atom < getNumOfAtoms(); atom++)
+    {
+        if (atom != index && areNeighbours(index, atom))
+        {
+            neighbours.push_back(atom);
+        }
+    }
+    return neighbours;
+}
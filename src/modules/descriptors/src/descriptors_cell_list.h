@@ -0,0 +1,88 @@
+/**
+ * Name:
+ *      descriptors_cell_list.h
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Header file corresponding to class CellList. Box object creates
+ *      CellList from positions of atoms in the first timestep in order to
+ *      find neighbours of each atom (atoms that are in Verlet List).
+ *
+ *      The periodic box is divided into cells with edge at least as long
+ *      as the cutoff, so neighbours of an atom are only in its own cell
+ *      and in 26 surrounding cells. Search of all neighbours is O(N).
+ *      There are at most cube root of the number of atoms cells in each
+ *      direction (larger cells in dilute systems), so memory is O(N) for
+ *      any size of the box.
+ *      When the box is too small for 3 cells in each direction, neighbours
+ *      are searched by comparing all pairs of atoms (O(N^2)).
+ *
+ *      Neighbours are found using the same minimum image convention and
+ *      returned in the same (ascending) order in both cases.
+ */
+
+#ifndef DESCRIPTORS_CELL_LIST_H
+#define DESCRIPTORS_CELL_LIST_H
+
+#include <array>
+#include <vector>
+#include <cmath>
+#include <algorithm>
+
+class CellList
+{
+private:
+    std::vector<double> m_x;            // x coordinates of atoms
+    std::vector<double> m_y;            // y coordinates of atoms
+    std::vector<double> m_z;            // z coordinates of atoms
+    std::vector<double> m_pbc;          // lengths of periodic box
+    double m_cutoff;                    // cutoff of neighbours
+    std::array<int, 3> m_numOfCells;    // number of cells in x, y, z direction
+    std::vector<int> m_cellStart;       // atoms of cell c are m_cellAtoms[m_cellStart[c]] ... m_cellAtoms[m_cellStart[c + 1] - 1]
+    std::vector<int> m_cellAtoms;       // indices of atoms sorted by cells
+    std::vector<size_t> m_atomCell;     // cell of each atom
+
+    size_t cellIndex(int cx, int cy, int cz) const;
+    int cellCoordinate(double coordinate, int direction) const;
+
+public:
+    // constructor
+    CellList(std::vector<double> x,
+             std::vector<double> y,
+             std::vector<double> z,
+             std::vector<double> pbc,
+             double cutoff);
+
+    // getters
+    inline int getNumOfAtoms() const { return m_x.size(); };
+    inline const std::array<int, 3> &getNumOfCells() const { return m_numOfCells; };
+
+    // methods
+    /**
+     * Returns true if atoms are sorted into cells (at least 3 cells in each direction)
+     */
+    bool isUsed() const;
+
+    /**
+     * Returns true if atoms with given indices are closer than cutoff (minimum image convention)
+     *
+     * @param first, second Indices of atoms
+     */
+    bool areNeighbours(int first, int second) const;
+
+    /**
+     * Returns indices of all atoms (except atom itself) closer than cutoff, in ascending order
+     *
+     * @param index Index of atom
+     */
+    std::vector<int> getNeighbours(int index) const;
+
+    /**
+     * Returns the same as getNeighbours(index) but all pairs of atoms are compared (O(N^2))
+     *
+     * @param index Index of atom
+     */
+    std::vector<int> getNeighboursBruteForce(int index) const;
+};
+
+#endif //DESCRIPTORS_CELL_LIST_H
@@ -0,0 +1,56 @@
+#include "descriptors_engine.h"
+
+void Engine::removeTimesteps(int keptTimestepId)
+{
+    int referenceTimestepId{m_box.getReferenceTimestepId()};
+    std::vector<int> timestepsId{m_box.getTimestepsId()};
+    for (int timestepId : timestepsId)
+    {
+        if (timestepId != referenceTimestepId && timestepId != keptTimestepId)
+        {
+            m_freeTimesteps.push_back(m_box.removeTimestep(timestepId));
+        }
+    }
+}
+
+void Engine::update(const double *positions, int numOfAtoms, const double *pbc, double *descriptors)
+{
+    auto start = std::chrono::steady_clock::now();
+
+    // previous frame is removed, only the timestep of Verlet lists is kept
+    removeTimesteps(-1);
+    int referenceTimestepId{m_box.getReferenceTimestepId()};
+
+    if (numOfAtoms > 0)
+    {
+        // new frame gets ID different from the reference timestep (memory of a removed timestep is reused)
+        int timestepId{referenceTimestepId == 0 ? 1 : 0};
+        Timestep timestep{timestepId};
+        if (!m_freeTimesteps.empty())
+        {
+            timestep = std::move(m_freeTimesteps.back());
+            m_freeTimesteps.pop_back();
+            timestep.clear(timestepId);
+        }
+        timestep.reserve(numOfAtoms);
+        for (int atom = 0; atom < numOfAtoms; atom++)
+        {
+            timestep.addAtom(atom, positions[3 * atom], positions[3 * atom + 1], positions[3 * atom + 2]);
+        }
+        m_box.addTimestep(std::move(timestep), {pbc[0], pbc[1], pbc[2]});
+
+        m_box.calculateTimestepDescriptors(timestepId);
+        const std::vector<double> &frameDescriptors{m_box.getTimestepDescriptors(timestepId)};
+        std::copy(frameDescriptors.begin(), frameDescriptors.end(), descriptors);
+
+        // former reference timestep is not needed when Verlet lists were created from this frame
+        removeTimesteps(timestepId);
+    }
+    m_numOfAtoms = numOfAtoms;
+
+    std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    m_numOfUpdates++;
+    m_lastUpdateTime = duration.count();
+    m_totalUpdateTime += m_lastUpdateTime;
+    m_maxUpdateTime = std::max(m_maxUpdateTime, m_lastUpdateTime);
+}
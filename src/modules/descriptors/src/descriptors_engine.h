@@ -0,0 +1,87 @@
+/**
+ * Name:
+ *      descriptors_engine.h
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Header file corresponding to class Engine. Engine calculates
+ *      descriptors of one frame at a time (e.g. frames of a running
+ *      simulation) and keeps its Box between calls, so Verlet lists,
+ *      arrays of atoms and buffers of Box are reused by the next frame.
+ *
+ *      Box of Engine holds at most two timesteps: the timestep Verlet lists
+ *      were created from (reference timestep) and the current frame. Memory
+ *      of the previous frame is reused for the next one (Timestep::clear).
+ *      Atom i is the same atom in all frames; Verlet lists are created again
+ *      only when atoms moved too much or the number of atoms changed, so
+ *      descriptors are the same as if each frame was calculated separately.
+ *
+ *      Time of each update (including copying of positions and descriptors)
+ *      is measured, statistics of Box are accumulated over all updates.
+ */
+
+#ifndef DESCRIPTORS_ENGINE_H
+#define DESCRIPTORS_ENGINE_H
+
+#include <vector>
+#include <map>
+#include <chrono>
+#include <algorithm>
+
+#include "descriptors_box.h"
+
+class Engine
+{
+private:
+    Box m_box;                               // Box kept between updates (Verlet lists, buffers)
+    std::vector<Timestep> m_freeTimesteps;   // removed timesteps, their memory is reused by next frames
+    int m_numOfAtoms;                        // number of atoms in the last frame
+    int m_numOfUpdates;                      // number of calls of update
+    double m_lastUpdateTime;                 // time of the last update [s]
+    double m_totalUpdateTime;                // time of all updates [s]
+    double m_maxUpdateTime;                  // time of the slowest update [s]
+
+    /**
+     * Removes all timesteps except the reference timestep and given one, their memory is reused later
+     *
+     * @param keptTimestepId
+     */
+    void removeTimesteps(int keptTimestepId);
+
+public:
+    // constructor
+    Engine(double skin = 1.0) : m_box(std::map<int, std::vector<double>>{}, skin)
+    {
+        m_numOfAtoms = 0;
+        m_numOfUpdates = 0;
+        m_lastUpdateTime = 0.0;
+        m_totalUpdateTime = 0.0;
+        m_maxUpdateTime = 0.0;
+    }
+
+    // getters
+    inline Box &getBox() { return m_box; };
+    inline int getNumOfAtoms() { return m_numOfAtoms; };
+    inline int getNumOfDescriptors() { return m_box.getNumOfDescriptors(); };
+    inline int getNumOfUpdates() { return m_numOfUpdates; };
+    inline double getLastUpdateTime() { return m_lastUpdateTime; };
+    inline double getTotalUpdateTime() { return m_totalUpdateTime; };
+    inline double getMaxUpdateTime() { return m_maxUpdateTime; };
+
+    // setters
+    inline void setNumOfThreads(int numOfThreads) { m_box.setNumOfThreads(numOfThreads); };
+    inline void setHalfLists(bool halfLists) { m_box.setHalfLists(halfLists); };
+
+    // methods
+    /**
+     * Calculates descriptors of one frame (Verlet lists of previous frames are used if atoms did not move too much)
+     *
+     * @param positions     coordinates of atoms [numOfAtoms * 3], atom i is the same atom in all frames
+     * @param numOfAtoms
+     * @param pbc           lengths of periodic box [3]
+     * @param descriptors   output [numOfAtoms * numOfDescriptors]
+     */
+    void update(const double *positions, int numOfAtoms, const double *pbc, double *descriptors);
+};
+
+#endif //DESCRIPTORS_ENGINE_H
@@ -1,14 +1,144 @@
 #include "descriptors_module.h"
 
-static PyObject *descriptors_compute(PyObject *self, PyObject *args)
+// skin of Verlet lists used in all calculations (descriptors.set_skin)
+static double verletListSkin{1.0};
+
+// number of threads calculating descriptors (descriptors.set_num_threads), all cores by default
+static int numOfThreads{std::max(1, static_cast<int>(std::thread::hardware_concurrency()))};
+
+// symmetry functions are evaluated once for each pair of atoms (descriptors.set_half_lists), off by default
+static bool halfLists{false};
+
+// statistics of the last calculation (descriptors.statistics)
+static int lastNumOfTimesteps{0};
+static int lastNumOfVerletListBuilds{0};
+static double lastVerletListTime{0.0};
+static double lastDescriptorsTime{0.0};
+static double lastSymmetryFunctionsTime{0.0};
+static double lastSteinhardtTime{0.0};
+static double lastMaxDisplacement{0.0};
+
+// time of stages and sizes of calculations are reported (descriptors.set_profiling), off by default
+static bool profiling{false};
+
+// profile of the last calculation (descriptors.profile), valid only if it was calculated with profiling
+static bool lastProfiled{false};
+static double lastParsingTime{0.0};
+static double lastMarshallingTime{0.0};
+static double lastTotalTime{0.0};
+static long long lastNumOfAtoms{0};
+static long long lastNumOfNeighbours{0};
+static long long lastNumOfSteinhardtNeighbours{0};
+
+/**
+ * Returns time in seconds since 'start'
+ */
+static double secondsSince(std::chrono::steady_clock::time_point start)
+{
+    std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    return duration.count();
+}
+
+/**
+ * Remembers statistics of calculation in box
+ */
+static void storeStatistics(Box &box)
+{
+    lastNumOfTimesteps = box.getNumOfTimesteps();
+    lastNumOfVerletListBuilds = box.getNumOfVerletListBuilds();
+    lastVerletListTime = box.getVerletListTime();
+    lastDescriptorsTime = box.getDescriptorsTime();
+    lastSymmetryFunctionsTime = box.getSymmetryFunctionsTime();
+    lastSteinhardtTime = box.getSteinhardtTime();
+    lastMaxDisplacement = box.getMaxDisplacement();
+    lastNumOfAtoms = box.getNumOfCalculatedAtoms();
+    lastNumOfNeighbours = box.getNumOfNeighbours();
+    lastNumOfSteinhardtNeighbours = box.getNumOfSteinhardtNeighbours();
+}
+
+/**
+ * Remembers time of stages of calculation (stored only if profiling is enabled)
+ *
+ * @param parsingTime Time of parsing of arguments and of filling Box with atoms
+ * @param marshallingTime Time of copying of descriptors to the result
+ * @param totalTime Time of the whole call
+ */
+static void storeProfile(double parsingTime, double marshallingTime, double totalTime)
+{
+    lastProfiled = profiling;
+    lastParsingTime = parsingTime;
+    lastMarshallingTime = marshallingTime;
+    lastTotalTime = totalTime;
+}
+
+/**
+ * Converts Python list or tuple of floats to vector, sets TypeError if it is neither list nor tuple
+ *
+ * @returns true if the object was converted, false if a Python exception is set
+ */
+static bool listTupleToVector(PyObject *incoming, std::vector<double> &data)
 {
-    std::cout << std::endl;
+    try
+    {
+        data = listTupleToVector_Float(incoming);
+    }
+    catch (const std::logic_error &e)
+    {
+        PyErr_SetString(PyExc_TypeError, "pbc and coordinates must be lists or tuples of floats");
+        return false;
+    }
+    return true;
+}
 
+/**
+ * Creates Verlet lists and calculates descriptors of all timesteps in box with GIL released.
+ * C++ exceptions must not reach Python, so they are caught and a Python exception is set instead
+ * (MemoryError if memory could not be allocated, RuntimeError otherwise).
+ *
+ * @param box Box with all timesteps
+ * @returns true if descriptors were calculated, false if a Python exception is set
+ */
+static bool calculateWithoutGil(Box &box)
+{
+    std::string exception;
+    bool outOfMemory{false};
+    Py_BEGIN_ALLOW_THREADS
+    try
+    {
+        box.createVerletLists();
+        box.calculateDescriptors();
+    }
+    catch (const std::bad_alloc &e)
+    {
+        outOfMemory = true;
+    }
+    catch (const std::length_error &e)
+    {
+        outOfMemory = true;
+    }
+    catch (const std::exception &e)
+    {
+        exception = e.what();
+    }
+    Py_END_ALLOW_THREADS
+
+    if (outOfMemory)
+    {
+        PyErr_SetString(PyExc_MemoryError, "not enough memory to calculate descriptors");
+        return false;
+    }
+    if (!exception.empty())
+    {
+        PyErr_SetString(PyExc_RuntimeError, exception.c_str());
+        return false;
+    }
+    return true;
+}
+
+static PyObject *descriptors_compute(PyObject *self, PyObject *args)
+{
     auto start = std::chrono::steady_clock::now();
-    std::chrono::duration<double> timeFromStart;
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Parsing arguments ..." << std::endl;
     // parse args
     PyObject *pyTimestepDictionary;
     PyObject *pyPbcDictionary;
@@ -17,8 +147,6 @@ static PyObject *descriptors_compute(PyObject *self, PyObject *args)
         return Py_BuildValue("d", 1);
     }
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Parsing pbc ..." << std::endl;
     // parse pbc for each timestep in pbcDictionary
     std::map<int, std::vector<double>> pbcMap; // {timestepId:[pbcX, pbcY, pbcZ]}
     PyObject *pyTimestepId = PyDict_Keys(pyPbcDictionary);
@@ -30,20 +158,36 @@ static PyObject *descriptors_compute(PyObject *self, PyObject *args)
         long int idOfTimestep{PyLong_AsLong(pyTimestepId)};
 
         // get pbc's of this timestep
-        std::vector<double> pbcs = listTupleToVector_Float(PyDict_GetItem(pyPbcDictionary, pyTimestepId));
+        std::vector<double> pbcs;
+        if (!listTupleToVector(PyDict_GetItem(pyPbcDictionary, pyTimestepId), pbcs))
+        {
+            return NULL;
+        }
 
         // add entry to pbcMap
         //pbcMap[idOfTimestep] = pbcs;
         pbcMap.insert(std::make_pair<int, std::vector<double>>(idOfTimestep, std::move(pbcs)));
     }
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Creating Box object ..." << std::endl;
+    // every timestep must have its pbc
+    pyTimestepId = PyDict_Keys(pyTimestepDictionary);
+    pyTimestep = PyDict_Values(pyTimestepDictionary);
+    pos1 = 0;
+    while (PyDict_Next(pyTimestepDictionary, &pos1, &pyTimestepId, &pyTimestep))
+    {
+        long int idOfTimestep{PyLong_AsLong(pyTimestepId)};
+        if (pbcMap.count(idOfTimestep) == 0 || pbcMap[idOfTimestep].size() != 3)
+        {
+            PyErr_Format(PyExc_ValueError, "timestep %ld has no pbc (pbcX, pbcY, pbcZ)", idOfTimestep);
+            return NULL;
+        }
+    }
+
     // create Box object
-    Box box(std::move(pbcMap));
+    Box box(std::move(pbcMap), verletListSkin);
+    box.setNumOfThreads(numOfThreads);
+    box.setHalfLists(halfLists);
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Parsing timestep dictionary ..." << std::endl;
     // parse each timestep in pyTimestepDictionary
     pyTimestepId = PyDict_Keys(pyTimestepDictionary);
     pyTimestep = PyDict_Values(pyTimestepDictionary);
@@ -52,7 +196,6 @@ static PyObject *descriptors_compute(PyObject *self, PyObject *args)
     {
         // get ID of timestep
         long int idOfTimestep{PyLong_AsLong(pyTimestepId)};
-        box.addTimestep(idOfTimestep);
 
         // get atoms in timestep
         PyObject *pyAtoms;
@@ -60,6 +203,7 @@ static PyObject *descriptors_compute(PyObject *self, PyObject *args)
         {
             return Py_BuildValue("d", 1);
         }
+        box.addTimestep(idOfTimestep, PyDict_Size(pyAtoms));
 
         // parse each atom in atoms
         PyObject *pyAtomId = PyDict_Keys(pyAtoms);
@@ -69,30 +213,35 @@ static PyObject *descriptors_compute(PyObject *self, PyObject *args)
         {
             // get current id and coordinates of current atom
             long int idOfAtom = PyLong_AsLong(pyAtomId);
-            std::vector<double> coordinates = listTupleToVector_Float(PyDict_GetItem(pyAtoms, pyAtomId));
+            std::vector<double> coordinates;
+            if (!listTupleToVector(PyDict_GetItem(pyAtoms, pyAtomId), coordinates))
+            {
+                return NULL;
+            }
+            if (coordinates.size() != 3)
+            {
+                PyErr_Format(PyExc_ValueError, "atom %ld of timestep %ld must have coordinates (x, y, z)",
+                             idOfAtom, idOfTimestep);
+                return NULL;
+            }
 
             // add atom to box (and to correct timestep)
             box.addAtomToTimestep(idOfTimestep, idOfAtom, coordinates.at(0), coordinates.at(1), coordinates.at(2));
         }
     }
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Creating Verlet lists ..." << std::endl;
-    // create Verlet lists
-    box.createVerletLists();
-    // std::cout << "Number of atoms in Box: " << box.getNumOfAtoms() << std::endl;
-    // int atomIndex{box.getTimestepAtomsId(box.getTimestepsId().at(0)).at(0)};
-    // std::cout << "Number of atoms in Verlet list of atom #" << atomIndex << ": "
-            //   << box.getNumOfAtomsInVerletList(atomIndex) << std::endl;
+    double parsingTime{secondsSince(start)};
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Calculating descriptors ..." << std::endl;
-    // calculate descriptors for each atom
-    box.calculateDescriptors();
+    // create Verlet lists and calculate descriptors for each atom (no Python object is used until
+    // the result is created, so GIL is released)
+    if (!calculateWithoutGil(box))
+    {
+        return NULL;
+    }
+    storeStatistics(box);
+
+    auto marshallingStart = std::chrono::steady_clock::now();
 
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Creating result object ..." << std::endl;
-    
     // create Python dictionary that will be passed back to Python script
     PyObject *pyResult = PyDict_New();
     std::vector<int> timestepsId{box.getTimestepsId()};
@@ -102,11 +251,15 @@ static PyObject *descriptors_compute(PyObject *self, PyObject *args)
     {
         PyObject *pyTimestepDict = PyDict_New();
 
-        std::vector<int> atomsId{box.getTimestepAtomsId(timestepId)};
+        const std::vector<int> &atomsId{box.getTimestepAtomsId(timestepId)};
+        const std::vector<double> &timestepDescriptors{box.getTimestepDescriptors(timestepId)};
+        int numOfDescriptors{box.getNumOfDescriptors()};
 
-        for (int atomId : atomsId)
+        for (size_t index = 0; index < atomsId.size(); index++)
         {
-            std::vector<double> atomDescriptors{box.getAtomDescriptors(timestepId, atomId)};
+            int atomId{atomsId[index]};
+            std::vector<double> atomDescriptors(timestepDescriptors.begin() + index * numOfDescriptors,
+                                                timestepDescriptors.begin() + (index + 1) * numOfDescriptors);
 
             // prepare id and descriptors of atom
             PyObject *pyId = Py_BuildValue("i", atomId);
@@ -125,10 +278,469 @@ static PyObject *descriptors_compute(PyObject *self, PyObject *args)
             return Py_BuildValue("d", 2);
         }
     }
-    timeFromStart = std::chrono::steady_clock::now() - start;
-    // std::cout << timeFromStart.count() << "s - Ending ..." << std::endl;
-    // std::cout << std::endl;
+    storeProfile(parsingTime, secondsSince(marshallingStart), secondsSince(start));
 
     // return a Python dictionary {timestepId: {atom_id:descriptors}}
     return pyResult;
 }
+
+static PyObject *descriptors_compute_array(PyObject *self, PyObject *args)
+{
+    auto start = std::chrono::steady_clock::now();
+
+    // parse args
+    PyObject *pyPositions;
+    PyObject *pyBox;
+    PyObject *pyOut;
+    if (!PyArg_ParseTuple(args, "OOO", &pyPositions, &pyBox, &pyOut))
+    {
+        return NULL;
+    }
+
+    Py_buffer positionsBuffer, boxBuffer, outBuffer;
+    if (!getDoubleBuffer(pyPositions, &positionsBuffer, false, "positions"))
+    {
+        return NULL;
+    }
+    if (!getDoubleBuffer(pyBox, &boxBuffer, false, "box"))
+    {
+        PyBuffer_Release(&positionsBuffer);
+        return NULL;
+    }
+    if (!getDoubleBuffer(pyOut, &outBuffer, true, "out"))
+    {
+        PyBuffer_Release(&positionsBuffer);
+        PyBuffer_Release(&boxBuffer);
+        return NULL;
+    }
+
+    // check shapes of arrays
+    Py_ssize_t numOfFrames{positionsBuffer.ndim == 3 ? positionsBuffer.shape[0] : 1};
+    Py_ssize_t numOfAtoms{positionsBuffer.ndim >= 2 ? positionsBuffer.shape[positionsBuffer.ndim - 2] : 0};
+    Py_ssize_t numOfBoxes{boxBuffer.len / (Py_ssize_t)sizeof(double) / 3};
+
+    // empty Box is created only to get the number of descriptors
+    Box parameters(std::map<int, std::vector<double>>{});
+    Py_ssize_t numOfDescriptors = parameters.getNumOfDescriptors();
+
+    const char *error{NULL};
+    if ((positionsBuffer.ndim != 2 && positionsBuffer.ndim != 3) || positionsBuffer.shape[positionsBuffer.ndim - 1] != 3)
+    {
+        error = "positions must have shape [frames, atoms, 3] or [atoms, 3]";
+    }
+    else if (boxBuffer.len != 3 * (Py_ssize_t)sizeof(double) && numOfBoxes != numOfFrames)
+    {
+        error = "box must have shape [frames, 3] or [3]";
+    }
+    else if (outBuffer.len != numOfFrames * numOfAtoms * numOfDescriptors * (Py_ssize_t)sizeof(double))
+    {
+        error = "out must have shape [frames, atoms, number_of_descriptors]";
+    }
+    if (error != NULL)
+    {
+        PyErr_SetString(PyExc_ValueError, error);
+        PyBuffer_Release(&positionsBuffer);
+        PyBuffer_Release(&boxBuffer);
+        PyBuffer_Release(&outBuffer);
+        return NULL;
+    }
+
+    const double *positionsData = static_cast<const double *>(positionsBuffer.buf);
+    const double *boxData = static_cast<const double *>(boxBuffer.buf);
+    double *outData = static_cast<double *>(outBuffer.buf);
+
+    double parsingTime{0.0}, marshallingTime{0.0};
+    if (numOfFrames > 0 && numOfAtoms > 0)
+    {
+        // frames are numbered 0, 1, ... and atoms by their index in the arrays
+        std::map<int, std::vector<double>> pbcMap;
+        for (Py_ssize_t frame = 0; frame < numOfFrames; frame++)
+        {
+            const double *frameBox = numOfBoxes == numOfFrames ? boxData + 3 * frame : boxData;
+            pbcMap.insert(std::make_pair(frame, std::vector<double>{frameBox[0], frameBox[1], frameBox[2]}));
+        }
+        Box box(std::move(pbcMap), verletListSkin);
+        box.setNumOfThreads(numOfThreads);
+        box.setHalfLists(halfLists);
+
+        for (Py_ssize_t frame = 0; frame < numOfFrames; frame++)
+        {
+            box.addTimestep(frame, numOfAtoms);
+            const double *framePositions = positionsData + 3 * numOfAtoms * frame;
+            for (Py_ssize_t atom = 0; atom < numOfAtoms; atom++)
+            {
+                box.addAtomToTimestep(frame, atom, framePositions[3 * atom],
+                                      framePositions[3 * atom + 1], framePositions[3 * atom + 2]);
+            }
+        }
+
+        parsingTime = secondsSince(start);
+
+        // no Python object is used while descriptors are calculated, so GIL is released
+        if (!calculateWithoutGil(box))
+        {
+            PyBuffer_Release(&positionsBuffer);
+            PyBuffer_Release(&boxBuffer);
+            PyBuffer_Release(&outBuffer);
+            return NULL;
+        }
+        storeStatistics(box);
+
+        // copy descriptors to output array (atoms of timestep are stored in the same order)
+        auto marshallingStart = std::chrono::steady_clock::now();
+        for (Py_ssize_t frame = 0; frame < numOfFrames; frame++)
+        {
+            const std::vector<double> &frameDescriptors{box.getTimestepDescriptors(frame)};
+            std::copy(frameDescriptors.begin(), frameDescriptors.end(), outData + numOfDescriptors * numOfAtoms * frame);
+        }
+        marshallingTime = secondsSince(marshallingStart);
+    }
+
+    PyBuffer_Release(&positionsBuffer);
+    PyBuffer_Release(&boxBuffer);
+    PyBuffer_Release(&outBuffer);
+    storeProfile(parsingTime, marshallingTime, secondsSince(start));
+
+    // return the output array
+    Py_INCREF(pyOut);
+    return pyOut;
+}
+
+static PyObject *descriptors_parameters(PyObject *self, PyObject *args)
+{
+    // parameters are set in constructor of Box
+    Box box(std::map<int, std::vector<double>>{}, verletListSkin);
+
+    PyObject *pyG2Parameters = PyList_New(0);
+    for (const std::vector<double> &parameters : box.getG2FunctionParameters())
+    {
+        PyObject *pyParameters = vectorToTuple_Float(parameters);
+        PyList_Append(pyG2Parameters, pyParameters);
+        Py_DECREF(pyParameters);
+    }
+
+    PyObject *pySteinhardtParameters = PyList_New(0);
+    for (int l : box.getSteinhardtFunctionParameters())
+    {
+        PyObject *pyL = PyLong_FromLong(l);
+        PyList_Append(pySteinhardtParameters, pyL);
+        Py_DECREF(pyL);
+    }
+
+    int numOfDescriptors = box.getNumOfDescriptors();
+
+    // return a Python dictionary with all parameters
+    return Py_BuildValue("{s:d,s:d,s:(dd),s:(dd),s:N,s:N,s:N,s:i}",
+                         "verlet_cutoff", box.getRVerletListLimit(),
+                         "skin", box.getSkin(),
+                         "symmetry_cutoff", box.getRMinSym(), box.getRMaxSym(),
+                         "steinhardt_cutoff", box.getRMinStein(), box.getRMaxStein(),
+                         "g2_parameters", pyG2Parameters,
+                         "g3_parameters", vectorToTuple_Float(box.getG3FunctionParameters()),
+                         "steinhardt_parameters", pySteinhardtParameters,
+                         "number_of_descriptors", numOfDescriptors);
+}
+
+static PyObject *descriptors_set_skin(PyObject *self, PyObject *args)
+{
+    double skin;
+    if (!PyArg_ParseTuple(args, "d", &skin))
+    {
+        return NULL;
+    }
+    if (!(skin >= 0.0))
+    {
+        PyErr_SetString(PyExc_ValueError, "skin must be a non-negative number");
+        return NULL;
+    }
+    verletListSkin = skin;
+    Py_RETURN_NONE;
+}
+
+static PyObject *descriptors_set_num_threads(PyObject *self, PyObject *args)
+{
+    int threads;
+    if (!PyArg_ParseTuple(args, "i", &threads))
+    {
+        return NULL;
+    }
+    if (threads < 1)
+    {
+        PyErr_SetString(PyExc_ValueError, "number of threads must be a positive integer");
+        return NULL;
+    }
+    numOfThreads = threads;
+    Py_RETURN_NONE;
+}
+
+static PyObject *descriptors_get_num_threads(PyObject *self, PyObject *args)
+{
+    return PyLong_FromLong(numOfThreads);
+}
+
+static PyObject *descriptors_set_half_lists(PyObject *self, PyObject *args)
+{
+    int enabled;
+    if (!PyArg_ParseTuple(args, "p", &enabled))
+    {
+        return NULL;
+    }
+    halfLists = enabled;
+    Py_RETURN_NONE;
+}
+
+static PyObject *descriptors_set_profiling(PyObject *self, PyObject *args)
+{
+    int enabled;
+    if (!PyArg_ParseTuple(args, "p", &enabled))
+    {
+        return NULL;
+    }
+    profiling = enabled;
+    Py_RETURN_NONE;
+}
+
+static PyObject *descriptors_profile(PyObject *self, PyObject *args)
+{
+    if (!lastProfiled)
+    {
+        Py_RETURN_NONE;
+    }
+
+    // each pair of atoms is in Verlet lists of both atoms
+    return Py_BuildValue("{s:d,s:d,s:d,s:d,s:d,s:d,s:d,s:i,s:L,s:L,s:L,s:L}",
+                         "parsing_time", lastParsingTime,
+                         "verlet_list_time", lastVerletListTime,
+                         "descriptors_time", lastDescriptorsTime,
+                         "symmetry_functions_time", lastSymmetryFunctionsTime,
+                         "steinhardt_time", lastSteinhardtTime,
+                         "marshalling_time", lastMarshallingTime,
+                         "total_time", lastTotalTime,
+                         "timesteps", lastNumOfTimesteps,
+                         "atoms", lastNumOfAtoms,
+                         "pairs", lastNumOfNeighbours / 2,
+                         "neighbours", lastNumOfNeighbours,
+                         "steinhardt_neighbours", lastNumOfSteinhardtNeighbours);
+}
+
+static PyObject *descriptors_statistics(PyObject *self, PyObject *args)
+{
+    return Py_BuildValue("{s:d,s:i,s:N,s:N,s:s,s:i,s:i,s:d,s:d,s:d,s:d,s:d}",
+                         "skin", verletListSkin,
+                         "threads", numOfThreads,
+                         "half_lists", PyBool_FromLong(halfLists),
+                         "profiling", PyBool_FromLong(profiling),
+                         "instruction_set", RadialKernel::getInstructionSetName(RadialKernel::getInstructionSet()).c_str(),
+                         "timesteps", lastNumOfTimesteps,
+                         "verlet_list_builds", lastNumOfVerletListBuilds,
+                         "verlet_list_time", lastVerletListTime,
+                         "descriptors_time", lastDescriptorsTime,
+                         "symmetry_functions_time", lastSymmetryFunctionsTime,
+                         "steinhardt_time", lastSteinhardtTime,
+                         "max_displacement", lastMaxDisplacement);
+}
+
+static int descriptors_engine_init(EngineObject *self, PyObject *args, PyObject *kwargs)
+{
+    // settings of module are used unless they are given
+    static const char *keywords[] = {"skin", "threads", "half_lists", NULL};
+    double skin{verletListSkin};
+    int threads{numOfThreads};
+    int enabled{halfLists};
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|$dip", const_cast<char **>(keywords), &skin, &threads, &enabled))
+    {
+        return -1;
+    }
+    if (!(skin >= 0.0))
+    {
+        PyErr_SetString(PyExc_ValueError, "skin must be a non-negative number");
+        return -1;
+    }
+    if (threads < 1)
+    {
+        PyErr_SetString(PyExc_ValueError, "number of threads must be a positive integer");
+        return -1;
+    }
+    if (self->busy)
+    {
+        PyErr_SetString(PyExc_RuntimeError, "Engine is updating a frame");
+        return -1;
+    }
+
+    delete self->engine;
+    self->engine = new Engine(skin);
+    self->engine->setNumOfThreads(threads);
+    self->engine->setHalfLists(enabled);
+    Py_CLEAR(self->out);
+    return 0;
+}
+
+static void descriptors_engine_dealloc(EngineObject *self)
+{
+    PyTypeObject *type = Py_TYPE(self);
+    delete self->engine;
+    Py_XDECREF(self->out);
+    type->tp_free(reinterpret_cast<PyObject *>(self));
+    Py_DECREF(type);
+}
+
+static PyObject *descriptors_engine_update(EngineObject *self, PyObject *args, PyObject *kwargs)
+{
+    // parse args
+    static const char *keywords[] = {"positions", "box", "out", NULL};
+    PyObject *pyPositions;
+    PyObject *pyBox;
+    PyObject *pyOut = Py_None;
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OO|O", const_cast<char **>(keywords), &pyPositions, &pyBox, &pyOut))
+    {
+        return NULL;
+    }
+    if (self->engine == NULL || self->busy)
+    {
+        PyErr_SetString(PyExc_RuntimeError, self->engine == NULL ? "Engine is not initialized" : "Engine is updating another frame");
+        return NULL;
+    }
+
+    Py_buffer positionsBuffer, boxBuffer, outBuffer;
+    if (!getDoubleBuffer(pyPositions, &positionsBuffer, false, "positions"))
+    {
+        return NULL;
+    }
+    if (!getDoubleBuffer(pyBox, &boxBuffer, false, "box"))
+    {
+        PyBuffer_Release(&positionsBuffer);
+        return NULL;
+    }
+
+    // check shapes of arrays
+    Py_ssize_t numOfAtoms{positionsBuffer.ndim == 2 ? positionsBuffer.shape[0] : 0};
+    Py_ssize_t numOfDescriptors = self->engine->getNumOfDescriptors();
+    Py_ssize_t outSize{numOfAtoms * numOfDescriptors * (Py_ssize_t)sizeof(double)};
+    const char *error{NULL};
+    if (positionsBuffer.ndim != 2 || positionsBuffer.shape[1] != 3 || numOfAtoms > std::numeric_limits<int>::max())
+    {
+        error = "positions must have shape [atoms, 3]";
+    }
+    else if (boxBuffer.len != 3 * (Py_ssize_t)sizeof(double))
+    {
+        error = "box must have shape [3]";
+    }
+    if (error != NULL)
+    {
+        PyErr_SetString(PyExc_ValueError, error);
+        PyBuffer_Release(&positionsBuffer);
+        PyBuffer_Release(&boxBuffer);
+        return NULL;
+    }
+
+    // descriptors are written to given array or to buffer of Engine
+    double *outData;
+    if (pyOut != Py_None)
+    {
+        if (!getDoubleBuffer(pyOut, &outBuffer, true, "out"))
+        {
+            PyBuffer_Release(&positionsBuffer);
+            PyBuffer_Release(&boxBuffer);
+            return NULL;
+        }
+        if (outBuffer.len != outSize)
+        {
+            PyErr_SetString(PyExc_ValueError, "out must have shape [atoms, number_of_descriptors]");
+            PyBuffer_Release(&positionsBuffer);
+            PyBuffer_Release(&boxBuffer);
+            PyBuffer_Release(&outBuffer);
+            return NULL;
+        }
+        outData = static_cast<double *>(outBuffer.buf);
+    }
+    else
+    {
+        if (self->out == NULL || PyByteArray_GET_SIZE(self->out) != outSize)
+        {
+            PyObject *out = PyByteArray_FromStringAndSize(NULL, outSize);
+            if (out == NULL)
+            {
+                PyBuffer_Release(&positionsBuffer);
+                PyBuffer_Release(&boxBuffer);
+                return NULL;
+            }
+            Py_XSETREF(self->out, out);
+        }
+        outData = reinterpret_cast<double *>(PyByteArray_AS_STRING(self->out));
+    }
+
+    // no Python object is used while descriptors are calculated, so GIL is released
+    std::string exception;
+    self->busy = true;
+    Py_BEGIN_ALLOW_THREADS
+    try
+    {
+        self->engine->update(static_cast<const double *>(positionsBuffer.buf), static_cast<int>(numOfAtoms),
+                             static_cast<const double *>(boxBuffer.buf), outData);
+    }
+    catch (const std::exception &e)
+    {
+        exception = e.what();
+    }
+    Py_END_ALLOW_THREADS
+    self->busy = false;
+
+    PyBuffer_Release(&positionsBuffer);
+    PyBuffer_Release(&boxBuffer);
+    if (pyOut != Py_None)
+    {
+        PyBuffer_Release(&outBuffer);
+    }
+    if (!exception.empty())
+    {
+        PyErr_SetString(PyExc_RuntimeError, exception.c_str());
+        return NULL;
+    }
+
+    // return the output array, or view [atoms, number_of_descriptors] of buffer of Engine
+    if (pyOut != Py_None)
+    {
+        Py_INCREF(pyOut);
+        return pyOut;
+    }
+    PyObject *view = PyMemoryView_FromObject(self->out);
+    if (view == NULL)
+    {
+        return NULL;
+    }
+    // memoryview cannot have zero in its shape, empty frame gives empty view of float64
+    PyObject *result = numOfAtoms > 0 ? PyObject_CallMethod(view, "cast", "s(nn)", "d", numOfAtoms, numOfDescriptors)
+                                      : PyObject_CallMethod(view, "cast", "s", "d");
+    Py_DECREF(view);
+    return result;
+}
+
+static PyObject *descriptors_engine_statistics(EngineObject *self, PyObject *args)
+{
+    if (self->engine == NULL || self->busy)
+    {
+        PyErr_SetString(PyExc_RuntimeError, self->engine == NULL ? "Engine is not initialized" : "Engine is updating a frame");
+        return NULL;
+    }
+
+    // times of updates in microseconds, times of Box in seconds (summed over all updates)
+    Engine &engine{*self->engine};
+    Box &box{engine.getBox()};
+    int numOfUpdates{engine.getNumOfUpdates()};
+    return Py_BuildValue("{s:i,s:i,s:d,s:d,s:d,s:i,s:d,s:d,s:d,s:d,s:d,s:d,s:i,s:N,s:s}",
+                         "updates", numOfUpdates,
+                         "atoms", engine.getNumOfAtoms(),
+                         "last_update_us", 1e6 * engine.getLastUpdateTime(),
+                         "mean_update_us", numOfUpdates > 0 ? 1e6 * engine.getTotalUpdateTime() / numOfUpdates : 0.0,
+                         "max_update_us", 1e6 * engine.getMaxUpdateTime(),
+                         "verlet_list_builds", box.getNumOfVerletListBuilds(),
+                         "verlet_list_time", box.getVerletListTime(),
+                         "descriptors_time", box.getDescriptorsTime(),
+                         "symmetry_functions_time", box.getSymmetryFunctionsTime(),
+                         "steinhardt_time", box.getSteinhardtTime(),
+                         "max_displacement", box.getMaxDisplacement(),
+                         "skin", box.getSkin(),
+                         "threads", box.getNumOfThreads(),
+                         "half_lists", PyBool_FromLong(box.getHalfLists()),
+                         "instruction_set", RadialKernel::getInstructionSetName(RadialKernel::getInstructionSet()).c_str());
+}
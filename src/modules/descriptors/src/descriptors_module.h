@@ -12,8 +12,15 @@
 #define DESCRIPTORS_H
 
 #include <iostream>
+#include <algorithm>
+#include <map>
 #include <vector>
 #include <chrono>
+#include <thread>
+#include <limits>
+#include <string>
+#include <new>
+#include <stdexcept>
 
 extern "C"
 {
@@ -22,10 +29,13 @@ extern "C"
 
 #include "descriptors_utility.h"
 #include "descriptors_box.h"
+#include "descriptors_engine.h"
 
 /**
   * Function that computes and returns descriptors for all timesteps of the simulation.
   * This function provides interface between Python and C++ extension.
+  * GIL is released while descriptors are calculated (by several threads).
+  * ValueError is raised if a timestep has no pbc, MemoryError or RuntimeError if the calculation fails.
   * This function is callable from Python script using `descriptors.compute(pbc_x, pbc_y, pbc_y, all_timesteps)`.
   *
   * @param self Module that is calling this function (that's me)
@@ -34,6 +44,204 @@ extern "C"
   */
 static PyObject *descriptors_compute(PyObject *self, PyObject *args);
 
+/**
+  * Function that computes descriptors for positions of atoms given as contiguous arrays.
+  * Arrays are passed using buffer protocol, no Python object is created for any atom.
+  * GIL is released while descriptors are calculated (by several threads).
+  * MemoryError or RuntimeError is raised if the calculation fails.
+  * This function is callable from Python script using `descriptors.compute_array(positions, box, out)`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args Arguments needed for a calculation:
+  *             positions - float64 array [frames, atoms, 3] or [atoms, 3], atom i is the same atom in all frames,
+  *             box - float64 array [frames, 3] or [3] of box lengths (pbcX, pbcY, pbcZ),
+  *             out - writable float64 array [frames, atoms, number_of_descriptors] for results
+  * @returns out Array of descriptors (the same object as out)
+  */
+static PyObject *descriptors_compute_array(PyObject *self, PyObject *args);
+
+/**
+  * Function that returns parameters used in the calculation of descriptors.
+  * This function is callable from Python script using `descriptors.parameters()`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args No arguments
+  * @returns result A Python dictionary {verlet_cutoff, symmetry_cutoff, steinhardt_cutoff,
+  *                 g2_parameters, g3_parameters, steinhardt_parameters, number_of_descriptors}
+  */
+static PyObject *descriptors_parameters(PyObject *self, PyObject *args);
+
+/**
+  * Function that sets skin of Verlet lists used in all following calculations.
+  * Verlet lists contain atoms closer than the largest cutoff plus skin, they are created
+  * again when the largest displacement of atom exceeds half of the skin.
+  * This function is callable from Python script using `descriptors.set_skin(skin)`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args Arguments: skin - non-negative float (in units of positions, default 1.0)
+  * @returns None
+  */
+static PyObject *descriptors_set_skin(PyObject *self, PyObject *args);
+
+/**
+  * Function that sets number of threads calculating descriptors in all following calculations
+  * (default is the number of cores). Results do not depend on the number of threads.
+  * This function is callable from Python script using `descriptors.set_num_threads(num_threads)`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args Arguments: num_threads - positive integer
+  * @returns None
+  */
+static PyObject *descriptors_set_num_threads(PyObject *self, PyObject *args);
+
+/**
+  * Function that returns number of threads calculating descriptors.
+  * This function is callable from Python script using `descriptors.get_num_threads()`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args No arguments
+  * @returns num_threads Integer
+  */
+static PyObject *descriptors_get_num_threads(PyObject *self, PyObject *args);
+
+/**
+  * Function that enables or disables half lists in all following calculations (default disabled):
+  * symmetry functions of each pair of atoms are evaluated once and added to both atoms. Results
+  * are the same, half lists are faster only when RadialKernel is not vectorized.
+  * This function is callable from Python script using `descriptors.set_half_lists(enabled)`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args Arguments: enabled - boolean
+  * @returns None
+  */
+static PyObject *descriptors_set_half_lists(PyObject *self, PyObject *args);
+
+/**
+  * Function that enables or disables profiling of all following calculations (default disabled):
+  * time of each stage (parsing of arguments, creation of Verlet lists, symmetry functions,
+  * Steinhardt parameters, copying of results) and numbers of atoms and neighbours are kept.
+  * This function is callable from Python script using `descriptors.set_profiling(enabled)`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args Arguments: enabled - boolean
+  * @returns None
+  */
+static PyObject *descriptors_set_profiling(PyObject *self, PyObject *args);
+
+/**
+  * Function that returns profile of the last calculation (compute or compute_array), times are in seconds
+  * (symmetry functions and Steinhardt parameters summed over threads, other stages measured by clock).
+  * This function is callable from Python script using `descriptors.profile()`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args No arguments
+  * @returns result A Python dictionary {parsing_time, verlet_list_time, descriptors_time, symmetry_functions_time,
+  *                 steinhardt_time, marshalling_time, total_time, timesteps, atoms, pairs, neighbours,
+  *                 steinhardt_neighbours}, or None if the last calculation was not profiled
+  */
+static PyObject *descriptors_profile(PyObject *self, PyObject *args);
+
+/**
+  * Function that returns statistics of the last calculation (compute or compute_array).
+  * This function is callable from Python script using `descriptors.statistics()`.
+  *
+  * @param self Module that is calling this function (that's me)
+  * @param args No arguments
+  * @returns result A Python dictionary {skin, threads, half_lists, profiling, timesteps, verlet_list_builds, verlet_list_time,
+  *                 descriptors_time, max_displacement}
+  */
+static PyObject *descriptors_statistics(PyObject *self, PyObject *args);
+
+/**
+ * Python object of type descriptors.Engine: calculates descriptors of one frame at a time
+ * and keeps Verlet lists and buffers of C++ Engine between calls.
+ * Items of structure:
+ *    * C++ engine (NULL before __init__),
+ *    * bytearray with descriptors of the last frame returned when no output array is given
+ *      (new bytearray is created when the number of atoms changes, so returned views stay valid),
+ *    * flag of running update (GIL is released, so another thread could call update meanwhile)
+ */
+typedef struct
+{
+  PyObject_HEAD
+  Engine *engine;
+  PyObject *out;
+  bool busy;
+} EngineObject;
+
+/**
+  * Function that initializes Engine. Settings of module (skin, number of threads, half lists) are used
+  * for arguments that are not given. This function is callable from Python script using
+  * `descriptors.Engine(skin=skin, threads=threads, half_lists=half_lists)` (keyword arguments only).
+  *
+  * @param self Engine that is initialized
+  * @param args, kwargs Arguments: skin - non-negative float, threads - positive integer, half_lists - boolean
+  * @returns 0 on success, -1 on error
+  */
+static int descriptors_engine_init(EngineObject *self, PyObject *args, PyObject *kwargs);
+
+/**
+  * Function that deletes C++ engine and output buffer of Engine.
+  *
+  * @param self Engine that is deleted
+  */
+static void descriptors_engine_dealloc(EngineObject *self);
+
+/**
+  * Function that computes descriptors of one frame. Verlet lists and buffers of previous frames are reused.
+  * GIL is released while descriptors are calculated (by several threads).
+  * This function is callable from Python script using `engine.update(positions, box, out=None)`.
+  *
+  * @param self Engine that is calling this function
+  * @param args, kwargs Arguments needed for a calculation:
+  *             positions - float64 array [atoms, 3], atom i is the same atom in all frames,
+  *             box - float64 array [3] of box lengths (pbcX, pbcY, pbcZ),
+  *             out - writable float64 array [atoms, number_of_descriptors] for results (optional)
+  * @returns out Array of descriptors (the same object as out), or memoryview [atoms, number_of_descriptors]
+  *              of buffer owned by Engine (overwritten by the next update) if out is not given
+  */
+static PyObject *descriptors_engine_update(EngineObject *self, PyObject *args, PyObject *kwargs);
+
+/**
+  * Function that returns statistics of all updates of Engine.
+  * This function is callable from Python script using `engine.statistics()`.
+  *
+  * @param self Engine that is calling this function
+  * @param args No arguments
+  * @returns result A Python dictionary {updates, atoms, last_update_us, mean_update_us, max_update_us,
+  *                 verlet_list_builds, verlet_list_time, descriptors_time, symmetry_functions_time,
+  *                 steinhardt_time, max_displacement, skin, threads, half_lists, instruction_set}
+  */
+static PyObject *descriptors_engine_statistics(EngineObject *self, PyObject *args);
+
+/**
+ * PyMethodDef list that defines methods of Engine that can be called from Python.
+ */
+static PyMethodDef descriptors_engine_methods[] = {
+    {"update", (PyCFunction)(void (*)(void))descriptors_engine_update, METH_VARARGS | METH_KEYWORDS,
+     "Computes descriptors of one frame, Verlet lists of previous frames are reused. "
+     "Callable from Python script using `engine.update(positions, box, out=None)`."},
+    {"statistics", (PyCFunction)descriptors_engine_statistics, METH_NOARGS,
+     "Returns statistics of all updates (number of updates, time of update in microseconds). "
+     "Callable from Python script using `engine.statistics()`."},
+    {NULL, NULL, 0, NULL}};
+
+/**
+ * Slots and specification of type descriptors.Engine (created in initialization function of module)
+ */
+static PyType_Slot descriptors_engine_slots[] = {
+    {Py_tp_doc, (void *)"Engine(*, skin, threads, half_lists) calculates descriptors of one frame at a time, "
+                        "Verlet lists and buffers are kept between frames (settings of module are used "
+                        "for arguments that are not given)."},
+    {Py_tp_new, (void *)PyType_GenericNew},
+    {Py_tp_init, (void *)descriptors_engine_init},
+    {Py_tp_dealloc, (void *)descriptors_engine_dealloc},
+    {Py_tp_methods, descriptors_engine_methods},
+    {0, NULL}};
+
+static PyType_Spec descriptors_engine_spec = {
+    "descriptors.Engine", sizeof(EngineObject), 0, Py_TPFLAGS_DEFAULT, descriptors_engine_slots};
+
 /**
  * PyMethodDef list that defines methods that can be called from Python.
  * Each method must be defined as:
@@ -43,6 +251,33 @@ static PyMethodDef descriptors_methods[] = {
     {"compute", descriptors_compute, METH_VARARGS,
      "Computes descriptors for given timesteps. Callable from Python script "
      "using `descriptors.compute(pbc_x, pbc_y, pbc_y, all_timesteps)`."},
+    {"compute_array", descriptors_compute_array, METH_VARARGS,
+     "Computes descriptors for positions of atoms given as arrays. Callable from Python script "
+     "using `descriptors.compute_array(positions, box, out)`."},
+    {"parameters", descriptors_parameters, METH_NOARGS,
+     "Returns parameters of descriptors (cutoffs, parameters of G2, G3 and Steinhardt functions). "
+     "Callable from Python script using `descriptors.parameters()`."},
+    {"set_skin", descriptors_set_skin, METH_VARARGS,
+     "Sets skin of Verlet lists (default 1.0). Callable from Python script "
+     "using `descriptors.set_skin(skin)`."},
+    {"set_num_threads", descriptors_set_num_threads, METH_VARARGS,
+     "Sets number of threads calculating descriptors (default is the number of cores). "
+     "Callable from Python script using `descriptors.set_num_threads(num_threads)`."},
+    {"get_num_threads", descriptors_get_num_threads, METH_NOARGS,
+     "Returns number of threads calculating descriptors. "
+     "Callable from Python script using `descriptors.get_num_threads()`."},
+    {"set_half_lists", descriptors_set_half_lists, METH_VARARGS,
+     "Evaluates symmetry functions once for each pair of atoms (default False). "
+     "Callable from Python script using `descriptors.set_half_lists(enabled)`."},
+    {"set_profiling", descriptors_set_profiling, METH_VARARGS,
+     "Keeps time of each stage of the following calculations (default False). "
+     "Callable from Python script using `descriptors.set_profiling(enabled)`."},
+    {"profile", descriptors_profile, METH_NOARGS,
+     "Returns time of stages and numbers of atoms and neighbours of the last calculation (None if not profiled). "
+     "Callable from Python script using `descriptors.profile()`."},
+    {"statistics", descriptors_statistics, METH_NOARGS,
+     "Returns statistics of the last calculation (number and time of creations of Verlet lists). "
+     "Callable from Python script using `descriptors.statistics()`."},
     {NULL, NULL, 0, NULL}};
 
 /**
@@ -59,11 +294,23 @@ static struct PyModuleDef descriptors = {
     PyModuleDef_HEAD_INIT, "descriptors", NULL, -1, descriptors_methods};
 
 /**
- * Initialization function of C++ extension for Python
+ * Initialization function of C++ extension for Python (module with type Engine)
  */
 PyMODINIT_FUNC PyInit_descriptors(void)
 {
-  return PyModule_Create(&descriptors);
+  PyObject *module = PyModule_Create(&descriptors);
+  if (module == NULL)
+  {
+    return NULL;
+  }
+  PyObject *engineType = PyType_FromSpec(&descriptors_engine_spec);
+  if (engineType == NULL || PyModule_AddObject(module, "Engine", engineType) < 0)
+  {
+    Py_XDECREF(engineType);
+    Py_DECREF(module);
+    return NULL;
+  }
+  return module;
 }
 
 #endif // DESCRIPTORS_H
\ No newline at end of file
@@ -0,0 +1,302 @@
+#include "descriptors_radial_kernel.h"
+
+// vectorized versions are compiled for x86 by GCC and Clang (target attributes, CPU detection)
+#if (defined(__GNUC__) || defined(__clang__)) && (defined(__x86_64__) || defined(__i386__))
+#define DESCRIPTORS_RADIAL_KERNEL_X86
+#endif
+
+namespace
+{
+// the largest number of G2 and G3 functions evaluated by vectorized versions
+const int maxNumOfFunctions{RadialKernel::maxNumOfFunctions};
+
+void evaluateTermsScalar(const double *distances,
+                         int numOfDistances,
+                         const double rMin,
+                         const double rMax,
+                         const std::vector<std::vector<double>> &g2FunctionParameters,
+                         const std::vector<double> &g3FunctionParameters,
+                         double *terms)
+{
+    // the same operations as Atom::fcFunction and the former loop over neighbours
+    for (int i = 0; i < numOfDistances; i++)
+    {
+        double r_ij{distances[i]};
+        double fcValue{r_ij <= rMin ? 1.0 : (r_ij <= rMax ? 0.5 + 0.5 * cos(M_PI * (r_ij - rMin) / (rMax - rMin)) : 0.0)};
+
+        int descriptor{0};
+        for (const std::vector<double> &params : g2FunctionParameters)
+        {
+            terms[descriptor * RadialKernel::blockSize + i] = fcValue * exp(-params[0] * pow(r_ij - params[1], 2));
+            descriptor++;
+        }
+        for (const double &param : g3FunctionParameters)
+        {
+            terms[descriptor * RadialKernel::blockSize + i] = fcValue * cos(param * r_ij);
+            descriptor++;
+        }
+    }
+}
+
+#ifdef DESCRIPTORS_RADIAL_KERNEL_X86
+// body of vectorized versions, inlined into functions compiled for each instruction set
+__attribute__((always_inline)) inline void evaluateTermsVectorized(const double *distances,
+                                                                   int numOfDistances,
+                                                                   const double rMin,
+                                                                   const double rMax,
+                                                                   const double *eta,
+                                                                   const double *rs,
+                                                                   int numOfG2,
+                                                                   const double *kappa,
+                                                                   int numOfG3,
+                                                                   double *terms)
+{
+    alignas(64) double fc[RadialKernel::blockSize];
+    for (int i = 0; i < numOfDistances; i++)
+    {
+        double r{distances[i]};
+        double value{0.5 + 0.5 * RadialKernel::cosFunction(M_PI * (r - rMin) / (rMax - rMin))};
+        // 1 for r <= rMin, value for rMin < r <= rMax, 0 for r > rMax
+        double inside{RadialKernel::selectByMask(RadialKernel::negativeMask(rMax - r), 0.0, value)};
+        fc[i] = RadialKernel::selectByMask(RadialKernel::negativeMask(rMin - r), inside, 1.0);
+    }
+
+    for (int g2 = 0; g2 < numOfG2; g2++)
+    {
+        double *g2Terms{terms + g2 * RadialKernel::blockSize};
+        for (int i = 0; i < numOfDistances; i++)
+        {
+            double difference{distances[i] - rs[g2]};
+            g2Terms[i] = fc[i] * RadialKernel::expFunction(-eta[g2] * (difference * difference));
+        }
+    }
+    for (int g3 = 0; g3 < numOfG3; g3++)
+    {
+        double *g3Terms{terms + (numOfG2 + g3) * RadialKernel::blockSize};
+        for (int i = 0; i < numOfDistances; i++)
+        {
+            g3Terms[i] = fc[i] * RadialKernel::cosFunction(kappa[g3] * distances[i]);
+        }
+    }
+}
+
+__attribute__((target("avx2,fma"))) void evaluateTermsAvx2(const double *distances,
+                                                            int numOfDistances,
+                                                            const double rMin,
+                                                            const double rMax,
+                                                            const double *eta,
+                                                            const double *rs,
+                                                            int numOfG2,
+                                                            const double *kappa,
+                                                            int numOfG3,
+                                                            double *terms)
+{
+    evaluateTermsVectorized(distances, numOfDistances, rMin, rMax, eta, rs, numOfG2, kappa, numOfG3, terms);
+}
+
+__attribute__((target("avx512f,avx512dq"))) void evaluateTermsAvx512(const double *distances,
+                                                                      int numOfDistances,
+                                                                      const double rMin,
+                                                                      const double rMax,
+                                                                      const double *eta,
+                                                                      const double *rs,
+                                                                      int numOfG2,
+                                                                      const double *kappa,
+                                                                      int numOfG3,
+                                                                      double *terms)
+{
+    evaluateTermsVectorized(distances, numOfDistances, rMin, rMax, eta, rs, numOfG2, kappa, numOfG3, terms);
+}
+#endif
+
+// vectorized versions are used for these parameters
+bool isVectorized(RadialKernel::InstructionSet instructionSet, int numOfFunctions)
+{
+    return instructionSet != RadialKernel::scalar && numOfFunctions <= maxNumOfFunctions;
+}
+} // namespace
+
+void RadialKernel::evaluate(double *distances,
+                            int numOfDistances,
+                            const double rMin,
+                            const double rMax,
+                            const std::vector<std::vector<double>> &g2FunctionParameters,
+                            const std::vector<double> &g3FunctionParameters,
+                            double *descriptors)
+{
+    alignas(64) double terms[maxNumOfFunctions * blockSize];
+    int numOfFunctions{static_cast<int>(g2FunctionParameters.size() + g3FunctionParameters.size())};
+    if (numOfFunctions > maxNumOfFunctions)
+    {
+        // too many functions for terms on stack, contributions are added one by one
+        for (int i = 0; i < numOfDistances; i++)
+        {
+            evaluateTermsScalar(distances + i, 1, rMin, rMax, g2FunctionParameters, g3FunctionParameters, terms);
+            for (int function = 0; function < numOfFunctions; function++)
+            {
+                descriptors[function] += terms[function * blockSize];
+            }
+        }
+        return;
+    }
+    evaluateTerms(distances, numOfDistances, rMin, rMax, g2FunctionParameters, g3FunctionParameters, terms);
+    addTerms(terms, numOfDistances, numOfFunctions, descriptors);
+}
+
+void RadialKernel::evaluateTerms(double *distances,
+                                 int numOfDistances,
+                                 const double rMin,
+                                 const double rMax,
+                                 const std::vector<std::vector<double>> &g2FunctionParameters,
+                                 const std::vector<double> &g3FunctionParameters,
+                                 double *terms)
+{
+    InstructionSet instructionSet{getInstructionSet()};
+    int numOfG2{static_cast<int>(g2FunctionParameters.size())};
+    int numOfG3{static_cast<int>(g3FunctionParameters.size())};
+    if (!isVectorized(instructionSet, numOfG2 + numOfG3))
+    {
+        evaluateTermsScalar(distances, numOfDistances, rMin, rMax, g2FunctionParameters, g3FunctionParameters, terms);
+        return;
+    }
+
+#ifdef DESCRIPTORS_RADIAL_KERNEL_X86
+    // parameters are read from contiguous arrays
+    double eta[maxNumOfFunctions], rs[maxNumOfFunctions], kappa[maxNumOfFunctions];
+    for (int g2 = 0; g2 < numOfG2; g2++)
+    {
+        eta[g2] = g2FunctionParameters[g2][0];
+        rs[g2] = g2FunctionParameters[g2][1];
+    }
+    for (int g3 = 0; g3 < numOfG3; g3++)
+    {
+        kappa[g3] = g3FunctionParameters[g3];
+    }
+
+    // distances beyond the cutoff (fc = 0) fill the last vector
+    int numOfPaddedDistances{(numOfDistances + lanes - 1) / lanes * lanes};
+    for (int i = numOfDistances; i < numOfPaddedDistances; i++)
+    {
+        distances[i] = rMax + 1.0;
+    }
+
+    if (instructionSet == avx512)
+    {
+        evaluateTermsAvx512(distances, numOfPaddedDistances, rMin, rMax, eta, rs, numOfG2, kappa, numOfG3, terms);
+    }
+    else
+    {
+        evaluateTermsAvx2(distances, numOfPaddedDistances, rMin, rMax, eta, rs, numOfG2, kappa, numOfG3, terms);
+    }
+#endif
+}
+
+void RadialKernel::addTerms(double *terms,
+                            int numOfDistances,
+                            int numOfFunctions,
+                            double *descriptors)
+{
+    if (!isVectorized(getInstructionSet(), numOfFunctions))
+    {
+        // one term after another (the same order as in the former loop over neighbours)
+        for (int function = 0; function < numOfFunctions; function++)
+        {
+            for (int i = 0; i < numOfDistances; i++)
+            {
+                descriptors[function] += terms[function * blockSize + i];
+            }
+        }
+        return;
+    }
+
+    // every lane has its own partial sum, so compiler vectorizes the loop over lanes without -ffast-math
+    int numOfPaddedDistances{(numOfDistances + lanes - 1) / lanes * lanes};
+    for (int function = 0; function < numOfFunctions; function++)
+    {
+        double *functionTerms{terms + function * blockSize};
+        for (int i = numOfDistances; i < numOfPaddedDistances; i++)
+        {
+            functionTerms[i] = 0.0;
+        }
+
+        alignas(64) double partial[lanes] = {};
+        for (int i = 0; i < numOfPaddedDistances; i += lanes)
+        {
+            for (int lane = 0; lane < lanes; lane++)
+            {
+                partial[lane] += functionTerms[i + lane];
+            }
+        }
+
+        double sum{0.0};
+        for (int lane = 0; lane < lanes; lane++)
+        {
+            sum += partial[lane];
+        }
+        descriptors[function] += sum;
+    }
+}
+
+bool RadialKernel::isSupported(InstructionSet instructionSet)
+{
+#ifdef DESCRIPTORS_RADIAL_KERNEL_X86
+    __builtin_cpu_init();
+    switch (instructionSet)
+    {
+    case avx512:
+        return __builtin_cpu_supports("avx512f") && __builtin_cpu_supports("avx512dq");
+    case avx2:
+        return __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma");
+    default:
+        return instructionSet == scalar;
+    }
+#else
+    return instructionSet == scalar;
+#endif
+}
+
+RadialKernel::InstructionSet RadialKernel::bestInstructionSet()
+{
+    for (InstructionSet instructionSet : {avx512, avx2})
+    {
+        if (isSupported(instructionSet))
+        {
+            return instructionSet;
+        }
+    }
+    return scalar;
+}
+
+RadialKernel::InstructionSet &RadialKernel::selectedInstructionSet()
+{
+    // CPU is checked once, at the first use
+    static InstructionSet instructionSet{bestInstructionSet()};
+    return instructionSet;
+}
+
+RadialKernel::InstructionSet RadialKernel::getInstructionSet()
+{
+    return selectedInstructionSet();
+}
+
+void RadialKernel::setInstructionSet(InstructionSet instructionSet)
+{
+    if (!isSupported(instructionSet))
+    {
+        throw std::invalid_argument("instruction set " + getInstructionSetName(instructionSet) + " is not supported");
+    }
+    selectedInstructionSet() = instructionSet;
+}
+
+std::string RadialKernel::getInstructionSetName(InstructionSet instructionSet)
+{
+    switch (instructionSet)
+    {
+    case avx512:
+        return "avx512";
+    case avx2:
+        return "avx2";
+    default:
+        return "scalar";
+    }
+}
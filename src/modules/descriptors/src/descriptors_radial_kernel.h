@@ -0,0 +1,247 @@
+/**
+ * Name:
+ *      descriptors_radial_kernel.h
+ * Author:
+ *      Ondrej Bily
+ * Description:
+ *      Header file corresponding to class RadialKernel. Atom gathers
+ *      distances of all its neighbours into an aligned array and RadialKernel
+ *      evaluates the cutoff function and all radial symmetry functions
+ *      (G2 and G3) for all of them at once.
+ *
+ *      Instruction set is chosen at runtime (the best one supported by CPU):
+ *      * avx512 - 8 distances in one register
+ *      * avx2   - 4 distances in one register (with FMA)
+ *      * scalar - one distance at a time with exp() and cos() of standard
+ *                 library (the same results as before vectorization), also
+ *                 used when the compiler is not GCC or Clang on x86
+ *
+ *      Vectorized versions use polynomial approximations of exp() and cos()
+ *      (relative error about 1e-16), so descriptors differ from the scalar
+ *      version only in the last bits.
+ */
+
+#ifndef DESCRIPTORS_RADIAL_KERNEL_H
+#define DESCRIPTORS_RADIAL_KERNEL_H
+
+#include <vector>
+#include <string>
+#include <cmath>
+#include <cstring>
+#include <cstdint>
+#include <stdexcept>
+
+class RadialKernel
+{
+public:
+    enum InstructionSet
+    {
+        scalar,
+        avx2,
+        avx512
+    };
+
+    static constexpr int lanes{8};      // distances are padded to multiple of this number
+    static constexpr int blockSize{64}; // the largest number of distances evaluated at once
+    static constexpr int maxNumOfFunctions{32}; // vectorized versions are used for at most this number of G2 and G3
+
+    /**
+     * Evaluates fc(r) * exp(-eta * (r - rs)^2) for each G2 and fc(r) * cos(kappa * r) for each G3
+     * and adds their sums over all distances to descriptors (G2 first, then G3)
+     *
+     * @param distances         distances of neighbours, aligned to 64 bytes [blockSize]
+     * @param numOfDistances    number of distances (at most blockSize)
+     * @param rMin, rMax        parameters of the cutoff function
+     * @param g2FunctionParameters
+     * @param g3FunctionParameters
+     * @param descriptors
+     */
+    static void evaluate(double *distances,
+                         int numOfDistances,
+                         const double rMin,
+                         const double rMax,
+                         const std::vector<std::vector<double>> &g2FunctionParameters,
+                         const std::vector<double> &g3FunctionParameters,
+                         double *descriptors);
+
+    /**
+     * Evaluates terms of evaluate() without adding them to descriptors: terms[function * blockSize + i]
+     * is the contribution of distance i to G2 or G3 function (G2 first, then G3); contribution of a pair
+     * of atoms depends only on their distance, so it is the same for both atoms of the pair
+     *
+     * @param distances         distances of neighbours, aligned to 64 bytes [blockSize]
+     * @param numOfDistances    number of distances (at most blockSize)
+     * @param rMin, rMax        parameters of the cutoff function
+     * @param g2FunctionParameters
+     * @param g3FunctionParameters
+     * @param terms             output, aligned to 64 bytes [maxNumOfFunctions * blockSize]
+     */
+    static void evaluateTerms(double *distances,
+                              int numOfDistances,
+                              const double rMin,
+                              const double rMax,
+                              const std::vector<std::vector<double>> &g2FunctionParameters,
+                              const std::vector<double> &g3FunctionParameters,
+                              double *terms);
+
+    /**
+     * Adds sums of terms to descriptors in the same order as evaluate(), so descriptors are the same
+     * whether terms were evaluated for this atom or copied from terms of pairs of atoms
+     *
+     * @param terms             terms[function * blockSize + i] (padding after numOfDistances is overwritten)
+     * @param numOfDistances
+     * @param numOfFunctions    number of G2 and G3 functions (at most maxNumOfFunctions)
+     * @param descriptors
+     */
+    static void addTerms(double *terms,
+                         int numOfDistances,
+                         int numOfFunctions,
+                         double *descriptors);
+
+    /**
+     * Returns true if instruction set can be used (it is compiled in and CPU supports it)
+     *
+     * @param instructionSet
+     */
+    static bool isSupported(InstructionSet instructionSet);
+
+    /**
+     * Returns instruction set used by evaluate() (the best supported one unless it was changed)
+     */
+    static InstructionSet getInstructionSet();
+
+    /**
+     * Changes instruction set used by evaluate() (e.g. for benchmarks), throws invalid_argument
+     * if it is not supported
+     *
+     * @param instructionSet
+     */
+    static void setInstructionSet(InstructionSet instructionSet);
+
+    /**
+     * Returns name of instruction set ("scalar", "avx2", "avx512")
+     *
+     * @param instructionSet
+     */
+    static std::string getInstructionSetName(InstructionSet instructionSet);
+
+    /**
+     * Exponential function and cosine used by vectorized versions (written without branches,
+     * so that compiler vectorizes loops that call them)
+     *
+     * @param x
+     */
+    static inline double expFunction(double x);
+    static inline double cosFunction(double x);
+
+    /**
+     * Branchless selection used by vectorized versions (comparisons of doubles are not vectorized
+     * for AVX2 when floating point exceptions must be preserved, so sign bits are used instead)
+     *
+     * negativeMask(x) returns all bits set if x < 0 (including -0.0), otherwise 0
+     * selectByMask(mask, a, b) returns a if all bits of mask are set, b if mask is 0
+     */
+    static inline std::int64_t negativeMask(double x);
+    static inline double selectByMask(std::int64_t mask, double a, double b);
+
+private:
+    static InstructionSet bestInstructionSet();
+    static InstructionSet &selectedInstructionSet();
+};
+
+inline double RadialKernel::expFunction(double x)
+{
+    // exp(x) = 2^n * exp(r), where x = n * ln(2) + r and |r| <= ln(2) / 2
+    const double shift{0x1.8p52}; // adding this number rounds to integer stored in the lowest bits
+    std::int64_t underflow{negativeMask(x + 708.0)};
+    x = selectByMask(underflow, -708.0, selectByMask(negativeMask(709.0 - x), 709.0, x));
+    double t{x * 1.4426950408889634 + shift};
+    double n{t - shift};
+    double r{x - n * 6.93147180369123816490e-01 - n * 1.90821492927058770002e-10};
+
+    // Taylor polynomial of degree 13
+    double p{1.0 / 6227020800.0};
+    p = p * r + 1.0 / 479001600.0;
+    p = p * r + 1.0 / 39916800.0;
+    p = p * r + 1.0 / 3628800.0;
+    p = p * r + 1.0 / 362880.0;
+    p = p * r + 1.0 / 40320.0;
+    p = p * r + 1.0 / 5040.0;
+    p = p * r + 1.0 / 720.0;
+    p = p * r + 1.0 / 120.0;
+    p = p * r + 1.0 / 24.0;
+    p = p * r + 1.0 / 6.0;
+    p = p * r + 0.5;
+    p = p * r + 1.0;
+    p = p * r + 1.0;
+
+    // multiplication by 2^n adds n to the exponent
+    std::int64_t bitsOfT, bitsOfShift, bitsOfP;
+    std::memcpy(&bitsOfT, &t, sizeof(t));
+    std::memcpy(&bitsOfShift, &shift, sizeof(shift));
+    std::memcpy(&bitsOfP, &p, sizeof(p));
+    bitsOfP += (bitsOfT - bitsOfShift) * (std::int64_t{1} << 52);
+    std::memcpy(&p, &bitsOfP, sizeof(p));
+    return selectByMask(underflow, 0.0, p);
+}
+
+inline double RadialKernel::cosFunction(double x)
+{
+    // cos(x) = +-cos(r) or +-sin(r), where |x| = q * pi / 2 + r and |r| <= pi / 4
+    const double shift{0x1.8p52};
+    x = std::fabs(x);
+    double t{x * 0.63661977236758134308 + shift};
+    double q{t - shift};
+    double r{x - q * 1.57079632673412561417e+00 - q * 6.07710050650619224932e-11};
+    double r2{r * r};
+
+    // Taylor polynomials of degree 16 (cosine) and 15 (sine)
+    double c{1.0 / 20922789888000.0};
+    c = c * r2 - 1.0 / 87178291200.0;
+    c = c * r2 + 1.0 / 479001600.0;
+    c = c * r2 - 1.0 / 3628800.0;
+    c = c * r2 + 1.0 / 40320.0;
+    c = c * r2 - 1.0 / 720.0;
+    c = c * r2 + 1.0 / 24.0;
+    c = c * r2 - 0.5;
+    c = c * r2 + 1.0;
+    double s{-1.0 / 1307674368000.0};
+    s = s * r2 + 1.0 / 6227020800.0;
+    s = s * r2 - 1.0 / 39916800.0;
+    s = s * r2 + 1.0 / 362880.0;
+    s = s * r2 - 1.0 / 5040.0;
+    s = s * r2 + 1.0 / 120.0;
+    s = s * r2 - 1.0 / 6.0;
+    s = s * r2 * r + r;
+
+    // quadrant of x is given by the lowest two bits of q: sine is used in odd quadrants
+    // and sign is changed in quadrants 1 and 2 (bit operations only, no branches)
+    std::int64_t bitsOfT;
+    std::memcpy(&bitsOfT, &t, sizeof(t));
+    double result{selectByMask(-(bitsOfT & 1), s, c)};
+    std::int64_t bitsOfResult;
+    std::memcpy(&bitsOfResult, &result, sizeof(result));
+    bitsOfResult ^= ((bitsOfT + 1) & 2) << 62;
+    std::memcpy(&result, &bitsOfResult, sizeof(result));
+    return result;
+}
+
+inline std::int64_t RadialKernel::negativeMask(double x)
+{
+    std::uint64_t bits;
+    std::memcpy(&bits, &x, sizeof(x));
+    return -static_cast<std::int64_t>(bits >> 63);
+}
+
+inline double RadialKernel::selectByMask(std::int64_t mask, double a, double b)
+{
+    std::int64_t bitsOfA, bitsOfB;
+    std::memcpy(&bitsOfA, &a, sizeof(a));
+    std::memcpy(&bitsOfB, &b, sizeof(b));
+    std::int64_t bitsOfResult{(bitsOfA & mask) | (bitsOfB & ~mask)};
+    double result;
+    std::memcpy(&result, &bitsOfResult, sizeof(result));
+    return result;
+}
+
+#endif
@@ -1,18 +1,68 @@
 #include "descriptors_timestep.h"
 
+void Timestep::reserve(int numOfAtoms)
+{
+    m_atomsId.reserve(numOfAtoms);
+    m_x.reserve(numOfAtoms);
+    m_y.reserve(numOfAtoms);
+    m_z.reserve(numOfAtoms);
+}
+
+void Timestep::clear(int id)
+{
+    m_id = id;
+    m_numOfAtoms = 0;
+    m_atomsId.clear();
+    m_x.clear();
+    m_y.clear();
+    m_z.clear();
+    m_atomIndex.clear();
+}
+
 void Timestep::addAtom(int atomId, double x, double y, double z)
 {
     m_numOfAtoms++;
     m_atomsId.push_back(atomId);
-    m_atoms.insert(std::pair<int, Atom>(atomId, Atom(atomId, x, y, z)));
+    m_x.push_back(x);
+    m_y.push_back(y);
+    m_z.push_back(z);
+}
+
+int Timestep::getAtomIndex(int atomId)
+{
+    // sort IDs of atoms (once after adding atoms)
+    if (static_cast<int>(m_atomIndex.size()) != m_numOfAtoms)
+    {
+        m_atomIndex.clear();
+        m_atomIndex.reserve(m_numOfAtoms);
+        for (int index = 0; index < m_numOfAtoms; index++)
+        {
+            m_atomIndex.push_back(std::make_pair(m_atomsId[index], index));
+        }
+        std::sort(m_atomIndex.begin(), m_atomIndex.end());
+    }
+
+    auto item = std::lower_bound(m_atomIndex.begin(), m_atomIndex.end(), std::make_pair(atomId, -1));
+    if (item == m_atomIndex.end() || item->first != atomId)
+    {
+        return -1;
+    }
+    return item->second;
 }
 
-Atom &Timestep::getAtom(int id)
+void Timestep::resetDescriptors(int numOfDescriptors)
 {
-    return m_atoms.at(id);
+    m_numOfDescriptors = numOfDescriptors;
+    m_descriptors.assign(static_cast<size_t>(m_numOfAtoms) * numOfDescriptors, 0.0);
 }
 
-const std::vector<double> &Timestep::getAtomDescriptors(int atom_id)
+std::vector<double> Timestep::getAtomDescriptors(int atomId)
 {
-    return  m_atoms.at(atom_id).getDescriptors();
+    int index{getAtomIndex(atomId)};
+    if (index < 0)
+    {
+        throw std::out_of_range("no atom with ID " + std::to_string(atomId) + " in timestep");
+    }
+    const double *descriptors{getDescriptors(index)};
+    return std::vector<double>(descriptors, descriptors + m_numOfDescriptors);
 }
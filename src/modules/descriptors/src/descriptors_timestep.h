@@ -7,44 +7,98 @@
  *      Header file corresponding to class Timestep. Object Timestep 
  *      is created in Box class for each loaded timestep. Timestep holds
  *      all atoms and theirs IDs. 
+ *
+ *      Atoms are stored as structure of arrays: index of atom is its
+ *      position in the vector of IDs and coordinates and descriptors of
+ *      atoms are in contiguous arrays. IDs are mapped to indices (by
+ *      binary search in sorted pairs (ID, index)) only when it is needed.
  */
 
 #ifndef DESCRIPTORS_TIMESTEP_H
 #define DESCRIPTORS_TIMESTEP_H
 
 #include <vector>
-#include <map>
+#include <string>
 #include <utility>
-
-#include "descriptors_atom.h"
+#include <algorithm>
+#include <stdexcept>
 
 class Timestep
 {
 private:
-    int m_id;                       // ID of timestep
-    int m_numOfAtoms;               // number of atoms in this timestep
-    std::map<int, Atom> m_atoms;    // map of atoms objects in this timestep
-    std::vector<int> m_atomsId;     // IDs of atoms in this timestep
+    int m_id;                                     // ID of timestep
+    int m_numOfAtoms;                             // number of atoms in this timestep
+    std::vector<int> m_atomsId;                   // IDs of atoms in this timestep
+    std::vector<double> m_x;                      // x coordinates of atoms
+    std::vector<double> m_y;                      // y coordinates of atoms
+    std::vector<double> m_z;                      // z coordinates of atoms
+    int m_numOfDescriptors;                       // number of descriptors of each atom
+    std::vector<double> m_descriptors;            // descriptors of atoms [numOfAtoms * numOfDescriptors]
+    std::vector<std::pair<int, int>> m_atomIndex; // pairs (ID, index) sorted by IDs
 
 public:
     // constructor
     Timestep(int id) : m_id{id}
     {
         m_numOfAtoms = 0;           // no atoms in the beginning
+        m_numOfDescriptors = 0;     // no descriptors in the beginning
     }
 
     // getters
     inline int getId() { return m_id; };
     inline int getNumOfAtoms() { return m_numOfAtoms; };
-    inline std::map<int, Atom> &getAtoms() { return m_atoms; };
-    inline std::vector<int> &getAtomsId() { return m_atomsId; };
+    inline const std::vector<int> &getAtomsId() { return m_atomsId; };
+    inline const std::vector<double> &getX() { return m_x; };
+    inline const std::vector<double> &getY() { return m_y; };
+    inline const std::vector<double> &getZ() { return m_z; };
+    inline int getNumOfDescriptors() { return m_numOfDescriptors; };
+    inline const std::vector<double> &getDescriptors() { return m_descriptors; };
+    inline double *getDescriptors(int index) { return m_descriptors.data() + index * m_numOfDescriptors; };
 
     // methods
+    /**
+     * Reserves memory for given number of atoms
+     *
+     * @param numOfAtoms
+     */
+    void reserve(int numOfAtoms);
+
+    /**
+     * Removes all atoms and gives timestep new ID (memory of atoms is kept for atoms added later)
+     *
+     * @param id
+     */
+    void clear(int id);
+
+    /**
+     * Adds new atom, its index is the number of atoms added before
+     *
+     * @param atomId
+     * @param x, y, z
+     */
     void addAtom(int atomId, double x, double y, double z);
-    //void setAtomDescriptors(int atom_id, std::vector<double> descriptors);
-    Atom &getAtom(int id);
-    const std::vector<double> &getAtomDescriptors(int atom_id);
-    
+
+    /**
+     * Returns index of atom with given ID, or -1 if there is no such atom
+     * (pairs (ID, index) are sorted at the first call after adding atoms, so the first call is not thread-safe)
+     *
+     * @param atomId
+     */
+    int getAtomIndex(int atomId);
+
+    /**
+     * Sets all descriptors of all atoms to zero
+     *
+     * @param numOfDescriptors Number of descriptors of each atom
+     */
+    void resetDescriptors(int numOfDescriptors);
+
+    /**
+     * Returns descriptors of atom with given ID (throws std::out_of_range if there is no such atom)
+     *
+     * @param atomId
+     */
+    std::vector<double> getAtomDescriptors(int atomId);
 };
 
 #endif //DESCRIPTORS_TIMESTEP_H
@@ -47,3 +47,22 @@ PyObject *vectorToTuple_Float(const std::vector<double> &data)
 
     return tuple;
 }
+
+bool getDoubleBuffer(PyObject *incoming, Py_buffer *buffer, bool writable, const char *name)
+{
+    int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT | (writable ? PyBUF_WRITABLE : 0);
+    if (PyObject_GetBuffer(incoming, buffer, flags) != 0)
+    {
+        return false;
+    }
+
+    // format of double is 'd', possibly with native byte order prefix
+    std::string format{buffer->format != NULL ? buffer->format : "B"};
+    if (buffer->itemsize != sizeof(double) || (format != "d" && format != "=d" && format != "@d" && format != "<d"))
+    {
+        PyErr_Format(PyExc_TypeError, "%s must be a contiguous array of float64", name);
+        PyBuffer_Release(buffer);
+        return false;
+    }
+    return true;
+}
@@ -17,6 +17,7 @@ extern "C"
 }
 
 #include <vector>
+#include <string>
 #include <stdexcept>
 #include <iostream>
 
@@ -38,4 +39,16 @@ std::vector<double> listTupleToVector_Float(PyObject *incoming);
  */
 PyObject *vectorToTuple_Float(const std::vector<double> &data);
 
+/**
+ * Acquires C-contiguous buffer of doubles (float64) from PyObject using buffer protocol
+ * (e.g. numpy.ndarray, array.array, memoryview)
+ *
+ * @param incoming It is a PyObject that supports buffer protocol
+ * @param buffer Buffer that is filled, it must be released by PyBuffer_Release
+ * @param writable Whether the buffer must be writable
+ * @param name Name of argument used in error message
+ * @returns true on success, otherwise false and Python exception is set
+ */
+bool getDoubleBuffer(PyObject *incoming, Py_buffer *buffer, bool writable, const char *name);
+
 #endif //DESCRIPTORS_UTILITY_H
@@ -14,6 +14,12 @@ using namespace ::testing;
 int id{1};
 double pbcX{6.3}, pbcY{6.3}, pbcZ{6.3};
 std::vector<int> atomsInVerletList{2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16};
+// cutoffs and parameters of descriptors, the same as defaults of Box
+double rMinSym{6.2}, rMaxSym{6.4}, rMinStein{3.8}, rMaxStein{4.0};
+std::vector<std::vector<double>> g2FunctionParameters{{20.0, 2.8}, {20.0, 3.2}, {20.0, 4.4}, {20.0, 4.8},
+                                                      {20.0, 5.0}, {20.0, 5.3}, {20.0, 5.7}, {20.0, 6.0}};
+std::vector<double> g3FunctionParameters{3.5, 4.5, 7.0};
+std::vector<int> steinhardtFunctionParameters{6, 7, 8};
 std::map<int, Atom> atoms = {
     // atoms in pure BCC structure (2x2x2 = 16 atoms)
     //      id      x[A]        y[A]        z[A]
@@ -203,6 +209,26 @@ TEST(testAtom, testYlmFunction1)
     // more tests can be added
 }
 
+TEST(testAtom, testYlmFunctions)
+{
+    std::vector<std::array<double, 3>> directions{
+        {1.0, 2.0, 3.0}, {-0.3, 0.7, -2.9}, {2.2, -1.1, 0.0}, {0.0, 0.0, 1.5}, {0.0, 0.0, -0.4}, {-1.0, 0.0, 0.0}};
+    std::array<double, (Atom::maxL + 1) * (Atom::maxL + 1)> ylm;
+
+    // all Y_lm computed at once are the same as computed one by one
+    for (std::array<double, 3> &direction : directions)
+    {
+        Atom::ylmFunctions(direction[0], direction[1], direction[2], ylm.data());
+        for (int l = 0; l <= Atom::maxL; l++)
+        {
+            for (int m = -l; m <= l; m++)
+            {
+                ASSERT_NEAR(Atom::ylmFunction(m, l, direction[0], direction[1], direction[2]), ylm[l * l + l + m], 1e-12);
+            }
+        }
+    }
+}
+
 TEST(testAtom, testQlmFunction1)
 {
     Atom atom(1, 0.84986, 0.84986, 0.84986);
@@ -210,7 +236,7 @@ TEST(testAtom, testQlmFunction1)
     double result;
 
     result = 0.28209;
-    ASSERT_TRUE(fabs(atom.qlmFunction(0, 0, pbcX, pbcY, pbcZ, atomsInVerletList, atoms) - result) < epsilon);
+    ASSERT_TRUE(fabs(atom.qlmFunction(0, 0, pbcX, pbcY, pbcZ, atomsInVerletList, atoms, rMinStein, rMaxStein) - result) < epsilon);
 
     // more tests can be added
 }
@@ -220,7 +246,8 @@ TEST(testAtom, evaluateSymmetryFunctions1)
     Atom atom(1, 0.84986, 0.84986, 0.84986);
     double epsilon{0.001};
     double result;
-    atom.calculateDescriptors(pbcX, pbcY, pbcZ, atomsInVerletList, atoms);
+    atom.calculateDescriptors(pbcX, pbcY, pbcZ, atomsInVerletList, atoms, rMinSym, rMaxSym, rMinStein, rMaxStein,
+                              g2FunctionParameters, g3FunctionParameters, steinhardtFunctionParameters);
 
     result = 7.46794;
     ASSERT_TRUE(fabs(atom.getDescriptors().at(0) - result) < epsilon);
@@ -233,7 +260,8 @@ TEST(testAtom, evaluateSymmetryFunctions2)
     Atom atom(1, 0.84986, 0.84986, 0.84986);
     double epsilon{0.001};
     double result;
-    atom.calculateDescriptors(pbcX, pbcY, pbcZ, atomsInVerletList, atoms);
+    atom.calculateDescriptors(pbcX, pbcY, pbcZ, atomsInVerletList, atoms, rMinSym, rMaxSym, rMinStein, rMaxStein,
+                              g2FunctionParameters, g3FunctionParameters, steinhardtFunctionParameters);
 
     result = -9.86289;
     ASSERT_TRUE(fabs(atom.getDescriptors().at(8) - result) < epsilon);
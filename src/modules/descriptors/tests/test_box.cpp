@@ -1,15 +1,296 @@
 /**
  * Tests for Box class
- * 
- * 
+ *
+ * Copyright 2005, Google Inc.
+ * All rights reserved.
  */
 
-#include <iostream>
+#include <random>
+
+#include "gtest/gtest.h"
 
 #include "../src/descriptors_box.h"
 
-int main() {
-    std::cout << "Testing Box class ...\n";
-    return 0;
+using namespace ::testing;
+
+std::vector<std::array<double, 3>> randomPositions(int numOfAtoms, double length)
+{
+    std::mt19937 generator(42);
+    std::uniform_real_distribution<double> uniform(0.0, length);
+    std::vector<std::array<double, 3>> positions;
+    for (int i = 0; i < numOfAtoms; i++)
+    {
+        positions.push_back({uniform(generator), uniform(generator), uniform(generator)});
+    }
+    return positions;
+}
+
+void addTimestep(Box &box, int timestepId, const std::vector<std::array<double, 3>> &positions)
+{
+    box.addTimestep(timestepId);
+    for (size_t atom = 0; atom < positions.size(); atom++)
+    {
+        box.addAtomToTimestep(timestepId, atom + 1, positions[atom][0], positions[atom][1], positions[atom][2]);
+    }
 }
 
+TEST(testBox, verletListLimit)
+{
+    Box test_box(std::map<int, std::vector<double>>{});
+    ASSERT_DOUBLE_EQ(7.4, test_box.getRVerletListLimit());
+
+    Box test_box_with_skin(std::map<int, std::vector<double>>{}, 0.5);
+    ASSERT_DOUBLE_EQ(6.9, test_box_with_skin.getRVerletListLimit());
+}
+
+TEST(testBox, smallDisplacementKeepsVerletLists)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    Box test_box({{0, {25.0, 25.0, 25.0}}, {1, {25.0, 25.0, 25.0}}});
+    addTimestep(test_box, 0, positions);
+    for (std::array<double, 3> &position : positions)
+    {
+        position[0] += 0.3;
+        position[1] += 0.3;
+    }
+    addTimestep(test_box, 1, positions);
+
+    test_box.createVerletLists();
+    ASSERT_FALSE(test_box.verletListsNeedUpdate(1));
+    ASSERT_NEAR(0.3 * sqrt(2), test_box.getMaxDisplacement(), 1e-12);
+}
+
+TEST(testBox, largeDisplacementRebuildsVerletLists)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    Box test_box({{0, {25.0, 25.0, 25.0}}, {1, {25.0, 25.0, 25.0}}});
+    addTimestep(test_box, 0, positions);
+    positions[7][2] += 0.6;
+    addTimestep(test_box, 1, positions);
+
+    test_box.createVerletLists();
+    ASSERT_TRUE(test_box.verletListsNeedUpdate(1));
+
+    test_box.calculateDescriptors();
+    ASSERT_EQ(2, test_box.getNumOfVerletListBuilds());
+}
+
+TEST(testBox, wrappedAtomIsNotDisplaced)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    Box test_box({{0, {25.0, 25.0, 25.0}}, {1, {25.0, 25.0, 25.0}}});
+    addTimestep(test_box, 0, positions);
+    positions[7][0] += 25.0;
+    addTimestep(test_box, 1, positions);
+
+    test_box.createVerletLists();
+    ASSERT_FALSE(test_box.verletListsNeedUpdate(1));
+}
+
+TEST(testBox, changeOfBoxRebuildsVerletLists)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    Box test_box({{0, {25.0, 25.0, 25.0}}, {1, {25.0, 25.0, 26.2}}});
+    addTimestep(test_box, 0, positions);
+    addTimestep(test_box, 1, positions);
+
+    test_box.createVerletLists();
+    ASSERT_TRUE(test_box.verletListsNeedUpdate(1));
+}
+
+TEST(testBox, sameDescriptorsAsSingleTimestep)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    std::mt19937 generator(7);
+    std::uniform_real_distribution<double> uniform(-0.2, 0.2);
+
+    // atoms move randomly, each timestep is also calculated separately
+    Box test_box({{0, {25.0, 25.0, 25.0}}, {1, {25.0, 25.0, 25.0}}, {2, {25.0, 25.0, 25.0}}, {3, {25.0, 25.0, 25.0}}});
+    std::vector<Box> single_boxes;
+    for (int timestepId = 0; timestepId < 4; timestepId++)
+    {
+        addTimestep(test_box, timestepId, positions);
+        single_boxes.push_back(Box({{timestepId, {25.0, 25.0, 25.0}}}));
+        addTimestep(single_boxes.back(), timestepId, positions);
+        for (std::array<double, 3> &position : positions)
+        {
+            position = {position[0] + uniform(generator), position[1] + uniform(generator), position[2] + uniform(generator)};
+        }
+    }
+
+    test_box.createVerletLists();
+    test_box.calculateDescriptors();
+    ASSERT_LT(1, test_box.getNumOfVerletListBuilds());
+    ASSERT_GT(4, test_box.getNumOfVerletListBuilds());
+
+    for (int timestepId = 0; timestepId < 4; timestepId++)
+    {
+        Box &single_box = single_boxes.at(timestepId);
+        single_box.createVerletLists();
+        single_box.calculateDescriptors();
+        for (int atomId : test_box.getTimestepAtomsId(timestepId))
+        {
+            ASSERT_EQ(single_box.getAtomDescriptors(timestepId, atomId), test_box.getAtomDescriptors(timestepId, atomId));
+        }
+    }
+}
+
+TEST(testBox, sameDescriptorsWithThreads)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    Box serial_box({{0, {25.0, 25.0, 25.0}}});
+    addTimestep(serial_box, 0, positions);
+    serial_box.createVerletLists();
+    serial_box.calculateDescriptors();
+
+    for (int numOfThreads : {2, 3, 8})
+    {
+        Box test_box({{0, {25.0, 25.0, 25.0}}});
+        test_box.setNumOfThreads(numOfThreads);
+        addTimestep(test_box, 0, positions);
+        test_box.createVerletLists();
+        test_box.calculateDescriptors();
+        for (int atomId : serial_box.getTimestepAtomsId(0))
+        {
+            ASSERT_EQ(serial_box.getAtomDescriptors(0, atomId), test_box.getAtomDescriptors(0, atomId));
+        }
+    }
+}
+
+TEST(testBox, steinhardtListContainsCloseAtoms)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    Box test_box({{0, {25.0, 25.0, 25.0}}});
+    addTimestep(test_box, 0, positions);
+    test_box.createVerletLists();
+
+    for (size_t atom = 0; atom < positions.size(); atom++)
+    {
+        int numOfCloseAtoms{0};
+        for (size_t other = 0; other < positions.size(); other++)
+        {
+            double distance2{0.0};
+            for (int direction = 0; direction < 3; direction++)
+            {
+                double difference{positions[other][direction] - positions[atom][direction]};
+                difference -= 25.0 * round(difference / 25.0);
+                distance2 += difference * difference;
+            }
+            if (other != atom && distance2 <= pow(test_box.getRSteinhardtListLimit(), 2))
+            {
+                numOfCloseAtoms++;
+            }
+        }
+        ASSERT_EQ(numOfCloseAtoms, test_box.getNumOfAtomsInSteinhardtList(atom + 1));
+        ASSERT_LT(test_box.getNumOfAtomsInSteinhardtList(atom + 1), test_box.getNumOfAtomsInVerletList(atom + 1));
+    }
+}
+
+TEST(testBox, sameDescriptorsAsWithFullVerletList)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    Box test_box({{0, {25.0, 25.0, 25.0}}});
+    addTimestep(test_box, 0, positions);
+    test_box.createVerletLists();
+    test_box.calculateDescriptors();
+
+    // Atom evaluates Steinhardt parameters of all atoms in Verlet list
+    std::map<int, Atom> atoms;
+    for (size_t atom = 0; atom < positions.size(); atom++)
+    {
+        atoms.insert(std::make_pair(atom + 1, Atom(atom + 1, positions[atom][0], positions[atom][1], positions[atom][2])));
+    }
+    for (auto &item : atoms)
+    {
+        item.second.calculateDescriptors(25.0, 25.0, 25.0, test_box.getVerletList(item.first).getAtomIds(), atoms,
+                                         test_box.getRMinSym(), test_box.getRMaxSym(),
+                                         test_box.getRMinStein(), test_box.getRMaxStein(),
+                                         test_box.getG2FunctionParameters(),
+                                         test_box.getG3FunctionParameters(),
+                                         test_box.getSteinhardtFunctionParameters());
+        ASSERT_EQ(item.second.getDescriptors(), test_box.getAtomDescriptors(0, item.first));
+    }
+    ASSERT_GT(test_box.getSymmetryFunctionsTime(), 0.0);
+    ASSERT_GT(test_box.getSteinhardtTime(), 0.0);
+}
+
+TEST(testBox, sameDescriptorsWithHalfLists)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(300, 25.0);
+    std::mt19937 generator(7);
+    std::uniform_real_distribution<double> uniform(-0.2, 0.2);
+    std::map<int, std::vector<double>> pbc{{0, {25.0, 25.0, 25.0}}, {1, {25.0, 25.0, 25.0}}, {2, {25.0, 25.0, 25.0}}};
+
+    // atoms move randomly, atoms of the last timestep are in reverse order
+    Box full_box(pbc), half_box(pbc);
+    for (int timestepId = 0; timestepId < 3; timestepId++)
+    {
+        for (Box *box : {&full_box, &half_box})
+        {
+            box->addTimestep(timestepId);
+            for (size_t i = 0; i < positions.size(); i++)
+            {
+                size_t atom{timestepId < 2 ? i : positions.size() - 1 - i};
+                box->addAtomToTimestep(timestepId, atom + 1, positions[atom][0], positions[atom][1], positions[atom][2]);
+            }
+        }
+        for (std::array<double, 3> &position : positions)
+        {
+            position = {position[0] + uniform(generator), position[1] + uniform(generator), position[2] + uniform(generator)};
+        }
+    }
+    half_box.setHalfLists(true);
+    ASSERT_TRUE(half_box.getHalfLists());
+
+    RadialKernel::InstructionSet best{RadialKernel::getInstructionSet()};
+    for (RadialKernel::InstructionSet instructionSet : {RadialKernel::scalar, RadialKernel::avx2, RadialKernel::avx512})
+    {
+        if (!RadialKernel::isSupported(instructionSet))
+        {
+            continue;
+        }
+        RadialKernel::setInstructionSet(instructionSet);
+        full_box.calculateDescriptors();
+        ASSERT_LT(1, full_box.getNumOfVerletListBuilds());
+
+        for (int numOfThreads : {1, 3})
+        {
+            half_box.setNumOfThreads(numOfThreads);
+            half_box.calculateDescriptors();
+            for (int timestepId = 0; timestepId < 3; timestepId++)
+            {
+                for (int atomId : full_box.getTimestepAtomsId(timestepId))
+                {
+                    ASSERT_EQ(full_box.getAtomDescriptors(timestepId, atomId), half_box.getAtomDescriptors(timestepId, atomId));
+                }
+            }
+        }
+    }
+    RadialKernel::setInstructionSet(best);
+}
+
+TEST(testBox, numbersOfCalculatedAtomsAndNeighbours)
+{
+    std::vector<std::array<double, 3>> positions = randomPositions(100, 12.0);
+    Box test_box({{0, {12.0, 12.0, 12.0}}, {1, {12.0, 12.0, 12.0}}});
+    for (int timestepId : {0, 1})
+    {
+        test_box.addTimestep(timestepId);
+        for (size_t atom = 0; atom < positions.size(); atom++)
+        {
+            test_box.addAtomToTimestep(timestepId, atom + 1, positions[atom][0], positions[atom][1], positions[atom][2]);
+        }
+    }
+    test_box.calculateDescriptors();
+
+    // both timesteps use the same Verlet lists
+    long long numOfNeighbours{0};
+    for (size_t atom = 0; atom < positions.size(); atom++)
+    {
+        numOfNeighbours += test_box.getNumOfAtomsInVerletList(atom + 1);
+    }
+    ASSERT_EQ(200, test_box.getNumOfCalculatedAtoms());
+    ASSERT_EQ(2 * numOfNeighbours, test_box.getNumOfNeighbours());
+    ASSERT_LT(0, test_box.getNumOfSteinhardtNeighbours());
+    ASSERT_LT(test_box.getNumOfSteinhardtNeighbours(), test_box.getNumOfNeighbours());
+}
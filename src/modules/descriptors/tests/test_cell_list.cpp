@@ -0,0 +1,91 @@
+/**
+ * Tests for CellList class
+ * 
+ * Copyright 2005, Google Inc.
+ * All rights reserved.
+ */
+
+#include <random>
+
+#include "gtest/gtest.h"
+
+#include "../src/descriptors_cell_list.h"
+
+using namespace ::testing;
+
+CellList randomCellList(int numOfAtoms, std::vector<double> pbc, double cutoff, double shift)
+{
+    std::mt19937 generator(42);
+    std::uniform_real_distribution<double> uniform(0.0, 1.0);
+    std::vector<double> x, y, z;
+    for (int i = 0; i < numOfAtoms; i++)
+    {
+        // coordinates are shifted, some of them are outside of the box
+        x.push_back(pbc[0] * uniform(generator) + shift);
+        y.push_back(pbc[1] * uniform(generator) - shift);
+        z.push_back(pbc[2] * uniform(generator) + shift);
+    }
+    return CellList(x, y, z, pbc, cutoff);
+}
+
+TEST(testCellList, numOfCells)
+{
+    CellList test_cell_list = randomCellList(100, {30.0, 22.3, 15.0}, 7.4, 0.0);
+
+    ASSERT_EQ(4, test_cell_list.getNumOfCells()[0]);
+    ASSERT_EQ(3, test_cell_list.getNumOfCells()[1]);
+    ASSERT_EQ(2, test_cell_list.getNumOfCells()[2]);
+    ASSERT_FALSE(test_cell_list.isUsed());
+}
+
+TEST(testCellList, areNeighboursWithPbc)
+{
+    CellList test_cell_list({0.5, 29.5, 15.0}, {1.0, 1.0, 1.0}, {1.0, 1.0, 1.0}, {30.0, 30.0, 30.0}, 7.4);
+
+    ASSERT_TRUE(test_cell_list.areNeighbours(0, 1));
+    ASSERT_FALSE(test_cell_list.areNeighbours(0, 2));
+}
+
+TEST(testCellList, sameNeighboursAsBruteForce)
+{
+    CellList test_cell_list = randomCellList(2000, {30.0, 31.0, 45.0}, 7.4, 3.0);
+    ASSERT_TRUE(test_cell_list.isUsed());
+
+    for (int atom = 0; atom < test_cell_list.getNumOfAtoms(); atom++)
+    {
+        ASSERT_EQ(test_cell_list.getNeighboursBruteForce(atom), test_cell_list.getNeighbours(atom));
+    }
+}
+
+TEST(testCellList, smallBoxUsesBruteForce)
+{
+    CellList test_cell_list = randomCellList(200, {20.0, 20.0, 20.0}, 7.4, -1.0);
+    ASSERT_FALSE(test_cell_list.isUsed());
+
+    for (int atom = 0; atom < test_cell_list.getNumOfAtoms(); atom++)
+    {
+        ASSERT_EQ(test_cell_list.getNeighboursBruteForce(atom), test_cell_list.getNeighbours(atom));
+    }
+}
+
+TEST(testCellList, numOfCellsOfDiluteSystem)
+{
+    // at most cube root of number of atoms cells in each direction, no overflow for huge boxes
+    CellList test_cell_list = randomCellList(2000, {1e4, 1e6, 1e12}, 7.4, 0.0);
+
+    ASSERT_EQ(13, test_cell_list.getNumOfCells()[0]);
+    ASSERT_EQ(13, test_cell_list.getNumOfCells()[1]);
+    ASSERT_EQ(13, test_cell_list.getNumOfCells()[2]);
+    ASSERT_TRUE(test_cell_list.isUsed());
+}
+
+TEST(testCellList, sameNeighboursAsBruteForceInDiluteSystem)
+{
+    CellList test_cell_list = randomCellList(2000, {200.0, 9000.0, 40.0}, 7.4, 3.0);
+    ASSERT_TRUE(test_cell_list.isUsed());
+
+    for (int atom = 0; atom < test_cell_list.getNumOfAtoms(); atom++)
+    {
+        ASSERT_EQ(test_cell_list.getNeighboursBruteForce(atom), test_cell_list.getNeighbours(atom));
+    }
+}
@@ -0,0 +1,100 @@
+/**
+ * Tests for Engine class
+ *
+ * Copyright 2005, Google Inc.
+ * All rights reserved.
+ */
+
+#include <random>
+
+#include "gtest/gtest.h"
+
+#include "../src/descriptors_engine.h"
+
+using namespace ::testing;
+
+// frames of random atoms moving by small random steps (the last frames move by 'jump')
+std::vector<std::vector<double>> movingFrames(int numOfAtoms, double length, int numOfFrames, double jump)
+{
+    std::mt19937 generator(11);
+    std::uniform_real_distribution<double> uniform(0.0, length), step(-0.05, 0.05);
+    std::vector<std::vector<double>> frames(1);
+    for (int i = 0; i < 3 * numOfAtoms; i++)
+    {
+        frames[0].push_back(uniform(generator));
+    }
+    for (int frame = 1; frame < numOfFrames; frame++)
+    {
+        frames.push_back(frames.back());
+        for (double &coordinate : frames.back())
+        {
+            coordinate += step(generator) + (frame >= numOfFrames - 2 ? jump : 0.0) * step(generator);
+        }
+    }
+    return frames;
+}
+
+TEST(testEngine, sameDescriptorsAsBox)
+{
+    const int numOfAtoms{200}, numOfFrames{6};
+    const double length{15.0};
+    std::vector<std::vector<double>> frames = movingFrames(numOfAtoms, length, numOfFrames, 20.0);
+
+    // all frames calculated by one Box
+    std::map<int, std::vector<double>> pbc;
+    for (int frame = 0; frame < numOfFrames; frame++)
+    {
+        pbc[frame] = {length, length, length};
+    }
+    Box box(pbc);
+    for (int frame = 0; frame < numOfFrames; frame++)
+    {
+        box.addTimestep(frame);
+        for (int atom = 0; atom < numOfAtoms; atom++)
+        {
+            box.addAtomToTimestep(frame, atom, frames[frame][3 * atom], frames[frame][3 * atom + 1], frames[frame][3 * atom + 2]);
+        }
+    }
+    box.calculateDescriptors();
+    ASSERT_LT(1, box.getNumOfVerletListBuilds());
+
+    // the same frames passed to Engine one by one
+    for (int numOfThreads : {1, 3})
+    {
+        Engine engine;
+        engine.setNumOfThreads(numOfThreads);
+        std::vector<double> descriptors(numOfAtoms * engine.getNumOfDescriptors());
+        for (int frame = 0; frame < numOfFrames; frame++)
+        {
+            engine.update(frames[frame].data(), numOfAtoms, pbc[frame].data(), descriptors.data());
+            ASSERT_EQ(box.getTimestepDescriptors(frame), descriptors);
+            ASSERT_GE(2, engine.getBox().getNumOfTimesteps());
+        }
+        ASSERT_EQ(box.getNumOfVerletListBuilds(), engine.getBox().getNumOfVerletListBuilds());
+        ASSERT_EQ(numOfFrames, engine.getNumOfUpdates());
+    }
+}
+
+TEST(testEngine, verletListsAreReused)
+{
+    const int numOfAtoms{150};
+    const double pbc[3]{14.0, 14.0, 14.0};
+    std::vector<std::vector<double>> frames = movingFrames(numOfAtoms, 14.0, 5, 0.0);
+
+    Engine engine(2.0);
+    std::vector<double> descriptors(numOfAtoms * engine.getNumOfDescriptors());
+    for (const std::vector<double> &positions : frames)
+    {
+        engine.update(positions.data(), numOfAtoms, pbc, descriptors.data());
+    }
+    ASSERT_EQ(1, engine.getBox().getNumOfVerletListBuilds());
+    ASSERT_EQ(0, engine.getBox().getReferenceTimestepId());
+    ASSERT_LE(engine.getLastUpdateTime(), engine.getMaxUpdateTime());
+    ASSERT_LE(engine.getMaxUpdateTime(), engine.getTotalUpdateTime());
+
+    // different number of atoms needs new Verlet lists
+    engine.update(frames[0].data(), numOfAtoms - 1, pbc, descriptors.data());
+    ASSERT_EQ(2, engine.getBox().getNumOfVerletListBuilds());
+    ASSERT_EQ(numOfAtoms - 1, engine.getNumOfAtoms());
+    ASSERT_EQ(1, engine.getBox().getNumOfTimesteps());
+}
@@ -0,0 +1,91 @@
+/**
+ * Tests for RadialKernel class
+ *
+ * Copyright 2005, Google Inc.
+ * All rights reserved.
+ */
+
+#include <random>
+
+#include "gtest/gtest.h"
+
+#include "../src/descriptors_radial_kernel.h"
+
+using namespace ::testing;
+
+const std::vector<std::vector<double>> g2FunctionParameters{{20.0, 2.8}, {20.0, 3.2}, {20.0, 4.4}, {20.0, 4.8},
+                                                            {20.0, 5.0}, {20.0, 5.3}, {20.0, 5.7}, {20.0, 6.0}};
+const std::vector<double> g3FunctionParameters{3.5, 4.5, 7.0};
+
+TEST(testRadialKernel, expFunction)
+{
+    for (double x = -700.0; x <= 700.0; x += 0.37)
+    {
+        ASSERT_NEAR(1.0, RadialKernel::expFunction(x) / exp(x), 1e-15);
+    }
+    ASSERT_EQ(1.0, RadialKernel::expFunction(0.0));
+    ASSERT_EQ(0.0, RadialKernel::expFunction(-1000.0));
+}
+
+TEST(testRadialKernel, cosFunction)
+{
+    for (double x = -60.0; x <= 60.0; x += 0.0137)
+    {
+        ASSERT_NEAR(cos(x), RadialKernel::cosFunction(x), 1e-15);
+    }
+    ASSERT_EQ(1.0, RadialKernel::cosFunction(0.0));
+}
+
+TEST(testRadialKernel, selectByMask)
+{
+    ASSERT_EQ(-1, RadialKernel::negativeMask(-2.5));
+    ASSERT_EQ(0, RadialKernel::negativeMask(0.0));
+    ASSERT_EQ(0, RadialKernel::negativeMask(3.0));
+    ASSERT_EQ(1.5, RadialKernel::selectByMask(-1, 1.5, 2.5));
+    ASSERT_EQ(2.5, RadialKernel::selectByMask(0, 1.5, 2.5));
+}
+
+TEST(testRadialKernel, scalarIsAlwaysSupported)
+{
+    ASSERT_TRUE(RadialKernel::isSupported(RadialKernel::scalar));
+    ASSERT_TRUE(RadialKernel::isSupported(RadialKernel::getInstructionSet()));
+    ASSERT_EQ("avx512", RadialKernel::getInstructionSetName(RadialKernel::avx512));
+}
+
+TEST(testRadialKernel, sameDescriptorsWithAllInstructionSets)
+{
+    // distances inside and outside of cutoff, including both limits of cutoff function
+    std::mt19937 generator(42);
+    std::uniform_real_distribution<double> uniform(1.5, 6.4);
+    alignas(64) double distances[RadialKernel::blockSize];
+    for (int i = 0; i < RadialKernel::blockSize; i++)
+    {
+        distances[i] = uniform(generator);
+    }
+    distances[0] = 6.2;
+    distances[1] = 6.4;
+
+    RadialKernel::InstructionSet best{RadialKernel::getInstructionSet()};
+    for (int numOfDistances : {1, 7, 8, 37, RadialKernel::blockSize})
+    {
+        std::vector<double> scalarDescriptors(11, 0.0);
+        RadialKernel::setInstructionSet(RadialKernel::scalar);
+        RadialKernel::evaluate(distances, numOfDistances, 6.2, 6.4, g2FunctionParameters, g3FunctionParameters, scalarDescriptors.data());
+
+        for (RadialKernel::InstructionSet instructionSet : {RadialKernel::avx2, RadialKernel::avx512})
+        {
+            if (!RadialKernel::isSupported(instructionSet))
+            {
+                continue;
+            }
+            std::vector<double> descriptors(11, 0.0);
+            RadialKernel::setInstructionSet(instructionSet);
+            RadialKernel::evaluate(distances, numOfDistances, 6.2, 6.4, g2FunctionParameters, g3FunctionParameters, descriptors.data());
+            for (int descriptor = 0; descriptor < 11; descriptor++)
+            {
+                ASSERT_NEAR(scalarDescriptors[descriptor], descriptors[descriptor], 1e-13 * (1.0 + fabs(scalarDescriptors[descriptor])));
+            }
+        }
+    }
+    RadialKernel::setInstructionSet(best);
+}
@@ -1,14 +1,73 @@
 /**
  * Tests for Timestep class
- * 
- * 
+ *
+ * Copyright 2005, Google Inc.
+ * All rights reserved.
  */
 
-#include <iostream>
+#include "gtest/gtest.h"
 
 #include "../src/descriptors_timestep.h"
 
-int main() {
-    std::cout << "Testing Timestep class ...\n";
-    return 0;
-}
\ No newline at end of file
+using namespace ::testing;
+
+TEST(testTimestep, atomsAreStoredInArrays)
+{
+    Timestep test_timestep(3);
+    test_timestep.addAtom(5, 1.0, 2.0, 3.0);
+    test_timestep.addAtom(2, 4.0, 5.0, 6.0);
+
+    ASSERT_EQ(2, test_timestep.getNumOfAtoms());
+    ASSERT_EQ(std::vector<int>({5, 2}), test_timestep.getAtomsId());
+    ASSERT_EQ(std::vector<double>({1.0, 4.0}), test_timestep.getX());
+    ASSERT_EQ(std::vector<double>({2.0, 5.0}), test_timestep.getY());
+    ASSERT_EQ(std::vector<double>({3.0, 6.0}), test_timestep.getZ());
+}
+
+TEST(testTimestep, atomIndex)
+{
+    Timestep test_timestep(0);
+    for (int atomId : {10, 3, 7})
+    {
+        test_timestep.addAtom(atomId, 0.0, 0.0, 0.0);
+    }
+    ASSERT_EQ(0, test_timestep.getAtomIndex(10));
+    ASSERT_EQ(1, test_timestep.getAtomIndex(3));
+    ASSERT_EQ(2, test_timestep.getAtomIndex(7));
+    ASSERT_EQ(-1, test_timestep.getAtomIndex(4));
+
+    // atoms added after the first search are found too
+    test_timestep.addAtom(1, 0.0, 0.0, 0.0);
+    ASSERT_EQ(3, test_timestep.getAtomIndex(1));
+}
+
+TEST(testTimestep, descriptorsOfAtom)
+{
+    Timestep test_timestep(0);
+    test_timestep.addAtom(10, 0.0, 0.0, 0.0);
+    test_timestep.addAtom(3, 0.0, 0.0, 0.0);
+    test_timestep.resetDescriptors(2);
+    test_timestep.getDescriptors(1)[0] = 1.5;
+    test_timestep.getDescriptors(1)[1] = 2.5;
+
+    ASSERT_EQ(std::vector<double>({0.0, 0.0, 1.5, 2.5}), test_timestep.getDescriptors());
+    ASSERT_EQ(std::vector<double>({1.5, 2.5}), test_timestep.getAtomDescriptors(3));
+    ASSERT_THROW(test_timestep.getAtomDescriptors(4), std::out_of_range);
+}
+
+TEST(testTimestep, clearRemovesAtoms)
+{
+    Timestep test_timestep(0);
+    test_timestep.addAtom(10, 1.0, 2.0, 3.0);
+    ASSERT_EQ(0, test_timestep.getAtomIndex(10));
+
+    test_timestep.clear(4);
+    ASSERT_EQ(4, test_timestep.getId());
+    ASSERT_EQ(0, test_timestep.getNumOfAtoms());
+    ASSERT_EQ(-1, test_timestep.getAtomIndex(10));
+
+    test_timestep.addAtom(7, 4.0, 5.0, 6.0);
+    ASSERT_EQ(std::vector<int>({7}), test_timestep.getAtomsId());
+    ASSERT_EQ(std::vector<double>({4.0}), test_timestep.getX());
+    ASSERT_EQ(0, test_timestep.getAtomIndex(7));
+}
@@ -0,0 +1,587 @@
+import io
+import os
+import bz2
+import gzip
+import json
+import lzma
+import mmap
+import time
+import shutil
+import struct
+import itertools
+import contextlib
+import subprocess
+import collections
+import logging
+
+import numpy as np
+
+# set-up the logger
+logger = logging.getLogger('kabuto.dump_reader')
+
+# suffix of sidecar file with frame index of dump file
+INDEX_SUFFIX = ".kabuto-index"
+
+# magic numbers (first bytes of file) of supported compression formats
+COMPRESSION_MAGIC_NUMBERS = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+# external (multi-threaded) decompressors, the first one found on PATH is used
+EXTERNAL_DECOMPRESSORS = {
+    "gzip": [["pigz", "-dc"], ["gzip", "-dc"]],
+    "bz2": [["lbzip2", "-dc"], ["pbzip2", "-dc"], ["bzip2", "-dc"]],
+    "xz": [["xz", "-T0", "-dc"]],
+    "zstd": [["zstd", "-T0", "-dc"]],
+}
+
+# supported coordinate columns of 'ITEM: ATOMS' header (x, y, z, scaled), the first complete triple is used
+COORDINATE_COLUMNS = [
+    (("x", "y", "z"), False),
+    (("xu", "yu", "zu"), False),
+    (("xs", "ys", "zs"), True),
+    (("xsu", "ysu", "zsu"), True),
+]
+
+# magic string of LAMMPS binary dump files written by 'dump ... custom ...' with '.bin' suffix
+BINARY_MAGIC_STRING = b"DUMPCUSTOM"
+
+
+class Frame:
+    """
+    class Frame
+        * one timestep of a LAMMPS dump file stored in contiguous numpy arrays
+        * 'ids' is an int64 array [num_of_atoms]
+        * 'positions' is a float64 array [num_of_atoms, 3] of cartesian (unscaled) coordinates
+        * 'box_bounds' is a float64 array [3, 2], i. e. (lo, hi) for x, y and z
+        * 'tilt' is a float64 array [3] of tilt factors (xy, xz, yz), zeros for orthogonal box
+    """
+
+    def __init__(self, timestep, ids, positions, box_bounds, tilt=None):
+        self.timestep = timestep
+        self.ids = ids
+        self.positions = positions
+        self.box_bounds = box_bounds
+        self.tilt = np.zeros(3) if tilt is None else tilt
+
+    @property
+    def number_of_atoms(self):
+        return len(self.ids)
+
+    @property
+    def is_triclinic(self):
+        return bool(np.any(self.tilt != 0.0))
+
+    def pbc(self):
+        """
+        returns lengths of the simulation box [pbc_x, pbc_y, pbc_z]
+        """
+        return (self.box_bounds[:, 1] - self.box_bounds[:, 0]).tolist()
+
+    def atoms_dict(self):
+        """
+        returns atoms in form {atom_id: [x, y, z]} that is accepted by descriptors.compute()
+        """
+        return dict(zip(self.ids.tolist(), self.positions.tolist()))
+
+
+def read_frames(filename, selection=None, allow_triclinic=False):
+    """
+    yields all frames (timesteps) of the LAMMPS dump file 'filename' one by one
+        * dump file is a text or binary file written by 'dump ... custom ...' (or 'dump ... atom ...'),
+          it must contain column 'id' and coordinates (x y z, xu yu zu, xs ys zs or xsu ysu zsu)
+        * dump file can be compressed (gzip, bz2, xz, zstd), it is decompressed on the fly
+        * only header lines are processed in Python, atom blocks are parsed in bulk
+        * 'selection' (see parse_selection) limits reading to chosen timesteps,
+          frames of uncompressed text file are found in the frame index and read directly from their byte offsets
+        * descriptors are calculated only for orthogonal boxes, triclinic frame raises ValueError
+          unless 'allow_triclinic' is True (see check_boxes)
+    """
+    yield from check_boxes(scan_frames(filename, selection), filename, allow_triclinic)
+
+
+def check_boxes(frames, filename, allow_triclinic=False):
+    """
+    yields frames, raises ValueError for the first frame with triclinic box
+        * with 'allow_triclinic' triclinic frames are yielded (descriptors are then calculated for orthogonal box
+          with the same lengths, i. e. wrong for atoms near faces of the box), a warning is logged once
+    """
+    triclinic_reported = False
+    for frame in frames:
+        if frame.is_triclinic:
+            if not allow_triclinic:
+                raise ValueError("Box of timestep #{} in {} is triclinic (tilt factors xy, xz, yz: {}), "
+                                 "descriptors are calculated only for orthogonal boxes".format(
+                                     frame.timestep, filename, frame.tilt.tolist()))
+            if not triclinic_reported:
+                logger.warning("Box of timestep #{} in {} is triclinic, descriptors are calculated "
+                               "for orthogonal box with the same lengths".format(frame.timestep, filename))
+                triclinic_reported = True
+        yield frame
+
+
+def scan_frames(filename, selection=None):
+    """
+    yields frames of dump file, chooses reader according to compression and format of the file
+        * frames are yielded in the order in which they are in the file, both by sequential reading
+          and from the frame index; a timestep of a list selection is yielded once (its first frame in the file)
+        * timesteps of a list selection that are not in the file are reported when the whole file was read
+    """
+    compression = detect_compression(filename)
+    binary = detect_binary(filename, compression)
+
+    if selection is None or compression is not None or binary:
+        # compressed files cannot be seeked, unselected frames are skipped without parsing
+        read = read_binary_frames if binary else read_text_frames
+        found = set()
+        with open_dump(filename, compression, binary) as input_file:
+            for frame in read(input_file, frame_filter(selection)):
+                found.add(frame.timestep)
+                yield frame
+        report_missing_timesteps(filename, selection, found)
+    else:
+        yield from read_indexed_frames(filename, indexed_frames(filename, selection))
+
+
+def indexed_frames(filename, selection=None):
+    """
+    returns frames [(timestep, offset, number_of_atoms)] of the frame index of dump file chosen by selection
+        * timesteps of a list selection that are not in the file are reported
+    """
+    frames = load_frame_index(filename)
+    if selection is not None:
+        frames = select_frames(frames, selection)
+        report_missing_timesteps(filename, selection, {timestep for timestep, _, _ in frames})
+    return frames
+
+
+def report_missing_timesteps(filename, selection, found):
+    """
+    logs a warning if some timesteps of a list selection are not among 'found' timesteps
+    """
+    if isinstance(selection, list):
+        missing = [timestep for timestep in selection if timestep not in found]
+        if missing:
+            logger.warning("Timesteps not found in dump file {}: {}".format(filename, missing))
+
+
+def read_indexed_frames(filename, frames):
+    """
+    yields frames [(timestep, offset, number_of_atoms)] of the frame index of uncompressed text dump file
+        * the file is opened once, each frame is read from its byte offset
+    """
+    with open(filename, "r") as input_file:
+        for timestep, offset, number_of_atoms in frames:
+            input_file.seek(offset)
+            yield next(read_text_frames(input_file))
+
+
+def read_text_frames(input_file, accept=None):
+    """
+    yields frames from opened text dump file
+        * size of each atom block is given by 'ITEM: NUMBER OF ATOMS' header
+        * 'accept' is an optional function accept(timestep) -> bool, atom blocks of frames
+          that are not accepted are skipped without parsing
+    """
+    timestep = None
+    number_of_atoms = None
+    bounds = None
+
+    for raw_line in input_file:
+        line = raw_line.strip()
+
+        if line == "ITEM: TIMESTEP":
+            timestep = int(next(input_file))
+
+        elif line == "ITEM: NUMBER OF ATOMS":
+            number_of_atoms = int(next(input_file))
+
+        elif line.startswith("ITEM: BOX BOUNDS"):
+            # 'ITEM: BOX BOUNDS pp pp pp' or 'ITEM: BOX BOUNDS xy xz yz pp pp pp' for triclinic box
+            if line.split()[3:4] == ["abc"]:
+                raise ValueError("General triclinic box of timestep #{} is not supported".format(timestep))
+            bounds = np.array([next(input_file).split()[:3] for _ in range(3)], dtype=np.float64)
+            if "xy" not in line.split():
+                bounds = bounds[:, :2]
+
+        elif line.startswith("ITEM: ATOMS"):
+            columns = line.split()[2:]
+            if number_of_atoms is None or bounds is None:
+                raise ValueError("Incomplete header of timestep #{}".format(timestep))
+
+            if accept is not None and not accept(timestep):
+                collections.deque(itertools.islice(input_file, number_of_atoms), maxlen=0)
+                number_of_atoms = None
+                bounds = None
+                continue
+
+            id_column, coordinate_columns, scaled = column_mapping(columns, timestep)
+            block = parse_atoms_block(input_file, number_of_atoms, [id_column] + coordinate_columns)
+            logger.debug("Timestep #{}: {} atoms parsed".format(timestep, number_of_atoms))
+
+            yield make_frame(timestep, block[:, 0], block[:, 1:4], scaled, bounds)
+
+            number_of_atoms = None
+            bounds = None
+
+        else:
+            # skipping useless lines
+            pass
+
+
+def parse_atoms_block(input_file, number_of_atoms, columns):
+    """
+    parses chosen 'columns' of next 'number_of_atoms' lines of input_file
+    into a float64 array [number_of_atoms, len(columns)]
+    """
+    lines = list(itertools.islice(input_file, number_of_atoms))
+    if len(lines) != number_of_atoms:
+        raise ValueError("Dump file ended in the middle of atom block "
+                         "({} of {} atoms read)".format(len(lines), number_of_atoms))
+    if number_of_atoms == 0:
+        return np.empty((0, len(columns)), dtype=np.float64)
+    return np.loadtxt(lines, dtype=np.float64, usecols=columns, ndmin=2)
+
+
+def read_binary_frames(input_file, accept=None):
+    """
+    yields frames from opened LAMMPS binary dump file
+        * each frame consists of a header and of chunks of atoms (one chunk per writing process),
+          a chunk is a matrix of doubles [num_of_atoms_in_chunk, num_of_columns]
+        * names of columns are stored in the header since LAMMPS format revision 2 ('DUMPCUSTOM' magic string)
+        * 'accept' is an optional function accept(timestep) -> bool, chunks of frames
+          that are not accepted are skipped without reading
+    """
+    columns = None
+
+    while True:
+        data = input_file.read(8)
+        if len(data) == 0:
+            return
+        if len(data) != 8:
+            raise ValueError("Binary dump file ended in the middle of header")
+        timestep, = struct.unpack("<q", data)
+
+        # negative timestep marks a header with magic string (length of the string)
+        revision = 0
+        if timestep < 0:
+            if read_exactly(input_file, -timestep) != BINARY_MAGIC_STRING:
+                raise ValueError("Unknown magic string of binary dump file")
+            endian, revision = struct.unpack("<ii", read_exactly(input_file, 8))
+            if endian != 1:
+                raise ValueError("Binary dump file has unsupported byte order")
+            timestep, = struct.unpack("<q", read_exactly(input_file, 8))
+
+        number_of_atoms, triclinic = struct.unpack("<qi", read_exactly(input_file, 12))
+        read_exactly(input_file, 6 * 4)  # boundary conditions
+        bounds = np.frombuffer(read_exactly(input_file, 6 * 8), dtype="<f8").reshape(3, 2)
+        if triclinic:
+            tilt = np.frombuffer(read_exactly(input_file, 3 * 8), dtype="<f8")
+            bounds = np.column_stack((bounds, tilt))
+        number_of_columns, = struct.unpack("<i", read_exactly(input_file, 4))
+
+        if revision > 1:
+            length, = struct.unpack("<i", read_exactly(input_file, 4))
+            read_exactly(input_file, length)  # units, written only in the first frame
+            if read_exactly(input_file, 1) != b"\x00":
+                read_exactly(input_file, 8)  # time
+            length, = struct.unpack("<i", read_exactly(input_file, 4))
+            columns = read_exactly(input_file, length).decode().split()
+        number_of_chunks, = struct.unpack("<i", read_exactly(input_file, 4))
+
+        if accept is not None and not accept(timestep):
+            for _ in range(number_of_chunks):
+                length, = struct.unpack("<i", read_exactly(input_file, 4))
+                skip_bytes(input_file, length * 8)
+            continue
+
+        if columns is None or len(columns) != number_of_columns:
+            raise ValueError("Names of columns are not stored in binary dump file (timestep #{}), "
+                             "file must be written by newer version of LAMMPS".format(timestep))
+        id_column, coordinate_columns, scaled = column_mapping(columns, timestep)
+
+        chunks = []
+        for _ in range(number_of_chunks):
+            length, = struct.unpack("<i", read_exactly(input_file, 4))
+            chunks.append(read_exactly(input_file, length * 8))
+        block = np.frombuffer(b"".join(chunks), dtype="<f8").reshape(-1, number_of_columns)
+        if len(block) != number_of_atoms:
+            raise ValueError("Timestep #{} contains {} atoms instead of {}".format(
+                timestep, len(block), number_of_atoms))
+        logger.debug("Timestep #{}: {} atoms read".format(timestep, number_of_atoms))
+
+        yield make_frame(timestep, block[:, id_column], block[:, coordinate_columns], scaled, bounds)
+
+
+def read_exactly(input_file, size):
+    """
+    reads exactly 'size' bytes from binary file
+    """
+    data = input_file.read(size)
+    if len(data) != size:
+        raise ValueError("Binary dump file ended unexpectedly ({} of {} bytes read)".format(len(data), size))
+    return data
+
+
+def skip_bytes(input_file, size):
+    """
+    skips 'size' bytes of binary file, by seeking if possible (e. g. not in output of decompressor)
+    """
+    if input_file.seekable():
+        input_file.seek(size, io.SEEK_CUR)
+        return
+    while size > 0:
+        data = input_file.read(min(size, 1 << 20))
+        if len(data) == 0:
+            raise ValueError("Binary dump file ended unexpectedly")
+        size -= len(data)
+
+
+def column_mapping(columns, timestep=None):
+    """
+    returns (index of 'id', indices of coordinates [x, y, z], scaled) for names of columns of atoms
+    """
+    if "id" not in columns:
+        raise ValueError("Column 'id' is missing in atoms of timestep #{}: {}".format(timestep, columns))
+    for names, scaled in COORDINATE_COLUMNS:
+        if all(name in columns for name in names):
+            return columns.index("id"), [columns.index(name) for name in names], scaled
+    raise ValueError("Coordinates of atoms are missing in timestep #{}: {}".format(timestep, columns))
+
+
+def make_frame(timestep, ids, coordinates, scaled, bounds):
+    """
+    creates Frame from columns of atoms
+        * 'bounds' are box bounds as written in dump file, [3, 2] or [3, 3] for triclinic box
+          (bounding box and tilt factors xy, xz, yz)
+        * scaled coordinates (fractions of box vectors) are converted to cartesian ones
+    """
+    box_bounds = np.array(bounds[:, :2], dtype=np.float64)
+    tilt = np.zeros(3)
+    if bounds.shape[1] == 3:
+        # bounding box of triclinic box is converted to bounds of the box itself
+        tilt = np.array(bounds[:, 2], dtype=np.float64)
+        xy, xz, yz = tilt
+        box_bounds[0] -= (min(0.0, xy, xz, xy + xz), max(0.0, xy, xz, xy + xz))
+        box_bounds[1] -= (min(0.0, yz), max(0.0, yz))
+
+    if scaled:
+        lengths = box_bounds[:, 1] - box_bounds[:, 0]
+        box_vectors = np.array([[lengths[0], 0.0, 0.0],
+                                [tilt[0], lengths[1], 0.0],
+                                [tilt[1], tilt[2], lengths[2]]])
+        positions = box_bounds[:, 0] + coordinates @ box_vectors
+    else:
+        positions = np.array(coordinates, dtype=np.float64, order="C")
+
+    return Frame(timestep=timestep,
+                 ids=np.asarray(ids).astype(np.int64),
+                 positions=positions,
+                 box_bounds=box_bounds,
+                 tilt=tilt)
+
+
+def detect_compression(filename):
+    """
+    returns compression format of file ('gzip', 'bz2', 'xz', 'zstd') or None for uncompressed file
+        * format is detected from magic number, not from extension
+    """
+    with open(filename, "rb") as input_file:
+        head = input_file.read(8)
+    for compression, magic_number in COMPRESSION_MAGIC_NUMBERS.items():
+        if head.startswith(magic_number):
+            return compression
+    return None
+
+
+def detect_binary(filename, compression=None):
+    """
+    returns True if (decompressed) dump file is a LAMMPS binary dump, text dump files start with 'ITEM:'
+    """
+    with open_dump(filename, compression, binary=True) as input_file:
+        head = input_file.read(5)
+    return len(head) > 0 and head != b"ITEM:"
+
+
+@contextlib.contextmanager
+def open_dump(filename, compression=None, binary=False):
+    """
+    opens (possibly compressed) dump file for reading as text (or as bytes if 'binary' is True)
+        * compressed file is streamed through external multi-threaded decompressor
+          (pigz, lbzip2/pbzip2, xz -T0, zstd -T0) when it is available,
+          otherwise Python's gzip, bz2, lzma or zstandard module is used
+        * nothing is decompressed to disk
+        * ValueError is raised when external decompressor fails (e.g. corrupt or cut archive), unless it was
+          stopped because reading ended before the end of file
+    """
+    mode = "rb" if binary else "r"
+    if compression is None:
+        with open(filename, mode) as input_file:
+            yield input_file
+        return
+
+    for command in EXTERNAL_DECOMPRESSORS[compression]:
+        if shutil.which(command[0]) is not None:
+            logger.debug("Decompressing {} using: {}".format(filename, ' '.join(command)))
+            process = subprocess.Popen(command + [filename], stdout=subprocess.PIPE)
+            stopped = False
+            try:
+                yield process.stdout if binary else io.TextIOWrapper(process.stdout)
+            finally:
+                # decompressor is stopped when reading ends before the end of file
+                if process.poll() is None:
+                    process.kill()
+                    stopped = True
+                process.stdout.close()
+                return_code = process.wait()
+            if return_code != 0 and not stopped:
+                raise ValueError("Decompression of {} by {} failed (exit code {})".format(
+                    filename, command[0], return_code))
+            return
+
+    if compression == "gzip":
+        input_file = gzip.open(filename, "rb" if binary else "rt")
+    elif compression == "bz2":
+        input_file = bz2.open(filename, "rb" if binary else "rt")
+    elif compression == "xz":
+        input_file = lzma.open(filename, "rb" if binary else "rt")
+    else:
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading of zstd-compressed dump file requires 'zstd' program "
+                              "or 'zstandard' Python package")
+        input_file = zstandard.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+        if not binary:
+            input_file = io.TextIOWrapper(input_file)
+    with input_file:
+        yield input_file
+
+
+def build_frame_index(filename):
+    """
+    scans dump file and returns a list of frames [(timestep, byte offset, number of atoms)]
+        * file is memory-mapped and searched for 'ITEM: TIMESTEP' headers, atom blocks are not parsed
+    """
+    frames = []
+    with open(filename, "rb") as input_file:
+        if os.fstat(input_file.fileno()).st_size == 0:
+            return frames
+        with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            offset = mapped_file.find(b"ITEM: TIMESTEP")
+            while offset != -1:
+                mapped_file.seek(offset)
+                mapped_file.readline()
+                timestep = int(mapped_file.readline())
+                if mapped_file.readline().strip() != b"ITEM: NUMBER OF ATOMS":
+                    raise ValueError("Unexpected header of timestep #{} in file {}".format(timestep, filename))
+                number_of_atoms = int(mapped_file.readline())
+                frames.append((timestep, offset, number_of_atoms))
+                offset = mapped_file.find(b"ITEM: TIMESTEP", mapped_file.tell())
+    return frames
+
+
+def load_frame_index(filename):
+    """
+    returns the frame index of dump file
+        * index is saved to the sidecar file '<filename>.kabuto-index'
+        * saved index is reused as long as size and modification time of dump file are the same
+    """
+    path_to_index = filename + INDEX_SUFFIX
+    status = os.stat(filename)
+
+    try:
+        with open(path_to_index, "r") as index_file:
+            index = json.load(index_file)
+        if index["size"] == status.st_size and index["mtime"] == status.st_mtime_ns:
+            logger.debug("Frame index loaded from file: {}".format(path_to_index))
+            return [tuple(frame) for frame in index["frames"]]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    start = time.perf_counter()
+    frames = build_frame_index(filename)
+    logger.info("Frame index of {} ({} frames) built in {:.3f} s".format(
+        filename, len(frames), time.perf_counter() - start))
+
+    try:
+        with open(path_to_index, "w") as index_file:
+            json.dump({"size": status.st_size, "mtime": status.st_mtime_ns, "frames": frames}, index_file)
+    except OSError:
+        logger.warning("Frame index could not be saved to file: {}".format(path_to_index))
+    return frames
+
+
+def parse_selection(text):
+    """
+    parses selection of timesteps given on command line
+        * 'start:stop:stride' - timesteps start <= timestep < stop, every stride-th of them
+          (each part is optional, e.g. '1000:', ':5000', '::10')
+        * 'timestep1,timestep2,...' - explicit list of timesteps
+    """
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) > 3:
+            raise ValueError("Wrong selection of timesteps: {}".format(text))
+        parts += [""] * (3 - len(parts))
+        start, stop, stride = [int(part) if part.strip() else None for part in parts]
+        if stride is not None and stride < 1:
+            raise ValueError("Stride of selection must be positive: {}".format(text))
+        return slice(start, stop, stride)
+    return [int(timestep) for timestep in text.split(",") if timestep.strip()]
+
+
+def frame_filter(selection):
+    """
+    returns function accept(timestep) -> bool for sequential reading of selected frames, or None
+        * frames must be passed to the function in order in which they are in dump file
+    """
+    if selection is None:
+        return None
+
+    if isinstance(selection, slice):
+        counter = itertools.count()
+
+        def accept(timestep):
+            if (selection.start is not None and timestep < selection.start) or \
+                    (selection.stop is not None and timestep >= selection.stop):
+                return False
+            return next(counter) % (selection.step or 1) == 0
+        return accept
+
+    # each listed timestep is accepted once (its first frame in the file)
+    remaining = set(selection)
+
+    def accept(timestep):
+        if timestep not in remaining:
+            return False
+        remaining.discard(timestep)
+        return True
+    return accept
+
+
+def select_frames(frames, selection):
+    """
+    returns frames [(timestep, offset, number_of_atoms)] chosen by selection (slice or list of timesteps)
+        * the same frames in the same (file) order as sequential reading with frame_filter(selection)
+    """
+    accept = frame_filter(selection)
+    return [frame for frame in frames if accept(frame[0])]
+
+
+def windows(frames, size):
+    """
+    groups frames into lists of at most 'size' consecutive frames
+        * only one window is held in memory at a time
+    """
+    window = []
+    for frame in frames:
+        window.append(frame)
+        if len(window) == size:
+            yield window
+            window = []
+    if window:
+        yield window
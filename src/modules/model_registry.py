@@ -0,0 +1,86 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+
+from modules.numpy_network import NumpyNetwork
+
+# set-up the logger
+logger = logging.getLogger('kabuto.model_registry')
+
+# default number of neural networks kept loaded in ModelRegistry
+DEFAULT_MAX_MODELS = 4
+
+
+class ModelRegistry:
+    """
+    class ModelRegistry
+        * in-process registry of loaded neural networks from 'path' folder (e.g. 'saved_nn')
+        * model of each network is loaded (from <name>.h5) once and used for all predictions
+        * networks are keyed by name and size and modification time of the model file,
+          so a model saved again (e.g. by 'train') is loaded again
+        * at most 'max_models' networks are kept, the least recently used one is removed first
+        * networks are NumpyNetwork (forward pass in NumPy, TensorFlow is not imported) unless 'keras' is True,
+          then Keras models are loaded by NeuralNetwork
+    """
+
+    def __init__(self, path, max_models=DEFAULT_MAX_MODELS, keras=False):
+        self.path = path
+        self.max_models = max(1, max_models)
+        self.keras = keras
+        self.networks = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_time = 0.0
+
+    def signature(self, name):
+        """
+        returns the key of network 'name', i.e. (name, size, modification time of model file)
+        """
+        status = os.stat(os.path.join(self.path, name + ".h5"))
+        return name, status.st_size, status.st_mtime_ns
+
+    def create_network(self, name):
+        """
+        returns a new network 'name' without loaded model
+        """
+        if self.keras:
+            # TensorFlow is imported only when Keras models are used
+            from modules.neural_network import NeuralNetwork
+            return NeuralNetwork(name)
+        return NumpyNetwork(name)
+
+    def get(self, name):
+        """
+        returns the network 'name' with loaded model, the model is loaded only if it is not
+        in the registry or if its file has changed
+        """
+        key = self.signature(name)
+        network = self.networks.get(name)
+        if network is not None and network[0] == key:
+            self.networks.move_to_end(name)
+            self.hits += 1
+            return network[1]
+
+        start = time.perf_counter()
+        nn = self.create_network(name)
+        nn.load_model(self.path)
+        elapsed = time.perf_counter() - start
+        self.load_time += elapsed
+        self.loads += 1
+        logger.debug("Model \'{}\' loaded in {:.2f} s ({})".format(name, elapsed, type(nn).__name__))
+
+        self.networks[name] = (key, nn)
+        self.networks.move_to_end(name)
+        while len(self.networks) > self.max_models:
+            evicted, _ = self.networks.popitem(last=False)
+            self.evictions += 1
+            logger.debug("Model \'{}\' removed from registry".format(evicted))
+        return nn
+
+    def clear(self):
+        """
+        removes all networks from the registry
+        """
+        self.networks.clear()
@@ -1,7 +1,10 @@
 import os
 import logging
+
 import tensorflow as tf
 
+from modules.numpy_network import DEFAULT_BATCH_SIZE
+
 # set-up the logger
 logger = logging.getLogger('kabuto.neural_networks')
 
@@ -42,33 +45,33 @@ class NeuralNetwork:
         ]
         return layers
 
-    def train(self, first_array, second_array):
+    def train(self, training_data, validation_data=None):
         """
-        trains the current nn from input arrays
+        trains the current nn from datasets of batches (descriptors, vector_q), e.g. tf.data.Dataset
+            validation_data are evaluated after each epoch (if they are given)
         """
         logger.info("Training begins!")
 
         history = self.model.fit(
-            x                   = first_array,
-            y                   = second_array,
-            #batch_size          = self.batch_size,
-            validation_split    = 0.2,
+            x                   = training_data,
+            validation_data     = validation_data,
             #epochs              = self.epochs,
-            shuffle             = True,
+            shuffle             = False,  # training data are shuffled by the dataset
             verbose             = 2
         )
 
         logger.info("Training finished!")
         return history
 
-    def predict(self, input_array):
+    def predict(self, input_array, batch_size=DEFAULT_BATCH_SIZE):
         """
         predicts the vector_q for each atom in input_array
             input_array is a matrix [num_of_atoms, num_of_descriptors]
             returns a matrix [num_of_atoms, num_of_phases]
+            at most 'batch_size' atoms are passed through the network at once
         """
         #logger.info("Predicting from array:\n{}".format(input_array))
-        return self.model.predict(input_array)
+        return self.model.predict(input_array, batch_size=max(1, min(batch_size, len(input_array))), verbose=0)
 
     def save_model(self, path):
         """
@@ -82,15 +85,40 @@ class NeuralNetwork:
         else:
             logger.error("Model \'{}\' was not saved.".format(self.name))
 
-    def load_model(self, path):
+    def load_model(self, path, training=False):
         """
-        loads model from 'path' to self.model and compiles it
+        loads model from 'path' to self.model
+            * for inference the model is not compiled (optimizer is not needed)
+            * for training ('training' is True) the model is compiled with the saved optimizer, so training
+              continues with the state of Adam (moments, number of iterations) of the last training
         """
         path_to_model = os.path.join(path, self.name + self.model_extension)
+        if not training:
+            self.model = tf.keras.models.load_model(path_to_model, compile=False)
+            return
+
         self.model = tf.keras.models.load_model(path_to_model)
+        optimizer = self.model.optimizer
+        if optimizer is None:
+            # model was saved without optimizer
+            self.compile_model()
+        elif not callable(optimizer.variables) and len(optimizer.variables) < len(self.model.trainable_variables):
+            # Keras 3 loads optimizer of .h5 file without its variables and training would fail
+            # ("Unknown variable"), the optimizer is built again and its state is read from the file
+            self.compile_model(restore_optimizer(path_to_model, optimizer, self.model.trainable_variables))
         #self.model.summary()
         #logger.info("NN \'{}\' is loaded.".format(self.name))
 
+    def compile_model(self, optimizer=None):
+        """
+        compiles self.model with optimizer (new Adam by default), loss and metrics used for training
+        """
+        self.model.compile(
+            optimizer   = optimizer if optimizer is not None else tf.keras.optimizers.Adam(self.learning_rate),
+            loss        = 'categorical_crossentropy',
+            metrics     = ['accuracy']
+        )
+
     def create_model(self, number_of_descriptors, number_of_phases):
         """
         creates a new model with 'self.name'
@@ -105,11 +133,46 @@ class NeuralNetwork:
         self.model = tf.keras.Sequential(layers)
 
         # compile the model
-        self.model.compile(
-            optimizer   = tf.keras.optimizers.Adam(self.learning_rate),
-            loss        = 'categorical_crossentropy',
-            metrics     = ['accuracy']
-        )
+        self.compile_model()
 
         self.model.summary()
         logger.info("Model \'{}\' created.".format(self.name))
+
+
+
+def restore_optimizer(path_to_model, optimizer, variables):
+    """
+    returns a new optimizer with the configuration of 'optimizer' built for 'variables' (trainable variables
+    of the model) with state saved in 'optimizer_weights' of .h5 file 'path_to_model'
+        * variables saved by Keras 3 are named <optimizer>/<path_of_variable>_momentum (and _velocity),
+          by Keras 2 <optimizer>/<layer>/<weight>/m:0 (and v:0)
+        * variables that are not in the file keep their initial values
+    """
+    import h5py
+
+    saved = dict()
+    with h5py.File(path_to_model, "r") as file:
+        if "optimizer_weights" in file:
+            file["optimizer_weights"].visititems(
+                lambda name, item: saved.update({name: item[()]}) if isinstance(item, h5py.Dataset) else None)
+
+    restored = optimizer.__class__.from_config(optimizer.get_config())
+    restored.build(variables)
+    prefix = restored.name
+    names = {"{}/iteration".format(prefix): ["{}/iteration".format(prefix), "{}/iter:0".format(prefix)]}
+    for variable in variables:
+        layer_and_weight = "/".join(variable.path.split("/")[-2:])
+        for slot, old_slot in (("momentum", "m"), ("velocity", "v")):
+            name = "{}/{}_{}".format(prefix, variable.path.replace("/", "_"), slot)
+            names[name] = [name, "{}/{}/{}:0".format(prefix, layer_and_weight, old_slot)]
+
+    missing = []
+    for variable in restored.variables:
+        values = [saved[name] for name in names.get(variable.path, []) if name in saved]
+        if values and values[0].shape == tuple(variable.shape):
+            variable.assign(values[0])
+        elif variable.path in names:
+            missing.append(variable.path)
+    if missing:
+        logger.warning("State of optimizer not found in \'{}\': {}".format(path_to_model, ", ".join(missing)))
+    return restored
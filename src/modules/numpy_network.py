@@ -0,0 +1,151 @@
+import os
+import json
+import logging
+
+import numpy as np
+
+# set-up the logger
+logger = logging.getLogger('kabuto.numpy_network')
+
+# default number of atoms predicted in one inference pass
+DEFAULT_BATCH_SIZE = 65536
+
+# number of atoms that go through all layers at once (hidden layers of a block stay in CPU cache)
+BLOCK_SIZE = 4096
+
+# activations of Dense layers that can be evaluated by NumpyNetwork
+ACTIVATIONS = ("linear", "relu", "sigmoid", "tanh", "softmax")
+
+
+def export_weights(path_to_model, path_to_weights=None):
+    """
+    reads weights of Dense layers from saved Keras model (.h5 file) and saves them to a compact .npz file
+        * TensorFlow is not needed, the file is read by h5py (configuration of model is stored as JSON)
+        * the weights file contains arrays 'kernel_<i>', 'bias_<i>', names of activations and size and
+          modification time of the model file (so a model saved again is exported again)
+        * returns a dictionary {name: array} with content of the weights file, the file is not written
+          if 'path_to_weights' is None
+    """
+    import h5py
+
+    status = os.stat(path_to_model)
+    with h5py.File(path_to_model, "r") as file:
+        config = json.loads(file.attrs["model_config"])
+        weights_group = file["model_weights"] if "model_weights" in file else file
+        layers = config["config"]["layers"] if isinstance(config["config"], dict) else config["config"]
+
+        arrays = dict()
+        activations = []
+        for layer in layers:
+            if layer["class_name"] in ("InputLayer", "Dropout"):
+                # input layer has no weights, dropout does nothing in inference
+                continue
+            if layer["class_name"] != "Dense":
+                raise ValueError("layer \'{}\' of type {} is not supported".format(
+                    layer["config"]["name"], layer["class_name"]))
+            activation = layer["config"].get("activation", "linear")
+            if activation not in ACTIVATIONS:
+                raise ValueError("activation \'{}\' of layer \'{}\' is not supported".format(
+                    activation, layer["config"]["name"]))
+
+            group = weights_group[layer["config"]["name"]]
+            names = [name.decode() if isinstance(name, bytes) else name for name in group.attrs["weight_names"]]
+            kernel = [name for name in names if "kernel" in name.split("/")[-1]]
+            bias = [name for name in names if "bias" in name.split("/")[-1]]
+            index = len(activations)
+            arrays["kernel_{}".format(index)] = np.asarray(group[kernel[0]], dtype=np.float32)
+            arrays["bias_{}".format(index)] = (np.asarray(group[bias[0]], dtype=np.float32) if bias else
+                                               np.zeros(arrays["kernel_{}".format(index)].shape[1], np.float32))
+            activations.append(activation)
+
+    if not activations:
+        raise ValueError("model {} has no Dense layers".format(path_to_model))
+    arrays["activations"] = np.array(activations)
+    arrays["source"] = np.array([status.st_size, status.st_mtime_ns], dtype=np.int64)
+
+    if path_to_weights is not None:
+        np.savez(path_to_weights, **arrays)
+        logger.info("Weights of model \'{}\' exported to file: {}".format(path_to_model, path_to_weights))
+    return arrays
+
+
+class NumpyNetwork:
+    """
+    class NumpyNetwork
+        * forward pass of saved Kabuto network (Dense layers, e.g. 14 -> 25 -> 25 -> N with ReLU and softmax)
+          in NumPy, TensorFlow is not imported
+        * weights are read from <name>.npz next to <name>.h5, the file is exported from the model
+          when it does not exist or the model was saved again
+        * atoms are evaluated in blocks of BLOCK_SIZE rows in float32, the same precision as Keras
+    """
+    model_extension = ".h5"
+    weights_extension = ".npz"
+
+    def __init__(self, name):
+        self.name = name
+        self.kernels = []
+        self.biases = []
+        self.activations = []
+
+    def load_model(self, path):
+        """
+        loads weights of model from 'path' folder (exports them from <name>.h5 if it is needed)
+        """
+        path_to_model = os.path.join(path, self.name + self.model_extension)
+        path_to_weights = os.path.join(path, self.name + self.weights_extension)
+        status = os.stat(path_to_model)
+
+        arrays = None
+        if os.path.isfile(path_to_weights):
+            with np.load(path_to_weights) as file:
+                if list(file["source"]) == [status.st_size, status.st_mtime_ns]:
+                    arrays = {name: file[name] for name in file.files}
+        if arrays is None:
+            try:
+                arrays = export_weights(path_to_model, path_to_weights)
+            except OSError as error:
+                # e.g. read-only 'saved_nn' folder, weights are exported again next time
+                logger.warning("Weights of model \'{}\' were not saved: {}".format(self.name, error))
+                arrays = export_weights(path_to_model)
+
+        self.activations = [str(activation) for activation in arrays["activations"]]
+        self.kernels = [arrays["kernel_{}".format(i)] for i in range(len(self.activations))]
+        self.biases = [arrays["bias_{}".format(i)] for i in range(len(self.activations))]
+
+    @staticmethod
+    def activate(values, activation):
+        """
+        applies activation to matrix 'values' in place
+        """
+        if activation == "relu":
+            np.maximum(values, 0.0, out=values)
+        elif activation == "sigmoid":
+            np.negative(values, out=values)
+            np.exp(values, out=values)
+            values += 1.0
+            np.reciprocal(values, out=values)
+        elif activation == "tanh":
+            np.tanh(values, out=values)
+        elif activation == "softmax":
+            values -= values.max(axis=1, keepdims=True)
+            np.exp(values, out=values)
+            values /= values.sum(axis=1, keepdims=True)
+
+    def predict(self, input_array, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        predicts the vector_q for each atom in input_array
+            input_array is a matrix [num_of_atoms, num_of_descriptors]
+            returns a matrix [num_of_atoms, num_of_phases] (float32)
+            'batch_size' is accepted for compatibility with NeuralNetwork.predict, atoms are evaluated
+            in blocks of BLOCK_SIZE rows
+        """
+        input_array = np.asarray(input_array)
+        result = np.empty((len(input_array), self.kernels[-1].shape[1]), dtype=np.float32)
+        for start in range(0, len(input_array), BLOCK_SIZE):
+            values = input_array[start:start + BLOCK_SIZE].astype(np.float32)
+            for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+                values = values @ kernel
+                values += bias
+                self.activate(values, activation)
+            result[start:start + BLOCK_SIZE] = values
+        return result
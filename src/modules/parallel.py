@@ -0,0 +1,264 @@
+import math
+import time
+import logging
+import collections
+import concurrent.futures
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+try:
+    import descriptors
+except ImportError:
+    # C++ extension is not installed, descriptors are calculated by NumPy/SciPy (equal up to rounding)
+    from modules import descriptors
+from modules.dump_reader import read_indexed_frames, check_boxes, windows, detect_compression, detect_binary
+
+# set-up the logger
+logger = logging.getLogger('kabuto.parallel')
+
+# number of tasks given to each worker, more tasks balance the load better
+TASKS_PER_WORKER = 4
+
+# number of descriptors calculated for each atom
+NUMBER_OF_DESCRIPTORS = descriptors.parameters()["number_of_descriptors"]
+
+# statistics of calculations in this process (and of collected tasks of workers),
+# summed values of descriptors.statistics()
+STATISTICS_KEYS = ("timesteps", "verlet_list_builds", "verlet_list_time", "descriptors_time",
+                  "symmetry_functions_time", "steinhardt_time")
+
+# summed values of descriptors.profile() (only if profiling is enabled) and time of calculations
+# including preparation of arrays in Python (compute_time)
+PROFILE_KEYS = ("parsing_time", "marshalling_time", "total_time", "compute_time",
+                "atoms", "pairs", "neighbours", "steinhardt_neighbours")
+statistics = collections.Counter()
+
+
+def supports_workers(filename):
+    """
+    returns True if frames of dump file can be read independently by workers,
+    i. e. the file is an uncompressed text dump with frame index
+    """
+    return detect_compression(filename) is None and not detect_binary(filename)
+
+
+def split_frames(frames, window, workers):
+    """
+    splits frames [(timestep, offset, number_of_atoms)] into tasks (lists of consecutive frames)
+        * windows of 'window' frames are never split, so descriptors are the same as in serial streaming mode
+    """
+    frame_windows = list(windows(frames, window))
+    windows_per_task = max(1, math.ceil(len(frame_windows) / (workers * TASKS_PER_WORKER)))
+    tasks = []
+    for start in range(0, len(frame_windows), windows_per_task):
+        tasks.append([frame for frame_window in frame_windows[start:start + windows_per_task]
+                      for frame in frame_window])
+    return tasks
+
+
+def compute_frames(frames, cache=None):
+    """
+    calculates descriptors of frames in one call of C++ extension
+        * Verlet lists are created from the first frame and again whenever atoms move more than half of skin
+        * frames with the same atoms are passed as arrays (descriptors.compute_array), other as dictionaries
+        * returns a list [(timestep, ids, descriptors [num_of_atoms, num_of_descriptors])]
+        * results are taken from (and saved to) 'cache' if it is given
+    """
+    if cache is not None:
+        results = cache.load_descriptors(frames)
+        if results is not None:
+            return results
+
+    start = time.perf_counter()
+    if have_same_atoms(frames):
+        results = compute_array(frames)
+    else:
+        results = compute_dict(frames)
+    last_statistics = descriptors.statistics()
+    statistics.update({key: last_statistics[key] for key in STATISTICS_KEYS})
+
+    last_profile = descriptors.profile()
+    if last_profile is not None:
+        last_profile["compute_time"] = time.perf_counter() - start
+        statistics.update({key: last_profile[key] for key in PROFILE_KEYS})
+
+    if cache is not None:
+        cache.save_descriptors(frames, results)
+    return results
+
+
+def have_same_atoms(frames):
+    """
+    returns True if all frames contain the same atoms (ids), each atom once
+    """
+    if len(frames) == 0:
+        return False
+    first_ids = np.sort(frames[0].ids)
+    if np.any(first_ids[1:] == first_ids[:-1]):
+        return False
+    return all(frame.number_of_atoms == len(first_ids) and np.array_equal(np.sort(frame.ids), first_ids)
+               for frame in frames[1:])
+
+
+def compute_array(frames):
+    """
+    calculates descriptors of frames with the same atoms using descriptors.compute_array
+        * positions of all frames are passed as one array [frames, atoms, 3] (atoms in the order of the first frame)
+        * descriptors are returned in the order of atoms of each frame
+    """
+    first = frames[0]
+    first_order = np.argsort(first.ids, kind="stable")
+    positions = np.empty((len(frames), first.number_of_atoms, 3), dtype=np.float64)
+    alignments = []
+    for index, frame in enumerate(frames):
+        # alignment[i] is the index of atom first.ids[i] in this frame
+        alignment = np.empty(first.number_of_atoms, dtype=np.int64)
+        alignment[first_order] = np.argsort(frame.ids, kind="stable")
+        positions[index] = frame.positions[alignment]
+        alignments.append(alignment)
+
+    box = np.array([frame.pbc() for frame in frames], dtype=np.float64)
+    out = np.empty((len(frames), first.number_of_atoms, NUMBER_OF_DESCRIPTORS), dtype=np.float64)
+    descriptors.compute_array(positions, box, out)
+
+    results = []
+    for index, frame in enumerate(frames):
+        values = np.empty_like(out[index])
+        values[alignments[index]] = out[index]
+        results.append((frame.timestep, frame.ids, values))
+    return results
+
+
+def compute_dict(frames):
+    """
+    calculates descriptors of frames using descriptors.compute (atoms are matched by ids)
+    """
+    pbc_dict = {frame.timestep: frame.pbc() for frame in frames}
+    timesteps = {frame.timestep: frame.atoms_dict() for frame in frames}
+    results = []
+    for timestep, atoms in descriptors.compute(pbc_dict, timesteps).items():
+        results.append((timestep,
+                        np.fromiter(atoms.keys(), dtype=np.int64, count=len(atoms)),
+                        np.array(list(atoms.values()), dtype=np.float64)))
+    return results
+
+
+def compute_task(filename, frames, window, cache=None, allow_triclinic=False):
+    """
+    worker: reads given frames, calculates their descriptors and stores them in a new shared memory block
+        * block contains ids [rows] (int64) followed by descriptors [rows, num_of_descriptors] (float64)
+        * returns (name of block, [(timestep, number_of_atoms)], number_of_descriptors, statistics of task)
+    """
+    statistics_before = collections.Counter(statistics)
+    results = []
+    loaded_frames = check_boxes(read_indexed_frames(filename, frames), filename, allow_triclinic)
+    for frame_window in windows(loaded_frames, window):
+        results.extend(compute_frames(frame_window, cache))
+
+    rows = sum(len(ids) for _, ids, _ in results)
+    number_of_descriptors = max((values.shape[1] for _, _, values in results if values.ndim == 2), default=0)
+    block = shared_memory.SharedMemory(create=True, size=max(1, rows * 8 * (1 + number_of_descriptors)))
+    ids_array, descriptors_array = block_arrays(block, rows, number_of_descriptors)
+    offset = 0
+    for _, ids, values in results:
+        ids_array[offset:offset + len(ids)] = ids
+        descriptors_array[offset:offset + len(ids)] = values.reshape(len(ids), number_of_descriptors)
+        offset += len(ids)
+    del ids_array, descriptors_array
+    block.close()
+
+    # the block is tracked by the resource tracker of the main process (see compute_in_parallel),
+    # it is unlinked by the main process after collecting
+    task_statistics = {key: statistics[key] - statistics_before[key] for key in STATISTICS_KEYS + PROFILE_KEYS}
+    return block.name, [(timestep, len(ids)) for timestep, ids, _ in results], number_of_descriptors, task_statistics
+
+
+def block_arrays(block, rows, number_of_descriptors):
+    """
+    returns views (ids [rows], descriptors [rows, num_of_descriptors]) of shared memory block
+    """
+    ids = np.ndarray((rows,), dtype=np.int64, buffer=block.buf)
+    values = np.ndarray((rows, number_of_descriptors), dtype=np.float64, buffer=block.buf, offset=rows * 8)
+    return ids, values
+
+
+def collect_task(result):
+    """
+    copies descriptors of finished task out of its shared memory block and releases the block
+        * statistics of task are added to statistics of this process
+        * returns a list [(timestep, ids, descriptors)]
+    """
+    name, frames, number_of_descriptors, task_statistics = result
+    statistics.update(task_statistics)
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        rows = sum(count for _, count in frames)
+        ids_array, descriptors_array = block_arrays(block, rows, number_of_descriptors)
+        collected = []
+        offset = 0
+        for timestep, count in frames:
+            collected.append((timestep,
+                              ids_array[offset:offset + count].copy(),
+                              descriptors_array[offset:offset + count].copy()))
+            offset += count
+        del ids_array, descriptors_array
+    finally:
+        block.close()
+        block.unlink()
+    return collected
+
+
+def release_block(name):
+    """
+    releases shared memory block of task that was not collected
+    """
+    block = shared_memory.SharedMemory(name=name)
+    block.close()
+    block.unlink()
+
+
+def configure_worker(skin, threads, half_lists, profiling):
+    """
+    worker: uses the same skin of Verlet lists, half lists and profiling as the main process and its share of threads
+    """
+    descriptors.set_skin(skin)
+    descriptors.set_num_threads(threads)
+    descriptors.set_half_lists(half_lists)
+    descriptors.set_profiling(profiling)
+
+
+def compute_in_parallel(filename, frames, window, workers, cache=None, allow_triclinic=False):
+    """
+    yields (timestep, ids, descriptors) for all frames [(timestep, offset, number_of_atoms)] of dump file
+        * frames are split into tasks that are processed by a pool of 'workers' processes
+        * workers share the on-disk 'cache' if it is given
+        * threads of the main process (descriptors.get_num_threads()) are divided among workers
+        * results are passed back through shared memory and yielded in the order of frames
+        * at most two tasks per worker are waiting to be collected, so memory usage stays bounded
+    """
+    tasks = split_frames(frames, window, workers)
+    logger.info("{} frames split into {} tasks for {} workers".format(len(frames), len(tasks), workers))
+
+    pending = collections.deque()
+    skin = descriptors.parameters()["skin"]
+    threads = max(1, descriptors.get_num_threads() // workers)
+    half_lists = descriptors.statistics()["half_lists"]
+    profiling = descriptors.statistics()["profiling"]
+    # workers share the resource tracker of this process, so blocks unlinked here are not reported as leaked
+    # by workers and blocks of tasks that were never collected are unlinked when this process ends
+    resource_tracker.ensure_running()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=configure_worker,
+                                                initargs=(skin, threads, half_lists, profiling)) as pool:
+        try:
+            for task in tasks:
+                pending.append(pool.submit(compute_task, filename, task, window, cache, allow_triclinic))
+                if len(pending) >= 2 * workers:
+                    yield from collect_task(pending.popleft().result())
+            while pending:
+                yield from collect_task(pending.popleft().result())
+        finally:
+            # blocks of tasks that were not collected (e.g. after an error) are released
+            for future in pending:
+                if not future.cancel() and future.exception() is None:
+                    release_block(future.result()[0])
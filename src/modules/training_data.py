@@ -0,0 +1,164 @@
+import math
+import logging
+
+import numpy as np
+import tensorflow as tf
+
+# set-up the logger
+logger = logging.getLogger('kabuto.training_data')
+
+# default number of rows read from the store at once
+DEFAULT_SHARD_SIZE = 8192
+
+# default number of rows in shuffle buffer of training data
+DEFAULT_SHUFFLE_BUFFER = 65536
+
+# default number of rows in one batch (the same as default of model.fit)
+DEFAULT_BATCH_SIZE = 32
+
+# default fraction of rows used for validation
+DEFAULT_VALIDATION_FRACTION = 0.2
+
+
+class TrainingData:
+    """
+    class TrainingData
+        * streams training and validation data (descriptors and one-hot vectors of phases) from DescriptorStore,
+          so memory used by training does not grow with the size of the store
+        * rows are read in shards (at most 'shard_size' consecutive rows of one segment) by tf.data pipeline:
+          shards are read in parallel, rows of training data go through a shuffle buffer of 'shuffle_buffer' rows,
+          batches are prefetched
+        * validation data are whole segments (one segment is written by one run of 'prepare'), about
+          'validation_fraction' of segments of each phase; a phase with only one segment is split by frames
+    """
+
+    def __init__(self, store, phases_available, validation_fraction=DEFAULT_VALIDATION_FRACTION,
+                 shuffle_buffer=DEFAULT_SHUFFLE_BUFFER, batch_size=DEFAULT_BATCH_SIZE,
+                 shard_size=DEFAULT_SHARD_SIZE, seed=0):
+        self.store = store
+        self.phases_available = phases_available
+        self.number_of_phases = len(phases_available)
+        self.validation_fraction = validation_fraction
+        self.shuffle_buffer = shuffle_buffer
+        self.batch_size = batch_size
+        self.shard_size = shard_size
+        self.seed = seed
+
+        unknown = sorted({str(frame["phase"]) for frame in store.frames if frame["phase"] not in phases_available})
+        if unknown:
+            raise ValueError("Phases {} of descriptor store are not available phases".format(", ".join(unknown)))
+
+        # offsets and phases of frames of each segment (sorted by offset), for labels of rows of shards
+        self.frame_offsets = dict()
+        self.frame_phases = dict()
+        for segment in store.segments:
+            frames = sorted((frame for frame in store.frames if frame["segment"] == segment),
+                            key=lambda frame: frame["offset"])
+            self.frame_offsets[segment] = np.array([frame["offset"] for frame in frames], dtype=np.int64)
+            self.frame_phases[segment] = np.array([phases_available[frame["phase"]] for frame in frames],
+                                                  dtype=np.int64)
+
+        training_frames, validation_frames = self.split()
+        self.training_shards = self.shards(training_frames)
+        self.validation_shards = self.shards(validation_frames)
+        self.training_rows = sum(frame["count"] for frame in training_frames)
+        self.validation_rows = sum(frame["count"] for frame in validation_frames)
+        logger.info("Training data: {} rows in {} shards, validation data: {} rows in {} shards".format(
+            self.training_rows, len(self.training_shards), self.validation_rows, len(self.validation_shards)))
+
+    def split(self):
+        """
+        returns frames of training and validation data ([frame], [frame])
+        """
+        generator = np.random.default_rng(self.seed)
+        training, validation = [], []
+        for phase in sorted(self.phases_available, key=self.phases_available.get):
+            frames = [frame for frame in self.store.frames if frame["phase"] == phase]
+            segments = sorted({frame["segment"] for frame in frames})
+            if len(segments) > 1:
+                units = [[frame for frame in frames if frame["segment"] == segment] for segment in segments]
+            else:
+                if frames:
+                    logger.warning("Phase \'{}\' has only one segment, its validation data are chosen "
+                                   "by frames".format(phase))
+                units = [[frame] for frame in frames]
+            if not units:
+                continue
+
+            number_of_validation_units = min(len(units) - 1, max(1, round(self.validation_fraction * len(units))))
+            if self.validation_fraction <= 0.0:
+                number_of_validation_units = 0
+            chosen = set(generator.permutation(len(units))[:number_of_validation_units].tolist())
+            for index, unit in enumerate(units):
+                (validation if index in chosen else training).extend(unit)
+        return training, validation
+
+    def shards(self, frames):
+        """
+        returns shards [(segment, start, stop)] that cover rows of given frames
+            * consecutive frames of one segment are joined and cut into parts of at most 'shard_size' rows
+        """
+        result = []
+        for frame in sorted(frames, key=lambda frame: (frame["segment"], frame["offset"])):
+            start, stop = frame["offset"], frame["offset"] + frame["count"]
+            if result and result[-1][0] == frame["segment"] and result[-1][2] == start:
+                # frame continues the last run of rows
+                segment, start, _ = result.pop()
+            else:
+                segment = frame["segment"]
+            result.append((segment, start, stop))
+
+        shards = []
+        for segment, start, stop in result:
+            for shard_start in range(start, stop, self.shard_size):
+                shards.append((segment, shard_start, min(stop, shard_start + self.shard_size)))
+        return shards
+
+    def read_shard(self, segment, start, stop):
+        """
+        returns (descriptors [rows, num_of_descriptors], one-hot vectors of phases [rows, num_of_phases])
+        of one shard, both float32
+        """
+        descriptors = self.store.read_rows(segment, start, stop).astype(np.float32, copy=False)
+        offsets = self.frame_offsets[segment]
+        frame_of_row = np.searchsorted(offsets, np.arange(start, stop), side="right") - 1
+        phases = np.eye(self.number_of_phases, dtype=np.float32)[self.frame_phases[segment][frame_of_row]]
+        return descriptors, phases
+
+    def dataset(self, shards, training):
+        """
+        returns tf.data.Dataset of batches (descriptors, one-hot vectors of phases) of rows of given shards
+            * order of shards and rows of training data is shuffled in each epoch
+        """
+        def read(index):
+            segment, start, stop = shards[int(index)]
+            return self.read_shard(segment, start, stop)
+
+        def set_shapes(descriptors, phases):
+            descriptors.set_shape([None, self.store.number_of_descriptors])
+            phases.set_shape([None, self.number_of_phases])
+            return descriptors, phases
+
+        data = tf.data.Dataset.range(len(shards))
+        if training:
+            data = data.shuffle(max(1, len(shards)), seed=self.seed, reshuffle_each_iteration=True)
+        data = data.map(lambda index: tf.numpy_function(read, [index], (tf.float32, tf.float32)),
+                        num_parallel_calls=tf.data.AUTOTUNE, deterministic=not training)
+        data = data.map(set_shapes).unbatch()
+        if training:
+            data = data.shuffle(self.shuffle_buffer, seed=self.seed, reshuffle_each_iteration=True)
+        # number of batches is known (Keras shows progress and does not expect an endless dataset)
+        number_of_batches = math.ceil(sum(stop - start for _, start, stop in shards) / self.batch_size)
+        data = data.batch(self.batch_size).apply(tf.data.experimental.assert_cardinality(number_of_batches))
+        return data.prefetch(tf.data.AUTOTUNE)
+
+    def training_dataset(self):
+        return self.dataset(self.training_shards, training=True)
+
+    def validation_dataset(self):
+        """
+        returns validation dataset or None if there are no validation data
+        """
+        if not self.validation_shards:
+            return None
+        return self.dataset(self.validation_shards, training=False)
@@ -0,0 +1,150 @@
+"""
+    Name:           test_cache.py
+    Description:    Checks the on-disk cache (modules/cache.py): keys are stable, they change with input and settings,
+                    the least recently used entries are evicted at the size limit (also while windows of frames
+                    are saved by one or more processes) and the cache is cleared.
+    Usage:          python3 -m pytest tests (in 'src' folder)
+"""
+
+import os
+import sys
+import shutil
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules import parallel
+from modules import cache as cache_module
+from modules.cache import Cache
+from modules.dump_reader import read_frames, windows, indexed_frames
+
+PATH_TO_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dump.out")
+PATH_TO_EXAMPLE_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "example",
+                                    "mo_bcc_fcc_amorf", "dumpOnlyAmorf.out")
+
+
+def frames_and_results():
+    """
+    returns frames of the test dump file and made-up descriptors of their atoms [(timestep, ids, descriptors)]
+    """
+    frames = list(read_frames(PATH_TO_DUMP))
+    results = [(frame.timestep, frame.ids, np.full((len(frame.ids), 14), float(frame.timestep)))
+               for frame in frames]
+    return frames, results
+
+
+def test_keys_are_stable(tmp_path):
+    frames, _ = frames_and_results()
+    key = Cache(str(tmp_path)).descriptors_key(frames)
+    assert Cache(str(tmp_path / "other")).descriptors_key(list(read_frames(PATH_TO_DUMP))) == key
+    assert len(key) == 64
+
+    model = tmp_path / "model.h5"
+    model.write_bytes(b"weights")
+    input_array = np.arange(12.0).reshape(3, 4)
+    assert Cache(str(tmp_path)).prediction_key(str(model), input_array) == \
+        Cache(str(tmp_path)).prediction_key(str(model), input_array.copy())
+
+
+def test_key_changes_with_input_and_settings(tmp_path, monkeypatch):
+    frames, _ = frames_and_results()
+    cache = Cache(str(tmp_path))
+    key = cache.descriptors_key(frames)
+    assert cache.descriptors_key(frames[:2]) != key
+
+    frames[1].positions[0, 0] += 1e-9
+    assert cache.descriptors_key(frames) != key
+    frames[1].positions[0, 0] -= 1e-9
+    assert cache.descriptors_key(frames) == key
+
+    # other parameters of descriptors (e.g. cutoffs) give other keys
+    parameters = dict(cache_module.descriptors.parameters(), symmetry_cutoff=(6.2, 7.0))
+    monkeypatch.setattr(cache_module.descriptors, "parameters", lambda: parameters)
+    assert Cache(str(tmp_path)).descriptors_key(frames) != key
+
+    # the same input of changed model, or input of other dtype or shape
+    model = tmp_path / "model.h5"
+    model.write_bytes(b"weights")
+    input_array = np.arange(12.0).reshape(3, 4)
+    key = cache.prediction_key(str(model), input_array)
+    assert cache.prediction_key(str(model), input_array.reshape(4, 3)) != key
+    assert cache.prediction_key(str(model), input_array.astype(np.float32)) != key
+    model.write_bytes(b"other weights")
+    assert cache.prediction_key(str(model), input_array) != key
+
+
+def test_save_and_load(tmp_path):
+    frames, results = frames_and_results()
+    cache = Cache(str(tmp_path))
+    assert cache.load_descriptors(frames) is None
+    cache.save_descriptors(frames, results)
+    loaded = cache.load_descriptors(frames)
+    assert [timestep for timestep, _, _ in loaded] == [timestep for timestep, _, _ in results]
+    for (_, ids, values), (_, loaded_ids, loaded_values) in zip(results, loaded):
+        assert np.array_equal(loaded_ids, ids) and np.array_equal(loaded_values, values)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    model = tmp_path / "model.h5"
+    model.write_bytes(b"weights")
+    cache.save_prediction(str(model), np.zeros(3), [0.25, 0.75])
+    assert cache.load_prediction(str(model), np.zeros(3)) == [0.25, 0.75]
+    assert cache.info()["descriptors"][0] == cache.info()["predictions"][0] == 1
+
+
+def test_eviction_and_clear(tmp_path):
+    cache = Cache(str(tmp_path))
+    for index in range(4):
+        cache.save("predictions", "{:064x}".format(index), vector_big_q=np.zeros(1000))
+        os.utime(cache.path_to_entry("predictions", "{:064x}".format(index)), (index, index))
+    # entry 0 was used last
+    assert cache.load("predictions", "{:064x}".format(0)) is not None
+    entry_size = cache.entries()[0][2]
+
+    cache.max_size = 2 * entry_size
+    cache.evict()
+    remaining = sorted(os.path.basename(path)[:64] for path, _, _, _ in cache.entries())
+    assert remaining == ["{:064x}".format(0), "{:064x}".format(3)]
+
+    # size under the limit, nothing is evicted
+    cache.evict()
+    assert len(cache.entries()) == 2
+    assert cache.clear() == 2
+    assert cache.entries() == [] and cache.load("predictions", "{:064x}".format(0)) is None
+
+
+def cache_size(cache):
+    return sum(size for _, _, size, _ in cache.entries())
+
+
+def test_size_limit_while_saving(tmp_path):
+    # descriptors of windows of 2 frames (250 atoms each) are saved, the cache holds about two windows
+    filename = str(tmp_path / "dump.out")
+    shutil.copy(PATH_TO_EXAMPLE_DUMP, filename)
+    windows_of_frames = list(windows(read_frames(filename, slice(None, None, 10)), 2))
+    entry_size = 2 * 250 * (14 * 8 + 8) + 2 * 8
+    cache = Cache(str(tmp_path / "cache"), max_size_mb=2.5 * entry_size / (1024 * 1024))
+
+    for frames in windows_of_frames:
+        parallel.compute_frames(frames, cache)
+        assert 0 < cache_size(cache) <= cache.max_size
+        assert cache.size == cache_size(cache)
+    assert cache.evicted == len(windows_of_frames) - 2
+    # the last windows are in cache
+    assert cache.load_descriptors(windows_of_frames[-1]) is not None
+    assert cache.load_descriptors(windows_of_frames[0]) is None
+
+    # workers share the cache, each of them keeps it under the limit
+    cache.clear()
+    frames = indexed_frames(filename, slice(None, None, 10))
+    list(parallel.compute_in_parallel(filename, frames, 2, 2, cache))
+    assert 0 < cache_size(cache) <= cache.max_size
+
+
+def test_entry_bigger_than_cache(tmp_path):
+    cache = Cache(str(tmp_path), max_size_mb=1000 / (1024 * 1024))
+    cache.save("predictions", "{:064x}".format(1), vector_big_q=np.zeros(10))
+    cache.save("predictions", "{:064x}".format(2), vector_big_q=np.zeros(1000))
+    assert [os.path.basename(path)[:64] for path, _, _, _ in cache.entries()] == ["{:064x}".format(1)]
+    assert cache.load("predictions", "{:064x}".format(2)) is None
+    assert not [name for _, _, names in os.walk(str(tmp_path)) for name in names if name.endswith(".tmp")]
@@ -0,0 +1,101 @@
+"""
+    Name:           test_descriptor_store.py
+    Description:    Checks the binary descriptor store (modules/descriptor_store.py): frames are read back as written,
+                    the index survives reopening, segments are moved between stores and a segment whose writing
+                    failed is deleted.
+    Usage:          python3 -m pytest tests (in 'src' folder)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.descriptor_store import DescriptorStore
+
+
+def write_segment(store, phase, timesteps, dtype="float32"):
+    """
+    appends a segment with one frame of 'timestep + 1' atoms for each timestep, returns written descriptors
+    """
+    written = []
+    with store.segment_writer(dtype) as writer:
+        for timestep in timesteps:
+            ids = np.arange(timestep + 1) + 100
+            descriptors = np.random.default_rng(timestep).normal(size=(timestep + 1, 14))
+            writer.append(timestep, ids, descriptors, phase)
+            written.append((ids, descriptors.astype(dtype)))
+    return written
+
+
+def test_frames_are_read_back(tmp_path):
+    store = DescriptorStore(str(tmp_path / "store"))
+    assert not store.exists()
+    written = write_segment(store, "bcc", [0, 3, 5]) + write_segment(store, "fcc", [2], "float64")
+
+    # index is saved, a new object of the same store sees the same frames
+    store = DescriptorStore(str(tmp_path / "store"))
+    assert store.exists() and len(store.segments) == 2
+    assert store.number_of_rows == 1 + 4 + 6 + 3
+    assert [(frame["timestep"], frame["phase"]) for frame in store.frames] == [(0, "bcc"), (3, "bcc"), (5, "bcc"),
+                                                                              (2, "fcc")]
+    for frame, (ids, descriptors) in zip(store.frames, written):
+        frame_ids, frame_descriptors = store.read_frame(frame)
+        assert np.array_equal(frame_ids, ids)
+        assert frame_descriptors.dtype == descriptors.dtype
+        assert np.array_equal(frame_descriptors, descriptors)
+
+
+def test_wrong_shape(tmp_path):
+    store = DescriptorStore(str(tmp_path / "store"))
+    with pytest.raises(ValueError):
+        with store.segment_writer() as writer:
+            writer.append(0, np.arange(3), np.zeros((3, 13)))
+
+
+def test_wrong_dtype(tmp_path):
+    store = DescriptorStore(str(tmp_path / "store"))
+    with pytest.raises(ValueError):
+        store.segment_writer("int8")
+    assert not store.exists()
+
+
+def test_move_to(tmp_path, monkeypatch):
+    # segments of both stores have the same name, the moved one is renamed
+    monkeypatch.setattr(DescriptorStore, "new_segment_name", lambda store: "segment")
+    source = DescriptorStore(str(tmp_path / "source"))
+    target = DescriptorStore(str(tmp_path / "target"))
+    written = write_segment(source, "bcc", [1, 2])
+    write_segment(target, "fcc", [4])
+
+    source.move_to(str(tmp_path / "target"))
+    assert not source.exists() and not os.path.isfile(source.path_to_index)
+
+    target = DescriptorStore(str(tmp_path / "target"))
+    assert sorted(target.segments) == ["segment", "segment_1"] and target.number_of_rows == 5 + 2 + 3
+    moved = [frame for frame in target.frames if frame["phase"] == "bcc"]
+    assert [frame["segment"] for frame in moved] == ["segment_1"] * 2
+    for frame, (ids, descriptors) in zip(moved, written):
+        frame_ids, frame_descriptors = target.read_frame(frame)
+        assert np.array_equal(frame_ids, ids)
+        assert np.array_equal(frame_descriptors, descriptors)
+
+
+def test_failed_segment_is_deleted(tmp_path):
+    store = DescriptorStore(str(tmp_path / "store"))
+    written = write_segment(store, "bcc", [1])
+    with pytest.raises(KeyboardInterrupt):
+        with store.segment_writer() as writer:
+            writer.append(2, np.arange(3), np.ones((3, 14)), "fcc")
+            raise KeyboardInterrupt
+
+    store = DescriptorStore(str(tmp_path / "store"))
+    assert len(store.segments) == 1 and [frame["phase"] for frame in store.frames] == ["bcc"]
+    assert sorted(os.listdir(str(tmp_path / "store"))) == sorted(
+        [os.path.basename(store.path_to_index)] +
+        [segment + suffix for segment in store.segments
+         for suffix in (DescriptorStore.ids_suffix, DescriptorStore.descriptors_suffix)])
+    assert np.array_equal(store.read_frame(store.frames[0])[1], written[0][1])
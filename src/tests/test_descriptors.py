@@ -0,0 +1,173 @@
+"""
+    Name:           test_descriptors.py
+    Description:    Compares descriptors calculated by NumPy/SciPy (modules/descriptors.py) with C++ extension 'descriptors'.
+    Usage:          python3 -m pytest tests (in 'src' folder, tests are skipped if C++ extension is not installed)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules import descriptors as numpy_descriptors
+from modules.dump_reader import read_frames
+
+cpp_descriptors = pytest.importorskip("descriptors")
+
+PATH_TO_EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "example")
+
+
+def example_frames(number_of_frames=3):
+    """
+    returns the first frames of amorphous molybdenum (250 atoms)
+    """
+    frames = []
+    for frame in read_frames(os.path.join(PATH_TO_EXAMPLE, "mo_bcc_fcc_amorf", "dumpOnlyAmorf.out")):
+        frames.append(frame)
+        if len(frames) == number_of_frames:
+            break
+    return frames
+
+
+def assert_same_descriptors(expected, actual):
+    """
+    descriptors differ only by rounding (relative to the largest value of each descriptor)
+    """
+    assert expected.shape == actual.shape
+    assert np.array_equal(np.isnan(expected), np.isnan(actual))
+    scale = np.nanmax(np.abs(expected).reshape(-1, expected.shape[-1]), axis=0)
+    assert np.nanmax(np.abs(expected - actual).reshape(-1, expected.shape[-1]) / scale) < 1e-12
+
+
+def test_same_parameters():
+    assert numpy_descriptors.parameters() == cpp_descriptors.parameters()
+
+
+def test_compute_array():
+    frames = example_frames()
+    positions = np.array([frame.positions for frame in frames])
+    box = np.array([frame.pbc() for frame in frames])
+    expected = np.empty(positions.shape[:2] + (numpy_descriptors.NUMBER_OF_DESCRIPTORS,))
+    actual = np.empty_like(expected)
+
+    cpp_descriptors.compute_array(positions, box, expected)
+    assert numpy_descriptors.compute_array(positions, box, actual) is actual
+    assert_same_descriptors(expected, actual)
+    assert numpy_descriptors.statistics()["timesteps"] == len(frames)
+
+
+def test_compute():
+    frames = example_frames()
+    pbc_dict = {frame.timestep: frame.pbc() for frame in frames}
+    timesteps = {frame.timestep: frame.atoms_dict() for frame in frames}
+    expected = cpp_descriptors.compute(pbc_dict, timesteps)
+    actual = numpy_descriptors.compute(pbc_dict, timesteps)
+
+    assert list(expected) == list(actual)
+    for timestep in expected:
+        assert list(expected[timestep]) == list(actual[timestep])
+        assert_same_descriptors(np.array(list(expected[timestep].values())),
+                                np.array(list(actual[timestep].values())))
+
+
+def test_small_box_and_isolated_atom():
+    # cutoff of symmetry functions is longer than half of the box, the last atom has no close neighbours
+    generator = np.random.default_rng(1)
+    positions = np.vstack((generator.uniform(0.0, 6.0, (20, 3)), [[9.0, 9.0, 9.0]]))
+    box = np.array([12.0, 12.0, 12.0])
+    expected = np.empty((len(positions), numpy_descriptors.NUMBER_OF_DESCRIPTORS))
+    actual = np.empty_like(expected)
+
+    cpp_descriptors.compute_array(positions, box, expected)
+    numpy_descriptors.compute_array(positions, box, actual)
+    assert np.all(np.isnan(actual[-1, 11:]))
+    assert_same_descriptors(expected, actual)
+
+
+def test_dilute_large_box():
+    # number of cells of the cell list does not grow with volume of the box (no huge allocation)
+    generator = np.random.default_rng(2)
+    positions = generator.uniform(0.0, 1e4, (2000, 3))
+    positions[:10] = positions[0] + np.arange(10)[:, np.newaxis] * [1.5, 0.3, 0.2]
+    box = np.array([1e4, 1e4, 1e4])
+    expected = np.empty((len(positions), numpy_descriptors.NUMBER_OF_DESCRIPTORS))
+    actual = np.empty_like(expected)
+
+    cpp_descriptors.compute_array(positions, box, expected)
+    numpy_descriptors.compute_array(positions, box, actual)
+    assert not np.any(np.isnan(expected[:10]))
+    assert_same_descriptors(expected, actual)
+
+
+def test_engine():
+    # frames are passed one by one, Verlet lists of the first frame are reused by the following ones
+    frames = example_frames()
+    positions = np.array([frame.positions for frame in frames])
+    box = np.array([frame.pbc() for frame in frames])
+    expected = np.empty(positions.shape[:2] + (numpy_descriptors.NUMBER_OF_DESCRIPTORS,))
+    cpp_descriptors.compute_array(positions, box, expected)
+
+    cpp_engine = cpp_descriptors.Engine(skin=2.0, threads=2)
+    numpy_engine = numpy_descriptors.Engine(skin=2.0)
+    out = np.empty_like(expected[0])
+    for frame in range(len(frames)):
+        assert np.array_equal(np.asarray(cpp_engine.update(positions[frame], box[frame])), expected[frame],
+                              equal_nan=True)
+        assert numpy_engine.update(positions[frame], box[frame], out) is out
+        assert_same_descriptors(expected[frame], out)
+
+    cpp_statistics, numpy_statistics = cpp_engine.statistics(), numpy_engine.statistics()
+    assert sorted(cpp_statistics) == sorted(numpy_statistics)
+    assert cpp_statistics["updates"] == numpy_statistics["updates"] == len(frames)
+    assert cpp_statistics["verlet_list_builds"] == numpy_statistics["verlet_list_builds"] == 1
+    assert 0.0 < cpp_statistics["last_update_us"] <= cpp_statistics["max_update_us"]
+
+    with pytest.raises(ValueError):
+        cpp_engine.update(positions, box[0])
+    with pytest.raises(ValueError):
+        numpy_engine.update(positions, box[0])
+
+
+def test_profile():
+    positions = np.array(example_frames(1)[0].positions)
+    box = np.array(example_frames(1)[0].pbc())
+    out = np.empty((len(positions), numpy_descriptors.NUMBER_OF_DESCRIPTORS))
+    profiles = []
+    for module in (cpp_descriptors, numpy_descriptors):
+        module.compute_array(positions, box, out)
+        assert module.profile() is None
+        module.set_profiling(True)
+        try:
+            module.compute_array(positions, box, out)
+            profiles.append(module.profile())
+            assert module.statistics()["profiling"]
+        finally:
+            module.set_profiling(False)
+
+    cpp_profile, numpy_profile = profiles
+    assert sorted(cpp_profile) == sorted(numpy_profile)
+    for key in ("timesteps", "atoms", "pairs", "neighbours", "steinhardt_neighbours"):
+        assert cpp_profile[key] == numpy_profile[key]
+    assert cpp_profile["atoms"] == len(positions)
+    assert cpp_profile["neighbours"] == 2 * cpp_profile["pairs"] > cpp_profile["steinhardt_neighbours"] > 0
+    assert cpp_profile["total_time"] >= cpp_profile["verlet_list_time"] + cpp_profile["descriptors_time"]
+
+
+def test_wrong_arrays():
+    with pytest.raises(ValueError):
+        numpy_descriptors.compute_array(np.zeros((4, 2)), np.ones(3), np.empty((4, 14)))
+    with pytest.raises(TypeError):
+        numpy_descriptors.compute_array(np.zeros((4, 3), dtype=np.float32), np.ones(3), np.empty((4, 14)))
+
+
+def test_timestep_without_pbc():
+    # error is a Python exception, not std::out_of_range thrown in released GIL (interpreter would be aborted)
+    timesteps = {0: {1: (0.0, 0.0, 0.0)}, 1: {1: (1.0, 1.0, 1.0)}}
+    for module in (cpp_descriptors, numpy_descriptors):
+        with pytest.raises(ValueError):
+            module.compute({0: (10.0, 10.0, 10.0)}, timesteps)
+    with pytest.raises(ValueError):
+        cpp_descriptors.compute({0: (10.0, 10.0, 10.0)}, {0: {1: (0.0, 0.0)}})
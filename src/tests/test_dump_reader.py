@@ -0,0 +1,172 @@
+"""
+    Name:           test_dump_reader.py
+    Description:    Checks the dump reader (modules/dump_reader.py) on small dump files in 'tests/data': text,
+                    compressed and binary dumps give the same frames, the frame index is reused and rebuilt,
+                    selection of timesteps gives the same frames in every reading mode.
+    Usage:          python3 -m pytest tests (in 'src' folder)
+"""
+
+import os
+import bz2
+import sys
+import lzma
+import shutil
+import logging
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules import dump_reader
+from modules.dump_reader import read_frames, parse_selection, INDEX_SUFFIX
+
+PATH_TO_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# timesteps of all dump files in 'tests/data' (5 atoms each)
+TIMESTEPS = [0, 100, 200]
+
+
+def copy_data(tmp_path, name):
+    """
+    returns path to a copy of dump file 'name' (the frame index is written next to it)
+    """
+    path = str(tmp_path / name)
+    shutil.copy(os.path.join(PATH_TO_DATA, name), path)
+    return path
+
+
+def timesteps_of(filename, selection):
+    return [frame.timestep for frame in read_frames(filename, selection)]
+
+
+def assert_same_frames(expected, actual):
+    """
+    frames have the same timesteps, atoms, positions and boxes
+    """
+    assert [frame.timestep for frame in actual] == [frame.timestep for frame in expected]
+    for expected_frame, actual_frame in zip(expected, actual):
+        assert np.array_equal(actual_frame.ids, expected_frame.ids)
+        assert np.allclose(actual_frame.positions, expected_frame.positions, rtol=0.0, atol=1e-12)
+        assert np.array_equal(actual_frame.box_bounds, expected_frame.box_bounds)
+        assert np.array_equal(actual_frame.tilt, expected_frame.tilt)
+
+
+def test_text_dump():
+    # columns are taken from the header (type id z x y vx)
+    frames = list(read_frames(os.path.join(PATH_TO_DATA, "dump.out")))
+    assert [frame.timestep for frame in frames] == TIMESTEPS
+    assert frames[0].ids.tolist() == [3, 1, 5, 2, 4]
+    assert frames[0].positions[0].tolist() == [5.251, 7.178, 11.808]
+    assert frames[0].pbc() == [10.0, 8.0, 12.0]
+    assert not frames[0].is_triclinic
+
+
+def test_truncated_text_dump(tmp_path):
+    with open(os.path.join(PATH_TO_DATA, "dump.out"), "r") as file:
+        lines = file.readlines()
+    filename = tmp_path / "dump.out"
+    filename.write_text("".join(lines[:12]))
+    with pytest.raises(ValueError):
+        list(read_frames(str(filename)))
+
+
+@pytest.mark.parametrize("external", [True, False])
+def test_compressed_dumps(tmp_path, monkeypatch, external):
+    # the same frames from compressed files, decompressed by external programs or by Python modules
+    if not external:
+        monkeypatch.setattr(dump_reader, "EXTERNAL_DECOMPRESSORS",
+                            {compression: [] for compression in dump_reader.EXTERNAL_DECOMPRESSORS})
+    filename = os.path.join(PATH_TO_DATA, "dump.out")
+    expected = list(read_frames(filename))
+    with open(filename, "rb") as file:
+        content = file.read()
+    (tmp_path / "dump.out.bz2").write_bytes(bz2.compress(content))
+    (tmp_path / "dump.out.xz").write_bytes(lzma.compress(content))
+
+    for path in (os.path.join(PATH_TO_DATA, "dump.out.gz"), tmp_path / "dump.out.bz2", tmp_path / "dump.out.xz"):
+        assert_same_frames(expected, list(read_frames(str(path))))
+
+
+@pytest.mark.parametrize("damage", ["checksum", "trailer"])
+def test_failed_external_decompressor(tmp_path, damage):
+    # all frames are decompressed, then gzip reports wrong CRC or unexpected end of file
+    if not any(shutil.which(command[0]) for command in dump_reader.EXTERNAL_DECOMPRESSORS["gzip"]):
+        pytest.skip("no external decompressor of gzip")
+    with open(os.path.join(PATH_TO_DATA, "dump.out.gz"), "rb") as file:
+        content = bytearray(file.read())
+    if damage == "checksum":
+        content[-8] ^= 0xFF
+    else:
+        content = content[:-8]
+    (tmp_path / "dump.out.gz").write_bytes(bytes(content))
+
+    with pytest.raises(ValueError, match="failed"):
+        list(read_frames(str(tmp_path / "dump.out.gz")))
+
+
+def test_index_is_reused_and_rebuilt(tmp_path, monkeypatch):
+    filename = copy_data(tmp_path, "dump.out")
+    builds = []
+    build_frame_index = dump_reader.build_frame_index
+    monkeypatch.setattr(dump_reader, "build_frame_index",
+                        lambda name: builds.append(name) or build_frame_index(name))
+
+    assert timesteps_of(filename, [100]) == [100]
+    assert os.path.isfile(filename + INDEX_SUFFIX) and len(builds) == 1
+    assert timesteps_of(filename, [200]) == [200]
+    assert len(builds) == 1
+
+    # the dump file changed (one frame less), the index is built again
+    with open(filename, "r") as file:
+        lines = file.readlines()
+    with open(filename, "w") as file:
+        file.writelines(lines[:-14])
+    os.utime(filename, ns=(0, 0))
+    assert timesteps_of(filename, slice(None)) == [0, 100]
+    assert len(builds) == 2
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("200,0,200,999", [0, 200]),
+    ("100:", [100, 200]),
+    (":200", [0, 100]),
+    ("::2", [0, 200]),
+    ("50:250:1", [100, 200]),
+])
+def test_same_selection_in_every_mode(tmp_path, caplog, text, expected):
+    # uncompressed dump is read from the frame index, compressed and binary dumps sequentially
+    selection = parse_selection(text)
+    for name in ("dump.out", "dump.out.gz", "dump.bin"):
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger="kabuto.dump_reader"):
+            assert timesteps_of(copy_data(tmp_path, name), selection) == expected
+        # missing timesteps of list selection are reported once
+        warnings = [record.getMessage() for record in caplog.records if "not found" in record.getMessage()]
+        assert len(warnings) == (1 if "999" in text else 0)
+        assert all("[999]" in warning for warning in warnings)
+
+
+def test_binary_and_scaled_dumps():
+    # binary dump (two chunks of atoms) and scaled coordinates xs ys zs of a box with nonzero lower bounds
+    expected = list(read_frames(os.path.join(PATH_TO_DATA, "dump.out")))
+    assert_same_frames(expected, list(read_frames(os.path.join(PATH_TO_DATA, "dump.bin"))))
+    assert_same_frames(expected, list(read_frames(os.path.join(PATH_TO_DATA, "dump_scaled.out"))))
+
+
+def test_triclinic_box(caplog):
+    filename = os.path.join(PATH_TO_DATA, "dump_triclinic.out")
+    with pytest.raises(ValueError):
+        list(read_frames(filename))
+
+    # calculation for orthogonal box is explicitly allowed, bounding box is converted to bounds of the box
+    with caplog.at_level(logging.WARNING, logger="kabuto.dump_reader"):
+        frame, = read_frames(filename, allow_triclinic=True)
+    assert frame.is_triclinic and frame.tilt.tolist() == [1.5, 0.0, 0.0]
+    assert frame.box_bounds.tolist() == [[-1.0, 9.0], [0.0, 8.0], [2.5, 14.5]]
+    assert any("triclinic" in record.getMessage() for record in caplog.records)
+
+    # scaled coordinates are fractions of box vectors a = (lx, 0, 0), b = (xy, ly, 0), c = (xz, yz, lz)
+    frame = dump_reader.make_frame(0, [1, 2], np.array([[0.0, 1.0, 0.0], [0.5, 0.5, 0.5]]), True,
+                                   np.array([[-1.0, 10.5, 1.5], [0.0, 8.0, 0.0], [2.5, 14.5, 0.0]]))
+    assert np.allclose(frame.positions, [[0.5, 8.0, 2.5], [4.75, 4.0, 8.5]], rtol=0.0, atol=1e-12)
@@ -0,0 +1,186 @@
+"""
+    Name:           test_kabuto.py
+    Description:    Runs the command line script kabuto.py in a copy of 'src' folder: wrong values of options are
+                    reported before anything is calculated. Checks prediction of vectors Q of batches of timesteps
+                    with kabuto.py loaded as a module (without action).
+    Usage:          python3 -m pytest tests (in 'src' folder)
+"""
+
+import os
+import sys
+import shutil
+import logging.config
+import subprocess
+import importlib.util
+
+import numpy as np
+import pytest
+
+PATH_TO_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PATH_TO_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dump.out")
+PATH_TO_TRICLINIC_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dump_triclinic.out")
+PATH_TO_MODEL = os.path.join(PATH_TO_SRC, "..", "example", "mo_bcc_fcc_amorf", "saved_nn", "nn-bcc-fcc-amorf.h5")
+
+# runs kabuto.py (path and arguments in sys.argv) and reports whether TensorFlow was imported
+IMPORTED_MODULES_SCRIPT = """
+import os, sys, runpy
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+runpy.run_path(sys.argv[0], run_name="__main__")
+print("TensorFlow imported:", "tensorflow" in sys.modules)
+"""
+
+
+def run_kabuto(tmp_path, *arguments, script=None):
+    """
+    runs kabuto.py with arguments in a copy of 'src' folder (directories and 'kabuto.log' are created there),
+    returns the finished process (output in 'stdout')
+        * with 'script', kabuto.py is run by Python code 'script' (path and arguments are in sys.argv)
+    """
+    shutil.copy(os.path.join(PATH_TO_SRC, "kabuto.py"), tmp_path)
+    shutil.copytree(os.path.join(PATH_TO_SRC, "config"), tmp_path / "config", dirs_exist_ok=True)
+    if not os.path.exists(tmp_path / "modules"):
+        os.symlink(os.path.join(os.path.abspath(PATH_TO_SRC), "modules"), tmp_path / "modules")
+    command = [sys.executable] + (["-c", script] if script is not None else [])
+    return subprocess.run(command + [str(tmp_path / "kabuto.py")] + list(arguments), cwd=str(tmp_path),
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+
+
+@pytest.fixture
+def kabuto(monkeypatch):
+    """
+    returns script kabuto.py loaded as a module without action (logging is not configured, no log is written)
+    """
+    monkeypatch.setattr(logging.config, "fileConfig", lambda *args, **kwargs: None)
+    monkeypatch.setattr(sys, "argv", [os.path.join(PATH_TO_SRC, "kabuto.py")])
+    spec = importlib.util.spec_from_file_location("kabuto_script", os.path.join(PATH_TO_SRC, "kabuto.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.import_modules("predict")
+    return module
+
+
+class RecordingNetwork:
+    """
+    network whose prediction of each atom are its first three descriptors, numbers of predicted atoms are recorded
+    """
+
+    def __init__(self):
+        self.predicted = []
+
+    def predict(self, input_array, batch_size):
+        self.predicted.append(len(input_array))
+        return input_array[:, :3].astype(np.float32)
+
+    def get(self, name):
+        # the network is its own registry of models
+        return self
+
+
+@pytest.mark.parametrize("option", ["window", "workers", "max-models", "batch-size", "shuffle-buffer"])
+@pytest.mark.parametrize("value", ["0", "-2", "two", "1.5"])
+def test_wrong_positive_integer_option(tmp_path, option, value):
+    process = run_kabuto(tmp_path, "prepare", "bcc", "dump.out", "--{}={}".format(option, value))
+    assert process.returncode == 1
+    assert "ERROR:kabuto: Wrong value of option --{}: '{}'".format(option, value) in process.stdout
+    # nothing was started
+    assert not os.path.isdir(tmp_path / "results")
+
+
+@pytest.mark.parametrize("value", ["int8", "float16", "double"])
+def test_wrong_dtype(tmp_path, value):
+    process = run_kabuto(tmp_path, "prepare", "bcc", PATH_TO_DUMP, "--dtype={}".format(value))
+    assert "ERROR:kabuto: Wrong data type of descriptors '{}'".format(value) in process.stdout
+    assert "Traceback" not in process.stdout and not os.path.isdir(tmp_path / "dir_to_train")
+
+
+@pytest.mark.parametrize("value", ["big", "0", "-5", "nan", "inf"])
+def test_wrong_cache_size(tmp_path, value):
+    process = run_kabuto(tmp_path, "prepare", "bcc", PATH_TO_DUMP, "--cache-size={}".format(value))
+    assert "ERROR:kabuto: Wrong size of cache" in process.stdout and "Traceback" not in process.stdout
+    assert not os.path.isdir(tmp_path / "dir_to_train") and not os.path.isdir(tmp_path / "cache")
+
+
+def test_positive_integer_options(tmp_path):
+    # '--workers' alone uses all cores
+    process = run_kabuto(tmp_path, "prepare", "bcc", "missing.out", "--window=2", "--workers")
+    assert "Wrong value of option" not in process.stdout
+    assert os.path.isdir(tmp_path / "results")
+
+
+def test_prepare_and_predict_without_tensorflow(tmp_path):
+    # prediction by NumpyNetwork from the model of example (phases bcc, fcc, amorf as in 'config')
+    os.mkdir(tmp_path / "saved_nn")
+    shutil.copy(PATH_TO_MODEL, tmp_path / "saved_nn")
+    for arguments in (("prepare", "bcc", PATH_TO_DUMP), ("predict", "nn-bcc-fcc-amorf", PATH_TO_DUMP)):
+        process = run_kabuto(tmp_path, *arguments, "--no-cache", script=IMPORTED_MODULES_SCRIPT)
+        assert process.returncode == 0 and ":ERROR:" not in process.stdout
+        assert "TensorFlow imported: False" in process.stdout
+    assert os.listdir(tmp_path / "dir_to_train") and os.listdir(tmp_path / "dir_predicted")
+    assert len(os.listdir(tmp_path / "results")) == 1
+
+    # prediction by Keras imports TensorFlow
+    process = run_kabuto(tmp_path, "predict", "nn-bcc-fcc-amorf", PATH_TO_DUMP, "--no-cache", "--keras",
+                         script=IMPORTED_MODULES_SCRIPT)
+    assert "TensorFlow imported: True" in process.stdout
+
+
+@pytest.mark.parametrize("mode", [[], ["--stream"], ["--workers=2"]])
+def test_dump_that_cannot_be_read(tmp_path, mode):
+    # triclinic box without --triclinic, the last frame of a dump file is cut short
+    os.mkdir(tmp_path / "saved_nn")
+    shutil.copy(PATH_TO_MODEL, tmp_path / "saved_nn")
+    with open(PATH_TO_DUMP, "r") as file:
+        lines = file.readlines()
+    (tmp_path / "truncated.out").write_text("".join(lines[:-2]))
+
+    for filename, message in ((PATH_TO_TRICLINIC_DUMP, "triclinic"), (str(tmp_path / "truncated.out"), "")):
+        for action, name in (("prepare", "bcc"), ("predict", "nn-bcc-fcc-amorf")):
+            process = run_kabuto(tmp_path, action, name, filename, "--no-cache", *mode)
+            assert "ERROR:kabuto: Reading of dump file '{}' failed: ".format(filename) in process.stdout
+            assert message in process.stdout and "Traceback" not in process.stdout
+    # no part of dump files was saved
+    for directory in ("dir_to_train", "dir_to_predict", "dir_predicted"):
+        assert not os.path.isdir(tmp_path / directory) or os.listdir(tmp_path / directory) == []
+    assert not os.path.isdir(tmp_path / "results") or os.listdir(tmp_path / "results") == []
+
+
+def test_vectors_big_q_of_segments(kabuto):
+    # empty timesteps at the beginning, at the end and next to each other have no vector Q
+    counts = np.array([0, 2, 0, 0, 3, 1, 0])
+    prediction = np.arange(3.0 * counts.sum()).reshape(-1, 3)
+    vectors = kabuto.Kabuto.calculate_vectors_big_q(prediction, counts)
+
+    assert len(vectors) == len(counts)
+    offsets = np.cumsum(counts) - counts
+    for vector, offset, count in zip(vectors, offsets, counts):
+        if count == 0:
+            assert np.all(np.isnan(vector))
+        else:
+            assert np.allclose(vector, prediction[offset:offset + count].mean(axis=0), rtol=1e-15, atol=0.0)
+
+
+def test_predict_batches(kabuto, tmp_path):
+    # timesteps are collected until the batch has at least 4 atoms
+    generator = np.random.default_rng(4)
+    timesteps = [(timestep, generator.uniform(size=(count, 14)).astype(np.float32))
+                 for timestep, count in zip(range(0, 500, 100), (3, 0, 4, 2, 5))]
+    machine = kabuto.Kabuto.__new__(kabuto.Kabuto)
+    machine.saved_nn_dir = str(tmp_path)
+    machine.batch_size = 4
+    machine.models = RecordingNetwork()
+    machine.cache = kabuto.Cache(str(tmp_path / "cache"))
+    (tmp_path / "nn.h5").write_bytes(b"model")
+
+    results = list(machine.predict_batches("nn", iter(timesteps)))
+    assert machine.models.predicted == [7, 7]
+    assert [timestep for timestep, _ in results] == [timestep for timestep, _ in timesteps]
+    for (_, input_array), (_, vector_big_q) in zip(timesteps, results):
+        expected = input_array[:, :3].astype(np.float64).mean(axis=0) if len(input_array) else np.full(3, np.nan)
+        assert np.allclose(vector_big_q, expected, rtol=1e-12, atol=0.0, equal_nan=True)
+
+    # predictions are taken from cache, only the changed timestep is predicted again
+    timesteps[3][1][0, 0] += 1.0
+    again = list(machine.predict_batches("nn", iter(timesteps)))
+    assert machine.models.predicted == [7, 7, 2]
+    assert np.array_equal([vector for _, vector in again][:3], [vector for _, vector in results][:3], equal_nan=True)
@@ -0,0 +1,81 @@
+"""
+    Name:           test_neural_network.py
+    Description:    Checks that a model loaded for training (modules/neural_network.py) continues with the saved state
+                    of optimizer and that a model loaded for inference is not compiled.
+    Usage:          python3 -m pytest tests (in 'src' folder, tests are skipped if TensorFlow is not installed)
+"""
+
+import os
+import sys
+import shutil
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+pytest.importorskip("tensorflow")
+h5py = pytest.importorskip("h5py")
+from modules.neural_network import NeuralNetwork
+
+PATH_TO_EXAMPLE_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "example",
+                                     "mo_bcc_fcc_training", "saved_nn", "nn1.h5")
+
+
+def training_batch(number_of_phases=2):
+    generator = np.random.default_rng(3)
+    return (generator.uniform(size=(64, 14)).astype(np.float32),
+            np.eye(number_of_phases)[generator.integers(0, number_of_phases, 64)])
+
+
+def optimizer_state(nn):
+    return {variable.path: variable.numpy() for variable in nn.model.optimizer.variables}
+
+
+def test_saved_state_of_optimizer(tmp_path):
+    x, y = training_batch()
+    nn = NeuralNetwork("new")
+    nn.create_model(14, 2)
+    nn.model.fit(x, y, batch_size=16, verbose=0)
+    nn.save_model(str(tmp_path))
+
+    loaded = NeuralNetwork("new")
+    loaded.load_model(str(tmp_path), training=True)
+    expected, actual = optimizer_state(nn), optimizer_state(loaded)
+    assert sorted(actual) == sorted(expected)
+    for name in expected:
+        assert np.array_equal(actual[name], expected[name])
+
+    # training continues
+    loaded.model.fit(x, y, batch_size=16, verbose=0)
+    assert int(loaded.model.optimizer.iterations) == 2 * int(nn.model.optimizer.iterations)
+
+    inference = NeuralNetwork("new")
+    inference.load_model(str(tmp_path))
+    assert getattr(inference.model, "optimizer", None) is None
+    assert np.allclose(inference.predict(x), nn.predict(x), atol=1e-6)
+
+
+def test_example_model_continues_training(tmp_path):
+    # model saved by older Keras with its own names of variables of optimizer
+    shutil.copy(PATH_TO_EXAMPLE_MODEL, tmp_path)
+    nn = NeuralNetwork("nn1")
+    nn.load_model(str(tmp_path), training=True)
+    iterations = int(nn.model.optimizer.iterations)
+    assert iterations > 0
+
+    with h5py.File(PATH_TO_EXAMPLE_MODEL, "r") as file:
+        saved = file["optimizer_weights"]
+        names = []
+        saved.visit(names.append)
+        moments = [name for name in names if name.endswith("/m:0")]
+        assert moments
+        state = optimizer_state(nn)
+        for name in moments:
+            layer, weight = name.split("/")[-3:-1]
+            restored = [value for path, value in state.items() if path.endswith("{}_{}_momentum".format(layer, weight))]
+            assert len(restored) == 1 and np.array_equal(restored[0], saved[name][()])
+
+    x, y = training_batch(nn.model.output_shape[-1])
+    nn.model.fit(x, y, batch_size=32, verbose=0)
+    assert int(nn.model.optimizer.iterations) == iterations + 2
@@ -0,0 +1,89 @@
+"""
+    Name:           test_numpy_network.py
+    Description:    Compares prediction of NumPy forward pass (modules/numpy_network.py) with Keras model.predict.
+    Usage:          python3 -m pytest tests (in 'src' folder, tests are skipped if TensorFlow is not installed)
+"""
+
+import os
+import sys
+import shutil
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules import descriptors as numpy_descriptors
+from modules.dump_reader import read_frames
+from modules.numpy_network import NumpyNetwork, BLOCK_SIZE
+from modules.model_registry import ModelRegistry
+
+pytest.importorskip("tensorflow")
+from modules.neural_network import NeuralNetwork
+
+PATH_TO_EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "example", "mo_bcc_fcc_amorf")
+EXAMPLE_MODEL = "nn-bcc-fcc-amorf"
+
+
+def example_descriptors():
+    """
+    returns descriptors of the first frame of amorphous molybdenum (250 atoms)
+    """
+    frame = next(read_frames(os.path.join(PATH_TO_EXAMPLE, "dumpOnlyAmorf.out")))
+    out = np.empty((len(frame.positions), numpy_descriptors.NUMBER_OF_DESCRIPTORS))
+    numpy_descriptors.compute_array(np.array(frame.positions), np.array(frame.pbc()), out)
+    return out.astype(np.float32)
+
+
+def assert_same_prediction(name, path, input_array):
+    keras_network = NeuralNetwork(name)
+    keras_network.load_model(path)
+    numpy_network = NumpyNetwork(name)
+    numpy_network.load_model(path)
+
+    expected = keras_network.predict(input_array)
+    actual = numpy_network.predict(input_array)
+    assert actual.shape == expected.shape
+    assert actual.dtype == np.float32
+    assert np.max(np.abs(actual - expected)) < 1e-5
+
+
+def test_example_model(tmp_path):
+    shutil.copy(os.path.join(PATH_TO_EXAMPLE, "saved_nn", EXAMPLE_MODEL + ".h5"), tmp_path)
+    input_array = example_descriptors()
+    assert_same_prediction(EXAMPLE_MODEL, str(tmp_path), input_array)
+
+    # weights were exported next to the model, rows of each atom sum to one (softmax)
+    assert os.path.isfile(os.path.join(tmp_path, EXAMPLE_MODEL + ".npz"))
+    network = NumpyNetwork(EXAMPLE_MODEL)
+    network.load_model(str(tmp_path))
+    assert network.activations == ["relu", "relu", "softmax"]
+    assert np.allclose(network.predict(input_array).sum(axis=1), 1.0, atol=1e-6)
+
+
+def test_new_model_and_more_blocks(tmp_path):
+    # model created (and saved) by the installed version of Keras, more atoms than one block
+    keras_network = NeuralNetwork("new")
+    keras_network.create_model(numpy_descriptors.NUMBER_OF_DESCRIPTORS, 4)
+    keras_network.save_model(str(tmp_path))
+    generator = np.random.default_rng(2)
+    input_array = generator.normal(size=(2 * BLOCK_SIZE + 7, numpy_descriptors.NUMBER_OF_DESCRIPTORS))
+    assert_same_prediction("new", str(tmp_path), input_array.astype(np.float32))
+
+
+def test_registry_exports_model_saved_again(tmp_path):
+    shutil.copy(os.path.join(PATH_TO_EXAMPLE, "saved_nn", EXAMPLE_MODEL + ".h5"), tmp_path)
+    registry = ModelRegistry(str(tmp_path))
+    first = registry.get(EXAMPLE_MODEL)
+    assert registry.get(EXAMPLE_MODEL) is first
+    assert (registry.loads, registry.hits) == (1, 1)
+
+    # model saved again (e.g. by 'train') has new modification time, its weights are exported again
+    path_to_model = os.path.join(tmp_path, EXAMPLE_MODEL + ".h5")
+    status = os.stat(path_to_model)
+    os.utime(path_to_model, ns=(status.st_atime_ns, status.st_mtime_ns + 1000000000))
+    second = registry.get(EXAMPLE_MODEL)
+    assert second is not first
+    assert registry.loads == 2
+    with np.load(os.path.join(tmp_path, EXAMPLE_MODEL + ".npz")) as weights:
+        assert weights["source"][1] == status.st_mtime_ns + 1000000000
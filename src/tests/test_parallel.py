@@ -0,0 +1,47 @@
+"""
+    Name:           test_parallel.py
+    Description:    Checks that descriptors calculated by a pool of workers (modules/parallel.py) are bit-identical
+                    with the serial calculation and that shared memory blocks of tasks are released.
+    Usage:          python3 -m pytest tests (in 'src' folder)
+"""
+
+import os
+import sys
+import shutil
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules import parallel
+from modules.dump_reader import read_frames, windows, indexed_frames
+
+PATH_TO_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "example", "mo_bcc_fcc_amorf",
+                            "dumpOnlyAmorf.out")
+
+
+def shared_memory_blocks():
+    """
+    returns names of shared memory blocks of this machine (empty set where they are not files)
+    """
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_workers_same_as_serial(tmp_path):
+    filename = str(tmp_path / "dump.out")
+    shutil.copy(PATH_TO_DUMP, filename)
+    selection = slice(None, None, 20)
+    window = 3
+
+    serial = []
+    for frames in windows(read_frames(filename, selection), window):
+        serial.extend(parallel.compute_frames(frames))
+
+    blocks_before = shared_memory_blocks()
+    in_parallel = list(parallel.compute_in_parallel(filename, indexed_frames(filename, selection), window, 2))
+    assert shared_memory_blocks() <= blocks_before
+
+    assert [timestep for timestep, _, _ in in_parallel] == [timestep for timestep, _, _ in serial]
+    for (_, serial_ids, serial_values), (_, ids, values) in zip(serial, in_parallel):
+        assert np.array_equal(ids, serial_ids)
+        assert np.array_equal(values, serial_values, equal_nan=True)
@@ -0,0 +1,80 @@
+"""
+    Name:           test_training_data.py
+    Description:    Checks that TrainingData (modules/training_data.py) streams every row of descriptor store
+                    exactly once with the right phase and splits validation data by segments.
+    Usage:          python3 -m pytest tests (in 'src' folder, tests are skipped if TensorFlow is not installed)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.descriptor_store import DescriptorStore
+
+pytest.importorskip("tensorflow")
+from modules.training_data import TrainingData
+
+PHASES = {"bcc": 0, "fcc": 1, "amorf": 2}
+
+
+def create_store(directory, segments_per_phase):
+    """
+    returns a store whose descriptors are (index of phase, unique number of row, ...), three frames in each segment
+    """
+    store = DescriptorStore(str(directory))
+    row = 0
+    for phase, index in PHASES.items():
+        for _ in range(segments_per_phase[phase]):
+            with store.segment_writer("float32") as writer:
+                for timestep, count in enumerate((70, 30, 50)):
+                    descriptors = np.zeros((count, 14), dtype=np.float32)
+                    descriptors[:, 0] = index
+                    descriptors[:, 1] = np.arange(row, row + count)
+                    writer.append(timestep, np.arange(count), descriptors, phase)
+                    row += count
+    return store
+
+
+def rows_of(dataset):
+    """
+    returns descriptors and phases of all rows of dataset
+    """
+    descriptors, phases = zip(*[(x.numpy(), y.numpy()) for x, y in dataset])
+    return np.concatenate(descriptors), np.concatenate(phases)
+
+
+def test_read_rows(tmp_path):
+    store = create_store(tmp_path, {"bcc": 1, "fcc": 1, "amorf": 1})
+    segment = sorted(store.segments)[1]
+    assert np.array_equal(store.read_rows(segment, 20, 120), store.open_segment(segment)[1][20:120])
+
+
+def test_every_row_once_with_its_phase(tmp_path):
+    store = create_store(tmp_path, {"bcc": 5, "fcc": 5, "amorf": 1})
+    data = TrainingData(store, PHASES, validation_fraction=0.2, shuffle_buffer=64, batch_size=16, shard_size=40)
+    training, training_phases = rows_of(data.training_dataset())
+    validation, validation_phases = rows_of(data.validation_dataset())
+
+    numbers = np.concatenate((training[:, 1], validation[:, 1]))
+    assert np.array_equal(np.sort(numbers), np.arange(store.number_of_rows))
+    assert len(training) == data.training_rows and len(validation) == data.validation_rows
+    assert np.array_equal(np.argmax(training_phases, axis=1), training[:, 0])
+    assert np.array_equal(np.argmax(validation_phases, axis=1), validation[:, 0])
+    # rows of training data are shuffled
+    assert not np.array_equal(training[:, 1], np.sort(training[:, 1]))
+
+    # one of five segments of bcc and fcc is used for validation, amorf (one segment) is split by frames
+    validation_segments = {segment for segment, _, _ in data.validation_shards}
+    training_segments = {segment for segment, _, _ in data.training_shards}
+    assert len(validation_segments - training_segments) == 2
+    assert len(validation_segments & training_segments) == 1
+
+
+def test_unknown_phase(tmp_path):
+    store = create_store(tmp_path, {"bcc": 1, "fcc": 1, "amorf": 1})
+    with pytest.raises(ValueError):
+        TrainingData(store, {"bcc": 0, "fcc": 1})